@@ -0,0 +1,258 @@
+"""end-to-end benchmark of OLTCLI_AN6K17 methods
+
+Each scenario runs one public method of OLTCLI_AN6K17 against a fresh OLTSimulator holding a fleet of 64, 1k or 8k ONUs,
+and reports wall time, logins, commands, round-trips and bytes served by the simulator, and CPU spent in extract_* parsers.
+A scenario fails when its round-trips exceed the budget recorded in budgets.json.
+
+    python -m benchmark.bench_cli                       # run all scenarios, check budgets
+    python -m benchmark.bench_cli --sizes 64 --only reset_onu
+    python -m benchmark.bench_cli --record              # save round-trips measured as budgets
+
+Methods using commands not emulated by OLTSimulator are not covered, nor is clear_olt_qinq_domain, which probes 20000 domain ids
+whatever the fleet size.
+"""
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, NoReturn, Optional
+
+from contextlib import contextmanager
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+from oltcli import cli
+from oltcli.cli import OLTCLI_AN6K17, WhitelistMode
+from oltcli.simulator import OLTSimulator, SimulatedONU
+
+# fleet size to (slots, pons, onus per pon)
+FLEETS = { 64: (1, 4, 16), 1024: (4, 16, 16), 8192: (16, 16, 32) }
+
+# seconds ONU stays offline after reset, longer than one show authorization of the largest fleet
+REBOOT_TIME = 3
+
+# file of recorded round-trip budgets, method name to { fleet size: round-trips }
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.json')
+
+class Fleet(NamedTuple):
+    """ONUs a scenario works on
+    """
+    simulator:OLTSimulator
+    oltcli:OLTCLI_AN6K17
+    # last authorized ONU, the worst case of scanning tables
+    onu:SimulatedONU
+    # ONU found by auto discovery but not authorized yet
+    new_onu:SimulatedONU
+
+class Scenario(NamedTuple):
+    """one method to benchmark
+    """
+    name:str
+    run:Callable[[Fleet], Any]
+    # called before counting starts
+    setup:Optional[Callable[[Fleet], Any]] = None
+    # largest fleet to run, for methods too slow on large fleets
+    max_onus:int = 8192
+    # headroom of recorded budget, round-trips vary a little with timing, and a lot for methods polling OLT until ONUs are back
+    slack:float = 0.05
+
+def add_profile(fleet:Fleet, name:str='bwp'):
+    fleet.oltcli.add_bandwidth_profile(name, 0, 1000, 0, 0, 2000)
+
+def add_domain(fleet:Fleet, bind:bool=False):
+    fleet.oltcli.add_olt_qinq_domain('domain')
+    if bind:
+        fleet.oltcli.bound_olt_qinq_domain(fleet.onu.slot, fleet.onu.pon, 'domain')
+
+SCENARIOS:List[Scenario] = [
+    Scenario('get_authorization', lambda f: f.oltcli.get_authorization()),
+    Scenario('get_onu_position', lambda f: f.oltcli.get_onu_position(f.onu.sn)),
+    Scenario('get_onu_id', lambda f: f.oltcli.get_onu_id(f.onu.sn)),
+    Scenario('get_onu_sn', lambda f: f.oltcli.get_onu_sn(f.onu.slot, f.onu.pon, f.onu.onu_id)),
+    Scenario('is_onu_online', lambda f: f.oltcli.is_onu_online(f.onu.sn)),
+    Scenario('reset_onu', lambda f: f.oltcli.reset_onu(f.onu.sn), slack=0.5),
+    Scenario('reset_all_onu', lambda f: f.oltcli.reset_all_onu(), slack=0.5),
+    Scenario('get_discovery', lambda f: f.oltcli.get_discovery()),
+    Scenario('get_pon_discovered', lambda f: f.oltcli.get_pon_discovered(f.new_onu.slot, f.new_onu.pon)),
+    Scenario('get_whitelist', lambda f: f.oltcli.get_whitelist(WhitelistMode.phyid)),
+    Scenario('get_pon_whitelist', lambda f: f.oltcli.get_pon_whitelist(f.onu.slot, f.onu.pon, WhitelistMode.phyid)),
+    Scenario('is_in_whitelist', lambda f: f.oltcli.is_in_whitelist(WhitelistMode.phyid, f.onu.sn)),
+    Scenario('is_onu_in_whitelist', lambda f: f.oltcli.is_onu_in_whitelist(f.onu.sn)),
+    Scenario('add_whitelist', lambda f: f.oltcli.add_whitelist(WhitelistMode.phyid_psw, f.new_onu.sn)),
+    Scenario('del_whitelist', lambda f: f.oltcli.del_whitelist(WhitelistMode.phyid, f.onu.sn)),
+    Scenario('del_from_whitelist', lambda f: f.oltcli.del_from_whitelist(f.onu.sn)),
+    Scenario('clear_pon_whitelist', lambda f: f.oltcli.clear_pon_whitelist(f.onu.slot, f.onu.pon)),
+    Scenario('clear_whitelist', lambda f: f.oltcli.clear_whitelist()),
+    Scenario('add_bandwidth_profile', lambda f: add_profile(f)),
+    Scenario('get_bandwidth_profile', lambda f: f.oltcli.get_bandwidth_profile(), setup=add_profile),
+    Scenario('query_bandwidth_profile_id_by_name', lambda f: f.oltcli.query_bandwidth_profile_id_by_name('bwp'), setup=add_profile),
+    Scenario('modify_bandwidth_profile', lambda f: f.oltcli.modify_bandwidth_profile('bwp', 0, 1000, 0, 0, 3000), setup=add_profile),
+    Scenario('del_bandwidth_profile', lambda f: f.oltcli.del_bandwidth_profile('bwp'), setup=add_profile, max_onus=64),
+    Scenario('clear_bandwidth_profile', lambda f: f.oltcli.clear_bandwidth_profile(), setup=lambda f: [ add_profile(f, name) for name in ('bwp1', 'bwp2') ], max_onus=64),
+    Scenario('set_onu_bandwidth_profile', lambda f: f.oltcli.set_onu_bandwidth_profile(f.onu.sn, 'bwp'), setup=add_profile),
+    Scenario('get_onu_bandwidth_profile', lambda f: f.oltcli.get_onu_bandwidth_profile(f.onu.sn)),
+    Scenario('clear_onu_bandwithd_profile', lambda f: f.oltcli.clear_onu_bandwithd_profile(f.onu.sn), setup=lambda f: (add_profile(f), f.oltcli.set_onu_bandwidth_profile(f.onu.sn, 'bwp'))),
+    Scenario('set_onu_bandwidth', lambda f: f.oltcli.set_onu_bandwidth(f.onu.sn, 0, 1000, 0, 2000)),
+    Scenario('add_olt_qinq_domain', lambda f: f.oltcli.add_olt_qinq_domain('domain')),
+    Scenario('get_olt_qinq_domain', lambda f: f.oltcli.get_olt_qinq_domain('domain'), setup=add_domain),
+    Scenario('set_olt_qinq_domain_service_count', lambda f: f.oltcli.set_olt_qinq_domain_service_count('domain', 2), setup=add_domain),
+    Scenario('bound_olt_qinq_domain', lambda f: f.oltcli.bound_olt_qinq_domain(f.onu.slot, f.onu.pon, 'domain'), setup=add_domain),
+    Scenario('is_olt_qinq_domain_bound', lambda f: f.oltcli.is_olt_qinq_domain_bound(f.onu.slot, f.onu.pon, 'domain'), setup=lambda f: add_domain(f, True)),
+    Scenario('unbound_olt_qinq_domain', lambda f: f.oltcli.unbound_olt_qinq_domain(f.onu.slot, f.onu.pon, 'domain'), setup=lambda f: add_domain(f, True)),
+    Scenario('del_olt_qinq_domain', lambda f: f.oltcli.del_olt_qinq_domain('domain'), setup=add_domain),
+]
+
+@contextmanager
+def count_parse_time() -> Iterator[List[float]]:
+    """count CPU seconds spent in extract_* functions of oltcli.cli while in context
+
+    Functions are replaced in module, so they are counted when called by OLTCLI_AN6K17 from any thread.
+
+    Returns:
+        List[float]: one item list, the CPU seconds counted so far
+    """
+    total = [ 0.0 ]
+    lock = threading.Lock()
+
+    def timed(func:Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with lock:
+                    total[0] += time.thread_time() - start
+        return wrapper
+
+    originals = { name: value for name, value in vars(cli).items() if name.startswith('extract_') and callable(value) }
+    for name, func in originals.items():
+        setattr(cli, name, timed(func))
+    try:
+        yield total
+    finally:
+        for name, func in originals.items():
+            setattr(cli, name, func)
+
+def run_scenario(scenario:Scenario, size:int) -> Dict[str, Any]:
+    """run scenario against a fresh simulator with the fleet of given size
+
+    Args:
+        scenario (Scenario): scenario to run
+        size (int): fleet size, key of FLEETS
+
+    Returns:
+        Dict[str, Any]: name, onus, wall, logins, commands, round_trips, bytes and parse_cpu
+    """
+    with OLTSimulator(reboot_time=REBOOT_TIME) as simulator:
+        onus = simulator.populate(*FLEETS[size])
+        newOnu = simulator.add_onu(1, 1, phy_pwd='fiberhome', authorized=False)
+
+        oltcli = OLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', port=simulator.port)
+        fleet = Fleet(simulator, oltcli, onus[-1], newOnu)
+        if scenario.setup != None:
+            scenario.setup(fleet)
+
+        simulator.reset_stats()
+        with count_parse_time() as parseTime:
+            start = time.perf_counter()
+            scenario.run(fleet)
+            wall = time.perf_counter() - start
+        stats = simulator.stats
+
+    return dict(name=scenario.name, onus=size, wall=wall, parse_cpu=parseTime[0], **stats)
+
+def load_budgets(path:str=BUDGETS_PATH) -> Dict[str, Dict[int, int]]:
+    """load recorded round-trip budgets
+
+    Args:
+        path (str, optional): budget file, default is budgets.json next to this file
+
+    Returns:
+        Dict[str, Dict[int, int]]: method name to { fleet size: round-trips }, empty if file not exists
+    """
+    if not os.path.exists(path):
+        return { }
+
+    with open(path, 'r') as f:
+        return { name: { int(size): budget for size, budget in budgets.items() } for name, budgets in json.load(f).items() }
+
+def save_budgets(budgets:Dict[str, Dict[int, int]], path:str=BUDGETS_PATH) -> NoReturn:
+    """save round-trip budgets
+
+    Args:
+        budgets (Dict[str, Dict[int, int]]): method name to { fleet size: round-trips }
+        path (str, optional): budget file, default is budgets.json next to this file
+    """
+    with open(path, 'w') as f:
+        json.dump({ name: { str(size): budgets[name][size] for size in sorted(budgets[name]) } for name in budgets }, f, indent=4)
+        f.write('\n')
+
+def run(sizes:List[int], names:Optional[List[str]]=None, record:bool=False, path:str=BUDGETS_PATH, out=sys.stdout) -> List[Dict[str, Any]]:
+    """run scenarios at given fleet sizes, print one line for each, and check or record budgets
+
+    Args:
+        sizes (List[int]): fleet sizes, keys of FLEETS
+        names (List[str], optional): names of scenarios to run, default is None, all scenarios
+        record (bool, optional): whether save round-trips measured as budgets instead of checking them, default is False
+        path (str, optional): budget file, default is budgets.json next to this file
+        out (file, optional): where to print, default is stdout
+
+    Returns:
+        List[Dict[str, Any]]: results of run_scenario, with budget and over_budget
+    """
+    budgets = load_budgets(path)
+    results = [ ]
+
+    header = '%-36s %6s %9s %7s %9s %11s %11s %10s %7s' % ('method', 'onus', 'wall(s)', 'logins', 'commands', 'round-trips', 'bytes', 'parse(s)', 'budget')
+    print(header, file=out)
+    print('-' * len(header), file=out)
+    for scenario in SCENARIOS:
+        if names and scenario.name not in names:
+            continue
+
+        for size in sizes:
+            if size > scenario.max_onus:
+                continue
+
+            result = run_scenario(scenario, size)
+            if record:
+                budgets.setdefault(scenario.name, { })[size] = math.ceil(result['round_trips'] * (1 + scenario.slack))
+
+            budget = budgets.get(scenario.name, { }).get(size)
+            result['budget'] = budget
+            result['over_budget'] = budget != None and result['round_trips'] > budget
+            results.append(result)
+
+            print('%-36s %6d %9.3f %7d %9d %11d %11d %10.3f %7s%s' % (result['name'], result['onus'], result['wall'], result['logins'], result['commands'],
+                result['round_trips'], result['bytes'], result['parse_cpu'], '-' if budget == None else budget, ' OVER BUDGET' if result['over_budget'] else ''), file=out)
+            out.flush()
+
+    if record:
+        save_budgets(budgets, path)
+
+    return results
+
+def main(argv:Optional[List[str]]=None) -> int:
+    """run benchmark from command line
+
+    Returns:
+        int: exit code, 1 if any method exceeds its budget
+    """
+    parser = argparse.ArgumentParser(description='benchmark OLTCLI_AN6K17 methods against OLTSimulator')
+    parser.add_argument('--sizes', type=int, nargs='+', choices=sorted(FLEETS), default=sorted(FLEETS), help='fleet sizes to run')
+    parser.add_argument('--only', nargs='+', metavar='METHOD', help='methods to run')
+    parser.add_argument('--record', action='store_true', help='save round-trips measured as budgets')
+    parser.add_argument('--budgets', default=BUDGETS_PATH, help='budget file')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.only, args.record, args.budgets)
+
+    overs = [ result for result in results if result['over_budget'] ]
+    for result in overs:
+        print('%s exceeds budget at %d ONUs: %d round-trips, budget is %d' % (result['name'], result['onus'], result['round_trips'], result['budget']), file=sys.stderr)
+
+    return 1 if len(overs) != 0 else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
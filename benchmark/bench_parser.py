@@ -0,0 +1,147 @@
+"""micro-benchmark of parsers on synthetic outputs
+
+Each table format of benchmark.corpus is generated once at the given fleet size, then parsed several times by its extract_* function.
+Rows per second is taken from the fastest run, peak memory is the most allocated by tracemalloc during one run.
+
+    python -m benchmark.bench_parser                            # 16 slots x 16 pons x 128 ONUs
+    python -m benchmark.bench_parser --onus 16 --only authorization whitelist_phy1
+    python -m benchmark.bench_parser --save before.json         # results to compare later
+    python -m benchmark.bench_parser --baseline before.json     # exit with 1 when a parser regresses
+"""
+from typing import Any, Dict, List, Optional
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from oltcli import cli
+from benchmark.corpus import Corpus, generate
+
+def measure(corpus:Corpus, repeat:int=3) -> Dict[str, Any]:
+    """parse output of corpus repeat times, and once more to trace memory
+
+    Args:
+        corpus (Corpus): output to parse
+        repeat (int, optional): number of timed runs, default is 3
+
+    Returns:
+        Dict[str, Any]: name, parser, rows, parsed, seconds, rows_per_sec and peak_bytes
+    """
+    parser = getattr(cli, corpus.parser)
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parsed = len(parser(corpus.output))
+        seconds = time.perf_counter() - start
+        best = seconds if best == None else min(best, seconds)
+
+    # traced run is slower, so it is not timed
+    tracemalloc.start()
+    try:
+        parser(corpus.output)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return dict(name=corpus.name, parser=corpus.parser, rows=corpus.rows, parsed=parsed, seconds=best, rows_per_sec=corpus.rows / best, peak_bytes=peak)
+
+def compare(result:Dict[str, Any], baseline:Optional[Dict[str, Any]], tolerance:float) -> Optional[str]:
+    """tell how result regresses from baseline
+
+    Args:
+        result (Dict[str, Any]): result of measure
+        baseline (Dict[str, Any]): result of measure saved before, None if not measured before
+        tolerance (float): fraction of rows per second allowed to lose
+
+    Returns:
+        str: reason of regression, None if not regressed
+    """
+    if baseline == None:
+        return None
+
+    if result['rows'] == baseline['rows'] and result['parsed'] != baseline['parsed']:
+        return 'parses %d rows instead of %d' % (result['parsed'], baseline['parsed'])
+
+    if result['rows_per_sec'] < baseline['rows_per_sec'] * (1 - tolerance):
+        return 'parses %.0f rows/s instead of %.0f' % (result['rows_per_sec'], baseline['rows_per_sec'])
+
+    return None
+
+def run(slots:int, pons:int, onus:int, seed:int=0, repeat:int=3, names:Optional[List[str]]=None,
+        baselines:Optional[Dict[str, Dict[str, Any]]]=None, tolerance:float=0.2, out=sys.stdout) -> List[Dict[str, Any]]:
+    """measure parsers, print one line for each
+
+    Args:
+        slots (int): number of slots
+        pons (int): number of pon ports in each slot
+        onus (int): number of ONUs on each pon port
+        seed (int, optional): seed of random values, default is 0
+        repeat (int, optional): number of timed runs, default is 3
+        names (List[str], optional): names of formats to run, default is None, all formats
+        baselines (Dict[str, Dict[str, Any]], optional): name to result saved before, default is None, not compared
+        tolerance (float, optional): fraction of rows per second allowed to lose from baseline, default is 0.2
+        out (file, optional): where to print, default is stdout
+
+    Returns:
+        List[Dict[str, Any]]: results of measure, with speedup and regression
+    """
+    baselines = baselines or { }
+    results = [ ]
+
+    header = '%-18s %-26s %8s %8s %9s %11s %10s %8s' % ('format', 'parser', 'rows', 'parsed', 'time(s)', 'rows/s', 'peak(MB)', 'speedup')
+    print(header, file=out)
+    print('-' * len(header), file=out)
+    for corpus in generate(slots, pons, onus, seed, names):
+        result = measure(corpus, repeat)
+        baseline = baselines.get(corpus.name)
+        result['speedup'] = None if baseline == None else result['rows_per_sec'] / baseline['rows_per_sec']
+        result['regression'] = compare(result, baseline, tolerance)
+        results.append(result)
+
+        print('%-18s %-26s %8d %8d %9.3f %11.0f %10.1f %8s%s' % (result['name'], result['parser'], result['rows'], result['parsed'], result['seconds'], result['rows_per_sec'],
+            result['peak_bytes'] / 2 ** 20, '-' if result['speedup'] == None else '%.2fx' % result['speedup'], '' if result['regression'] == None else ' REGRESSED'), file=out)
+        out.flush()
+
+    return results
+
+def main(argv:Optional[List[str]]=None) -> int:
+    """run benchmark from command line
+
+    Returns:
+        int: exit code, 1 if any parser regresses from baseline
+    """
+    parser = argparse.ArgumentParser(description='benchmark parsers on synthetic outputs')
+    parser.add_argument('--slots', type=int, default=16, help='number of slots')
+    parser.add_argument('--pons', type=int, default=16, help='number of pon ports in each slot')
+    parser.add_argument('--onus', type=int, default=128, help='number of ONUs on each pon port')
+    parser.add_argument('--seed', type=int, default=0, help='seed of random values')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs')
+    parser.add_argument('--only', nargs='+', metavar='FORMAT', help='formats to run')
+    parser.add_argument('--save', help='file to save results')
+    parser.add_argument('--baseline', help='file of results saved before, to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='fraction of rows per second allowed to lose from baseline')
+    args = parser.parse_args(argv)
+
+    baselines = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baselines = { result['name']: result for result in json.load(f) }
+
+    results = run(args.slots, args.pons, args.onus, args.seed, args.repeat, args.only, baselines, args.tolerance)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump([ { k: v for k, v in result.items() if k not in [ 'speedup', 'regression' ] } for result in results ], f, indent=4)
+            f.write('\n')
+
+    regressions = [ result for result in results if result['regression'] != None ]
+    for result in regressions:
+        print('%s %s' % (result['name'], result['regression']), file=sys.stderr)
+
+    return 1 if len(regressions) != 0 else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""synthetic CLI outputs of any size
+
+Each function renders the output of one show command in the layout AN6000-17 prints, filled with random but realistic values,
+so parsers can be measured on tables far larger than the samples captured from real OLTs. Same seed gives same output.
+"""
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import random
+
+ONU_TYPES = [ 'HG6243C', '5506-04-F1', '5506-10-A1', '5506-02-F', 'HG6201M', 'HG260' ]
+
+# title, dashes and row layout of each show whitelist format, see extract_whitelist
+WHITELIST_FORMATS = {
+    'phy1': (' ----- Physical Address Whitelist -----',
+             'Slot  Pon   Onu   Onu-Type       Phy-ID       Phy-Pwd    Used',
+             '----- ----- ----- -------------- ------------ ---------- ----'),
+    'phy2': (' ----- Physical SN Whitelist-----',
+             'PHYID        PHYPWD     SLOT  PON   ONU   TYPE           EN  USED',
+             '------------ ---------- ----- ----- ----- -------------- --- ----'),
+    'log1': (' ----- Logic SN Whitelist-----',
+             'Slot  Pon   Onu   Onu-Type       Logic-Id                 Logic-Pwd    En Used',
+             '----- ----- ----- -------------- ------------------------ ------------ -- ----'),
+    'log2': ('----- Logical SN Whitelist-----',
+             'LOGICId                  LOGICPWD     SLOT  PON   ONU   TYPE           EN  USED',
+             '------------------------ ------------ ----- ----- ----- -------------- --- ----'),
+    'pwd1': (' ----- Physical Password Whitelist -----',
+             'Slot  Pon   Onu   Onu-Type       Phy-Pwd    En Used',
+             '----- ----- ----- -------------- ---------- -- ----'),
+    'pwd2': ('----- Physical Password Whitelist-----',
+             'PHYPWD     SLOT  PON   ONU   TYPE           EN  USED',
+             '---------- ----- ----- ----- -------------- --- ----'),
+}
+
+class FakeONU(NamedTuple):
+    """ONU shown in generated tables
+    """
+    slot:int
+    pon:int
+    onu:int
+    onu_type:str
+    sn:str
+    phy_pwd:str
+    logic_id:str
+    logic_pwd:str
+    online:bool
+
+def fleet(slots:int, pons:int, onus:int, seed:int=0) -> Iterator[FakeONU]:
+    """ONUs of a fleet, slot and pon count from 1, onu id counts from 1 in each pon
+
+    Args:
+        slots (int): number of slots
+        pons (int): number of pon ports in each slot
+        onus (int): number of ONUs on each pon port, at most 128
+        seed (int, optional): seed of random values, default is 0
+
+    Returns:
+        Iterator[FakeONU]: ONUs ordered by slot, pon and onu id
+    """
+    rand = random.Random(seed)
+    for slot in range(1, slots + 1):
+        for pon in range(1, pons + 1):
+            for onu in range(1, onus + 1):
+                # most ONUs are authorized by SN only, some carry password or logic id
+                kind = rand.random()
+                phyPwd = '' if kind < 0.7 else rand.choice([ 'fiberhome', '%010d' % rand.randrange(10 ** 10) ])
+                logicId = '' if kind < 0.8 else 'fiberhome%06d' % rand.randrange(10 ** 6)
+                logicPwd = '' if logicId == '' else rand.choice([ '', 'fiberhome' ])
+                yield FakeONU(slot, pon, onu, rand.choice(ONU_TYPES), 'FHTT%08x' % rand.getrandbits(32), phyPwd, logicId, logicPwd, rand.random() < 0.9)
+
+def group_by_pon(onus:Iterator[FakeONU]) -> Iterator[Tuple[Tuple[int, int], List[FakeONU]]]:
+    """group ONUs by (slot, pon), ONUs should be ordered by slot and pon
+    """
+    key, group = None, [ ]
+    for onu in onus:
+        if (onu.slot, onu.pon) != key and len(group) != 0:
+            yield key, group
+            group = [ ]
+        key = (onu.slot, onu.pon)
+        group.append(onu)
+
+    if len(group) != 0:
+        yield key, group
+
+def authorization(slots:int, pons:int, onus:int, seed:int=0) -> str:
+    """output of show authorization
+
+    Returns:
+        str: output, slots * pons * onus rows
+    """
+    lines = [ '-----  ONU Auth Table, Total ITEM = %s -----' % (slots * pons * onus) ]
+    for (slot, pon), group in group_by_pon(fleet(slots, pons, onus, seed)):
+        lines.append('')
+        lines.append('A: Authorized  P: Preauthorized  R: System Reserved')
+        lines.append('')
+        lines.append('-----  ONU Auth Table, SLOT = %s, PON = %s, ITEM = %s -----' % (slot, pon, len(group)))
+        lines.append('Slot Pon Onu OnuType        ST Lic OST PhyId        PhyPwd     LogicId                  LogicPwd')
+        lines.append('---- --- --- -------------- -- --- --- ------------ ---------- ------------------------ ------------')
+        for onu in group:
+            lines.append('%-4s %-3s %-3s %-14s %-2s %-3s %-3s %-12s %-10s %-24s %-12s' % (slot, pon, onu.onu, onu.onu_type, 'A', 0, 'up' if onu.online else 'dn',
+                         onu.sn, onu.phy_pwd, onu.logic_id, onu.logic_pwd))
+    lines.append('=' * 100)
+
+    return '\r\n'.join(lines)
+
+def discovery(slots:int, pons:int, onus:int, seed:int=0) -> str:
+    """output of show discovery
+
+    Returns:
+        str: output, slots * pons * onus rows
+    """
+    lines = [ ]
+    for (slot, pon), group in group_by_pon(fleet(slots, pons, onus, seed)):
+        lines.append('=' * 84)
+        lines.append('----- ONU Unauth Table, SLOT = %s, PON = %s, ITEM = %s -----' % (slot, pon, len(group)))
+        lines.append('No  OnuType        PhyId        PhyPwd     LogicId                  LogicPwd     Why')
+        lines.append('--- -------------- ------------ ---------- ------------------------ ------------ ---')
+        for onu in group:
+            lines.append('%-3s %-14s %-12s %-10s %-24s %-12s %-3s' % (onu.onu, onu.onu_type, onu.sn, onu.phy_pwd, onu.logic_id, onu.logic_pwd, 1))
+    lines.append('=' * 84)
+
+    return '\r\n'.join(lines)
+
+def whitelist(slots:int, pons:int, onus:int, format:str='phy1', seed:int=0) -> str:
+    """output of show whitelist
+
+    Args:
+        format (str, optional): key of WHITELIST_FORMATS, 'phy1', 'log1' and 'pwd1' are printed in config mode, the others in interface pon mode.
+                                default is 'phy1'
+
+    Returns:
+        str: output, slots * pons * onus rows
+    """
+    header, titles, dashes = WHITELIST_FORMATS[format]
+
+    lines = [ header, titles, dashes ]
+    for (slot, pon), group in group_by_pon(fleet(slots, pons, onus, seed)):
+        if format in [ 'phy2', 'log2', 'pwd2' ] and len(lines) != 3:
+            lines.extend([ header, titles, dashes ])
+
+        for onu in group:
+            used = 'Y' if onu.online else 'N'
+            if format == 'phy1':
+                lines.append('%-5s %-5s %-5s %-14s %-12s %-10s %s' % (slot, pon, onu.onu, onu.onu_type, onu.sn, onu.phy_pwd, used))
+            elif format == 'phy2':
+                lines.append('%-12s %-10s %-5s %-5s %-5s %-14s %-3s %s' % (onu.sn, onu.phy_pwd, slot, pon, onu.onu, onu.onu_type, 'EN', used + 'ES' if used == 'Y' else 'NO'))
+            elif format == 'log1':
+                lines.append('%-5s %-5s %-5s %-14s %-24s %-12s %-2s %s' % (slot, pon, onu.onu, onu.onu_type, onu.logic_id or onu.sn, onu.logic_pwd, 'Y', used))
+            elif format == 'log2':
+                lines.append('%-24s %-12s %-5s %-5s %-5s %-14s %-3s %s' % (onu.logic_id or onu.sn, onu.logic_pwd, slot, pon, onu.onu, onu.onu_type, 'EN', used + 'ES' if used == 'Y' else 'NO'))
+            elif format == 'pwd1':
+                lines.append('%-5s %-5s %-5s %-14s %-10s %-2s %s' % (slot, pon, onu.onu, onu.onu_type, onu.phy_pwd or '%010d' % onu.onu, 'Y', used))
+            else:
+                lines.append('%-10s %-5s %-5s %-5s %-14s %-3s %s' % (onu.phy_pwd or '%010d' % onu.onu, slot, pon, onu.onu, onu.onu_type, 'EN', used + 'ES' if used == 'Y' else 'NO'))
+
+        if format in [ 'phy2', 'log2', 'pwd2' ]:
+            lines.append('-' * 32)
+            lines.append('SLOT: %s PON: %s ITEM: %s' % (slot, pon, len(group)))
+
+    return '\r\n'.join(lines)
+
+def onu_port_vlan(ports:int, services:int, slot:int=1, pon:int=1, onu:int=1, seed:int=0) -> str:
+    """output of show onu port vlan
+
+    Args:
+        ports (int): number of ONU ports
+        services (int): number of services on each port
+
+    Returns:
+        str: output, ports * services rows
+    """
+    rand = random.Random(seed)
+    lines = [ 'NO.  SL/LI/ONU PORT ID TYPE  MODE CVID COS  TPID  TVID COS  TPID  SVID COS  TPID  PVID COS  SRVTYPE PRIQUE  GEMPORT',
+              '=' * 116 ]
+    no = 1
+    for port in range(1, ports + 1):
+        for service in range(1, services + 1):
+            # unicast services translate or tag customer vlan, others are transparent
+            if rand.random() < 0.5:
+                cvid, cos, tvid, svid = rand.randrange(1, 4095), rand.randrange(8), rand.randrange(1, 4095), 'null'
+                mode = 'tag'
+            else:
+                cvid, cos, tvid, svid = 'null', 'null', 'null', 'null'
+                mode = 'tran'
+            lines.append('%-4s %-2s/%-2s/%-3s %-4s %-2s %-5s %-4s %-4s %-4s %-5s %-4s %-4s %-5s %-4s %-4s %-5s %-4s %-4s %-7s %-7s %s' % (no, slot, pon, onu, port, service, 'unica',
+                         mode, cvid, cos, 33024, tvid, 'null', 'null', svid, 'null', 'null', 'null', 'null', 'default', 'default', 'default'))
+            no = no + 1
+
+    return '\r\n'.join(lines)
+
+def bandwidth_profile(profiles:int, seed:int=0) -> str:
+    """output of show bandwidth-profile all
+
+    Args:
+        profiles (int): number of profiles
+
+    Returns:
+        str: output, profiles rows
+    """
+    rand = random.Random(seed)
+    lines = [ '-------- onubandwidth profile, num = %s --------' % profiles,
+              'Id   Name                 upMin  upMax  downMin downMax upFix',
+              '-' * 66 ]
+    for id in range(1, profiles + 1):
+        upMax, downMax = rand.choice([ 1000, 2000, 10000, 100000 ]), rand.choice([ 2000, 3000, 10000, 100000 ])
+        lines.append('%-4s %-20s %-6s %-6s %-6s  %-6s %-6s' % (id, 'b_prf_%s' % id, rand.choice([ 0, upMax // 2 ]), upMax, rand.choice([ 0, downMax // 2 ]), downMax, 0))
+
+    return '\r\n'.join(lines)
+
+class Corpus(NamedTuple):
+    """output of one table format and the number of rows in it
+    """
+    name:str
+    parser:str
+    output:str
+    rows:int
+
+def generate(slots:int=16, pons:int=16, onus:int=128, seed:int=0, names:Optional[List[str]]=None) -> Iterator[Corpus]:
+    """outputs of every table format the benchmarked parsers accept
+
+    Args:
+        slots (int, optional): number of slots, default is 16
+        pons (int, optional): number of pon ports in each slot, default is 16
+        onus (int, optional): number of ONUs on each pon port, default is 128
+        seed (int, optional): seed of random values, default is 0
+        names (List[str], optional): names of formats to generate, default is None, all formats
+
+    Returns:
+        Iterator[Corpus]: outputs, generated one by one
+    """
+    total = slots * pons * onus
+
+    # name to (parser, function generating output, rows)
+    formats:Dict[str, Tuple[str, Callable[[], str], int]] = {
+        'authorization': ('extract_authorization', lambda: authorization(slots, pons, onus, seed), total),
+        'discovery': ('extract_discovery', lambda: discovery(slots, pons, onus, seed), total),
+        # ONUs have 4 ports at most, services make up the rest
+        'onu_port_vlan': ('extract_onu_port_vlan', lambda: onu_port_vlan(4, max(1, total // 4), seed=seed), 4 * max(1, total // 4)),
+        'bandwidth_profile': ('extract_bandwidth_profile', lambda: bandwidth_profile(total, seed), total),
+    }
+    for format in WHITELIST_FORMATS:
+        formats['whitelist_%s' % format] = ('extract_whitelist', lambda format=format: whitelist(slots, pons, onus, format, seed), total)
+
+    for name, (parser, func, rows) in formats.items():
+        if names and name not in names:
+            continue
+        yield Corpus(name, parser, func(), rows)
@@ -0,0 +1,1250 @@
+'''
+AN6000系列OLT命令行接口的asyncio封装
+'''
+
+from contextlib import asynccontextmanager
+from typing import Any, Callable, List, NoReturn, Optional, Pattern, Tuple
+
+import asyncio
+import logging
+import time
+
+from .utils import parse_datetime
+from .telnet import Connection, CommandResult, find_error, LOGIN_PROMPT_EXP, PASSWORD_PROMPT_EXP, USER_PROMPT_EXP, ADMIN_PROMPT_EXP, MAX_PROMPT_LEN, compile_prompt
+from .snapshot import ONUIndex, AuthorizationSnapshot
+from .entry import AuthorizationEntry
+from .cli import WhitelistMode, get_whitelist_query_str, get_whitelist_id_key, get_whitelist_add_cmd, get_whitelist_del_cmd, \
+    select_whitelist, whitelist_contains, check_results, is_online_in, get_reset_all_cmds, get_auth_mode_query_str, \
+    get_onu_port_vlan_cmd, get_bandwidth_profile_str, get_onu_bandwidth_cmd, get_onu_layer3_rate_limit_cmds, \
+    get_onu_qinq_classification_profile_str, get_olt_qinq_domain_str, bool_to_str, str_to_bool, auto_convert, \
+    extract_snmp_time, extract_card_info, extract_acl, extract_ip_address, extract_system_time, extract_authorization, \
+    extract_last_reg_status_change, iter_whitelist, extract_whitelist, extract_auto_discover, extract_pon_auto_discover, extract_discovery, \
+    extract_manage_vlan, extract_port_authentication_mode, extract_dhcp_state, extract_pppoe_plus, extract_onu_port_vlan, \
+    extract_onu_port_status, extract_igmp_vlan, extract_igmp_mode_info, extract_port_vlan, extract_wan_cfg, \
+    extract_onu_statistics, extract_bandwidth_profile, extract_onu_bandwidth, extract_bandwidth, \
+    extract_onu_layer3_rate_limit_profile, extract_service_vlan, extract_onu_qinq_classification_profile, \
+    extract_olt_qinq_domain, extract_olt_qinq_domain_bound_info, extract_current_alarm
+
+logger = logging.getLogger(__name__)
+
+# telnet commands, see RFC 854
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+
+class AsyncOLTTelnet(Connection):
+    """Async OLT Telnet
+
+    AsyncOLTTelnet represents a telnet connection with OLT driven by asyncio,
+    connect/run/disconnect are coroutines, use it with async with syntax
+    """
+
+    def __init__(self, ip:str, username:str, password:str, port:int=23, timeout:Optional[float]=30) -> NoReturn:
+        """init
+
+        Args:
+            ip (str): OLT ip address
+            username (str): username for connection
+            password (str): password for connection
+            port (int, optional): telnet port, default is 23
+            timeout (float, optional): seconds to wait for more data before giving up, default is 30, None is waiting forever
+        """
+        # save information need for connection
+        self._ip = ip
+        self._port = port
+        self._username = username
+        self._password = password
+        self._timeout = timeout
+
+        # stream of connection
+        self._reader = None
+        self._writer = None
+
+        # data received but not consumed yet
+        self._buffer = bytearray()
+
+        # state of telnet command parsing, kept between chunks
+        self._iac = bytearray()
+        self._in_sb = False
+
+        # prompt regex, compiled with hostname after login
+        self._prompt_exp = None
+
+        # hostname and mode in last prompt
+        self._hostname = None
+        self._mode = None
+
+    def __enter__(self):
+        """with syntax is not supported, use async with
+        """
+        raise TypeError('use async with for AsyncOLTTelnet')
+
+    async def __aenter__(self):
+        """to support async with syntax
+        """
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_tb):
+        """to support async with syntax
+        """
+        await self.disconnect()
+
+    def __del__(self):
+        """close transport when free, no coroutine can be awaited here
+        """
+        if self._writer != None:
+            self._writer.close()
+            self._writer = None
+
+    @property
+    def hostname(self) -> Optional[str]:
+        """hostname shown in prompt
+
+        Returns:
+            str: hostname, None if not logged in
+        """
+        return self._hostname
+
+    @property
+    def mode(self) -> Optional[str]:
+        """mode shown in last prompt
+
+        Returns:
+            str: mode such as 'config' or 'config-pon-1/4/8', None in admin mode
+        """
+        return self._mode
+
+    async def connect(self) -> NoReturn:
+        """connect OLT with given information
+        """
+        await self.disconnect()
+
+        self._reader, self._writer = await asyncio.open_connection(self._ip, self._port)
+        self._buffer = bytearray()
+        self._iac = bytearray()
+        self._in_sb = False
+
+        # login
+        await self._read_until_prompt(LOGIN_PROMPT_EXP)
+        self._writer.write(self._username.encode('ascii') + b"\n")
+        await self._read_until_prompt(PASSWORD_PROMPT_EXP)
+        self._writer.write(self._password.encode('ascii') + b"\n")
+
+        # enter admin mode
+        await self._read_until_prompt(USER_PROMPT_EXP)
+        self._writer.write("enable".encode('ascii') + b"\n")
+        await self._read_until_prompt(PASSWORD_PROMPT_EXP)
+        self._writer.write(self._password.encode('ascii') + b"\n")
+
+        # learn hostname from the first prompt of admin mode
+        _, match = await self._read_until_prompt(ADMIN_PROMPT_EXP)
+        self._hostname = match.group('hostname').decode('ascii')
+        self._mode = None if match.group('mode') == None else match.group('mode').decode('ascii')
+        self._prompt_exp = compile_prompt(self._hostname)
+
+        # disable paging
+        await self.run('terminal length 0')
+
+    async def disconnect(self) -> NoReturn:
+        """disconnect with OLT
+        """
+        if self._writer != None:
+            writer = self._writer
+            self._reader, self._writer = None, None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def run(self, cmd:str, append_return:bool=True) -> str:
+        """run command through telnet connection
+
+        Args:
+            cmd (str): command need to run
+            append_return (bool, optional): whether add RETURN at end of command, default is True
+
+        Returns:
+            str: result to return
+        """
+        if self._writer == None:
+            raise RuntimeError("need connect OLT first")
+
+        # before run command, discard last result in buffer
+        if len(self._buffer) != 0:
+            logger.debug('discard unread data: %s' % bytes(self._buffer))
+            self._buffer = bytearray()
+
+        # run command
+        if append_return:
+            cmdBytes = cmd.encode('ascii') + b"\r\n"
+        else:
+            cmdBytes = cmd.encode('ascii')
+        self._writer.write(cmdBytes)
+        await self._writer.drain()
+
+        # read result until prompt
+        data, match = await self._read_until_prompt(self._prompt_exp)
+        self._mode = None if match.group('mode') == None else match.group('mode').decode('ascii')
+
+        raw_output = data.decode("ascii")
+        output = raw_output.split("\r\n")[1:-1]
+        ret = "\r\n".join(output)
+        logger.debug(ret)
+
+        return ret
+
+    async def run_batch(self, cmds:List[str]) -> List[CommandResult]:
+        """run commands in order, and check error of each
+
+        Args:
+            cmds (List[str]): commands to run
+
+        Returns:
+            List[CommandResult]: results in order of commands
+        """
+        results = [ ]
+        for cmd in cmds:
+            output = await self.run(cmd)
+            results.append(CommandResult(cmd, output, find_error(output), self.mode))
+
+        return results
+
+    async def _read_until_prompt(self, exp:Pattern) -> Tuple[bytes, Any]:
+        """read until prompt matched, return as soon as it arrives
+
+        Args:
+            exp (Pattern): compiled regex of prompt
+
+        Returns:
+            tuple: (data, match), data is bytes read including prompt, match is the match object of prompt
+        """
+        start = 0
+        while True:
+            # search prompt only in data not searched before
+            match = exp.search(self._buffer, start)
+            if match:
+                # match again on a copy, buffer is changed below
+                data = bytes(self._buffer[:match.end()])
+                match = exp.match(data, match.start())
+                del self._buffer[:match.end()]
+                return data, match
+
+            start = max(0, len(self._buffer) - MAX_PROMPT_LEN)
+
+            try:
+                raw = await asyncio.wait_for(self._reader.read(65536), self._timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError('no prompt from %s in %s seconds, received: %s' % (self._ip, self._timeout, bytes(self._buffer[-MAX_PROMPT_LEN:])))
+
+            if not raw:
+                raise EOFError('telnet connection closed')
+
+            self._buffer += self._process(raw)
+
+    def _process(self, raw:bytes) -> bytes:
+        """remove telnet commands from received data, and refuse every option negotiation like telnetlib
+
+        Args:
+            raw (bytes): data received from socket
+
+        Returns:
+            bytes: data without telnet commands
+        """
+        cooked = bytearray()
+        reply = bytearray()
+        for c in raw:
+            if len(self._iac) == 0:
+                if c == IAC:
+                    self._iac.append(c)
+                elif self._in_sb or c == 0 or c == 0x11:
+                    # skip subnegotiation data, NUL and XON
+                    continue
+                else:
+                    cooked.append(c)
+                continue
+
+            self._iac.append(c)
+            if len(self._iac) == 2:
+                if c == IAC:
+                    # escaped 0xFF
+                    if not self._in_sb:
+                        cooked.append(c)
+                elif c in (DO, DONT, WILL, WONT):
+                    # need option
+                    continue
+                elif c == SB:
+                    self._in_sb = True
+                elif c == SE:
+                    self._in_sb = False
+                self._iac = bytearray()
+                continue
+
+            # IAC, verb, option
+            verb, option = self._iac[1], c
+            if verb == DO:
+                reply += bytes([IAC, WONT, option])
+            elif verb == WILL:
+                reply += bytes([IAC, DONT, option])
+            self._iac = bytearray()
+
+        if len(reply) != 0:
+            self._writer.write(bytes(reply))
+
+        return bytes(cooked)
+
+async def wait_for_true(func:Callable, interval:float, timeout:float) -> NoReturn:
+    """等待协程函数返回True
+
+    Args:
+        func (Callable): 无参数的协程函数
+        interval (float): 检查间隔的秒数
+        timeout (float): 超时的秒数
+
+    Raises:
+        TimeoutError: 超时后仍未返回True
+    """
+    deadline = time.monotonic() + timeout
+    while not await func():
+        if time.monotonic() > deadline:
+            raise TimeoutError('等待%s秒后仍不满足条件' % timeout)
+        await asyncio.sleep(interval)
+
+class AsyncOLTCLI_AN6K17:
+    """asyncio版本的OLTCLI for AN6000-17 serie
+
+    方法与OLTCLI_AN6K17同名同参，均为协程。一个事件循环即可同时轮询大量OLT，不需要每个会话一个线程。
+    命令由cli.py中的get_*_cmd等函数生成，结果由extract_*函数解析，与OLTCLI_AN6K17共用，这里只负责收发。
+
+    支持的方法：
+        get_snmp_time, get_card_type, get_acl, get_ip_address, get_system_time,
+        get_authorization, get_authorization_snapshot, invalidate_authorization,
+        get_onu_position, get_onu_id, get_onu_sn, get_onu_last_online_time, get_onu_last_offline_time, is_onu_online,
+        reset_onu, reset_all_onu,
+        get_pon_whitelist, get_whitelist, is_in_whitelist, is_onu_in_whitelist, add_whitelist, del_whitelist,
+        get_auto_discover, get_pon_auto_discover, get_discovery, get_pon_discovered,
+        get_manage_vlan, get_auth_mode, get_dhcp_option, get_pppoe_plus,
+        set_onu_port_vlan_tls, get_onu_port_vlan, get_onu_port_status, get_onu_port_vlan_service_count,
+        set_onu_port_vlan_service_count, set_onu_port_vlan_service_type, del_onu_port_vlan_service,
+        get_igmp_vlan, get_igmp_mode, get_port_vlan, get_onu_wan_cfg, get_onu_statistics,
+        get_bandwidth_profile, query_bandwidth_profile_id_by_name, set_onu_bandwidth_profile, get_onu_bandwidth_profile,
+        set_onu_bandwidth, get_pon_bandwidth, get_onu_layer3_rate_limit, get_service_vlan,
+        get_onu_qinq_classification_profile, get_olt_qinq_domain, is_olt_qinq_domain_bound, get_current_alarm
+    其余方法请使用OLTCLI_AN6K17。
+    """
+
+    def __init__(self, ip:str, username:str, password:str, keep_alive:bool=False, port:int=23, auth_ttl:float=0) -> NoReturn:
+        """OLT构造函数
+
+        Args:
+            ip (str): OLT IP地址
+            username (str): OLT Telnet用户名
+            password (str): OLT Telnet密码
+            keep_alive (bool, optional): 是否保持一个Telnet会话供所有命令复用。默认False，每个方法单独登录一次。
+            port (int, optional): OLT Telnet端口。默认23。
+            auth_ttl (float, optional): 授权表快照的有效秒数，同OLTCLI_AN6K17。默认0，每次都重新查询。
+        """
+        self._ip = ip
+        self._username = username
+        self._password = password
+        self._port = port
+
+        # 长连接会话，keep_alive为True时使用
+        self._keep_alive = keep_alive
+        self._conn = None
+        self._lock = asyncio.Lock()
+
+        # 授权表快照，修改授权或白名单的方法会使其失效
+        self._auth_ttl = auth_ttl
+        self._auth_snapshot = None
+
+    @property
+    def ip(self) -> str:
+        """OLT Telnet IP地址
+
+        Returns:
+            str: OLT IP地址
+        """
+        return self._ip
+
+    @property
+    def username(self) -> str:
+        """OLT Telnet用户名
+
+        Returns:
+            str: OLT Telnet用户名
+        """
+        return self._username
+
+    @property
+    def password(self) -> str:
+        """OLT Telnet密码
+
+        Returns:
+            str: OLT Telnet密码
+        """
+        return self._password
+
+    async def __aenter__(self):
+        """支持async with语法
+        """
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_tb):
+        """支持async with语法，退出时关闭长连接会话
+        """
+        await self.close()
+
+    @asynccontextmanager
+    async def _connect(self):
+        """获取到OLT的连接。keep_alive为False时，每次新建连接并登录；为True时，复用长连接会话。
+
+        Yields:
+            AsyncOLTTelnet: 处于Admin模式下的连接
+        """
+        if not self._keep_alive:
+            async with AsyncOLTTelnet(self.ip, self.username, self.password, self._port) as conn:
+                yield conn
+            return
+
+        async with self._lock:
+            try:
+                if self._conn == None:
+                    self._conn = AsyncOLTTelnet(self.ip, self.username, self.password, self._port)
+                    await self._conn.connect()
+
+                # 根据提示符中的模式退回Admin模式
+                while self._conn.mode != None:
+                    await self._conn.run('exit')
+
+                yield self._conn
+            except (EOFError, OSError):
+                # 连接已断开，下次使用时重建
+                if self._conn != None:
+                    await self._conn.disconnect()
+                    self._conn = None
+                raise
+
+    async def close(self) -> NoReturn:
+        """关闭长连接会话。之后再调用方法时会自动重新建立。
+        """
+        async with self._lock:
+            if self._conn != None:
+                await self._conn.disconnect()
+                self._conn = None
+
+    async def _query(self, cmd:str, pon:Optional[Tuple[int, int]]=None, mode:str='config') -> str:
+        """在指定模式下执行一条命令，返回结果
+
+        Args:
+            cmd (str): 要执行的命令
+            pon (tuple, optional): (slot, port)，指定时在interface pon下执行。默认None。
+            mode (str, optional): 在config下要进入的模式，如'igmp'。默认'config'，不再进入其它模式。
+
+        Returns:
+            str: 命令返回的信息
+        """
+        async with self._connect() as conn:
+            await conn.run('config')
+            if mode != 'config':
+                await conn.run(mode)
+            if pon != None:
+                await conn.run('interface pon 1/%s/%s' % pon)
+            return await conn.run(cmd)
+
+    async def _query_onu(self, sn:str, build:Callable[[int], str]) -> str:
+        """在ONU所在的PON口下执行命令。ONU位置和ID只查一次。
+
+        Args:
+            sn (str): ONU SN
+            build (Callable[[int], str]): 根据ONU ID生成命令的函数
+
+        Returns:
+            str: 命令返回的信息
+        """
+        slot, pon, onuId = await self._resolve_onu(sn)
+
+        return await self._query(build(onuId), pon=(slot, pon))
+
+    async def get_snmp_time(self) -> dict:
+        """获取SNMP时间配置
+
+        Returns:
+            dict: 包含时间配置参数的字典。interval，表示时间间隔；ip，表示SNMP对时的IP地址。
+        """
+        return extract_snmp_time(await self._query('show snmp-time'))
+
+    async def get_card_type(self, slot):
+        """查询卡的类型
+
+        Args:
+            slot (int): 槽位号
+
+        Returns:
+            str: 卡的类型
+        """
+        for entry in extract_card_info(await self._query('show card info')):
+            if entry['CARD'] == slot:
+                if entry['DETECT'] != '---':
+                    return entry['DETECT']
+                else:
+                    break
+
+        raise RuntimeWarning('未查询到卡的类型')
+
+    async def get_acl(self, id = None):
+        """获取ACL配置信息
+
+        Args:
+            id (int, optional): 指定了ID，就返回指定的，否则返回所有的。
+
+        Returns:
+            list或dict: 返回包含{No, IP, Mask, Status}字典的列表，或返回单个字典
+        """
+        entries = extract_acl(await self._query('show acl'))
+        if id == None:
+            return entries
+
+        for entry in entries:
+            if entry['No'] == id:
+                return entry
+
+        raise RuntimeWarning('未能找到指定ID的ACL信息')
+
+    async def get_ip_address(self):
+        """获取OLT带外管理IP地址
+
+        Returns:
+            tuple: (ip, mask)组成的元组
+        """
+        return extract_ip_address(await self._query('show ip address', mode='interface meth 1'))
+
+    async def get_system_time(self):
+        """返回OLT上面的系统时间。等同执行show time命令。
+
+        Returns:
+            datetime: datetime类型的系统时间
+        """
+        date, time = extract_system_time(await self._query('show time'))
+
+        return parse_datetime('%s %s' % (date, time))
+
+    async def get_authorization_snapshot(self, max_age:Optional[float]=None) -> AuthorizationSnapshot:
+        """获取授权表快照。快照未过期时直接返回，否则执行show authorization重新获取。
+
+        Args:
+            max_age (float, optional): 可接受的快照最大秒数。默认None，使用auth_ttl；为0时总是重新获取。
+
+        Returns:
+            AuthorizationSnapshot: 可按PhyId或(Slot, Pon, Onu)查找的授权表快照
+        """
+        if max_age == None:
+            max_age = self._auth_ttl
+
+        snapshot = self._auth_snapshot
+        if snapshot != None and snapshot.age < max_age:
+            return snapshot
+
+        snapshot = AuthorizationSnapshot(extract_authorization(await self._query('show authorization')))
+        self._auth_snapshot = snapshot
+
+        return snapshot
+
+    def invalidate_authorization(self) -> NoReturn:
+        """使授权表快照失效，下次查询时重新执行show authorization
+        """
+        self._auth_snapshot = None
+
+    async def get_authorization(self, compact=False):
+        """获取所有授权的ONU。等同于执行show authorization命令。
+
+        Args:
+            compact (bool, optional): 为True时返回AuthorizationEntry列表，适合长期缓存大量ONU。默认为False。
+
+        Returns:
+            列表: 包含ONU授权信息的字典列表
+        """
+        entry_type = AuthorizationEntry.from_dict if compact else dict
+        return [ entry_type(entry) for entry in await self.get_authorization_snapshot() ]
+
+    async def _resolve_onu(self, sn):
+        """根据ONU SN查询ONU的槽位号、端口号和ONU ID。先查授权表快照，查不到再查自动发现的ONU。
+
+        Args:
+            sn (str): ONU SN号
+
+        Raises:
+            RuntimeWarning: 授权表和自动发现中都查不到时，抛出异常
+
+        Returns:
+            tuple: 返回(slot, port, onuId)元组。仅被发现未授权的ONU，onuId为None。
+        """
+        position = (await self.get_authorization_snapshot()).locate(sn)
+        if position != None:
+            return position
+
+        position = ONUIndex(await self.get_discovery(), position_keys=('SLOT', 'PON', None)).locate(sn)
+        if position != None:
+            return position
+
+        logger.warning('查不到该ONU(%s)对应的槽位号和端口号，请检查ONU是否发现' % sn)
+        raise RuntimeWarning('查不到该ONU(%s)对应的槽位号和端口号，请检查ONU是否发现' % sn)
+
+    async def get_onu_position(self, sn):
+        """根据ONU SN查询ONU的槽位号和端口号
+
+        Args:
+            sn (str): ONU SN号
+
+        Raises:
+            RuntimeWarning: 查不到该ONUID对应信息时，抛出异常
+
+        Returns:
+            tuple: 返回(slot, port)元组，如果查不到抛出异常
+        """
+        slot, pon, _ = await self._resolve_onu(sn)
+
+        return slot, pon
+
+    async def get_onu_id(self, sn):
+        """给定SN，查找ONUID。等同于执行show authorization，从里面查找对应关系。
+
+        Args:
+            sn (str): onu sn
+
+        Return:
+            int : 找到返回ONU ID, 没找到，返回None。
+        """
+        info = (await self.get_authorization_snapshot()).get_by_phy_id(sn)
+
+        return None if info == None else info['Onu']
+
+    async def get_onu_sn(self, slot, port, onuId):
+        """给定ONUID，查找其SN号。等同于执行show authorization，从里面查找对应关系。
+
+        Args:
+            slot(int): 槽位号
+            port(int): 端口号
+            onuId (int): ONU ID
+
+        Return:
+            str: 找到，返回ONU SN；没找到，返回None。
+        """
+        info = (await self.get_authorization_snapshot()).get_by_position(slot, port, onuId)
+
+        return None if info == None else info['PhyId']
+
+    async def get_onu_last_online_time(self, sn):
+        """获取ONU最近一次上线时间。等同执行show onu last-reg-status-change <onuId>命令。
+
+        Args:
+            sn (str): ONU SN
+
+        Returns:
+            datetime: 查不到ONUID抛异常。查到了，但是无最后一次上线时间(一般从未上线)，返回None。正常情况下，返回datetime格式的上线时间。
+        """
+        result = await self._query_onu(sn, lambda onuId: 'show onu last-reg-status-change %s' % onuId)
+
+        return extract_last_reg_status_change(result)[0]['LAST_ON_TIME']
+
+    async def get_onu_last_offline_time(self, sn):
+        """获取ONU最近一次下线时间。等同执行show onu last-reg-status-change <onuId>命令。
+
+        Args:
+            sn (str): ONU SN
+
+        Returns:
+            datetime: 查不到ONUID抛异常。查到了，但是无最后一次下线时间(一般从未下线)，返回None。正常情况下，返回datetime格式的最近一次的下线时间。
+        """
+        result = await self._query_onu(sn, lambda onuId: 'show onu last-reg-status-change %s' % onuId)
+
+        return extract_last_reg_status_change(result)[0]['LAST_OFF_TIME']
+
+    async def is_onu_online(self, sn):
+        """检查ONU是否在线。等同执行命令show authorization，然后检查其中的OST字段是否为up。
+
+        Args:
+            sn (str): ONUD SN
+
+        Returns:
+            bool: True，在线；False，不在线。
+        """
+        value = (await self.get_authorization_snapshot()).get_by_phy_id(sn)
+        if value != None:
+            if value["OST"] == "up":
+                return True
+            elif value["OST"] == "dn":
+                return False
+
+        logger.warning('查不到该ONU(%s)状态信息，请检查ONU是否进行过授权' % sn)
+        raise RuntimeWarning('查不到该ONU(%s)状态信息，请检查ONU是否进行过授权' % sn)
+
+    async def _wait_reset(self, sns:List[str], wait:bool) -> NoReturn:
+        """等待ONU重启：30秒内全部下线，wait为True时再等待180秒内全部重新上线。每次检查只获取一次授权表。
+
+        Args:
+            sns (List[str]): ONU SN列表
+            wait (bool): 是否等待重新上线
+        """
+        async def isOffline():
+            snapshot = await self.get_authorization_snapshot(max_age=0)
+            return all(not is_online_in(snapshot, sn) for sn in sns)
+
+        await wait_for_true(isOffline, 1, 30)
+
+        if wait:
+            async def isOnline():
+                snapshot = await self.get_authorization_snapshot(max_age=0)
+                return all(is_online_in(snapshot, sn) for sn in sns)
+
+            await wait_for_true(isOnline, 1, 180)
+
+    async def reset_onu(self, sn, wait = True):
+        """重置ONU。等同执行onu reset <onuId>命令。
+
+        Args:
+            sn (str): ONU SN号
+            wait (bool, optional): 重置ONU后，等待重新上线。
+        """
+        if not await self.is_onu_online(sn):
+            raise RuntimeWarning('无法重置离线状态下的ONU')
+
+        await self._query_onu(sn, lambda onuId: 'onu reset %s' % onuId)
+        self.invalidate_authorization()
+
+        await self._wait_reset([ sn ], wait)
+
+    async def reset_all_onu(self, wait = True):
+        """重置所有在线的ONU。在一个连接中依次发出重置命令，再等待ONU重启。
+
+        Args:
+            wait (bool, optional): 重置ONU后，等待重新上线。
+        """
+        cmds, sns = get_reset_all_cmds(await self.get_authorization_snapshot())
+        async with self._connect() as conn:
+            check_results(await conn.run_batch(cmds))
+        self.invalidate_authorization()
+
+        await self._wait_reset(sns, wait)
+
+    async def get_pon_whitelist(self, slot, port, wlMode, compact=False):
+        """获取指定槽位号和端口下的指定类型的白名单列表。等同于执行show whitelist命令。
+
+        Args:
+            slot (int): 槽位号
+            port (int): 端口号
+            wlMode (WhitelistMode): 白名单类型
+            compact (bool, optional): 为True时返回WhitelistEntry列表。默认为False。
+
+        Returns:
+            list: 包含授权信息的列表
+        """
+        return extract_whitelist(await self._query('show whitelist %s' % get_whitelist_query_str(wlMode), pon=(slot, port)), compact)
+
+    async def get_whitelist(self, wlMode, compact=False):
+        """读取白名单列表。等同于执行show whitelist命令。
+
+        Args:
+            wlMode (WhitelistMode): 指定要获取哪种白名单类型的列表。
+            compact (bool, optional): 为True时返回WhitelistEntry列表。默认为False。
+
+        Returns:
+            list: 包含授权字典信息的列表
+        """
+        return extract_whitelist(await self._query('show whitelist %s' % get_whitelist_query_str(wlMode)), compact)
+
+    async def is_in_whitelist(self, wlMode, id):
+        """检查ONU是否在对应白名单列表中。
+
+        Args:
+            wlMode (WhitelistMode): 要在哪个白名单列表中检查
+            id (str): ONU的phyId、logId或passwd
+
+        Returns:
+            bool: True，在白名单列表中；False，不在白名单列表中
+        """
+        return whitelist_contains(await self.get_whitelist(wlMode), wlMode, id)
+
+    async def is_onu_in_whitelist(self, id):
+        """验证ONU是否在白名单中
+
+        Args:
+            id (str): ONU的phyId、logId或passwd
+        """
+        for wlMode in WhitelistMode:
+            if await self.is_in_whitelist(wlMode, id):
+                return True
+
+        return False
+
+    async def add_whitelist(self, wlMode, sn, onuId=None):
+        """将指定的sn号的ONU增加到指定白名单中。增加白名单所需的信息自动去查ONU上报的信息。
+
+        Args:
+            wlMode (WhitelistMode): 要增加到哪个白名单
+            sn (str): ONU的SN，加白名单所需的信息会自动去查
+            onuid (int or None): 指定onuid，不指定自动分配。默认None，自动分配。
+        """
+        onuDetailInfo = ONUIndex(await self.get_discovery(), position_keys=('SLOT', 'PON', None)).get_by_phy_id(sn)
+        if onuDetailInfo == None:
+            raise RuntimeWarning('未查到该ONU信息，无法进行有效配置')
+
+        cmd, id = get_whitelist_add_cmd(wlMode, onuDetailInfo, onuId)
+
+        self.invalidate_authorization()
+        await self._query(cmd)
+
+        if not await self.is_in_whitelist(wlMode, id):
+            raise RuntimeWarning("白名单添加失败")
+
+    async def del_whitelist(self, wlMode, id):
+        """从指定白名单里删除指定的ONU
+
+        Args:
+            wlMode (Whitelist): 要从哪个白名单里面删除
+            id (str): ONU的phyId、logId或passwd
+        """
+        ids = set([ auto_convert(id) ])
+        query = 'show whitelist %s' % get_whitelist_query_str(wlMode)
+
+        async with self._connect() as conn:
+            await conn.run('config')
+
+            onuInfos = select_whitelist(iter_whitelist(await conn.run(query), raw=True), wlMode, ids)
+            cmds = [ get_whitelist_del_cmd(wlMode, onuInfo) for onuInfo in sorted(onuInfos, key=lambda onuInfo: (onuInfo['Slot'], onuInfo['Pon'])) ]
+            if len(cmds) == 0:
+                return
+
+            self.invalidate_authorization()
+            check_results(await conn.run_batch(cmds))
+
+            failures = [ onuInfo[get_whitelist_id_key(wlMode)] for onuInfo in select_whitelist(iter_whitelist(await conn.run(query), raw=True), wlMode, ids) ]
+
+        if len(failures) != 0:
+            raise RuntimeWarning('删除白名单中的ONU失败：%s' % ', '.join(failures))
+
+    async def get_auto_discover(self, slot, port):
+        """获取ONU自动发现设置。等同于执行show onu auto-discover。
+
+        Args:
+            slot (int): 槽位号
+            port (int): 端口号
+
+        Returns:
+           list : 返回(slot, portNo, status, agingTime)元组组成的列表
+        """
+        return extract_auto_discover(await self._query('show onu auto-discover 1/%s/%s' % (slot, port)))
+
+    async def get_pon_auto_discover(self, slot, port):
+        """获取指定槽位号和端口下的ONU自动发现设置。等同于执行show onu auto-discover。
+
+        Args:
+            slot (int): 槽位号
+            portNo (int): 端口号
+
+        Returns:
+            tuple: (status, agingTime)元组
+        """
+        return extract_pon_auto_discover(await self._query('show onu auto-discover', pon=(slot, port)))
+
+    async def get_discovery(self, compact=False):
+        """查询自动发现的ONU。等同于执行show discovery命令。
+
+        Args:
+            compact (bool, optional): 为True时返回DiscoveryEntry列表。默认为False。
+
+        Returns:
+            list: 返回自动发现的ONU信息列表
+        """
+        return extract_discovery(await self._query('show discovery'), compact)
+
+    async def get_pon_discovered(self, slot, port, compact=False):
+        """查询自动发现的ONU。等同于执行show onu discovered命令。
+
+        Args:
+            slot (int): 槽位号
+            port (int): 端口号
+            compact (bool, optional): 为True时返回DiscoveryEntry列表。默认为False。
+
+        Returns:
+            list: 返回自动发现的ONU信息列表
+        """
+        return extract_discovery(await self._query('show onu discovered', pon=(slot, port)), compact)
+
+    async def get_manage_vlan(self, name = None):
+        """获取所有管理VLAN。等同于执行show manage-vlan all命令
+
+        Args:
+            name (str, optional): 要查询的管理VLAN名称。如果为None，则返回所有管理VLAN。默认为None。
+
+        Returns:
+            list或dict: 包含管理VLAN信息字典的列表，或指定VLAN信息的字典。
+        """
+        vlanList = extract_manage_vlan(await self._query('show manage-vlan all'))
+        if name == None:
+            return vlanList
+
+        for vlan in vlanList:
+            if vlan['Manage name'] == name:
+                return vlan
+        raise RuntimeWarning('未找到%s名称的管理VLAN信息' % name)
+
+    async def get_auth_mode(self, slot = None, port = None):
+        """获取指定端口的授权模式。等同于执行show port authentication-mode命令
+
+        Args:
+            slot (int, optional): 槽位号。默认None，获取所有端口的授权信息。
+            port (int, optional): 端口号。默认None，获取所有端口的授权信息。
+
+        Returns:
+            dict或AuthMode: 获取所有授权信息时，返回(slot, port)为键，AuthMode为值的字典。获取个别端口端口的授权模式时，返回AuthMode。
+        """
+        dictRet = extract_port_authentication_mode(await self._query('show port authentication-mode %s' % get_auth_mode_query_str(slot, port)))
+        if (slot, port) == (None, None):
+            return dictRet
+
+        return dictRet[slot, port]
+
+    async def get_dhcp_option(self):
+        """获取dhcp选项开关状态。等同于执行show dhcp state命令。
+
+        Return:
+            dict, 包含dhcp状态信息的字典。
+        """
+        return extract_dhcp_state(await self._query('show dhcp state'))
+
+    async def get_pppoe_plus(self):
+        """获取PPPoE+选项状态。等同于执行show pppoe-plus state命令。
+
+        return:
+            bool: True使能， False未使能。
+        """
+        ret = extract_pppoe_plus(await self._query('show pppoe-plus state'))
+
+        return str_to_bool(ret['PPPoE+'])
+
+    async def set_onu_port_vlan_tls(self, sn, eth, index, tls):
+        """设置ONU Port Vlan TLS特性
+
+        Args:
+            sn (str): ONU SN
+            eth (int): ONU 端口号
+            index (int): ONU Service 索引号
+            tls (bool): 是否启用tls，True，启用，False，不启用
+        """
+        await self._query_onu(sn, lambda onuId: get_onu_port_vlan_cmd(onuId, eth, '%s tls %s' % (index, bool_to_str(tls))))
+
+    async def get_onu_port_vlan(self, sn):
+        """读取ONU的Port Vlan业务设置。等同于执行命令show onu port vlan。
+
+        Args:
+            sn (str): 要显示的ONU的SN
+
+        Return:
+            list : 元组列表。
+        """
+        return extract_onu_port_vlan(await self._query_onu(sn, lambda onuId: 'show onu port vlan %s' % onuId))
+
+    async def get_onu_port_status(self, sn):
+        """获取ONU端口状态。等同于执行命令show onu port status。
+
+        Args:
+            sn (str): ONU SN
+
+        Returns:
+            list: 端口状态列表
+        """
+        if not await self.is_onu_online(sn):
+            raise RuntimeWarning('无法查询离线状态下的ONU端口状态')
+
+        slot, pon, onuId = await self._resolve_onu(sn)
+        async with self._connect() as conn:
+            await conn.run('config')
+            await conn.run('terminal length 0')
+            await conn.run('interface pon 1/%s/%s' % (slot, pon))
+            result = await conn.run('show onu port status %s' % onuId)
+
+        return extract_onu_port_status(result)
+
+    async def get_onu_port_vlan_service_count(self, sn, eth):
+        """获取ONU Port VLAN业务个数。
+
+        Args:
+            sn (str): ONU SN
+            eth (int): 要获取的ONU对应的网口
+
+        Returns:
+            int: 返回业务个数
+        """
+        return len([ item for item in await self.get_onu_port_vlan(sn) if item['PORT'] == eth ])
+
+    async def set_onu_port_vlan_service_count(self, sn, eth, count):
+        """设置ONU Port VLAN业务个数。等同于执行onu port vlan命令。
+
+        Args:
+            sn (str): ONU SN
+            eth (int): 要设置的ONU对应的网口
+            count (int): 要设置的业务个数
+        """
+        await self._query_onu(sn, lambda onuId: get_onu_port_vlan_cmd(onuId, eth, 'count %s' % count))
+
+    async def set_onu_port_vlan_service_type(self, sn, eth, index, type):
+        """"设置ONU Port VLAN业务类型。等同于执行onu port vlan命令。
+
+        Args:
+            sn (str): ONU SN
+            eth (int): 网口的索引值，从1开始。
+            index (int): 业务的索引值，从1开始。
+            type (str): unicast，表示单播; multicast，表示多播。
+        """
+        await self._query_onu(sn, lambda onuId: get_onu_port_vlan_cmd(onuId, eth, '%s type %s' % (index, type)))
+
+    async def del_onu_port_vlan_service(self, sn, eth, index):
+        """删除指定ONU下面指定网口的指定业务
+
+        Args:
+            sn (str): ONU SN
+            eth (int): 要删除的网口
+            index (int): 要删除的业务ID
+        """
+        await self._query_onu(sn, lambda onuId: 'no ' + get_onu_port_vlan_cmd(onuId, eth, index))
+
+    async def get_igmp_vlan(self, vlan):
+        """获取组播VLAN设置。等同于执行命令show igmp vlan。
+
+        Args:
+            vlan (int或str): 要查询的组播VLAN ID。
+
+        Returns:
+            dict: 组播VLAN信息字典。
+        """
+        if type(vlan) == str:
+            vlan = auto_convert(vlan)
+
+        return extract_igmp_vlan(await self._query('show igmp vlan %s' % vlan, mode='igmp'))
+
+    async def get_igmp_mode(self):
+        """获取组播模式信息。等同于执行命令show igmp mode。
+
+        Return:
+            dict: 包含组播模式信息的字典。
+        """
+        return extract_igmp_mode_info(await self._query('show igmp mode', mode='igmp'))
+
+    async def get_port_vlan(self, slot, port):
+        """查询指定槽位和端口的Port VLAN信息。等同于执行show port vlan命令。
+
+        Args:
+            slot (int): 要查的槽位号。
+            port (int): 要查的端口号。
+
+        Returns:
+            list: 包含VLAN信息的元组列表。
+        """
+        return extract_port_vlan(await self._query('show port vlan 1/%s/%s' % (slot, port)))
+
+    async def get_onu_wan_cfg(self, sn, index):
+        """读取指定ONU ID和WAN INDEX的配置。等同于执行命令show onu wan-cfg。
+
+        Args:
+            sn (str): ONU SN
+            index (int): 要获取的WAN index
+
+        Returns:
+            dict: 包含配置信息的字典。字典的键名参考setONUWanCfg
+        """
+        return extract_wan_cfg(await self._query_onu(sn, lambda onuId: 'show onu wan-cfg %s index %s' % (onuId, index)))
+
+    async def get_onu_statistics(self, sn, typed=False):
+        """获取ONU统计信息。等同于执行命令show onu statistics。
+
+        Args:
+            sn (str): ONU SN
+            typed (bool, optional): 为True时返回ONUStatistics。默认为False。
+
+        Returns:
+            dict: 包含ONU统计信息的字典。
+        """
+        return extract_onu_statistics(await self._query_onu(sn, lambda onuId: 'show onu statistics %s' % onuId), typed)
+
+    async def get_bandwidth_profile(self, id='all'):
+        """获取指定ID的Bandwidth Profile。等同于show bandwidth-profile命令。
+
+        Args:
+            id (str, optional): 要获取的profile Id名称。默认为'all'，即获取全部。
+
+        Returns:
+            list: 包含Bandwidth profile信息的列表
+        """
+        if type(id) == str:
+            assert id == 'all'
+        else:
+            assert type(id) == int
+
+        return extract_bandwidth_profile(await self._query('show bandwidth-profile %s' % id))
+
+    async def query_bandwidth_profile_id_by_name(self, name):
+        """根据Profile 名称查询对应的ID。
+
+        Args:
+            name (str): 要查询Bandwidth Profile的名称
+
+        Returns:
+            int: Bandwidth Profile的ID。查不到，返回None。
+        """
+        for profile in await self.get_bandwidth_profile():
+            if profile['Name'] == name:
+                return int(profile['Id'])
+
+        return None
+
+    async def set_onu_bandwidth_profile(self, sn, profileIdOrName):
+        """为ONU关联带宽模板。等同于执行onu bandwidth-profile命令。
+
+        Args:
+            sn (str): ONU SN
+            profileIdOrName (int或str): 带宽模板的ID或者名称
+        """
+        strProfile = get_bandwidth_profile_str(profileIdOrName)
+
+        await self._query_onu(sn, lambda onuId: 'onu bandwidth-profile %s %s' % (onuId, strProfile))
+
+        if type(profileIdOrName) == str:
+            id = await self.query_bandwidth_profile_id_by_name(profileIdOrName)
+        else:
+            id = profileIdOrName
+
+        ret = await self.get_onu_bandwidth_profile(sn)
+        try:
+            assert ret['prfId'] == id
+        except KeyError as ke:
+            logger.error(ret)
+            raise RuntimeWarning('带宽模板关联验证失败')
+
+    async def get_onu_bandwidth_profile(self, sn):
+        """查询ONU关联的带宽模板信息。等同于执行命令。
+
+        Args:
+            sn (str): 要查询的ONU SN
+
+        Returns:
+            dict: 包含ONU所关联带宽模板的信息。
+        """
+        ret = extract_onu_bandwidth(await self._query_onu(sn, lambda onuId: 'show onu bandwidth %s' % onuId))
+        ret['prfId'] = ret['prfId'] + 1
+
+        return ret
+
+    async def set_onu_bandwidth(self, sn, usCir, usPir, usFir, dsPir):
+        """设置ONU带宽。等同于执行onu bandwidth命令。
+
+        Args:
+            sn (str): ONU SN
+            usCir (int): upstream committed information rate
+            usPir (int): upstream peak information rate
+            usFir (int): upstream fix information rate
+            dsPir (int): downstream peak information rate
+        """
+        await self._query_onu(sn, lambda onuId: get_onu_bandwidth_cmd(onuId, usCir, usPir, usFir, dsPir))
+
+        ret = await self.get_onu_bandwidth_profile(sn)
+
+        assert ret['upAssureBand'] == usCir \
+            and ret['upMaxband'] == usPir \
+                and ret['upFixband'] == usFir \
+                        and ret['downMaxband'] == dsPir
+
+    async def get_pon_bandwidth(self, slot, port):
+        """查询PON口带宽。等同于执行show bandwidth命令。
+
+        Args:
+            slot (int): 槽位号
+            port (int): 端口号
+
+        Returns:
+            dict: 含带宽信息的字典。
+        """
+        return extract_bandwidth(await self._query('show bandwidth', pon=(slot, port)))
+
+    async def get_onu_layer3_rate_limit(self, sn, state=None):
+        """获取ONU 3层限速配置信息。等同于执行show onu layer3-ratelimit-profile命令。
+
+        Args:
+            sn (str): ONU sn
+            state (str, optional): 查询哪种状态的限速. 默认为None，查询offline和online两种状态的限速信息。
+
+        Returns:
+            list: 包含限速信息的列表
+        """
+        slot, pon, onuId = await self._resolve_onu(sn)
+        async with self._connect() as conn:
+            await conn.run('config')
+            await conn.run('interface pon 1/%s/%s' % (slot, pon))
+
+            ret = [ ]
+            for cmd in get_onu_layer3_rate_limit_cmds(onuId, state):
+                ret = ret + extract_onu_layer3_rate_limit_profile(await conn.run(cmd))
+
+        return ret
+
+    async def get_service_vlan(self):
+        """获取业务VLAN信息。等同于执行show service-vlan命令。
+
+        Returns:
+            list: 包含业务VLAN信息字典的列表。
+        """
+        return extract_service_vlan(await self._query('show service-vlan'))
+
+    async def get_onu_qinq_classification_profile(self, name=None):
+        """查询onuqinq-classfication-profile。等同于执行show onuqinq-classification-profile命令。
+
+        Args:
+            name (str): 要查询Profile的名称
+
+        Returns:
+            list: 包含Profile信息字典的列表
+        """
+        return extract_onu_qinq_classification_profile(await self._query('show onuqinq-classification-profile %s' % get_onu_qinq_classification_profile_str(name)))
+
+    async def get_olt_qinq_domain(self, nameOrIndex):
+        """获取oltqinq-domain。等同于执行命令。
+
+        Args:
+            nameOrIndex (str或int): 要获取oltqinq-domain的名称。
+
+        Returns:
+            dict: 包含oltqinq-domain信息的字典。
+        """
+        return extract_olt_qinq_domain(await self._query('show oltqinq-domain %s' % get_olt_qinq_domain_str(nameOrIndex)))
+
+    async def is_olt_qinq_domain_bound(self, slot, port, name):
+        """检查指定oltqinq-domain是否绑定。等同于执行show oltqinq-domain bound-info命令。
+
+        Args:
+            slot (int): 槽位号
+            port (int): 端口号
+            name (str): QinQ域名称
+        Returns:
+            bool: True, 绑定；Flase，未绑定。
+        """
+        result = await self._query('show oltqinq-domain bound-info %s' % name, pon=(slot, port))
+        try:
+            return extract_olt_qinq_domain_bound_info(result) == (int(slot), int(port))
+        except AssertionError:
+            return False
+
+    async def get_current_alarm(self):
+        """获取OLT上面当前产生的告警
+        """
+        return extract_current_alarm(await self._query('show alarm current'))
+
+__all__ = [
+
+    'AsyncOLTTelnet',
+    'AsyncOLTCLI_AN6K17'
+]
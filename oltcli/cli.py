@@ -3,17 +3,77 @@ AN6000系列OLT命令行接口封装类
 '''
 
 from datetime import time
-from typing import Any, NoReturn, Optional, Tuple, Union, List
-from dateutil.parser import parse
+from typing import Any, Callable, Dict, Iterable, Iterator, NoReturn, Optional, Tuple, Union, List
 
 import re
 import logging
 import time
 from enum import Enum
-from wait import wait_for_true
 
-from .utils import auto_convert, run_by_thread_pool, list_to_str, validate_key, len_of_mask
-from .telnet import OLTTelnet
+from contextlib import contextmanager
+from concurrent.futures import Future
+import threading
+
+from .utils import auto_convert, to_int, to_str, to_datetime, parse_datetime, get_converters, FixedWidthTable, iter_lines, run_by_thread_pool, list_to_str, validate_key, len_of_mask
+from .telnet import OLTTelnet, CommandResult
+from .session import OLTSession
+from .pool import OLTSessionPool, get_pool
+from .snapshot import ONUIndex, AuthorizationSnapshot
+from .entry import AuthorizationEntry, DiscoveryEntry, WhitelistEntry, ONUStatistics
+from .columnar import ColumnarTable, AUTHORIZATION_KINDS
+from .poller import SnapshotPoller, wait_all
+from .watcher import ONUWatcher, ONUEvent, ONUEventType
+
+# CLI命令到抽取函数的映射，由parser装饰器注册
+PARSERS:Dict[str, Callable[[str], Any]] = { }
+
+def parser(*cmds:str) -> Callable:
+    """将抽取函数注册为指定命令的解析函数
+
+    Args:
+        cmds (str): 抽取函数能处理的命令，不含参数部分，如'show onu statistics'
+
+    Returns:
+        Callable: 装饰器，原样返回被装饰的抽取函数
+    """
+    def register(func:Callable[[str], Any]) -> Callable[[str], Any]:
+        for cmd in cmds:
+            PARSERS[' '.join(cmd.split())] = func
+        return func
+
+    return register
+
+def get_parser(cmd:str) -> Callable[[str], Any]:
+    """查找能处理指定命令返回信息的抽取函数，按命令前缀匹配，最长的优先
+
+    Args:
+        cmd (str): 完整的命令，如'show onu statistics 1'
+
+    Raises:
+        RuntimeWarning: 没有能处理该命令的抽取函数
+
+    Returns:
+        Callable: 抽取函数
+    """
+    words = cmd.split()
+    for i in range(len(words), 0, -1):
+        func = PARSERS.get(' '.join(words[:i]))
+        if func != None:
+            return func
+
+    raise RuntimeWarning('没有能处理命令的抽取函数：%s' % cmd)
+
+def parse_output(cmd:str, value:str) -> Any:
+    """用命令对应的抽取函数处理命令返回的信息
+
+    Args:
+        cmd (str): 完整的命令，如'show onu statistics 1'
+        value (str): 命令返回的信息
+
+    Returns:
+        any: 抽取函数的返回值
+    """
+    return get_parser(cmd)(value)
 
 class IGMPMode(Enum):
     """所有支持的IGMP模式
@@ -367,6 +427,8 @@ def is_vlan_in_list(beginVlan:int, endVlan:int, tag:str, vlanList:list) -> bool:
     
     return isContained
 
+PORT_VLAN_STR_EXP = re.compile(r'(\d+)\s+(to\s+(\d+)\s+)?(\w+)\s+\d+/(\d+)\s+([\d\s,]+)')
+
 def convert_port_vlan_str(value:str) -> Tuple:
     """将port vlan字串转换成指定格式
 
@@ -376,18 +438,20 @@ def convert_port_vlan_str(value:str) -> Tuple:
     Returns:
         tuple: (beginVlan, endVlan, tag, slotPortTupleList)格式的元组。如1000, 1000, tag, [(9, 2), (9, 3)]。
     """
-    vlanExp = re.compile('(\d+)\s+(to\s+(\d+)\s+)?(\w+)\s+\d+/(\d+)\s+([\d\s,]+)')
 
-    beginVlan, _, endVlan, tag, slot, ports  = vlanExp.match(value)
+    beginVlan, _, endVlan, tag, slot, ports  = PORT_VLAN_STR_EXP.match(value).groups()
     if endVlan == None:
         endVlan = beginVlan
     
     portList = [ ]
     for port in ports.split(","):
-        portList.append((value(slot), value(port)))
+        portList.append((auto_convert(slot), auto_convert(port)))
+
+    return auto_convert(beginVlan), auto_convert(endVlan), auto_convert(tag), portList 
 
-    return value(beginVlan), value(endVlan), value(tag), portList 
+PORT_AUTHENTICATION_MODE_PORT_AUTH_EXP = re.compile(r'slot (\d+) pon (\d+) ,auth mode is ([\w\s+-]+).')
 
+@parser('show port authentication-mode')
 def extract_port_authentication_mode(value:str) -> dict[int, int]:
     """处理show port authentication-mode命令返回的字符串。
 
@@ -422,8 +486,6 @@ def extract_port_authentication_mode(value:str) -> dict[int, int]:
     
     lines = value.splitlines()
 
-    portAuthExp = re.compile('slot (\d+) pon (\d+) ,auth mode is ([\w\s-+]+).')
-
     AuthModeDict = {
 
         # 用于将show port authentication-mode命令返回的授权模式字符串，映射为AuthMode中的模式
@@ -440,21 +502,28 @@ def extract_port_authentication_mode(value:str) -> dict[int, int]:
 
     ret = { }
     for line in lines:
-        match = portAuthExp.match(line)
+        match = PORT_AUTHENTICATION_MODE_PORT_AUTH_EXP.match(line)
         if match:
             slot, pon, authMode = match.groups()
-            ret[value(slot), value(pon)] = AuthModeDict[authMode]
+            ret[auto_convert(slot), auto_convert(pon)] = AuthModeDict[authMode]
         
     return ret
 
-def extract_authorization(value:str) -> List[dict]:
-    """处理show authorization命令得到的信息
+# show authorization各列的转换函数，密码和逻辑ID可能是纯数字，未列出，仍由auto_convert转换
+AUTHORIZATION_SCHEMA = {
+    'Slot': to_int, 'Pon': to_int, 'Onu': to_int, 'OnuType': to_str,
+    'ST': to_str, 'Lic': to_int, 'OST': to_str, 'PhyId': to_str
+}
+
+def iter_authorization(value:Union[str, Iterable[str]], compact:bool=False) -> Iterator[dict]:
+    """逐条产生show authorization命令得到的ONU信息，不保留已产生的条目
 
     Args:
-        value (str): show authorization命令得到的信息
+        value (str or iterable): show authorization命令得到的信息，或逐行产生信息的迭代器
+        compact (bool, optional): 为True时产生AuthorizationEntry，否则产生字典。默认为False。
 
-    Returns:
-        List[dict]: 包含信息的字典列表
+    Yields:
+        dict: 一台ONU的信息
     """
     # ====================================================================================================
     # -----  ONU Auth Table, Total ITEM = 5 -----
@@ -483,39 +552,38 @@ def extract_authorization(value:str) -> List[dict]:
     # 4    8   128 5506-10-A1     A  0   up  FHTT000aae64
     # ====================================================================================================
 
-    # 匹配标题
-    titlesExp = re.compile('(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)')
-    # 匹配值
-    valuesExp = re.compile('([\d\s]{4,4})\s([\d\s]{3,3})\s([\d\s]{3,3})\s([\w\s-]{14,14})\s([\w\s]{2,2})\s([\d\s]{3,3})\s([\w\s]{3,3})\s([\w\s]{12,12})\s(.{10,10}\s)?(.{24,24}\s)?(.{12,12})?')
+    table = FixedWidthTable(AUTHORIZATION_SCHEMA, max_value=65535, entry_type=AuthorizationEntry if compact else None)
+    for line in iter_lines(value):
+        entry = table.feed(line)
+        if entry != None:
+            yield entry
 
-    ret = []
-    lines = value.splitlines()
-    titles = None
-    for line in lines:
-        match = titlesExp.match(line)
-        if match:
-            titles = match.groups()
-            continue
-        
-        match = valuesExp.match(line)
-        if match:
-            values = match.groups()
-            # 以字典形式存入
-            ret.append({})
-            for k, v in zip(titles, values):
-                ret[-1][auto_convert(k)] = auto_convert(v, max_value=65535)
-            continue
-    
-    return ret
+@parser('show authorization')
+def extract_authorization(value:Union[str, Iterable[str]], compact:bool=False) -> List[dict]:
+    """处理show authorization命令得到的信息
 
-def extract_discovery(value:str) -> List[dict]:
-    """处理show discovery/show onu discovered得到的信息
+    Args:
+        value (str or iterable): show authorization命令得到的信息，或逐行产生信息的迭代器
+        compact (bool, optional): 为True时返回AuthorizationEntry列表，内存占用远小于字典，且可按字典方式访问。默认为False。
+
+    Returns:
+        List[dict]: 包含信息的字典列表
+    """
+    return list(iter_authorization(value, compact))
+
+DISCOVERY_SLOT_PORT_EXP = re.compile(r'SLOT = (\d+), PON = (\d+)')
+# show discovery各列的转换函数，未列出的列由auto_convert转换
+DISCOVERY_SCHEMA = { 'No': to_int, 'OnuType': to_str, 'PhyId': to_str, 'Why': to_int }
+
+def iter_discovery(value:Union[str, Iterable[str]], compact:bool=False) -> Iterator[dict]:
+    """逐条产生show discovery/show onu discovered得到的ONU信息，不保留已产生的条目
     
     Args:
-        value (str): show discovery/show onu discovered命令返回的字符串
+        value (str or iterable): show discovery/show onu discovered命令返回的字符串，或逐行产生结果的迭代器
+        compact (bool, optional): 为True时产生DiscoveryEntry，否则产生字典。默认为False。
     
-    Returns:
-        List[dict]: 包含字典的列表
+    Yields:
+        dict: 一台未授权ONU的信息，SLOT和PON为其所在的槽位和PON口
     """
     # ====================================================================================
     # ----- ONU Unauth Table, SLOT = 4, PON = 8, ITEM = 1 -----
@@ -543,38 +611,35 @@ def extract_discovery(value:str) -> List[dict]:
     # ====================================================================================
     
 
-    slotPortExp = re.compile('SLOT = (\d+), PON = (\d+)')
-    titleExp = re.compile('(No)\s+(OnuType)\s+(PhyId)\s+(PhyPwd)\s+(LogicId)\s+(LogicPwd)\s+(Why)\s*')
-    valueExp = re.compile('([\d\s]{3,3})\s([\w\s-]{14,14})\s([\w\s]{12,12})\s([\w\s]{10,10})\s([\w\s]{24,24})\s([\w\s]{12,12})\s([\d\s]{1,3})')
-
-    lines = value.splitlines()
-
-    ret = [ ]
-    titles = None
+    table = FixedWidthTable(DISCOVERY_SCHEMA, entry_type=DiscoveryEntry if compact else None)
     slot, port = None, None
-    for line in lines:
-        match = slotPortExp.search(line)
+    for line in iter_lines(value):
+        match = DISCOVERY_SLOT_PORT_EXP.search(line)
         if match:
-            slot, port = match.groups()
+            slot, port = to_int(match.group(1)), to_int(match.group(2))
 
-        if titles == None:
-            match = titleExp.match(line)
-            if match:
-                titles = match.groups()
-                continue
-        else:
-            match = valueExp.match(line)
-            if match:
-                values = match.groups()
-                ret.append({ })
-                for k, v in zip(titles, values):
-                    ret[-1][value(k)] = value(v)
-                ret[-1]['SLOT'] = value(slot)
-                ret[-1]['PON'] = value(port)
-                continue
+        entry = table.feed(line)
+        if entry != None:
+            entry['SLOT'] = slot
+            entry['PON'] = port
+            yield entry
 
-    return ret
+@parser('show discovery', 'show onu discovered')
+def extract_discovery(value:Union[str, Iterable[str]], compact:bool=False) -> List[dict]:
+    """处理show discovery/show onu discovered得到的信息
+    
+    Args:
+        value (str or iterable): show discovery/show onu discovered命令返回的字符串，或逐行产生结果的迭代器
+        compact (bool, optional): 为True时返回DiscoveryEntry列表。默认为False。
+    
+    Returns:
+        List[dict]: 包含字典的列表
+    """
+    return list(iter_discovery(value, compact))
 
+AUTO_DISCOVER_EXP = re.compile(r'slot\s*(\d+)\s*pon\s*(\d+)\s*:\s*(\w+)\s*,\s*agingtime:\s*(\d+)\s*s')
+
+@parser('show onu auto-discover')
 def extract_auto_discover(value:str) -> List: # TODO:
     """ 处理show onu auto-discover得到的信息
 
@@ -585,17 +650,18 @@ def extract_auto_discover(value:str) -> List: # TODO:
         list: (slot, portNo, status, agingTime)元组组成的列表
     """
 
-    exp = re.compile('slot\s*(\d+)\s*pon\s*(\d+)\s*:\s*(\w+)\s*,\s*agingtime:\s*(\d+)\s*s')
-
     ret = [ ]
     for line in value.splitlines():
-        match = exp.match(line)
+        match = AUTO_DISCOVER_EXP.match(line)
         if match != None:
             slot, pon, status, agingTime = match.groups()
-            ret.append((value(slot), value(pon), value(status), value(agingTime)))
+            ret.append((auto_convert(slot), auto_convert(pon), auto_convert(status), auto_convert(agingTime)))
 
     return ret
 
+PON_AUTO_DISCOVER_EXP = re.compile(r'auto-discover-onu:\s+(\w+),\s+agingtime:\s+(\d+)')
+
+# interface pon模式下的show onu auto-discover，与config模式下的同名命令输出不同，不注册到PARSERS
 def extract_pon_auto_discover(value:str) -> Tuple[bool, int]:
     """处理show onu auto-discover得到的信息
     
@@ -606,16 +672,17 @@ def extract_pon_auto_discover(value:str) -> Tuple[bool, int]:
         tuple: status, agingTime组成的元组，其中status为bool类型
     """
 
-    exp = re.compile('auto-discover-onu:\s+(\w+),\s+agingtime:\s+(\d+)')
-
     for line in value.splitlines():
-        match = exp.match(line)
+        match = PON_AUTO_DISCOVER_EXP.match(line)
         if match:
             strStatus, strAgingTime = match.groups()
             return value(strStatus), value(strAgingTime)
     
     raise RuntimeWarning("未发现Auto Discover数据")
 
+MANAGE_VLAN_KEY_VALUE_EXP = re.compile(r'([\w\s]+):\s(.+)')
+
+@parser('show manage-vlan')
 def extract_manage_vlan(strValue):
     """处理show manage-vlan得到的信息
     
@@ -656,13 +723,11 @@ def extract_manage_vlan(strValue):
     # TX bytes        : 704
     # MTU             : 0
 
-    keyValueExp = re.compile('([\w\s]+):\s(.+)')
-
     ret = [ ]
 
     for line in strValue.splitlines():
         
-        match = keyValueExp.match(line)
+        match = MANAGE_VLAN_KEY_VALUE_EXP.match(line)
         if match:
             k, v = match.groups()
             k = auto_convert(k)
@@ -675,26 +740,40 @@ def extract_manage_vlan(strValue):
 
     return ret
 
-def extract_whitelist(strValue):
-    """处理show whitelist命令得到的信息。
+# show whitelist各种格式中各列的转换函数，ID和密码可能是纯数字，未列出，仍由auto_convert转换
+WHITELIST_SCHEMA = {
+    'Slot': to_int, 'Pon': to_int, 'Onu': to_int, 'Onu-Type': to_str, 'Phy-ID': to_str, 'En': to_str, 'Used': to_str,
+    'SLOT': to_int, 'PON': to_int, 'ONU': to_int, 'TYPE': to_str, 'PHYID': to_str, 'EN': to_str, 'USED': to_str
+}
+
+# phyId、logId、passwd等列保留原始文本，用于生成删除命令，如密码'000123'不会变成123
+WHITELIST_RAW_SCHEMA = dict(WHITELIST_SCHEMA, **{
+    'Phy-Pwd': to_str, 'Logic-Id': to_str, 'Logic-Pwd': to_str, 'PHYPWD': to_str, 'LOGICId': to_str, 'LOGICPWD': to_str
+})
+
+# 未绑定ONU的白名单（如只配置了密码）显示的槽位号和端口号
+UNBOUND_POSITION = 65535
+
+def iter_whitelist(strValue, compact=False, raw=False):
+    """逐条产生show whitelist命令得到的白名单，不保留已产生的条目。
 
     Args:
-        strValue (str): show whitelist命令得到的信息
+        strValue (str or iterable): show whitelist命令得到的信息，或逐行产生信息的迭代器
+        compact (bool, optional): 为True时产生WhitelistEntry，否则产生字典。默认为False。
+        raw (bool, optional): 为True时phyId、logId、passwd等列保留原始文本，不做类型转换。默认为False。
 
-    Returns:
-        list: 包含处理后的信息列表
+    Yields:
+        dict: 一条白名单
     """
     # 支持匹配6种输出
 
-    lines = strValue.splitlines()
+    lines = iter_lines(strValue)
 
     # 在config下运行show whitelist命令时
     #  ----- Physical Address Whitelist -----
     # Slot  Pon   Onu   Onu-Type       Phy-ID       Phy-Pwd    Used
     # ----- ----- ----- -------------- ------------ ---------- ----
     # 13    1     1     null           FHTT17f6c2d2            Y
-    phy1TitleExp = re.compile('(Slot)\s+(Pon)\s+(Onu)\s+(Onu-Type)\s+(Phy-ID)\s+(Phy-Pwd)\s+(Used)')
-    phy1ValuesExp = re.compile('([\d\s]{5,5})\s([\d\s]{5,5})\s([\d\s]{5,5})\s([\w\s-]{14,14})\s([\w\s]{12,12})\s([\w\d\s]{10,10})\s([\w\s]{1,4})')
 
     #  ----- Physical SN Whitelist-----
     # PHYID        PHYPWD     SLOT  PON   ONU   TYPE           EN  USED
@@ -702,15 +781,11 @@ def extract_whitelist(strValue):
     # FHTT000aae64            4     8     1     5506-10-A1     EN  YES
     # --------------------------------
     # SLOT: 4 PON: 8 ITEM: 1
-    phy2TitleExp = re.compile('(PHYID)\s+(PHYPWD)\s+(SLOT)\s+(PON)\s+(ONU)\s+(TYPE)\s+(EN)\s+USED')
-    phy2ValuesExp = re.compile('([\w\s]{12,12})\s([\w\s]{10,10})\s([\d\s]{5,5})\s([\d\s]{5,5})\s([\d\s]{5,5})\s([\w\s-]{14,14})\s([\w\s]{3,3})\s([\w\s]{1,4})')
 
     #  ----- Logic SN Whitelist-----
     # Slot  Pon   Onu   Onu-Type       Logic-Id                 Logic-Pwd    En Used
     # ----- ----- ----- -------------- ------------------------ ------------ -- ----
     # 13    1     2     null           FHTT17f6c2d2                          Y  Y
-    log1TitleExp = re.compile('(Slot)\s+(Pon)\s+(Onu)\s+(Onu-Type)\s+(Logic-Id)\s+(Logic-Pwd)\s+(En)\s+(Used)')
-    log1ValueExp = re.compile('([\d\s]{5,5})\s([\d\s]{5,5})\s([\d\s]{5,5})\s([\w\s-]{14,14})\s([\w\s]{24,24})\s([\w\s]{12,12})\s([\w\s]{2,2})\s([\w\s]{1,4})')
 
     # ----- Logical SN Whitelist-----
     # LOGICId                  LOGICPWD     SLOT  PON   ONU   TYPE           EN  USED
@@ -718,15 +793,11 @@ def extract_whitelist(strValue):
     # FHTT000aae64                          4     8     2     5506-10-A1     EN  YES
     # --------------------------------
     # SLOT: 4 PON: 8 ITEM: 1
-    log2TitleExp = re.compile('(LOGICId)\s+(LOGICPWD)\s+(SLOT)\s+(PON)\s+(ONU)\s+(TYPE)\s+(EN)\s+(USED)')
-    log2ValueExp = re.compile('([\w\s]{24,24})\s([\w\s]{12,12})\s([\d\s]{5,5})\s([\d\s]{5,5})\s([\d\s]{5,5})\s([\w\s-]{14,14})\s([\w\s]{3,3})\s([\w\s]{1,4})')
 
     #  ----- Physical Password Whitelist -----
     # Slot  Pon   Onu   Onu-Type       Phy-Pwd    En Used
     # ----- ----- ----- -------------- ---------- -- ----
     # 65535 65535 65535 null           123456     Y  N
-    pwd1TitleExp = re.compile('(Slot)\s+(Pon)\s+(Onu)\s+(Onu-Type)\s+(Phy-Pwd)\s+(En)\s+(Used)')
-    pwd1ValueExp = re.compile('([\d\s]{5,5})\s([\d\s]{5,5})\s([\d\s]{5,5})\s([\w\s-]{14,14})\s([\w\s]{10,10})\s([\w\s]{2,2})\s([\w\s]{1,4})')
 
     # ----- Physical Password Whitelist-----
     # PHYPWD     SLOT  PON   ONU   TYPE           EN  USED
@@ -734,41 +805,29 @@ def extract_whitelist(strValue):
     # 1234567890 4     8     3     5506-10-A1     EN  YES
     # --------------------------------
     # SLOT: 4 PON: 8 ITEM: 1
-    pwd2TitleExp = re.compile('(PHYPWD)\s+(SLOT)\s+(PON)\s+(ONU)\s+(TYPE)\s+(EN)\s+(USED)')
-    # '123456789a 4     8     65535 5506-10-A1     EN  NO   '
-    pwd2ValueExp = re.compile('([\w\s]{10,10})\s([\d\s]{5,5})\s([\d\s]{5,5})\s([\d\s]{5,5})\s([\w\s-]{14,14})\s([\w\s]{3,3})\s([\w\s]{1,4})')
-
-    exps = [(phy1TitleExp, phy1ValuesExp),
-            (phy2TitleExp, phy2ValuesExp),
-            (log1TitleExp, log1ValueExp),
-            (log2TitleExp, log2ValueExp),
-            (pwd1TitleExp, pwd1ValueExp),
-            (pwd2TitleExp, pwd2ValueExp)]
 
-    ret = [ ]
-    titles = None
-    valueExp = None
+    table = FixedWidthTable(WHITELIST_RAW_SCHEMA if raw else WHITELIST_SCHEMA, entry_type=WhitelistEntry if compact else None)
     for line in lines:
-        if titles == None:
-            # 先看看匹配到哪种标题，然后再用标题对应的抽取值的正则表达式去提取
-            for tExp, vExp in exps:
-                match = tExp.match(line)
-                if match != None:
-                    titles = match.groups()
-                    valueExp = vExp
-                    break
+        entry = table.feed(line)
+        if entry != None:
+            yield entry
 
-        else:
-            # 确定之后，用该种正则表达式进行匹配
-            match = valueExp.match(line)
-            if match:
-                values = match.groups()
-                ret.append({ })
-                for k, v in zip(titles, values):
-                    ret[-1][auto_convert(k)] = auto_convert(v)
+@parser('show whitelist')
+def extract_whitelist(strValue, compact=False):
+    """处理show whitelist命令得到的信息。
 
-    return ret
+    Args:
+        strValue (str or iterable): show whitelist命令得到的信息，或逐行产生信息的迭代器
+        compact (bool, optional): 为True时返回WhitelistEntry列表。默认为False。
 
+    Returns:
+        list: 包含处理后的信息列表
+    """
+    return list(iter_whitelist(strValue, compact))
+
+LAST_REG_STATUS_CHANGE_VALUES_EXP = re.compile(r"(\d+)\s+(\d+)\s+(\d+)\s+Last Off Time = (\d{4,4}\-\d{2,2}\-\d{2,2}\s\d{2,2}:\d{2,2}:\d{2,2}),Last On Time = (\d{4,4}\-\d{2,2}\-\d{2,2}\s\d{2,2}:\d{2,2}:\d{2,2})\.")
+
+@parser('show onu last-reg-status-change')
 def extract_last_reg_status_change(strValue):
     """处理show onu last-reg-status-change命令得到的数据。其中，时间若为0000-00-00 00:00:00，将会转换为None。
 
@@ -792,19 +851,17 @@ def extract_last_reg_status_change(strValue):
     lines = strValue.splitlines()
 
     titles = ['SLOT', 'PON', 'ONU', 'LAST_OFF_TIME', 'LAST_ON_TIME']
-    valuesExp = re.compile("(\d+)\s+(\d+)\s+(\d+)\s+Last Off Time = (\d{4,4}\-\d{2,2}\-\d{2,2}\s\d{2,2}:\d{2,2}:\d{2,2}),Last On Time = (\d{4,4}\-\d{2,2}\-\d{2,2}\s\d{2,2}:\d{2,2}:\d{2,2})\.")
+    converters = [ to_int, to_int, to_int, to_datetime, to_datetime ]
     
     ret = [ ]
     for line in lines:
-        match = valuesExp.match(line)
+        match = LAST_REG_STATUS_CHANGE_VALUES_EXP.match(line)
         if match:
-            values = match.groups()
-            ret.append({ })
-            for k, v in zip(titles, values):
-                ret[-1][auto_convert(k)] = auto_convert(v)
+            ret.append({ k: convert(v) for k, convert, v in zip(titles, converters, match.groups()) })
     
     return ret
 
+@parser('show dhcp state')
 def extract_dhcp_state(strValue):
     """处理show dhcp state命令得到的数据
 
@@ -827,31 +884,43 @@ def extract_dhcp_state(strValue):
     
     return ret
 
-def extract_onu_port_vlan(strValue):
-    """处理show onu port vlan得到的信息。
+ONU_PORT_VLAN_EXP = re.compile(r"(\w+)\s+(\w+)\s+/(\w+)\s+/(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)")
+
+def iter_onu_port_vlan(strValue):
+    """逐条产生show onu port vlan得到的Port Vlan信息，不保留已产生的条目。
 
     Args:
-        strValue (str): show onu port vlan得到的信息。
+        strValue (str or iterable): show onu port vlan得到的信息，或逐行产生信息的迭代器。
 
-    Returns:
-        list: 包含Port Vlan信息的列表
+    Yields:
+        dict: 一条Port Vlan信息
     """
     # NO.  SL/LI/ONU PORT ID TYPE  MODE CVID COS  TPID  TVID COS  TPID  SVID COS  TPID  PVID COS  SRVTYPE PRIQUE  GEMPORT
     # ====================================================================================================================
     # 1    4 /8 /1   1    1  unica tran null null 33024 null null null  null null null  null null default default default
 
-    ret = [ ]
     titles = ['NO', 'SL', 'LI', 'ONU', 'PORT', 'ID', 'TYPE', 'MODE', 'CVID', 'CCOS', 'CTPID', 'TVID', 'TCOS', 'TTPID', 'SVID', 'SCOS', 'STPID', 'PVID', 'PCOS', 'SRVTYPE', 'PRIQUE', 'GEMPORT']
-    regexExp = re.compile("(\w+)\s+(\w+)\s+/(\w+)\s+/(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)")
-    for line in strValue.splitlines():
-        match = regexExp.match(line)
+    for line in iter_lines(strValue):
+        match = ONU_PORT_VLAN_EXP.match(line)
         if match != None:
-            ret.append({})
-            for k, v in zip(titles, match.groups()):
-                ret[-1][k] = auto_convert(v)
+            yield { k: auto_convert(v) for k, v in zip(titles, match.groups()) }
 
-    return ret
+@parser('show onu port vlan')
+def extract_onu_port_vlan(strValue):
+    """处理show onu port vlan得到的信息。
+
+    Args:
+        strValue (str or iterable): show onu port vlan得到的信息，或逐行产生信息的迭代器。
+
+    Returns:
+        list: 包含Port Vlan信息的列表
+    """
+    return list(iter_onu_port_vlan(strValue))
+
+CARD_INFO_TITLES_EXP = re.compile(r'(CARD)\s+(EXIST)\s+(CONFIG)\s+(DETECT)\s+(DETAIL)\s*(BLOCK)?')
+CARD_INFO_VALUES_EXP = re.compile(r'(\d+)\s+([\w-]+)\s+([\w-]+)\s+([\w-]+)\s+([\w/-]+)\s*([\w-]+)?')
 
+@parser('show card info')
 def extract_card_info(strValue):
     """处理show card info得到的信息
 
@@ -889,19 +958,17 @@ def extract_card_info(strValue):
 
     lines = strValue.splitlines()
 
-    titlesExp = re.compile('(CARD)\s+(EXIST)\s+(CONFIG)\s+(DETECT)\s+(DETAIL)\s*(BLOCK)?')
-    valuesExp = re.compile('(\d+)\s+([\w-]+)\s+([\w-]+)\s+([\w-]+)\s+([\w-\/]+)\s*([\w-]+)?')
     
     ret = [ ]
     titles = None
     for line in lines:
         if titles == None:
-            match = titlesExp.match(line)
+            match = CARD_INFO_TITLES_EXP.match(line)
             if match:
                 titles = match.groups()
                 continue
         else:
-            match = valuesExp.match(line)
+            match = CARD_INFO_VALUES_EXP.match(line)
             if match:
                 values = match.groups()
                 ret.append({ })
@@ -912,6 +979,11 @@ def extract_card_info(strValue):
 
     return ret
 
+ONU_PORT_STATUS_SUMMARY_EXP = re.compile(r'SLOT:(\d+)\s*PON:(\d+)\s*ONU:(\d+)\s*,\s*ITEM=(\d+)')
+ONU_PORT_STATUS_PORT_ID_EXP = re.compile(r'PORT\s+ID\s+=\s+(\d+)')
+ONU_PORT_STATUS_KEY_VALUE_EXP = re.compile(r'(.+):(.+)')
+
+@parser('show onu port status')
 def extract_onu_port_status(strValue):
     """处理show onu port status命令得到的信息
 
@@ -960,15 +1032,12 @@ def extract_onu_port_status(strValue):
     # PORT CONNECT    : full
     # LOOPBACK STATUS : normal
 
-    summaryExp = re.compile('SLOT:(\d+)\s*PON:(\d+)\s*ONU:(\d+)\s*,\s*ITEM=(\d+)')
-    portIdExp = re.compile('PORT\s+ID\s+=\s+(\d+)')
-    keyValueExp = re.compile('(.+):(.+)')
     
     lines = strValue.splitlines()
 
     ret = { }
     for line in lines:
-        match = summaryExp.match(line)
+        match = ONU_PORT_STATUS_SUMMARY_EXP.match(line)
         if match:
             slot, pon, onu, item = match.groups()
             ret['SLOT'] = auto_convert(slot)
@@ -978,14 +1047,14 @@ def extract_onu_port_status(strValue):
             ret['PORT'] = [ ]
             continue
         
-        match = portIdExp.match(line)
+        match = ONU_PORT_STATUS_PORT_ID_EXP.match(line)
         if match:
             portId = match.groups()[0]
             ret['PORT'].append({ })
             ret['PORT'][-1]['PORT ID'] = auto_convert(portId)
             continue
         
-        match = keyValueExp.match(line)
+        match = ONU_PORT_STATUS_KEY_VALUE_EXP.match(line)
         if match:
             k, v = match.groups()
             if auto_convert(k) not in ret['PORT'][-1].keys():
@@ -997,6 +1066,9 @@ def extract_onu_port_status(strValue):
 
     return ret
 
+IGMP_VLAN_EXP = re.compile(r"(.+):(.+)")
+
+@parser('show igmp vlan')
 def extract_igmp_vlan(strValue):
     """处理show igmp vlan命令得到的数据
 
@@ -1027,19 +1099,20 @@ def extract_igmp_vlan(strValue):
     # igi->igi_sflags          :0x0
     # ========================================
 
-    regexExp = re.compile("(.+):(.+)")
-
     lines = strValue.splitlines()
 
     ret = { }
     for line in lines:
-        match = regexExp.match(line)
+        match = IGMP_VLAN_EXP.match(line)
         if match != None:
             k, v = match.groups()
             ret[auto_convert(k)] = auto_convert(v)
 
     return ret
 
+PORT_VLAN_VLAN_EXP = re.compile(r'(\d+)\s?~?\s?(\d+)?\(([UT])\)')
+
+@parser('show port vlan')
 def extract_port_vlan(strValue):
     """处理show port vlan得到的数据
 
@@ -1055,14 +1128,12 @@ def extract_port_vlan(strValue):
     # 1251 ~ 1254(T).
     # 3049 ~ 3049(T).
 
-    vlanExp = re.compile('(\d+)\s?~?\s?(\d+)?\(([UT])\)')
-
     lines = strValue.splitlines()
 
     ret = [ ]
     for line in lines:
         
-        match = vlanExp.match(line)
+        match = PORT_VLAN_VLAN_EXP.match(line)
         if match:
             beginVlan, endVlan, tag = match.groups()
             if endVlan == None:
@@ -1072,6 +1143,17 @@ def extract_port_vlan(strValue):
     
     return ret
 
+WAN_CFG_NONE_EXP = re.compile(r"slot_out \d+ \d+ \d+ index \d+ no wancfg,ret -?\d+.")
+WAN_CFG_MANDATORY_PART_EXP = re.compile(r'show wancfg:slot\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+wan_name\s+(\w+)\s+(\w+)\s+(\w+)\s+vlan\s+(\d+)\s+cos\s+(\d+)\s+nat\s+(\w+)\s+qos\s+(\w+)\s+upnp\s+(\w+)\s+')
+WAN_CFG_PPPOE_DSP_EXP = re.compile(r'DSP\s+(\w+)\s+(\d+)\s+mode\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+')
+WAN_CFG_DHCP_DSP_EXP = re.compile(r'DSP\s+(\w+)')
+WAN_CFG_STATIC_DSP_EXP = re.compile(r'DSP\s+(\w+)\s+ip\s+(\d+\.\d+\.\d+\.\d+)\s+(\d+\.\d+\.\d+\.\d+)\s+(\d+\.\d+\.\d+\.\d+)\s+(\d+\.\d+\.\d+\.\d+)\s+(\d+\.\d+\.\d+\.\d+)')
+WAN_CFG_VLANMODE_EXP = re.compile(r'(\w+)\s+translate\s+(\w+)\s+tvlan\s+(\d+)\s+tcos\s+(\d+)\s+qinq\s+(\w+)\s+(\d+)\s+(\d+)\s+(\d+)\s+')
+WAN_CFG_ENTRIES_EXP = re.compile(r'bind\s+item\s+(\d+)\s+([\d\s]+)?')
+WAN_CFG_FE_EXP = re.compile(r'^(\d)$')
+WAN_CFG_SSID_EXP = re.compile(r'^10(\d)$')
+
+@parser('show onu wan-cfg')
 def extract_wan_cfg(strValue):
     """提取show onu wan-cfg命令得到的信息
 
@@ -1084,27 +1166,20 @@ def extract_wan_cfg(strValue):
 
     ret = None
 
-    regexExp0 = re.compile("slot_out \d+ \d+ \d+ index \d+ no wancfg,ret -?\d+.")
-    if regexExp0.search(strValue) != None:
+    if WAN_CFG_NONE_EXP.search(strValue) != None:
         return ret
 
     # show wancfg:slot 4 8 1 2 wan_name INTERNET_R_VID_2000 INTERNET route vlan 2000 cos 4 nat enable qos disable upnp disable DSP pppoe 0 mode auto fiberhome fiberhome xxx transparent translate disable tvlan 65535 tcos 65535 qinq disable 33024 65535 bind item 4 1   2   3   101
     # show wancfg:slot 4 8 1 1 wan_name INTERNET_R_VID_1000 INTERNET route vlan 1000 cos 4 nat enable qos enable upnp disable transparent translate disable tvlan 65535 tcos 65535 qinq disable 33024 65535 65535 bind item 4 1 2 3 101
    
-    mandatoryPartExp = re.compile('show wancfg:slot\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+wan_name\s+(\w+)\s+(\w+)\s+(\w+)\s+vlan\s+(\d+)\s+cos\s+(\d+)\s+nat\s+(\w+)\s+qos\s+(\w+)\s+upnp\s+(\w+)\s+')
     # DSP\s+(\w+)\s+(\d+)\s+mode\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+
-    pppoeDSPExp = re.compile('DSP\s+(\w+)\s+(\d+)\s+mode\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+')
-    dhcpDSPExp = re.compile('DSP\s+(\w+)')
-    staticDSPExp = re.compile('DSP\s+(\w+)\s+ip\s+(\d+\.\d+\.\d+\.\d+)\s+(\d+\.\d+\.\d+\.\d+)\s+(\d+\.\d+\.\d+\.\d+)\s+(\d+\.\d+\.\d+\.\d+)\s+(\d+\.\d+\.\d+\.\d+)')
-    vlanmodeExp = re.compile('(\w+)\s+translate\s+(\w+)\s+tvlan\s+(\d+)\s+tcos\s+(\d+)\s+qinq\s+(\w+)\s+(\d+)\s+(\d+)\s+(\d+)\s+')
-    entriesExp = re.compile('bind\s+item\s+(\d+)\s+([\d\s]+)?')
 
-    if mandatoryPartExp.match(strValue) != None:
+    if WAN_CFG_MANDATORY_PART_EXP.match(strValue) != None:
 
         if ret == None:
             ret = {}
         
-        slot, port, onuId, index, name, mode, type, wvid, wcos, nat, qos, upnp = mandatoryPartExp.match(strValue).groups()
+        slot, port, onuId, index, name, mode, type, wvid, wcos, nat, qos, upnp = WAN_CFG_MANDATORY_PART_EXP.match(strValue).groups()
         
         ret['slot'] = auto_convert(slot)
         ret['port'] = auto_convert(port)
@@ -1119,9 +1194,9 @@ def extract_wan_cfg(strValue):
         ret['qos'] = auto_convert(qos)
         ret['upnp'] = auto_convert(upnp)
 
-    if vlanmodeExp.search(strValue) != None:
+    if WAN_CFG_VLANMODE_EXP.search(strValue) != None:
 
-        tag, translate, tvlan, tcos, qinq, stpid, svlan, scos = vlanmodeExp.search(strValue).groups()
+        tag, translate, tvlan, tcos, qinq, stpid, svlan, scos = WAN_CFG_VLANMODE_EXP.search(strValue).groups()
         
         ret['vlanmode'] = tag.lower() 
         ret['tvlan'] = translate
@@ -1132,9 +1207,9 @@ def extract_wan_cfg(strValue):
         ret['svlan'] = auto_convert(svlan)
         ret['scos'] = auto_convert(scos)
 
-    if ret != None and 'dsp' not in ret.keys() and pppoeDSPExp.search(strValue) != None:
+    if ret != None and 'dsp' not in ret.keys() and WAN_CFG_PPPOE_DSP_EXP.search(strValue) != None:
         
-        dsp, proxy, pppoemode, username, password, servername = pppoeDSPExp.search(strValue).groups() 
+        dsp, proxy, pppoemode, username, password, servername = WAN_CFG_PPPOE_DSP_EXP.search(strValue).groups() 
 
         ret['dsp'] = DSPMode(dsp.lower())
         ret['proxy'] = 'enable' if proxy == '1' else 'disable'
@@ -1143,9 +1218,9 @@ def extract_wan_cfg(strValue):
         ret['password'] = auto_convert(password)
         ret['servername'] = auto_convert(servername)
 
-    if ret != None and 'dsp' not in ret.keys() and staticDSPExp.search(strValue) != None:
+    if ret != None and 'dsp' not in ret.keys() and WAN_CFG_STATIC_DSP_EXP.search(strValue) != None:
         
-        dsp, ip, mask, gate, master, slave = staticDSPExp.search(strValue).groups()
+        dsp, ip, mask, gate, master, slave = WAN_CFG_STATIC_DSP_EXP.search(strValue).groups()
         ret['dsp'] = DSPMode(dsp.lower())
         ret['ip'] = auto_convert(ip)
         ret['mask'] = auto_convert(mask)
@@ -1153,9 +1228,9 @@ def extract_wan_cfg(strValue):
         ret['master'] = auto_convert(master)
         ret['slave'] = auto_convert(slave)
 
-    if ret != None and 'dsp' not in ret.keys() and dhcpDSPExp.search(strValue) != None:
+    if ret != None and 'dsp' not in ret.keys() and WAN_CFG_DHCP_DSP_EXP.search(strValue) != None:
         
-        dsp = dhcpDSPExp.search(strValue).groups()
+        dsp = WAN_CFG_DHCP_DSP_EXP.search(strValue).groups()
         ret['dsp'] = DSPMode(dsp.lower())
 
     if ret != None and 'dsp' not in ret.keys():
@@ -1164,21 +1239,19 @@ def extract_wan_cfg(strValue):
 
     ret['fe'] = [ ]
     ret['ssid'] = [ ]
-    if entriesExp.search(strValue) != None:
+    if WAN_CFG_ENTRIES_EXP.search(strValue) != None:
 
         if ret == None:
             ret = { }
 
-        itemsCount, itemsValue  = entriesExp.search(strValue).groups()
+        itemsCount, itemsValue  = WAN_CFG_ENTRIES_EXP.search(strValue).groups()
         if int(itemsCount) != 0:
 
-            feRegexExp = re.compile('^(\d)$')
-            ssidRegexExp = re.compile('^10(\d)$')
             for v in re.split('\s+', itemsValue):
-                if None != feRegexExp.match(v):
+                if None != WAN_CFG_FE_EXP.match(v):
                     ret['fe'].append('fe%s' % v)
-                elif None != ssidRegexExp.match(v):
-                    ret['ssid'].append('ssid%s' % ssidRegexExp.match(v).groups()[0])
+                elif None != WAN_CFG_SSID_EXP.match(v):
+                    ret['ssid'].append('ssid%s' % WAN_CFG_SSID_EXP.match(v).groups()[0])
                 elif '' == v:
                     continue
                 else:
@@ -1189,6 +1262,9 @@ def extract_wan_cfg(strValue):
     
     return ret
 
+IGMP_MODE_INFO_KEY_VALUE_EXP = re.compile(r'\s*(.+)\s*:\s*(.+)\s*')
+
+@parser('show igmp mode')
 def extract_igmp_mode_info(strValue):
     """提取show igmp mode命令信息
 
@@ -1207,25 +1283,29 @@ def extract_igmp_mode_info(strValue):
     # Query interval            :  125
     # Query response interval   :  10
 
-    keyValueExp = re.compile('\s*(.+)\s*:\s*(.+)\s*')
     
     ret = { }
     for line in strValue.splitlines():
-        match = keyValueExp.match(line)
+        match = IGMP_MODE_INFO_KEY_VALUE_EXP.match(line)
         if match != None:
             key, value = match.groups()
             ret[key.strip()] = value.strip()
     
     return ret
 
-def extract_onu_statistics(strValue):
+ONU_STATISTICS_EXP = re.compile(r'(.+):(.+)\((.+)\)')
+ONU_STATISTICS_PERIOD_EXP = re.compile(r'From\s+(\S+\s\S+)\s+To\s+(\S+\s\S+)')
+
+@parser('show onu statistics')
+def extract_onu_statistics(strValue, typed=False):
     """提取show onu statistics命令的信息
 
     Args:
         strValue (str): show onu statistics命令的信息
+        typed (bool, optional): 为True时返回ONUStatistics，计数为int，速率、光功率等为统一单位的float，并带有统计起止时间。默认为False。
 
     Returns:
-        dict: 包含ONU统计信息的字典
+        dict: 包含ONU统计信息的字典，值为(值, 单位)字符串元组
     """
     # buf:0x8cdcddc4,len448,prtcl:0, lv:4,obj:4/8/4 type:4, order:0.
     # From 2020-11-10 14:46:04 To 0000-00-00 00:00:00
@@ -1268,21 +1348,36 @@ def extract_onu_statistics(strValue):
     # OLT_Rx_power                    :          -14.32 (dbm)
 
     ret = { }
+    since, until = None, None
 
-    exp = re.compile('(.+):(.+)\((.+)\)')
     for line in strValue.splitlines():
-        match = exp.match(line)
+        match = ONU_STATISTICS_EXP.match(line)
         if match:
             key, value, unit = match.groups()
             ret[key.strip()] = (value.strip(), unit.strip())
+            continue
+
+        match = ONU_STATISTICS_PERIOD_EXP.search(line)
+        if match:
+            since, until = to_datetime(match.group(1)), to_datetime(match.group(2))
+
+    if typed:
+        return ONUStatistics.from_raw(ret, since, until)
 
     return ret
 
+BANDWIDTH_PROFILE_SUMMARY_EXP = re.compile(r'-+\s+onubandwidth\sprofile,\snum\s+=\s+(\d+)\s-+')
+BANDWIDTH_PROFILE_TITLES_EXP = re.compile(r'(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s*')
+BANDWIDTH_PROFILE_ITEMS_EXP = re.compile(r'(\d+)\s+([\w\d]+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s*')
+# show bandwidth-profile各列的转换函数，名称可能是纯数字，未列出，仍由auto_convert转换
+BANDWIDTH_PROFILE_SCHEMA = { 'Id': to_int, 'upMin': to_int, 'upMax': to_int, 'downMin': to_int, 'downMax': to_int, 'upFix': to_int }
+
+@parser('show bandwidth-profile')
 def extract_bandwidth_profile(strValue):
     """提取show bandwidth-profile的信息
 
     Args:
-        strValue(str): show bandwidth-profile信息
+        strValue(str or iterable): show bandwidth-profile信息，或逐行产生信息的迭代器
     
     Returns:
         list: 包含onu bandwith profile信息的列表
@@ -1306,44 +1401,36 @@ def extract_bandwidth_profile(strValue):
     # ------------------------------------------------------------------
     # 3    bwp                  10000  10000  10000  10000  10000
 
-    summaryRegex = re.compile('-+\s+onubandwidth\sprofile,\snum\s+=\s+(\d+)\s-+')
-
-    titlesRegex = re.compile('(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s+(\w+)\s*')
-
-    itemsRegex = re.compile('(\d+)\s+([\w\d]+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s+(\d+)\s*')
-
     ret = [ ]
     titles = None
     count = None
-    for line in strValue.splitlines():
+    for line in iter_lines(strValue):
 
-        match = titlesRegex.match(line)
-        if itemsRegex.match(line):
-            
-            values = match.groups()
-
-            save = { }
-            for t, v in zip(titles, values):
-                save[t] = auto_convert(v)
+        match = BANDWIDTH_PROFILE_ITEMS_EXP.match(line)
+        if match:
             
-            ret.append(save)
+            ret.append({ t: convert(v) for t, convert, v in zip(titles, converters, match.groups()) })
             continue
 
-        match = summaryRegex.match(line)
+        match = BANDWIDTH_PROFILE_SUMMARY_EXP.match(line)
         if match:
             assert len(match.groups()) == 1
             count = int(match.groups()[0])
             continue
 
-        match = titlesRegex.match(line)
+        match = BANDWIDTH_PROFILE_TITLES_EXP.match(line)
         if match:
             titles = match.groups()
+            converters = get_converters(titles, BANDWIDTH_PROFILE_SCHEMA)
             continue
 
     assert count == len(ret)
 
     return ret
 
+ONU_BANDWIDTH_KEY_VALUE_EXP = re.compile(r'\s*(\w+)\s*:\s*(-?\d+)\s*\.')
+
+@parser('show onu bandwidth')
 def extract_onu_bandwidth(strValue):
     """提取show onu bandwidth数据
 
@@ -1362,15 +1449,17 @@ def extract_onu_bandwidth(strValue):
     # prfId: -1.
 
     ret = { }
-    keyValueRegexExp = re.compile('\s*(\w+)\s*:\s*(-?\d+)\s*\.')
     for line in strValue.splitlines():
-        match = keyValueRegexExp.match(line)
+        match = ONU_BANDWIDTH_KEY_VALUE_EXP.match(line)
         if match:
             k, v = match.groups()
             ret[k]=auto_convert(v)
     
     return ret
 
+BANDWIDTH_EXP = re.compile(r'BANDWIDTH:\s*UP\s*(\d+)\s*DOWN\s*(\d+)')
+
+@parser('show bandwidth')
 def extract_bandwidth(strValue):
     """提取show bandwidth数据
 
@@ -1382,19 +1471,21 @@ def extract_bandwidth(strValue):
     """
 
     # BANDWIDTH: UP 20000      DOWN 20000
-    regexExp = 'BANDWIDTH:\s*UP\s*(\d+)\s*DOWN\s*(\d+)'
     
     ret = { }
 
     for line in strValue.splitlines():
-        match = regexExp.match(line)
+        match = BANDWIDTH_EXP.match(line)
         if match:
-            usPir, dsPir = match.group()
+            usPir, dsPir = match.groups()
             ret['UP'] = auto_convert(usPir)
             ret['DOWN'] = auto_convert(dsPir)
         
     return ret
 
+ONU_LAYER3_RATE_LIMIT_PROFILE_EXP = re.compile(r'(.+)\s*:\s*(.+).')
+
+@parser('show onu layer3-ratelimit-profile')
 def extract_onu_layer3_rate_limit_profile(strValue):
     """提取show onu layer3-ratelimit-profile数据
 
@@ -1415,11 +1506,9 @@ def extract_onu_layer3_rate_limit_profile(strValue):
     # Up bandwidth profile id: 65535.
     # Down bandwidth profile id: 65535.
 
-    regexExp = re.compile('(.+)\s*:\s*(.+).')
-
     ret = [ ]
     for line in strValue.splitlines():
-        match = regexExp.match(line)
+        match = ONU_LAYER3_RATE_LIMIT_PROFILE_EXP.match(line)
         if match:
             k, v = match.groups()
             k = k.strip()
@@ -1431,6 +1520,11 @@ def extract_onu_layer3_rate_limit_profile(strValue):
     
     return ret
 
+SERVICE_VLAN_VLAN_INDEX_EXP = re.compile(r'servicevlan\s+(\d+)\s+:\s*')
+SERVICE_VLAN_NAME_TYPE_EXP = re.compile(r'name\s+:\s+(.+),\s+type\s+:\s+(.+)\s*')
+SERVICE_VLAN_SVLAN_EXP = re.compile(r'vlan\s+range:\s+(\d+|\d+\s+~\s+\d+)\s+#####end.')
+
+@parser('show service-vlan')
 def extract_service_vlan(strValue):
     """提取show service-vlan数据
 
@@ -1447,31 +1541,32 @@ def extract_service_vlan(strValue):
     # name : sip,   type : voip
     # vlan range: 3990 #####end.
 
-    vlanIndexExp = re.compile('servicevlan\s+(\d+)\s+:\s*')
-    nameTypeExp = re.compile('name\s+:\s+(.+),\s+type\s+:\s+(.+)\s*')
-    svlanExp = re.compile('vlan\s+range:\s+(\d+|\d+\s+~\s+\d+)\s+#####end.')
-
     ret = [ ]
     for line in strValue.splitlines():
-        match = vlanIndexExp.match(line)
+        match = SERVICE_VLAN_VLAN_INDEX_EXP.match(line)
         if match:
             ret.append({ })
             ret[-1]['servicevlan'] = auto_convert(match.groups()[0].strip())
             continue
 
-        match = nameTypeExp.match(line)
+        match = SERVICE_VLAN_NAME_TYPE_EXP.match(line)
         if match:
             ret[-1]['name'] = auto_convert(match.groups()[0].strip())
             ret[-1]['type'] = auto_convert(match.groups()[1].strip())
             continue
 
-        match = svlanExp.match(line)
+        match = SERVICE_VLAN_SVLAN_EXP.match(line)
         if match:
             ret[-1]['vlan range'] = auto_convert(match.groups()[0].strip())
             continue
     
     return ret
 
+ONU_QINQ_CLASSIFICATION_PROFILE_PROFILE_NAME_EXP = re.compile(r'-+.+\[(.+)\].+-+')
+ONU_QINQ_CLASSIFICATION_PROFILE_PROFILE_INDEX_EXP = re.compile(r'Index: (\d+)')
+ONU_QINQ_CLASSIFICATION_PROFILE_PROFILE_FIELD_VALUE_OP_EXP = re.compile(r'Type:\s+(.+)\s+Value:\s+(.+)\s+Operator:\s+(.+)')
+
+@parser('show onuqinq-classification-profile')
 def extract_onu_qinq_classification_profile(strValue):
     """提取show onuqinq-classification-profile数据
 
@@ -1496,24 +1591,21 @@ def extract_onu_qinq_classification_profile(strValue):
     # Type: Source MAC Address        Value: 00 00 00 00 00 00                        Operator: No exist then match
 
     
-    profileNameExp = re.compile('-+.+\[(.+)\].+-+')
-    profileIndexExp = re.compile('Index: (\d+)')
-    profileFieldValueOpExp = re.compile('Type:\s+(.+)\s+Value:\s+(.+)\s+Operator:\s+(.+)')
 
     ret = []
     for line in strValue.splitlines():
-        match = profileNameExp.match(line)
+        match = ONU_QINQ_CLASSIFICATION_PROFILE_PROFILE_NAME_EXP.match(line)
         if match:
             ret.append({ })
             ret[-1]['name'] = match.groups()[0].strip()
             continue
 
-        match = profileIndexExp.match(line)
+        match = ONU_QINQ_CLASSIFICATION_PROFILE_PROFILE_INDEX_EXP.match(line)
         if match:
             ret[-1]['index'] = auto_convert(match.groups()[0].strip())
             continue
         
-        match = profileFieldValueOpExp.match(line)
+        match = ONU_QINQ_CLASSIFICATION_PROFILE_PROFILE_FIELD_VALUE_OP_EXP.match(line)
         if match:
             f, v, o = match.groups()
 
@@ -1528,6 +1620,15 @@ def extract_onu_qinq_classification_profile(strValue):
     
     return ret
 
+OLT_QINQ_DOMAIN_QINQ_NAME_EXP = re.compile(r'-+.+\[(.+)\].+-+')
+OLT_QINQ_DOMAIN_QINQ_INDEX_AND_SVC_INDEX_EXP = re.compile(r'Domain index:\s*(\d+)\s*Service num:\s*(\d+)\s*')
+OLT_QINQ_DOMAIN_SERVICE_TYPE_AND_ID_EXP = re.compile(r'Service type:\s*(\d+)\s*Service ID:\s*(\d+)\s*')
+OLT_QINQ_DOMAIN_SERVICE_INDEX_AND_RULE_EXP = re.compile(r'Service\[(\d+)\] (\w+) rule:')
+OLT_QINQ_DOMAIN_TYPE_VALUE_OP_EXP = re.compile(r'Type\[(\d+)\]\s+val\[(.+)\]\s+opt\[(\d+)\]')
+OLT_QINQ_DOMAIN_SERVICE_VLAN_INFO_EXP = re.compile(r'Service\[(\d+)\] vlan information:')
+OLT_QINQ_DOMAIN_LAYER_EXP = re.compile(r'Layer\s*(\d+):\s*oldvlan\[(.+)\]\s*oldcos\[(.+)\]\s*action\[(.+)\]\s*tpid\[(.+)\]\s*cos\[(.+)\]\s*newvlan\[(.+)\]')
+
+@parser('show oltqinq-domain')
 def extract_olt_qinq_domain(strValue):
     """提取show oltqinq-domain <name> / index <index>数据
 
@@ -1551,13 +1652,6 @@ def extract_olt_qinq_domain(strValue):
     # Layer 3: oldvlan[65535] oldcos[255] action[3] tpid[0x8100] cos[255] newvlan[65535]
     # Layer 4: oldvlan[65535] oldcos[255] action[3] tpid[0x8100] cos[255] newvlan[65535]
 
-    qinqNameExp = re.compile('-+.+\[(.+)\].+-+')
-    qinqIndexAndSvcIndexExp = re.compile('Domain index:\s*(\d+)\s*Service num:\s*(\d+)\s*')
-    serviceTypeAndIDExp = re.compile('Service type:\s*(\d+)\s*Service ID:\s*(\d+)\s*')
-    serviceIndexAndRuleExp = re.compile('Service\[(\d+)\] (\w+) rule:')
-    typeValueOpExp = re.compile('Type\[(\d+)\]\s+val\[(.+)\]\s+opt\[(\d+)\]')
-    serviceVlanInfoExp = re.compile('Service\[(\d+)\] vlan information:')
-    layerExp = re.compile('Layer\s*(\d+):\s*oldvlan\[(.+)\]\s*oldcos\[(.+)\]\s*action\[(.+)\]\s*tpid\[(.+)\]\s*cos\[(.+)\]\s*newvlan\[(.+)\]')
     
     # {
     #     'name': 'profile-name',
@@ -1588,19 +1682,19 @@ def extract_olt_qinq_domain(strValue):
 
     lastKey = None
     for line in strValue.splitlines():
-        match = qinqNameExp.match(line)
+        match = OLT_QINQ_DOMAIN_QINQ_NAME_EXP.match(line)
         if match:
             ret['name'] = auto_convert(match.groups()[0])
             continue
 
-        match = qinqIndexAndSvcIndexExp.match(line)
+        match = OLT_QINQ_DOMAIN_QINQ_INDEX_AND_SVC_INDEX_EXP.match(line)
         if match:
             ret['index'] = auto_convert(match.groups()[0])
             ret['count'] = auto_convert(match.groups()[1])
             ret['services'] = [ ]
             continue
 
-        match = serviceTypeAndIDExp.match(line)
+        match = OLT_QINQ_DOMAIN_SERVICE_TYPE_AND_ID_EXP.match(line)
         if match:
             ret['services'].append({ })
             ret['services'][-1]['no'] = auto_convert(match.groups()[1])
@@ -1609,7 +1703,7 @@ def extract_olt_qinq_domain(strValue):
             ret['services'][-1]['vlan'] = [ ]
             continue
 
-        match = serviceIndexAndRuleExp.match(line)
+        match = OLT_QINQ_DOMAIN_SERVICE_INDEX_AND_RULE_EXP.match(line)
         if match:
             no = auto_convert(match.groups()[0])
             upOrDownStream = auto_convert(match.groups()[1])
@@ -1618,7 +1712,7 @@ def extract_olt_qinq_domain(strValue):
             lastKey = upOrDownStream
             continue
 
-        match = typeValueOpExp.match(line)
+        match = OLT_QINQ_DOMAIN_TYPE_VALUE_OP_EXP.match(line)
         if match:
             typeCode, rawValue, opCode = match.groups()
             intType = auto_convert(typeCode)
@@ -1627,13 +1721,13 @@ def extract_olt_qinq_domain(strValue):
             ret['services'][-1]['rule'][lastKey].append((intType, strValue, intOp))
             continue
 
-        match = serviceVlanInfoExp.match(line)
+        match = OLT_QINQ_DOMAIN_SERVICE_VLAN_INFO_EXP.match(line)
         if match:
             no = auto_convert(match.groups()[0])
             assert no == ret['services'][-1]['no']
             continue
         
-        match = layerExp.match(line)
+        match = OLT_QINQ_DOMAIN_LAYER_EXP.match(line)
         if match:
             layerNo, oldVlan, oldCos, action, newTpid, newCos, newVlan = match.groups()
             if action == '1':
@@ -1650,6 +1744,9 @@ def extract_olt_qinq_domain(strValue):
 
     return ret
 
+OLT_QINQ_DOMAIN_BOUND_INFO_PON_BOUND_INFO_EXP = re.compile(r'Pon bound info: slot id: (\d+); pon id: (\d+).')
+
+@parser('show oltqinq-domain bound-info')
 def extract_olt_qinq_domain_bound_info(strValue):
     """提取show oltqinq-domain bound-info信息
 
@@ -1662,16 +1759,18 @@ def extract_olt_qinq_domain_bound_info(strValue):
 
     lines = strValue.splitlines()
 
-    ponBoundInfoExp = re.compile('Pon bound info: slot id: (\d+); pon id: (\d+).')
-
     for line in lines:
-        match = ponBoundInfoExp.match(line)
+        match = OLT_QINQ_DOMAIN_BOUND_INFO_PON_BOUND_INFO_EXP.match(line)
         if match:
             slot, portNo = match.groups()
             return auto_convert(slot), auto_convert(portNo)
 
     assert False, '没有找到绑定信息: %s' % strValue
 
+SYSTEM_TIME_DATE_EXP = re.compile(r'Current\s+Date\s+is\s+(\d{4,4}-\d{2,2}-\d{2,2})')
+SYSTEM_TIME_TIME_EXP = re.compile(r'Current\s+Time\s+is\s+(\d{2,2}:\d{2,2}:\d{2,2})')
+
+@parser('show time')
 def extract_system_time(strValue):
     """提取show time命令的信息
 
@@ -1685,24 +1784,25 @@ def extract_system_time(strValue):
     # Current Date is 2020-11-23
     # Current Time is 17:27:45
     # System running time is 6 day  21:34:39
-    dateExp = re.compile('Current\s+Date\s+is\s+(\d{4,4}-\d{2,2}-\d{2,2})')
-    timeExp = re.compile('Current\s+Time\s+is\s+(\d{2,2}:\d{2,2}:\d{2,2})')
 
     lines = strValue.splitlines()
     date, time = '', ''
     for line in lines:
-        match = dateExp.match(line)
+        match = SYSTEM_TIME_DATE_EXP.match(line)
         if match:
             date = match.groups()[0]
             continue
 
-        match = timeExp.match(line)
+        match = SYSTEM_TIME_TIME_EXP.match(line)
         if match:
             time = match.groups()[0]
             continue
     
     return date.strip(), time.strip()
 
+PPPOE_PLUS_STATE_EXP = re.compile(r'(.+):(.+)')
+
+@parser('show pppoe-plus state')
 def extract_pppoe_plus(strValue):
     """提取show pppoe-plus state命令的信息
 
@@ -1713,19 +1813,21 @@ def extract_pppoe_plus(strValue):
         dict: 包含PPPoE-Plus状态信息的字典
     """
 
-    stateExp = re.compile('(.+):(.+)')
-
     lines = strValue.splitlines()
 
     ret = { }
     for line in lines:
-        match = stateExp.match(line)
+        match = PPPOE_PLUS_STATE_EXP.match(line)
         if match:
             k, v = match.groups()
             ret[auto_convert(k)] = auto_convert(v)
     
     return ret
 
+IP_ADDRESS_IP_EXP = re.compile(r'debugip\s+(\d+\\.\d+\\.\d+\\.\d+)')
+IP_ADDRESS_MASK_EXP = re.compile(r'mask\s+(\d+\\.\d+\\.\d+\\.\d+)')
+
+@parser('show ip address')
 def extract_ip_address(strValue):
     """抽取show ip address命令的信息
 
@@ -1738,16 +1840,13 @@ def extract_ip_address(strValue):
 
     lines = strValue.splitlines()
 
-    ipExpr = re.compile('debugip\s+(\d+\\.\d+\\.\d+\\.\d+)')
-    maskExpr = re.compile('mask\s+(\d+\\.\d+\\.\d+\\.\d+)')
-
     ip, mask = None, None
     for line in lines:
-        match = ipExpr.search(line)
+        match = IP_ADDRESS_IP_EXP.search(line)
         if match:
             ip = auto_convert(match.groups()[0])
 
-        match = maskExpr.search(line)
+        match = IP_ADDRESS_MASK_EXP.search(line)
         if match:
             mask = auto_convert(match.groups()[0])
     
@@ -1756,6 +1855,9 @@ def extract_ip_address(strValue):
 
     return (ip, mask)
 
+ACL_VALUE_EXP = re.compile(r'(\d+)\s+(\d+\\.d+\\.d+\\.d+)\s+(\d+\\.d+\\.d+\\.d+)\s+(\w+)')
+
+@parser('show acl')
 def extract_acl(strValue):
     """抽取show acl命令的信息
 
@@ -1768,12 +1870,11 @@ def extract_acl(strValue):
 
     titles = ['No', 'IP', 'Mask', 'Status']
 
-    valueExpr = re.compile('(\d+)\s+(\d+\\.d+\\.d+\\.d+)\s+(\d+\\.d+\\.d+\\.d+)\s+(\w+)')
     lines = strValue.splitlines()
 
     ret = [ ]
     for line in lines:
-        match = valueExpr.match(line)
+        match = ACL_VALUE_EXP.match(line)
         if match:
             ret.append({ })
             for t, v in zip(titles, match.groups()):
@@ -1781,6 +1882,10 @@ def extract_acl(strValue):
     
     return ret
 
+SNMP_TIME_INTERVAL_EXP = re.compile(r'INTERVAL=(\d+)')
+SNMP_TIME_IP_EXP = re.compile(r'Server\s+IP\s+:\s+(\d+\\.\d+\\.\d+\\.\d+)')
+
+@parser('show snmp-time')
 def extract_snmp_time(strValue):
     """抽取show snmp-time命令的信息
 
@@ -1791,57 +1896,374 @@ def extract_snmp_time(strValue):
         dict: 包含ip和interval信息的字典
     """
 
-    intervalExpr = re.compile('INTERVAL=(\d+)')
-    ipExpr = re.compile('Server\s+IP\s+:\s+(\d+\\.\d+\\.\d+\\.\d+)')
-
     lines = strValue.splitlines()
     
     ip, interval = None, None
     for line in lines:
-        match = intervalExpr.search(line)
+        match = SNMP_TIME_INTERVAL_EXP.search(line)
         if match:
             interval = auto_convert(match.groups()[0])
 
-        match = ipExpr.search(line)
-        if match:
-            ip = auto_convert(match.groups()[0])
+        match = SNMP_TIME_IP_EXP.search(line)
+        if match:
+            ip = auto_convert(match.groups()[0])
+
+    if ip == None or interval == None:
+        raise RuntimeWarning('未找到IP和Interval信息')
+
+    return { 'ip': ip, 'interval': interval }
+
+CURRENT_ALARM_TITLE_EXP = re.compile(r'\s*(Item Description)\s+(Code vOLT)\s+(Object)\s+(Begintime)\s+(Endtime)\s*')
+
+@parser('show alarm current')
+def extract_current_alarm(strValue):
+    """抽取show alarm current命令的信息
+
+    Args:
+        strValue (str): show alarm current显示的信息
+
+    Returns:
+        list: 包含信息的字典
+    """
+
+    # TODO: FIXME: 抽取告警信息没有实现
+    valueExpr = re.compile('???')
+
+    lines = strValue.splitlines()
+
+    ret = [ ]
+    titles = None
+    for line in lines:
+        match = CURRENT_ALARM_TITLE_EXP.match(line)
+        if match != None:
+            titles = match.groups()
+        
+        match = valueExpr.match(line)
+        if match != None:
+            values = match.groups()
+            ret.append({ })
+            for title, value in zip(titles, values):
+                ret[-1][title] = value
+
+    return ret
+
+def port_vlan_rule_to_str(rule:tuple) -> str:
+    """将ONU Port Vlan业务参数转换为onu port vlan命令中的规则字符串
+
+    Args:
+        rule (tuple): LAN业务参数，如('tag', 0, 33024, 1000)，参考set_onu_port_vlan_service_vlan
+
+    Raises:
+        ValueError: 未知的VLAN设置参数
+
+    Returns:
+        str: 规则字符串，如'tag priority 0 tpid 33024 vid 1000'
+    """
+
+    # pvlan格式化模板
+    pvlanFormat = '%s priority %s vid %s'
+    # tag格式化模板
+    tagFormat = '%s priority %s tpid %s vid %s'
+    # translate格式化模板
+    translateEnableFormat = '%s %s priority %s tpid %s vid %s'
+    translateDisableFormat = '%s %s'
+    # transparent格式化模板
+    transparentFormat = '%s priority %s tpid %s vid %s'
+    # qinq格式化模板
+    qinqEnableFormat = '%s %s priority %s tpid %s vid %s %s %s'
+    qinqDisableFormat = '%s %s'
+
+    mode = rule[0]
+    if mode == 'pvlan':
+        return pvlanFormat % rule
+    elif mode == 'tag':
+        return tagFormat % rule
+    elif mode == 'translate':
+        if rule[1] == 'enable':
+            return translateEnableFormat % rule
+        else:
+            assert rule[1] == 'disable'
+            return translateDisableFormat % rule
+    elif mode == 'transparent':
+        return transparentFormat % rule
+    elif mode == 'qinq':
+        if rule[1] == 'enable':
+            return qinqEnableFormat % rule
+        else:
+            assert rule[1] == 'disable'
+            return qinqDisableFormat % rule
+    else:
+        raise ValueError('未知VLAN设置参数：%s' % str(rule))
+
+def is_online_in(snapshot:AuthorizationSnapshot, sn:str) -> Optional[dict]:
+    """检查ONU在授权表快照中是否在线，不在表中视为不在线
+
+    Args:
+        snapshot (AuthorizationSnapshot): 授权表快照
+        sn (str): ONU SN
+
+    Returns:
+        dict: 在线时返回该ONU的授权信息，否则返回None
+    """
+    entry = snapshot.get_by_phy_id(sn)
+    return entry if entry != None and entry['OST'] == 'up' else None
+
+def get_whitelist_add_cmd(wlMode:WhitelistMode, onuInfo:dict, onuId:Optional[int]=None) -> Tuple[str, Union[str, int]]:
+    """根据自动发现的ONU信息，生成增加白名单的命令
+
+    Args:
+        wlMode (WhitelistMode): 要增加到哪个白名单
+        onuInfo (dict): extract_discovery返回的ONU信息
+        onuId (int, optional): 指定onuid，不指定自动分配。默认None。
+
+    Returns:
+        tuple: (命令, 白名单中用于查找该ONU的phyId、logId或passwd)
+    """
+    if wlMode == WhitelistMode.phyid:
+        cmd, id = 'whitelist add phy-id %s' % onuInfo['PhyId'], onuInfo['PhyId']
+    elif wlMode == WhitelistMode.phyid_psw:
+        cmd, id = 'whitelist add phy-id %s checkcode %s' % (onuInfo['PhyId'], onuInfo['PhyPwd']), onuInfo['PhyId']
+    elif wlMode == WhitelistMode.logid:
+        cmd, id = 'whitelist add logic-id %s' % onuInfo['LogicId'], onuInfo['LogicId']
+    elif wlMode == WhitelistMode.logid_psw:
+        cmd, id = 'whitelist add logic-id %s checkcode %s' % (onuInfo['LogicId'], onuInfo['LogicPwd']), onuInfo['LogicId']
+    else:
+        cmd, id = 'whitelist add password %s' % onuInfo['PhyPwd'], onuInfo['PhyPwd']
+
+    if onuId != None:
+        cmd = cmd + ' onuid %s' % onuId
+
+    return cmd, id
+
+def whitelist_contains(onuInfos:List[dict], wlMode:WhitelistMode, id) -> bool:
+    """检查白名单列表中是否有指定的ONU
+
+    Args:
+        onuInfos (List[dict]): extract_whitelist返回的白名单列表
+        wlMode (WhitelistMode): 白名单类型
+        id (str): ONU的phyId、logId或passwd
+
+    Returns:
+        bool: True，在白名单列表中；False，不在白名单列表中
+    """
+    id = auto_convert(id)
+
+    for onuInfo in onuInfos:
+        if wlMode in [ WhitelistMode.phyid, WhitelistMode.phyid_psw ]:
+            if onuInfo['Phy-ID'] == id:
+                return True
+
+        if wlMode in [ WhitelistMode.logid, WhitelistMode.logid_psw ]:
+            if onuInfo['Logic-Id'] == id:
+                return True
+
+        if wlMode in  [ WhitelistMode.password ]:
+            if onuInfo['Phy-Pwd'] == id:
+                return True
+
+    return False
+
+def get_whitelist_id_key(wlMode:WhitelistMode) -> str:
+    """根据WhitelistMode的类型，返回extract_whitelist结果中ONU的phyId、logId或passwd的键
+
+    Args:
+        wlMode (WhitelistMode): 白名单类型
+
+    Returns:
+        str: 'Phy-ID'、'Logic-Id'或'Phy-Pwd'
+    """
+    if wlMode in [ WhitelistMode.phyid, WhitelistMode.phyid_psw ]:
+        return 'Phy-ID'
+
+    if wlMode in [ WhitelistMode.logid, WhitelistMode.logid_psw ]:
+        return 'Logic-Id'
+
+    return 'Phy-Pwd'
+
+def get_whitelist_ids(onuInfos:List[dict], wlMode:WhitelistMode) -> set:
+    """获取白名单列表中所有ONU的phyId、logId或passwd，用于一次验证多个ONU
+
+    Args:
+        onuInfos (List[dict]): extract_whitelist返回的白名单列表
+        wlMode (WhitelistMode): 白名单类型
+
+    Returns:
+        set: phyId、logId或passwd的集合，查找前id需要先auto_convert
+    """
+    key = get_whitelist_id_key(wlMode)
+    return set([ onuInfo[key] for onuInfo in onuInfos ])
+
+def check_results(results:List[CommandResult]) -> List[CommandResult]:
+    """检查批量执行命令的结果，有命令被OLT拒绝时抛出异常
+
+    Args:
+        results (List[CommandResult]): run_batch返回的结果
+
+    Raises:
+        RuntimeWarning: 有命令执行失败时，抛出异常
+
+    Returns:
+        List[CommandResult]: 原样返回结果
+    """
+    errors = [ '%s(%s)' % (result.cmd, result.error) for result in results if not result.ok ]
+    if len(errors) != 0:
+        raise RuntimeWarning('命令执行失败：%s' % '，'.join(errors))
+
+    return results
+
+def select_whitelist(onuInfos:Iterable[dict], wlMode:WhitelistMode, ids:Optional[set]=None) -> Iterator[dict]:
+    """从白名单中选出指定的ONU，与whitelist_contains一样按auto_convert后的值匹配
+
+    Args:
+        onuInfos (Iterable[dict]): iter_whitelist返回的白名单
+        wlMode (WhitelistMode): 白名单类型
+        ids (set, optional): auto_convert后的phyId、logId或passwd。默认None，选出所有ONU。
+
+    Yields:
+        dict: 选中的白名单
+    """
+    key = get_whitelist_id_key(wlMode)
+    for onuInfo in onuInfos:
+        if ids == None or auto_convert(onuInfo[key]) in ids:
+            yield onuInfo
+
+def get_whitelist_del_cmd(wlMode:WhitelistMode, onuInfo:dict) -> str:
+    """生成从白名单中删除ONU的命令。onuInfo应来自iter_whitelist(raw=True)，命令中使用白名单中的原始文本
+
+    Args:
+        wlMode (WhitelistMode): 白名单类型
+        onuInfo (dict): 要删除的白名单
+
+    Returns:
+        str: 删除命令，在config模式下执行
+    """
+    return 'no whitelist %s %s %s %s' % (get_whitelist_query_str(wlMode), onuInfo['Slot'], onuInfo['Pon'], onuInfo[get_whitelist_id_key(wlMode)])
+
+def get_reset_all_cmds(snapshot:AuthorizationSnapshot) -> Tuple[List[str], List[str]]:
+    """生成重置授权表中所有在线ONU的命令，按PON口分组
+
+    Args:
+        snapshot (AuthorizationSnapshot): 授权表快照
+
+    Returns:
+        tuple: (从Admin模式开始的命令列表, 被重置ONU的SN列表)
+    """
+    # 只重置在线的ONU，因为有些ONU重启时可能本来就没上线，无法验证
+    groups = { }
+    for authInfo in snapshot:
+        if authInfo['OST'] == 'up':
+            groups.setdefault((authInfo['Slot'], authInfo['Pon']), [ ]).append(authInfo)
+
+    cmds, sns = [ 'config' ], [ ]
+    for slotPort, authInfos in groups.items():
+        cmds.append('interface pon 1/%s/%s' % slotPort)
+        # onu reset all命令存在bug，使用普通命令替代
+        for authInfo in authInfos:
+            cmds.append('onu reset %s' % authInfo['Onu'])
+            sns.append(authInfo['PhyId'])
+        cmds.append('exit')
+
+    return cmds, sns
+
+def get_auth_mode_query_str(slot:Optional[int]=None, port:Optional[int]=None) -> str:
+    """生成show port authentication-mode命令的参数
+
+    Args:
+        slot (int, optional): 槽位号。默认None，查询所有端口。
+        port (int, optional): 端口号。默认None，查询所有端口。
+
+    Returns:
+        str: 'all'或'select 1/slot/port'
+    """
+    if (slot, port) == (None, None):
+        return 'all'
+
+    return 'select 1/%s/%s' % (slot, port)
+
+def get_onu_port_vlan_cmd(onuId:int, eth:int, service:str) -> str:
+    """生成设置ONU Port VLAN业务的命令，在PON口下执行，删除时在前面加no
+
+    Args:
+        onuId (int): ONU ID
+        eth (int): ONU网口
+        service (str): service之后的参数，如'count 2'、'1 tls enable'
+
+    Returns:
+        str: 命令
+    """
+    return 'onu port vlan %s eth %s service %s' % (onuId, eth, service)
+
+def get_bandwidth_profile_str(profileIdOrName:Union[int, str]) -> str:
+    """生成关联带宽模板时指定模板的参数
+
+    Args:
+        profileIdOrName (int或str): 带宽模板的ID或者名称
+
+    Returns:
+        str: 'profile-id <id>'或'profile-name <name>'
+    """
+    assert type(profileIdOrName) == int or type(profileIdOrName) == str
+
+    if type(profileIdOrName) == int:
+        return 'profile-id %s' % profileIdOrName
+
+    return 'profile-name %s' % profileIdOrName
+
+def get_onu_bandwidth_cmd(onuId:int, usCir:int, usPir:int, usFir:int, dsPir:int) -> str:
+    """生成设置ONU带宽的命令，在PON口下执行
+
+    Args:
+        onuId (int): ONU ID
+        usCir (int): upstream committed information rate
+        usPir (int): upstream peak information rate
+        usFir (int): upstream fix information rate
+        dsPir (int): downstream peak information rate
+
+    Returns:
+        str: 命令
+    """
+    return 'onu bandwidth %s upstream-pir %s downstream-pir %s upstream-cir %s upstream-fir %s' % (onuId, usPir, dsPir, usCir, usFir)
+
+def get_onu_layer3_rate_limit_cmds(onuId:int, state:Optional[str]=None) -> List[str]:
+    """生成查询ONU 3层限速的命令，在PON口下执行
 
-    if ip == None or interval == None:
-        raise RuntimeWarning('未找到IP和Interval信息')
+    Args:
+        onuId (int): ONU ID
+        state (str, optional): 查询哪种状态的限速。默认None，查询offline和online两种状态。
 
-    return { 'ip': ip, 'interval': interval }
+    Returns:
+        List[str]: 命令列表，结果依次用extract_onu_layer3_rate_limit_profile解析后合并
+    """
+    states = [ 'offline', 'online' ] if state == None else [ state ]
 
-def extract_current_alarm(strValue):
-    """抽取show alarm current命令的信息
+    return [ 'show onu layer3-ratelimit-profile %s %s' % (onuId, s) for s in states ]
+
+def get_onu_qinq_classification_profile_str(name:Optional[str]=None) -> str:
+    """生成show onuqinq-classification-profile命令的参数
 
     Args:
-        strValue (str): show alarm current显示的信息
+        name (str, optional): Profile的名称。默认None，查询所有。
 
     Returns:
-        list: 包含信息的字典
+        str: 'name <name>'或'all'
     """
+    return 'name %s' % name if name else 'all'
 
-    # TODO: FIXME: 抽取告警信息没有实现
-    titleExpr = re.compile('\s*(Item Description)\s+(Code vOLT)\s+(Object)\s+(Begintime)\s+(Endtime)\s*')
-    valueExpr = re.compile('???')
+def get_olt_qinq_domain_str(nameOrIndex:Union[int, str]) -> str:
+    """生成show oltqinq-domain命令的参数
 
-    lines = strValue.splitlines()
+    Args:
+        nameOrIndex (str或int): oltqinq-domain的名称或索引
 
-    ret = [ ]
-    titles = None
-    for line in lines:
-        match = titleExpr.match(line)
-        if match != None:
-            titles = match.groups()
-        
-        match = valueExpr.match(line)
-        if match != None:
-            values = match.groups()
-            ret.append({ })
-            for title, value in zip(titles, values):
-                ret[-1][title] = value
+    Returns:
+        str: 名称，或'index <index>'
+    """
+    assert type(nameOrIndex) == str or type(nameOrIndex) == int, "nameOrIndex只接受str或int类型"
 
-    return ret
+    if type(nameOrIndex) == str and not nameOrIndex.isdigit():
+        return nameOrIndex
+
+    return 'index %s' % nameOrIndex
 
 class OLTModel(Enum):
     """OLT Model
@@ -1851,7 +2273,7 @@ class OLTModel(Enum):
 class OLTCLI:
 
     @staticmethod
-    def get(model:OLTModel, ip:str, username:str, password:str):
+    def get(model:OLTModel, ip:str, username:str, password:str, keep_alive:bool=False, pool:Optional[OLTSessionPool]=None, auth_ttl:float=0, port:int=23):
         """get OLT CLI
 
         Args:
@@ -1859,12 +2281,16 @@ class OLTCLI:
             ip (str): [description]
             username (str): [description]
             password (str): [description]
+            keep_alive (bool, optional): whether reuse telnet sessions from the pool shared in process, default is False
+            pool (OLTSessionPool, optional): pool to take telnet sessions from, default is None
+            auth_ttl (float, optional): seconds to reuse the result of show authorization, default is 0, always run it again
+            port (int, optional): telnet port of OLT, default is 23
 
         Returns:
             OLTCIL: OLT CLI
         """
         if model == OLTModel.AN6000_17:
-            return OLTCLI_AN6K17(ip, username, password)
+            return OLTCLI_AN6K17(ip, username, password, keep_alive, pool, auth_ttl, port)
 
 class OLTCLI_AN6K17:
     """OLTCLI for AN6000-17 serie
@@ -1872,18 +2298,118 @@ class OLTCLI_AN6K17:
     封装了OLT常用的命令
     """
 
-    def __init__(self, ip:str, username:str, password:str) -> NoReturn:
+    def __init__(self, ip:str, username:str, password:str, keep_alive:bool=False, pool:Optional[OLTSessionPool]=None, auth_ttl:float=0, port:int=23) -> NoReturn:
         """OLT构造函数
 
         Args:
             ip (str): OLT IP地址
             username (str): OLT Telnet用户名
             password (str): OLT Telnet密码
+            keep_alive (bool, optional): 是否复用Telnet会话。为True时，从进程内按(ip, port, username, password)共享的连接池中取会话。默认False，每个方法单独登录一次。
+            pool (OLTSessionPool, optional): 指定取会话的连接池，指定后keep_alive视为True。默认None。
+            auth_ttl (float, optional): 授权表快照的有效秒数，有效期内查询ONU位置、ID、在线状态不再执行show authorization。默认0，每次都重新查询。
+            port (int, optional): OLT Telnet端口。默认23。
         """
         self._ip = ip
         self._username = username
         self._password = password
-    
+        self._port = port
+
+        # 会话连接池，keep_alive为True时使用
+        if pool == None and keep_alive:
+            pool = get_pool(ip, username, password, port=port)
+        self._pool = pool
+
+        # 当前线程持有的会话，嵌套调用的方法复用它
+        self._local = threading.local()
+
+        # 授权表快照，修改授权或白名单的方法会使其失效
+        self._auth_ttl = auth_ttl
+        self._auth_snapshot = None
+
+        # 等待ONU状态时共用的轮询器，每次轮询只获取一次授权表
+        self._poller = SnapshotPoller(lambda: self.get_authorization_snapshot(max_age=0))
+
+        # ONU状态监视器，有订阅者时才在后台定时获取授权表
+        self._watcher = ONUWatcher(lambda: self.get_authorization_snapshot(max_age=0))
+
+    def __enter__(self):
+        """支持with语法
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        """支持with语法，退出时关闭长连接会话
+        """
+        self.close()
+
+    @contextmanager
+    def _connect(self):
+        """获取到OLT的连接。当前线程已持有会话时复用它；否则keep_alive为False时新建会话并登录，为True时从连接池中取会话。
+
+        Yields:
+            Connection: 处于Admin模式下的连接
+        """
+        session = getattr(self._local, 'session', None)
+        if session != None:
+            # 嵌套调用，复用当前线程已持有的会话
+            with session.checkout() as conn:
+                yield conn
+            return
+
+        if self._pool != None:
+            opened = self._pool.connection(owner=self)
+        else:
+            opened = OLTSession(self.ip, self.username, self.password, port=self.port)
+
+        with opened as session:
+            self._local.session = session
+            try:
+                with session.checkout() as conn:
+                    yield conn
+            finally:
+                self._local.session = None
+
+    @contextmanager
+    def session(self):
+        """在当前线程持有一个会话直到退出with，其间直接执行的命令和调用的方法都复用它，只登录一次
+
+            with oltcli.session() as conn:
+                conn.run_batch([ 'config', 'whitelist add phy-id FHTT000aae64 type HG6243C slot 12 pon 8 onuid 3' ])
+                oltcli.get_authorization()
+
+        Yields:
+            Connection: 处于Admin模式下的连接
+        """
+        with self._connect() as conn:
+            yield conn
+
+    def close(self) -> NoReturn:
+        """停止ONU状态监视器，断开连接池中本实例放回的空闲会话，共用连接池的其他实例的会话不受影响。之后再调用方法时会自动重新建立。
+        """
+        self._watcher.stop()
+
+        if self._pool != None:
+            self._pool.release(self)
+
+    @property
+    def keep_alive(self) -> bool:
+        """是否复用Telnet会话
+
+        Returns:
+            bool: True，复用；False，每个方法单独登录。
+        """
+        return self._pool != None
+
+    @property
+    def pool(self) -> Optional[OLTSessionPool]:
+        """取会话的连接池
+
+        Returns:
+            OLTSessionPool: 连接池，keep_alive为False时为None
+        """
+        return self._pool
+
     @property
     def ip(self) -> str:
         """OLT Telnet IP地址
@@ -1911,6 +2437,15 @@ class OLTCLI_AN6K17:
         """
         return self._password
 
+    @property
+    def port(self) -> int:
+        """OLT Telnet端口
+
+        Returns:
+            int: OLT Telnet端口
+        """
+        return self._port
+
     def del_onu_caps_profile(self, name:str) -> NoReturn:
         """删除ONU能力集模板
 
@@ -1918,7 +2453,7 @@ class OLTCLI_AN6K17:
             name (str): ONU能力集名称
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('no onu caps-profile name %s' % name)
 
@@ -1945,7 +2480,7 @@ class OLTCLI_AN6K17:
             pots (int): pots端口号
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('onu caps-profile add name %s onutype %s pontype %s onucapa %s lan1g %s lan10g %s lan25g %s lan2.5g %s pots %s end' % (name, onutype, pontype, onucapa, lan1g, lan10g, lan25g, lan2_5g, pots))
 
@@ -1956,7 +2491,7 @@ class OLTCLI_AN6K17:
             dict: 包含时间配置参数的字典。interval，表示时间间隔；ip，表示SNMP对时的IP地址。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show snmp-time')
         
@@ -1971,7 +2506,7 @@ class OLTCLI_AN6K17:
             ip(str): IP地址
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('snmp-time interval %s servip %s %s' % (interval, type, ip))
 
@@ -1986,7 +2521,7 @@ class OLTCLI_AN6K17:
             ems-min (int): 时区分钟
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('time %s hour %s min %s ems-hour %s ems-min %s' % (mode, hour, min, ems_hour, ems_min))
 
@@ -2000,7 +2535,7 @@ class OLTCLI_AN6K17:
             time (str): HH:MM:SS字符串的时间
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('time %s %s %s %s' % (year, month, day, time))
 
@@ -2013,7 +2548,7 @@ class OLTCLI_AN6K17:
             type (str, optional): 抑制类型。支持broadcast、multicast、unknown和all。默认'all'。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('traffic-suppress 1/%s %s value %s' % (slot, type, rate))
 
@@ -2027,14 +2562,14 @@ class OLTCLI_AN6K17:
 
         type = self.get_card_type(slot)
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('card auth 1/%s %s' % (slot, type))
 
     def set_card_auto_auth(self):
         """对卡进行自动授权
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('card auto-auth')  
 
@@ -2048,7 +2583,7 @@ class OLTCLI_AN6K17:
             str: 卡的类型
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show card info')
         
@@ -2069,7 +2604,7 @@ class OLTCLI_AN6K17:
             slot (int): 卡的槽位号
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('card unauth 1/%s' % slot)
 
@@ -2091,7 +2626,7 @@ class OLTCLI_AN6K17:
             if entry['IP'] == '0.0.0.0' and entry['Mask'] == '0.0.0.0' and entry['Status'] == 'disable':
                 id = entry['No']
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('acl %s ip %s mask %s %s' % (id, ip, mask, status))
 
@@ -2106,7 +2641,7 @@ class OLTCLI_AN6K17:
         Returns:
             list或dict: 返回包含{No, IP, Mask, Status}字典的列表，或返回单个字典
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show acl')
         
@@ -2132,7 +2667,7 @@ class OLTCLI_AN6K17:
         if type(mask) != str and type(mask) != int:
             raise RuntimeWarning('只接受点分格式或者长度格式的掩码')
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             if metric == None:
                 conn.run('no static-route destination-ip  %s mask %s nexthop %s' % (ip, mask, hop)) 
@@ -2152,7 +2687,7 @@ class OLTCLI_AN6K17:
         if type(mask) != str and type(mask) != int:
             raise RuntimeWarning('只接受点分格式或者长度格式的掩码')
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('static-route destination-ip  %s mask %s nexthop %s metric %s' % (ip, mask, hop, metric))
 
@@ -2164,7 +2699,7 @@ class OLTCLI_AN6K17:
             cvlan (int): CVLAN，内层VLAN
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('manage-vlan %s svlan %s cvlan %s' % (name, svlan, cvlan))
 
@@ -2184,7 +2719,7 @@ class OLTCLI_AN6K17:
         else:
             raise RuntimeWarning('mask类型非法，只接受str或int类型')
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('manage-vlan %s %s %s/%s' % (version, name, ip, mask))
 
@@ -2196,7 +2731,8 @@ class OLTCLI_AN6K17:
             mask (str): OLT 子网掩码
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        # 修改管理IP会断开连接，使用单独的连接，不能让长连接会话重连后重发该命令
+        with OLTTelnet(self.ip, self.username, self.password, port=self.port) as conn:
             conn.run('config')
             conn.run('interface meth 1')
             try:
@@ -2206,6 +2742,9 @@ class OLTCLI_AN6K17:
 
                 # 等待连接恢复
                 time.sleep(5)
+
+        # 长连接会话也已断开，关闭后自动重建
+        self.close()
         
         ipR, maskR = self.get_ip_address()
         if ipR != ip or maskR != mask:
@@ -2217,7 +2756,7 @@ class OLTCLI_AN6K17:
         Returns:
             tuple: (ip, mask)组成的元组
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface meth 1')
             result = conn.run('show ip address')
@@ -2230,25 +2769,108 @@ class OLTCLI_AN6K17:
         Returns:
             datetime: datetime类型的系统时间
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show time')
         
         date, time = extract_system_time(result)
 
-        return parse('%s %s' % (date, time))
+        return parse_datetime('%s %s' % (date, time))
 
-    def get_authorization(self):
+    def get_authorization(self, compact:bool=False):
         """获取所有授权的ONU。等同于执行show authorization命令。
 
+        Args:
+            compact (bool, optional): 为True时返回AuthorizationEntry列表，适合长期缓存大量ONU。默认为False。
+
         Returns:
             列表: 包含ONU授权信息的字典列表
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        entry_type = AuthorizationEntry.from_dict if compact else dict
+        return [ entry_type(entry) for entry in self.get_authorization_snapshot() ]
+
+    def iter_authorization(self, compact:bool=False) -> Iterator[dict]:
+        """边接收show authorization的结果边逐条产生授权的ONU，不缓存授权表快照。
+        遍历结束或被关闭前一直占用连接，其间不能在同一线程内通过本对象执行其他命令；适合只做过滤或统计的大表导出。
+
+        Args:
+            compact (bool, optional): 为True时产生AuthorizationEntry。默认为False。
+
+        Yields:
+            dict: 一台授权ONU的信息
+        """
+        with self._connect() as conn:
+            conn.run('config')
+            yield from iter_authorization(conn.run_iter('show authorization'), compact)
+
+    def get_authorization_table(self) -> ColumnarTable:
+        """按列获取所有授权的ONU，需要安装numpy。边接收边把每行的值存入各列，不保留每行的字典，也不缓存授权表快照。
+        Slot、Pon、Onu、Lic为整数数组，OnuType、ST、OST为类别编码，可直接向量化过滤，如table.filter((table['Slot'] == 4) & table.equals('OST', 'dn'))
+
+        Returns:
+            ColumnarTable: 按列存储的授权表
+        """
+        return ColumnarTable.from_rows(self.iter_authorization(), AUTHORIZATION_KINDS, AuthorizationEntry.FIELDS.keys())
+
+    def get_authorization_snapshot(self, max_age:Optional[float]=None) -> AuthorizationSnapshot:
+        """获取授权表快照。快照未过期时直接返回，否则执行show authorization重新获取。
+
+        Args:
+            max_age (float, optional): 可接受的快照最大秒数。默认None，使用auth_ttl；为0时总是重新获取。
+
+        Returns:
+            AuthorizationSnapshot: 可按PhyId或(Slot, Pon, Onu)查找的授权表快照
+        """
+        if max_age == None:
+            max_age = self._auth_ttl
+
+        snapshot = self._auth_snapshot
+        if snapshot != None and snapshot.age < max_age:
+            return snapshot
+
+        with self._connect() as conn:
             conn.run('config')
-            result = conn.run('show authorization')
+            # 边接收边解析，大表不必整块读入
+            snapshot = AuthorizationSnapshot(extract_authorization(conn.run_iter('show authorization')))
 
-        return extract_authorization(result)
+        self._auth_snapshot = snapshot
+
+        return snapshot
+
+    def get_watcher(self, interval:Optional[float]=None) -> ONUWatcher:
+        """获取本OLT的ONU状态监视器。同一对象的所有订阅者共用一个监视器，由一个后台线程定时获取授权表，
+        按SN比较前后两次快照，把ONU上线、下线、新增、删除、型号变化事件交给订阅者。
+
+        Args:
+            interval (float, optional): 获取授权表的间隔秒数。默认None，不修改，初始为5秒。
+
+        Returns:
+            ONUWatcher: ONU状态监视器
+        """
+        if interval != None:
+            self._watcher.interval = interval
+
+        return self._watcher
+
+    def watch(self, callback:Callable[[ONUEvent], Any], scope:Optional[Iterable[Union[int, Tuple[int, int]]]]=None,
+              types:Optional[Iterable[ONUEventType]]=None, interval:Optional[float]=None) -> Callable[[ONUEvent], Any]:
+        """订阅ONU状态变化事件，并启动监视器。callback在监视器的后台线程中调用。
+
+        Args:
+            callback (Callable[[ONUEvent], Any]): 事件回调函数，也可以是queue.Queue的put方法
+            scope (Iterable, optional): 关注的槽位号，或(槽位号, 端口号)。默认None，整个OLT。
+            types (Iterable[ONUEventType], optional): 关注的事件类型。默认None，所有类型。
+            interval (float, optional): 获取授权表的间隔秒数。默认None，不修改，初始为5秒。
+
+        Returns:
+            Callable[[ONUEvent], Any]: callback，用于get_watcher().unsubscribe取消订阅
+        """
+        return self.get_watcher(interval).subscribe(callback, scope, types)
+
+    def invalidate_authorization(self) -> NoReturn:
+        """使授权表快照失效，下次查询时重新执行show authorization
+        """
+        self._auth_snapshot = None
 
     def get_onu_position(self, sn):
         """根据ONU SN查询ONU的槽位号和端口号
@@ -2263,21 +2885,36 @@ class OLTCLI_AN6K17:
             tuple: 返回(slot, port)元组，如果查不到抛出异常
         """
 
-       
-        authInfo = self.get_authorization()
-        for info in authInfo:
-            if info['PhyId'] == sn:
-                return info['Slot'], info['Pon']
-        
-        onuInfo = self.get_discovery()
-        for info in onuInfo:
-            if info['PhyId'] == sn:
-                return info['SLOT'], info['PON']
+        slot, pon, _ = self._resolve_onu(sn)
+
+        return slot, pon
+
+    def _resolve_onu(self, sn):
+        """根据ONU SN查询ONU的槽位号、端口号和ONU ID。先查授权表快照，查不到再查自动发现的ONU。
+
+        Args:
+            sn (str): ONU SN号
+
+        Raises:
+            RuntimeWarning: 授权表和自动发现中都查不到时，抛出异常
+
+        Returns:
+            tuple: 返回(slot, port, onuId)元组。仅被发现未授权的ONU，onuId为None。
+        """
+        authIndex = self.get_authorization_snapshot()
+        position = authIndex.locate(sn)
+        if position != None:
+            return position
+
+        discoveryIndex = ONUIndex(self.get_discovery(), position_keys=('SLOT', 'PON', None))
+        position = discoveryIndex.locate(sn)
+        if position != None:
+            return position
 
         logging.getLogger().warning('查不到该ONU(%s)对应的槽位号和端口号，请检查ONU是否发现' % sn)
-        logging.getLogger().debug('authorization:\n %s' % authInfo)
-        logging.getLogger().debug('discovery:\n %s' % onuInfo)
-        raise RuntimeWarning('查不到该ONU(%s)对应的槽位号和端口号，请检查ONU是否发现' % sn)    
+        logging.getLogger().debug('authorization:\n %s' % authIndex.entries)
+        logging.getLogger().debug('discovery:\n %s' % discoveryIndex.entries)
+        raise RuntimeWarning('查不到该ONU(%s)对应的槽位号和端口号，请检查ONU是否发现' % sn)
 
     def get_onu_last_online_time(self, sn):
         """获取ONU最近一次上线时间。等同执行show onu last-reg-status-change <onuId>命令。
@@ -2289,10 +2926,11 @@ class OLTCLI_AN6K17:
             datetime: 查不到ONUID抛异常。查到了，但是无最后一次上线时间(一般从未上线)，返回None。正常情况下，返回datetime格式的上线时间。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            result = conn.run('show onu last-reg-status-change %s' % self.get_onu_id(sn))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            result = conn.run('show onu last-reg-status-change %s' % onuId)
         
         dictList = extract_last_reg_status_change(result)
 
@@ -2308,10 +2946,11 @@ class OLTCLI_AN6K17:
             datetime: 查不到ONUID抛异常。查到了，但是无最后一次下线时间(一般从未下线)，返回None。正常情况下，返回datetime格式的最近一次的下线时间。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            result = conn.run('show onu last-reg-status-change %s' % self.get_onu_id(sn))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            result = conn.run('show onu last-reg-status-change %s' % onuId)
         
         dictList = extract_last_reg_status_change(result)
 
@@ -2327,14 +2966,12 @@ class OLTCLI_AN6K17:
             bool: True，在线；False，不在线。
         """
 
-        values = self.get_authorization()
-
-        for value in values:
-            if value["PhyId"] == sn:
-                if value["OST"] == "up":
-                    return True
-                elif value["OST"] == "dn":
-                    return False
+        value = self.get_authorization_snapshot().get_by_phy_id(sn)
+        if value != None:
+            if value["OST"] == "up":
+                return True
+            elif value["OST"] == "dn":
+                return False
         
         logging.getLogger().warning('查不到该ONU(%s)状态信息，请检查ONU是否进行过授权' % sn)
         raise RuntimeWarning('查不到该ONU(%s)状态信息，请检查ONU是否进行过授权' % sn)
@@ -2346,25 +2983,49 @@ class OLTCLI_AN6K17:
             sn (str): ONU SN号
             wait (bool, optional): 重置ONU后，等待重新上线。
         """
+        self.reset_onu_nowait(sn, wait).result()
+
+    def reset_onu_nowait(self, sn, wait = True) -> Future:
+        """重置ONU，发出onu reset <onuId>命令后立即返回，不等待ONU重启。
+
+        ONU的下线和重新上线由本OLT共用的轮询器在后台检查，大量ONU同时重置时也只需一个后台线程，每次轮询只获取一次授权表。
+
+        Args:
+            sn (str): ONU SN号
+            wait (bool, optional): 为True时，返回的Future在ONU重新上线后完成；为False时，在ONU下线后完成。默认True。
+
+        Returns:
+            Future: concurrent.futures.Future，完成时结果为ONU的授权信息（wait为False时为True），
+                    30秒内未下线或180秒内未重新上线时抛出TimeoutError。在asyncio中可用asyncio.wrap_future等待。
+        """
 
         if not self.is_onu_online(sn):
             raise RuntimeWarning('无法重置离线状态下的ONU')
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            conn.run('onu reset %s' % self.get_onu_id(sn))
-        
-        def isOffline():
-            return not self.is_onu_online(sn)
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run('onu reset %s' % onuId)
+        self.invalidate_authorization()
+
+        return self._watch_reset(sn, wait)
 
-        wait_for_true(isOffline, 1, 30)
+    def _watch_reset(self, sn:str, wait:bool) -> Future:
+        """在共用的轮询器中等待ONU重启：30秒内下线，wait为True时再等待180秒内重新上线
+
+        Args:
+            sn (str): ONU SN号
+            wait (bool): 是否等待重新上线
 
+        Returns:
+            Future: 下线（wait为True时重新上线）后完成
+        """
+        stages = [ (lambda snapshot: not is_online_in(snapshot, sn), 30) ]
         if wait:
-            def isOnline():
-                return self.is_onu_online(sn)
-            
-            wait_for_true(isOnline, 1, 180)
+            stages.append((lambda snapshot: is_online_in(snapshot, sn), 180))
+
+        return self._poller.submit_sequence(stages, sn)
 
     def reset_all_onu(self, wait = True):
         """重置所有ONU。等同执行onu reset all命令。不同于resetONU，不会验证是否重启和重新上线。
@@ -2372,70 +3033,32 @@ class OLTCLI_AN6K17:
         Args:
             wait (bool, optional): 重置ONU后，等待重新上线。
         """
+        wait_all(self.reset_all_onu_nowait(wait))
 
-        # 获取所有在线的ONU对应的槽位号和端口号，以及下面挂的ONUID
-        stats = { }
-        for authInfo in self.get_authorization():
-            key = (authInfo['Slot'], authInfo['Pon'])
-            if key not in stats.keys():
-                stats[key] = set()
-    
-            if authInfo['OST'] == 'up': # 后面只验证重启时在线的ONU，因为有些ONU重启时可能本来就没上线。
-                stats[key].add(authInfo['PhyId'])
-        
-        # 重启这些个ONU
-        for slotPort in stats.keys():
-            with OLTTelnet(self.ip, self.username, self.password) as conn:
-                conn.run('config')
-                conn.run('interface pon 1/%s/%s' % slotPort)
-                # onu reset all命令存在bug，使用普通命令替代
-                for sn in stats[slotPort]:
-                    conn.run('onu reset %s' % self.get_onu_id(sn))
-                
-
-        # 等待下线
-        def isOffline():
-            ret = True
-            for key in stats.keys():
-                for sn in stats[key]:
-                    ret = ret and not self.is_onu_online(sn)
-            return ret
-        
-        wait_for_true(isOffline, 1, 30)
+    def reset_all_onu_nowait(self, wait = True) -> Dict[str, Future]:
+        """重置所有在线的ONU，批量发出重置命令后立即返回，不等待ONU重启。
 
-        if wait:
-            # 等待上线
-            def isOnline():
-                ret = True
-                for key in stats.keys():
-                    for sn in stats[key]:
-                        ret = ret and self.is_onu_online(sn)
-                return ret
-            
-            wait_for_true(isOnline, 1, 180)
+        Args:
+            wait (bool, optional): 为True时，每个Future在对应ONU重新上线后完成；为False时，在ONU下线后完成。默认True。
+
+        Returns:
+            Dict[str, Future]: ONU SN到Future的字典，Future同reset_onu_nowait的返回值，可用poller.wait_all一起等待
+        """
+
+        # 所有命令一次批量发送
+        cmds, sns = get_reset_all_cmds(self.get_authorization_snapshot())
+        with self._connect() as conn:
+            check_results(conn.run_batch(cmds))
+
+        self.invalidate_authorization()
+
+        # 所有ONU共用轮询器，每次轮询只获取一次授权表，每个ONU各自计算超时
+        return { sn: self._watch_reset(sn, wait) for sn in sns }
 
     def clear_whitelist(self):
         """清空所有授权
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
-            conn.run('config')
-            for wlMode in [ WhitelistMode.phyid, WhitelistMode.logid, WhitelistMode.password ]:
-                onuInfos = self.get_whitelist(wlMode)
-                for onuInfo in onuInfos:
-                    if wlMode in [ WhitelistMode.phyid, WhitelistMode.phyid_psw ]:
-                        conn.run('no whitelist phy-id %s %s %s' % (onuInfo['Slot'], onuInfo['Pon'], onuInfo['Phy-ID']))
-                    
-                    if wlMode in [ WhitelistMode.logid, WhitelistMode.logid_psw ]:
-                        conn.run('no whitelist logic-id %s %s %s' % (onuInfo['Slot'], onuInfo['Pon'], onuInfo['Logic-Id']))                       
-
-                    if wlMode in [ wlMode.password ]:
-                        conn.run('no whitelist password %s %s %s' % (onuInfo['Slot'], onuInfo['Pon'], onuInfo['Phy-Pwd']))
-
-        # 验证
-        for wlMode in [ WhitelistMode.phyid, WhitelistMode.logid, WhitelistMode.password ]:
-            onuInfos = self.get_whitelist(wlMode)
-            if len(onuInfos) != 0:
-                raise RuntimeWarning('%s的白名单没有清理干净' % (get_whitelist_query_str(wlMode)))
+        self.del_whitelist_bulk(None)
 
     def clear_pon_whitelist(self, slot, port):
         """清空指定的槽位号和端口号下的所有类型的ONU授权列表。等同于执行no whitelist all。
@@ -2444,50 +3067,67 @@ class OLTCLI_AN6K17:
             slot (int): 槽位号
             port (init): 端口号
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % (slot, port))
             conn.run('no whitelist %s' % 'all')
+        self.invalidate_authorization()
 
         for wlMode in [ WhitelistMode.phyid, WhitelistMode.logid, WhitelistMode.password ]:
             whiteList = self.get_pon_whitelist(slot, port, wlMode)
             if len(whiteList) != 0:
                 raise RuntimeError('清空白名单(%s)失败' % wlMode)
 
-    def get_pon_whitelist(self, slot, port, wlMode):
+    def get_pon_whitelist(self, slot, port, wlMode, compact=False):
         """获取指定槽位号和端口下的指定类型的白名单列表。等同于执行show whitelist命令。
 
         Args:
             slot (int): 槽位号
             port (int): 端口号
             wlMode (WhitelistMode): 白名单类型
+            compact (bool, optional): 为True时返回WhitelistEntry列表。默认为False。
 
         Returns:
             list: 包含授权信息的列表
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % (slot, port))
-            result = conn.run('show whitelist %s' % get_whitelist_query_str(wlMode))
-        
-        return extract_whitelist(result)
+            ret = extract_whitelist(conn.run_iter('show whitelist %s' % get_whitelist_query_str(wlMode)), compact)
+
+        return ret
 
-    def get_whitelist(self, wlMode):
+    def get_whitelist(self, wlMode, compact=False):
         """读取白名单列表。等同于执行show whitelist命令。
 
         Args:
             wlMode (WhitelistMode): 指定要获取哪种白名单类型的列表。
+            compact (bool, optional): 为True时返回WhitelistEntry列表。默认为False。
 
         Returns:
             list: 包含授权字典信息的列表
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
-            result = conn.run('show whitelist %s' % get_whitelist_query_str(wlMode))
+            ret = extract_whitelist(conn.run_iter('show whitelist %s' % get_whitelist_query_str(wlMode)), compact)
+
+        return ret
+
+    def iter_whitelist(self, wlMode, compact:bool=False) -> Iterator[dict]:
+        """边接收show whitelist的结果边逐条产生白名单。遍历结束或被关闭前一直占用连接。
+
+        Args:
+            wlMode (WhitelistMode): 指定要获取哪种白名单类型的列表。
+            compact (bool, optional): 为True时产生WhitelistEntry。默认为False。
 
-        return extract_whitelist(result)
+        Yields:
+            dict: 一条白名单
+        """
+        with self._connect() as conn:
+            conn.run('config')
+            yield from iter_whitelist(conn.run_iter('show whitelist %s' % get_whitelist_query_str(wlMode)), compact)
 
     def is_in_whitelist(self, wlMode, id):
         """检查ONU是否在对应白名单列表中。
@@ -2500,23 +3140,7 @@ class OLTCLI_AN6K17:
             bool: True，在白名单列表中；False，不在白名单列表中
         """
 
-        id = auto_convert(id)
-
-        onuInfos = self.get_whitelist(wlMode)
-        for onuInfo in onuInfos:
-            if wlMode in [ WhitelistMode.phyid, WhitelistMode.phyid_psw ]:
-                if onuInfo['Phy-ID'] == id:
-                    return True
-
-            if wlMode in [ WhitelistMode.logid, WhitelistMode.logid_psw ]:
-                if onuInfo['Logic-Id'] == id:
-                    return True
-
-            if wlMode in  [ WhitelistMode.password ]:
-                if onuInfo['Phy-Pwd'] == id:
-                    return True
-
-        return False
+        return whitelist_contains(self.get_whitelist(wlMode), wlMode, id)
 
     def is_onu_in_whitelist(self, id):
         """验证ONU是否在白名单中
@@ -2557,52 +3181,57 @@ class OLTCLI_AN6K17:
         if onuDetailInfo == None:
             raise RuntimeWarning('未查到该ONU信息，无法进行有效配置')
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
-            conn.run('config')
-            if wlMode == WhitelistMode.phyid:
-                if onuId == None:
-                    conn.run('whitelist add phy-id %s' % (onuDetailInfo['PhyId']))
-                else:
-                    conn.run('whitelist add phy-id %s onuid %s' % (onuDetailInfo['PhyId'], onuId))
-
-                if not self.is_in_whitelist(wlMode, onuDetailInfo['PhyId']):
-                    raise RuntimeWarning("白名单添加失败")
-            
-            if wlMode == WhitelistMode.phyid_psw:
-                if onuId == None:
-                    conn.run('whitelist add phy-id %s checkcode %s' % (onuDetailInfo['PhyId'], onuDetailInfo['PhyPwd']))
-                else:
-                    conn.run('whitelist add phy-id %s checkcode %s onuid %s' % (onuDetailInfo['PhyId'], onuDetailInfo['PhyPwd'], onuId))
+        cmd, id = get_whitelist_add_cmd(wlMode, onuDetailInfo, onuId)
 
-                if not self.is_in_whitelist(wlMode, onuDetailInfo['PhyId']):
-                    raise RuntimeWarning("白名单添加失败")
-            
-            if wlMode == WhitelistMode.logid:
-                if onuId == None:
-                    conn.run('whitelist add logic-id %s' % (onuDetailInfo['LogicId']))
-                else:
-                    conn.run('whitelist add logic-id %s onuid %s' % (onuDetailInfo['LogicId'], onuId))
+        self.invalidate_authorization()
+        with self._connect() as conn:
+            conn.run('config')
+            conn.run(cmd)
 
-                if not self.is_in_whitelist(wlMode, onuDetailInfo['LogicId']):
-                    raise RuntimeWarning("白名单添加失败")
+        if not self.is_in_whitelist(wlMode, id):
+            raise RuntimeWarning("白名单添加失败")
 
-            if wlMode == WhitelistMode.logid_psw:
-                if onuId == None:
-                    conn.run('whitelist add logic-id %s checkcode %s' % (onuDetailInfo['LogicId'], onuDetailInfo['LogicPwd']))
-                else:
-                    conn.run('whitelist add logic-id %s checkcode %s onuid %s' % (onuDetailInfo['LogicId'], onuDetailInfo['LogicPwd'], onuId))
+    def add_whitelist_bulk(self, wlMode:WhitelistMode, onus:Iterable[Union[str, Tuple[str, Optional[int]]]]) -> NoReturn:
+        """将多个ONU增加到指定白名单中。只查一次自动发现，按PON口分组在一个会话中批量增加，最后只读一次白名单验证。
 
-                if not self.is_in_whitelist(wlMode, onuDetailInfo['LogicId']):
-                    raise RuntimeWarning("白名单添加失败")
+        Args:
+            wlMode (WhitelistMode): 要增加到哪个白名单
+            onus (Iterable[Union[str, Tuple[str, Optional[int]]]]): ONU的SN，或(sn, onuId)元组，onuId为None时自动分配
 
-            if wlMode == WhitelistMode.password:
-                if onuId == None:
-                    conn.run('whitelist add password %s' % (onuDetailInfo['PhyPwd']))
-                else:
-                    conn.run('whitelist add password %s onuid %s' % (onuDetailInfo['PhyPwd'], onuId))
+        Raises:
+            RuntimeWarning: 有ONU查不到、命令被OLT拒绝或验证失败时，抛出异常
+        """
+        onus = [ (onu, None) if type(onu) == str else tuple(onu) for onu in onus ]
+        if len(onus) == 0:
+            return
 
-                if not self.is_in_whitelist(wlMode, onuDetailInfo['PhyPwd']):
-                    raise RuntimeWarning("白名单添加失败")   
+        # 增加白名单所需的ONU信息，只查一次自动发现
+        discovery = ONUIndex(self.get_discovery(), position_keys=('SLOT', 'PON', None))
+        missing = [ sn for sn, _ in onus if discovery.get_by_phy_id(sn) == None ]
+        if len(missing) != 0:
+            raise RuntimeWarning('未查到ONU(%s)信息，无法进行有效配置' % ', '.join(missing))
+
+        # 同一PON口下的ONU放在一起，保持提交的先后顺序
+        groups, ids = { }, { }
+        for sn, onuId in onus:
+            onuInfo = discovery.get_by_phy_id(sn)
+            cmd, ids[sn] = get_whitelist_add_cmd(wlMode, onuInfo, onuId)
+            groups.setdefault((onuInfo['SLOT'], onuInfo['PON']), [ ]).append(cmd)
+
+        cmds = [ 'config' ]
+        for slotPon in sorted(groups.keys()):
+            cmds.append('interface pon 1/%s/%s' % slotPon)
+            cmds.extend(groups[slotPon])
+            cmds.append('exit')
+
+        self.invalidate_authorization()
+        with self._connect() as conn:
+            check_results(conn.run_batch(cmds))
+            whitelist = get_whitelist_ids(extract_whitelist(conn.run_iter('show whitelist %s' % get_whitelist_query_str(wlMode))), wlMode)
+
+        failures = [ sn for sn, id in ids.items() if auto_convert(id) not in whitelist ]
+        if len(failures) != 0:
+            raise RuntimeWarning('白名单添加失败：%s' % ', '.join(failures))
 
     def del_whitelist(self, wlMode, id):
         """从指定白名单里删除指定的ONU
@@ -2611,27 +3240,7 @@ class OLTCLI_AN6K17:
             wlMode (Whitelist): 要从哪个白名单里面删除
             id (str): ONU的phyId、logId或passwd
         """
-
-        if not self.is_in_whitelist(wlMode, id):
-            return
-        
-        onuInfos = self.get_whitelist(wlMode)
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
-
-            conn.run('config')
-            
-            for onuInfo in onuInfos:
-                if wlMode in [ WhitelistMode.phyid, WhitelistMode.phyid_psw ] and id == onuInfo['Phy-ID']:
-                    conn.run('no whitelist phy-id %s %s %s' % (onuInfo['Slot'], onuInfo['Pon'], id))
-                    
-                if wlMode in [ WhitelistMode.logid, WhitelistMode.logid_psw ] and id == onuInfo['Logic-Id']:
-                    conn.run('no whitelist logic-id %s %s %s' % (onuInfo['Slot'], onuInfo['Pon'], onuInfo['Logic-Id']))                       
-
-                if wlMode in [ WhitelistMode.password ] and id == onuInfo['Phy-Pwd']:
-                    conn.run('no whitelist password %s %s %s' % (onuInfo['Slot'], onuInfo['Pon'], onuInfo['Phy-Pwd']))
-
-        if self.is_in_whitelist(wlMode, id):
-            raise RuntimeWarning('删除指定白名单中的ONU失败')
+        self.del_whitelist_bulk([ id ], [ wlMode ])
 
     def del_from_whitelist(self, id):
         """将指定的ONU从白名单中移除
@@ -2639,8 +3248,59 @@ class OLTCLI_AN6K17:
         Args:
             id (str): ONU的phyId、logId或passwd
         """
-        for wlMode in WhitelistMode:
-            self.del_whitelist(wlMode, id)
+        self.del_whitelist_bulk([ id ])
+
+    def del_whitelist_bulk(self, ids:Optional[Iterable[str]], wlModes:Optional[Iterable[WhitelistMode]]=None) -> NoReturn:
+        """从白名单中删除多个ONU。在一个会话中每种白名单只读一次，按PON口排序批量删除，最后每种白名单再读一次验证。
+
+        Args:
+            ids (Iterable[str]): ONU的phyId、logId或passwd，为None时删除所有ONU
+            wlModes (Iterable[WhitelistMode], optional): 要从哪些白名单里面删除。默认None，从phy-id、logic-id、password三种白名单中删除。
+
+        Raises:
+            RuntimeWarning: 命令被OLT拒绝或验证失败时，抛出异常
+        """
+        # phyid和phyid_psw、logid和logid_psw是同一个白名单，只处理一次
+        queries = { }
+        for wlMode in (wlModes or [ WhitelistMode.phyid, WhitelistMode.logid, WhitelistMode.password ]):
+            queries.setdefault(get_whitelist_query_str(wlMode), wlMode)
+
+        # 与whitelist_contains一样按auto_convert后的值匹配，删除命令使用白名单中的原始文本
+        if ids != None:
+            ids = set([ auto_convert(id) for id in ids ])
+            if len(ids) == 0:
+                return
+
+        with self._connect() as conn:
+            conn.run('config')
+
+            deletes = [ ]
+            for query, wlMode in queries.items():
+                for onuInfo in select_whitelist(iter_whitelist(conn.run_iter('show whitelist %s' % query), raw=True), wlMode, ids):
+                    deletes.append((onuInfo['Slot'], onuInfo['Pon'], get_whitelist_del_cmd(wlMode, onuInfo)))
+
+            if len(deletes) == 0:
+                return
+
+            self.invalidate_authorization()
+            if ids == None and len(queries) == 3:
+                # 清空所有白名单时，每个PON口执行一次no whitelist all，未绑定ONU的白名单不属于任何PON口，逐条删除
+                unbound = [ delete for delete in deletes if UNBOUND_POSITION in delete[:2] ]
+                cmds = [ cmd for _, _, cmd in unbound ]
+                for slotPon in sorted(set([ delete[:2] for delete in deletes if delete not in unbound ])):
+                    cmds.extend([ 'interface pon 1/%s/%s' % slotPon, 'no whitelist all', 'exit' ])
+            else:
+                # 同一PON口下的删除放在一起
+                cmds = [ cmd for _, _, cmd in sorted(deletes, key=lambda delete: delete[:2]) ]
+            check_results(conn.run_batch(cmds))
+
+            failures = [ ]
+            for query, wlMode in queries.items():
+                rows = select_whitelist(iter_whitelist(conn.run_iter('show whitelist %s' % query), raw=True), wlMode, ids)
+                failures.extend([ onuInfo[get_whitelist_id_key(wlMode)] for onuInfo in rows ])
+
+        if len(failures) != 0:
+            raise RuntimeWarning('删除白名单中的ONU失败：%s' % ', '.join(failures))
 
     def get_auto_discover(self, slot, port):
         """获取ONU自动发现设置。等同于执行show onu auto-discover。
@@ -2652,7 +3312,7 @@ class OLTCLI_AN6K17:
         Returns:
            list : 返回(slot, portNo, status, agingTime)元组组成的列表
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show onu auto-discover 1/%s/%s' % (slot, port))
 
@@ -2668,7 +3328,7 @@ class OLTCLI_AN6K17:
         Returns:
             tuple: (status, agingTime)元组
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % (slot, port))
             result = conn.run('show onu auto-discover')
@@ -2683,7 +3343,7 @@ class OLTCLI_AN6K17:
             status (str): enable或者disable
             agingTime (int): 发现时间, 有效取值为0-3600
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('onu auto-discover %s %s %s' % (where, status, agingTime))
 
@@ -2697,42 +3357,55 @@ class OLTCLI_AN6K17:
             agingTime (int): 发现时间
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % (slot, port))
             conn.run('onu auto-discover %s %s' % (status, agingTime))
 
-    def get_discovery(self):
+    def get_discovery(self, compact=False):
         """查询自动发现的ONU。等同于执行show discovery命令。
 
+        Args:
+            compact (bool, optional): 为True时返回DiscoveryEntry列表。默认为False。
+
         Returns:
             list: 返回自动发现的ONU信息列表
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
-            result = conn.run('show discovery')
-
-        ret = extract_discovery(result)
+            ret = extract_discovery(conn.run_iter('show discovery'), compact)
 
         return ret
 
-    def get_pon_discovered(self, slot, port):
+    def iter_discovery(self, compact:bool=False) -> Iterator[dict]:
+        """边接收show discovery的结果边逐条产生自动发现的ONU。遍历结束或被关闭前一直占用连接。
+
+        Args:
+            compact (bool, optional): 为True时产生DiscoveryEntry。默认为False。
+
+        Yields:
+            dict: 一台自动发现的ONU的信息
+        """
+        with self._connect() as conn:
+            conn.run('config')
+            yield from iter_discovery(conn.run_iter('show discovery'), compact)
+
+    def get_pon_discovered(self, slot, port, compact=False):
         """查询自动发现的ONU。等同于执行show onu discovered命令。
         
         Args:
             slot (int): 槽位号
             port (int): 端口号
+            compact (bool, optional): 为True时返回DiscoveryEntry列表。默认为False。
         
         Returns:
             list: 返回自动发现的ONU信息列表
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % (slot, port))
-            result = conn.run('show onu discovered')
-
-        ret = extract_discovery(result)
+            ret = extract_discovery(conn.run_iter('show onu discovered'), compact)
 
         return ret
 
@@ -2745,7 +3418,7 @@ class OLTCLI_AN6K17:
         Returns:
             list或dict: 包含管理VLAN信息字典的列表，或指定VLAN信息的字典。
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show manage-vlan all')
 
@@ -2767,9 +3440,10 @@ class OLTCLI_AN6K17:
             mode (AuthMode): 授权模式
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('port authentication-mode 1/%s/%s mode %s' % (slot, port, mode.value))
+        self.invalidate_authorization()
         
         assert self.get_auth_mode(slot, port) == mode
     
@@ -2783,15 +3457,15 @@ class OLTCLI_AN6K17:
         Returns:
             dict或AuthMode: 获取所有授权信息时，返回(slot, port)为键，AuthMode为值的字典。获取个别端口端口的授权模式时，返回AuthMode。 
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
-            if (slot, port) == (None, None):
-                result = conn.run('show port authentication-mode all')
-                return extract_port_authentication_mode(result)
-            else: 
-                result = conn.run('show port authentication-mode select 1/%s/%s' % (slot, port))
-                dictRet = extract_port_authentication_mode(result)
-                return dictRet[slot, port]
+            result = conn.run('show port authentication-mode %s' % get_auth_mode_query_str(slot, port))
+
+        dictRet = extract_port_authentication_mode(result)
+        if (slot, port) == (None, None):
+            return dictRet
+        else:
+            return dictRet[slot, port]
 
     def set_dhcp_option(self, option, enable=True):
         """设置DHCP选项开关。等同于执行dhcp option18/option37/option82/patch命令。
@@ -2801,7 +3475,7 @@ class OLTCLI_AN6K17:
             enable (bool, optional): 是否打开。默认为True，打开。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('dhcp %s %s' % (option.value, bool_to_str(enable)))
 
@@ -2811,7 +3485,7 @@ class OLTCLI_AN6K17:
         Return:
             dict, 包含dhcp状态信息的字典。
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show dhcp state')
 
@@ -2826,7 +3500,7 @@ class OLTCLI_AN6K17:
             enable (bool, optional): 默认为True，打开PPPoE+开关。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('pppoe-plus %s' % bool_to_str(enable))
 
@@ -2836,7 +3510,7 @@ class OLTCLI_AN6K17:
         return:
             bool: True使能， False未使能。
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show pppoe-plus state')
         
@@ -2856,12 +3530,9 @@ class OLTCLI_AN6K17:
             str: 找到，返回ONU SN；没找到，返回None。
         """
 
-        authList = self.get_authorization()
-        for info in authList:
-            if info['Onu'] == onuId and info['Slot'] == slot and info['Pon'] == port:
-                return info['PhyId']
+        info = self.get_authorization_snapshot().get_by_position(slot, port, onuId)
         
-        return None
+        return None if info == None else info['PhyId']
 
     def get_onu_id(self, sn):
         """给定SN，查找ONUID。等同于执行show authorization，从里面查找对应关系。
@@ -2873,12 +3544,9 @@ class OLTCLI_AN6K17:
             int : 找到返回ONU ID, 没找到，返回None。
         """
 
-        authList = self.get_authorization()
-        for info in authList:
-            if info['PhyId'] == sn:
-                return info['Onu']
+        info = self.get_authorization_snapshot().get_by_phy_id(sn)
         
-        return None
+        return None if info == None else info['Onu']
 
     def set_onu_port_vlan_tls(self, sn, eth, index, tls):
         """设置ONU Port Vlan TLS特性
@@ -2890,10 +3558,11 @@ class OLTCLI_AN6K17:
             tls (bool): 是否启用tls，True，启用，False，不启用
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            conn.run('onu port vlan %s eth %s service %s tls %s' % (self.get_onu_id(sn), eth, index, bool_to_str(tls)))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run(get_onu_port_vlan_cmd(onuId, eth, '%s tls %s' % (index, bool_to_str(tls))))
 
     def get_onu_port_vlan(self, sn):
         """读取ONU的Port Vlan业务设置。等同于执行命令show onu port vlan。
@@ -2906,10 +3575,11 @@ class OLTCLI_AN6K17:
         """
 
         
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            result = conn.run('show onu port vlan %s' % self.get_onu_id(sn))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            result = conn.run('show onu port vlan %s' % onuId)
         
         ret = extract_onu_port_vlan(result)
 
@@ -2928,11 +3598,12 @@ class OLTCLI_AN6K17:
         if not self.is_onu_online(sn):
             raise RuntimeWarning('无法查询离线状态下的ONU端口状态')
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
             conn.run('terminal length 0')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            result = conn.run('show onu port status %s' % self.get_onu_id(sn))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            result = conn.run('show onu port status %s' % onuId)
         
         ret = extract_onu_port_status(result)
 
@@ -2945,17 +3616,21 @@ class OLTCLI_AN6K17:
             sn (str): ONU SN
             eth (str或int): 要清理的网口
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
-            conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            if eth == 'all':
-                if not self.is_onu_online(sn):
-                    raise RuntimeWarning('ONU不在线，无法查询其端口数')
-                ethCount = len(self.get_onu_port_status(sn)['PORT'])
-                for eth in range(1, ethCount + 1):
-                    conn.run('no onu port vlan %s eth %s' % (self.get_onu_id(sn), eth))
-            else:
-                conn.run('no onu port vlan %s eth %s' % (self.get_onu_id(sn), eth))
+        slot, pon, onuId = self._resolve_onu(sn)
+        if eth == 'all':
+            if not self.is_onu_online(sn):
+                raise RuntimeWarning('ONU不在线，无法查询其端口数')
+            ethCount = len(self.get_onu_port_status(sn)['PORT'])
+            eths = range(1, ethCount + 1)
+        else:
+            eths = [ eth ]
+
+        cmds = [ 'config', 'interface pon 1/%s/%s' % (slot, pon) ]
+        for eth in eths:
+            cmds.append('no onu port vlan %s eth %s' % (onuId, eth))
+
+        with self._connect() as conn:
+            check_results(conn.run_batch(cmds))
 
     def get_onu_port_vlan_service_count(self, sn, eth):
         """获取ONU Port VLAN业务个数。
@@ -2991,10 +3666,11 @@ class OLTCLI_AN6K17:
             count (int): 要设置的业务个数
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            conn.run('onu port vlan %s eth %s service count %s' % (self.get_onu_id(sn), eth, count))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run(get_onu_port_vlan_cmd(onuId, eth, 'count %s' % count))
 
     def set_onu_port_vlan_service_type(self, sn, eth, index, type):
         """"设置ONU Port VLAN业务类型。等同于执行onu port vlan命令。
@@ -3006,10 +3682,11 @@ class OLTCLI_AN6K17:
             type (str): unicast，表示单播; multicast，表示多播。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            conn.run('onu port vlan %s eth %s service %s type %s' % (self.get_onu_id(sn), eth, index, type))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run(get_onu_port_vlan_cmd(onuId, eth, '%s type %s' % (index, type)))
 
     def set_onu_port_vlan_service_vlan(self, sn, eth, index, rule):
         """设置ONU Port Vlan业务
@@ -3028,45 +3705,13 @@ class OLTCLI_AN6K17:
             rule (tuple): LAN业务参数， 以元组的方式提供。
         """
 
-        # pvlan格式化模板
-        pvlanFormat = '%s priority %s vid %s'
-        # tag格式化模板
-        tagFormat = '%s priority %s tpid %s vid %s'
-        # translate格式化模板
-        translateEnableFormat = '%s %s priority %s tpid %s vid %s'
-        translateDisableFormat = '%s %s'
-        # transparent格式化模板
-        transparentFormat = '%s priority %s tpid %s vid %s'
-        # qinq格式化模板
-        qinqEnableFormat = '%s %s priority %s tpid %s vid %s %s %s'
-        qinqDisableFormat = '%s %s'
-
-        mode = rule[0]
-        if mode == 'pvlan':
-            ruleString = pvlanFormat % rule
-        elif mode == 'tag':
-            ruleString = tagFormat % rule
-        elif mode == 'translate':
-            if rule[1] == 'enable':
-                ruleString = translateEnableFormat % rule
-            else:
-                assert rule[1] == 'disable'
-                ruleString = translateDisableFormat % rule
-        elif mode == 'transparent':
-            ruleString = transparentFormat % rule
-        elif mode == 'qinq':
-            if rule[1] == 'enable':
-                ruleString = qinqEnableFormat % rule
-            else:
-                assert rule[1] == 'disable'
-                ruleString = qinqDisableFormat % rule
-        else:
-            raise ValueError('未知VLAN设置参数：%s' % str(rule))
+        ruleString = port_vlan_rule_to_str(rule)
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            conn.run('onu port vlan %s eth %s service %s %s' % (self.get_onu_id(sn), eth, index, ruleString))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run(get_onu_port_vlan_cmd(onuId, eth, '%s %s' % (index, ruleString)))
  
     def del_onu_port_vlan_service(self, sn, eth, index):
         """删除指定ONU下面指定网口的指定业务
@@ -3078,10 +3723,11 @@ class OLTCLI_AN6K17:
         """
 
         
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            conn.run('no onu port vlan %s eth %s service %s' % (self.get_onu_id(sn), eth, index))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run('no ' + get_onu_port_vlan_cmd(onuId, eth, index))
 
     def set_onu_port_vlan_service_classification(self, sn, eth, index, ruleList):
         """设置ONU端口业务区分规则
@@ -3093,12 +3739,13 @@ class OLTCLI_AN6K17:
             ruleList(list): 规则清单, (类型，操作，值，方向)元组组成的列表
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
             for rule in ruleList:
                 type_, op_, value_, direction_ = rule
-                cmd2run = 'onu port vlan %s eth %s service %s %s %s %s %s' % (self.get_onu_id(sn), eth, index, direction_.value, type_.value, value_, op_.value)
+                cmd2run = 'onu port vlan %s eth %s service %s %s %s %s %s' % (onuId, eth, index, direction_.value, type_.value, value_, op_.value)
                 conn.run(cmd2run)
 
     def set_igmp_vlan(self, vlan):
@@ -3110,7 +3757,7 @@ class OLTCLI_AN6K17:
         if type(vlan) == str:
             vlan = auto_convert(vlan)
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('igmp')
             conn.run('igmp vlan %s' % vlan)
@@ -3128,7 +3775,7 @@ class OLTCLI_AN6K17:
             vlan = auto_convert(vlan)
         
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('igmp')
             result = conn.run('show igmp vlan %s' % vlan)
@@ -3146,7 +3793,7 @@ class OLTCLI_AN6K17:
             mode = IGMPMode(mode)
         
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('igmp')
             conn.run('igmp mode %s' % mode.value)
@@ -3166,7 +3813,7 @@ class OLTCLI_AN6K17:
             dict: 包含组播模式信息的字典。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('igmp')
             result = conn.run('show igmp mode')
@@ -3185,7 +3832,7 @@ class OLTCLI_AN6K17:
         """
         vlan = str(vlan)
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             if slot == None and port == None and tag == None:
                 conn.run('port vlan %s allslot' % (vlan))
@@ -3203,7 +3850,7 @@ class OLTCLI_AN6K17:
             list: 包含VLAN信息的元组列表。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show port vlan 1/%s/%s' % (slot, port))
         
@@ -3218,7 +3865,7 @@ class OLTCLI_AN6K17:
             port (str): 要设置的端口号。如，'2'，或'2, 3'。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             try:
                 conn.run('no port vlan %s 1/%s %s' % (vlan, slot, port))
@@ -3391,7 +4038,7 @@ class OLTCLI_AN6K17:
         
         cmd2Run = wanCfgCMDPart1 + wanCfgCMDPart2 + wanCfgCMDPart3 + wanCfgCMDPart4
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % self.get_onu_position(kargs['onuId']))
             conn.run(cmd2Run)
@@ -3407,11 +4054,12 @@ class OLTCLI_AN6K17:
             dict: 包含配置信息的字典。字典的键名参考setONUWanCfg
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
 
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            result = conn.run('show onu wan-cfg %s index %s' % (self.get_onu_id(sn), index))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            result = conn.run('show onu wan-cfg %s index %s' % (onuId, index))
 
         return extract_wan_cfg(result)
 
@@ -3428,9 +4076,10 @@ class OLTCLI_AN6K17:
         if None == wanCfgRet:
             return
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
 
             wanCfg = wanCfgRet.copy()
             if len(wanCfg['fe']) != '0':
@@ -3441,24 +4090,26 @@ class OLTCLI_AN6K17:
 
             self.set_onu_wan_cfg(**wanCfg)
 
-            conn.run('no onu wan-cfg %s index %s' % (self.get_onu_id(sn), index))
+            conn.run('no onu wan-cfg %s index %s' % (onuId, index))
 
-    def get_onu_statistics(self, sn):
+    def get_onu_statistics(self, sn, typed=False):
         """获取ONU统计信息。等同于执行命令show onu statistics。
 
         Args:
             sn (str): ONU SN
+            typed (bool, optional): 为True时返回ONUStatistics，数值已转换类型并统一单位，可用to_vector()按固定顺序取出。默认为False。
 
         Returns:
             dict: 包含ONU统计信息的字典。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            result = conn.run('show onu statistics %s' % self.get_onu_id(sn))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            result = conn.run('show onu statistics %s' % onuId)
         
-        return extract_onu_statistics(result)
+        return extract_onu_statistics(result, typed)
 
     def add_bandwidth_profile(self, name, usCir, usPir, usFir, dsCir, dsPir):
         """增加Bandwidth Profile。等同于执行命令bandwidth-profile add。
@@ -3476,7 +4127,7 @@ class OLTCLI_AN6K17:
         assert self.query_bandwidth_profile_id_by_name(name) == None
 
         # add bandwidth profile
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             # conn.run('bandwidth-profile add %s upstream cir %s pir %s fir %s downstream cir %s pir %s' % (name, usCir, usPir, usFir, dsCir, dsPir))
             conn.run('bandwidth-profile add %s upstream-pir %s downstream-pir %s upstream-cir %s downstream-cir %s upstream-fir %s' % (name, usPir, dsPir, usCir, dsCir, usFir))
@@ -3562,13 +4213,13 @@ class OLTCLI_AN6K17:
         
 
         if type(nameOrId) == int:
-            nameOrId = 'id %s' % nameOrId
+            strNameOrId = 'id %s' % nameOrId
         else:   # type(nameOrId) == str
-            nameOrId = 'name %s' % nameOrId
+            strNameOrId = 'name %s' % nameOrId
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('bandwidth-profile modify %s upstream cir %s pir %s fir %s downstream cir %s pir %s' % (nameOrId, usCir, usPir, usFir, dsCir, dsPir))
+            conn.run('bandwidth-profile modify %s upstream cir %s pir %s fir %s downstream cir %s pir %s' % (strNameOrId, usCir, usPir, usFir, dsCir, dsPir))
         
         assert self.exist_bandwidth_profile(nameOrId, usCir, usPir, usFir, dsCir, dsPir)
 
@@ -3584,19 +4235,19 @@ class OLTCLI_AN6K17:
         prfId = None 
         if type(nameOrId) == int:
             prfId = nameOrId
-            nameOrId = 'id %s' % nameOrId
+            strNameOrId = 'id %s' % nameOrId
         else:
             prfId = self.query_bandwidth_profile_id_by_name(nameOrId)
-            nameOrId = 'name %s' % nameOrId
+            strNameOrId = 'name %s' % nameOrId
 
         for onu in self.get_authorization():
-            prof = self.get_onu_bandwidth_profile(onu['Onu'])
+            prof = self.get_onu_bandwidth_profile(onu['PhyId'])
             if prof['prfId'] == prfId:
-                self.clear_onu_bandwithd_profile(onu['Onu'])
+                self.clear_onu_bandwithd_profile(onu['PhyId'])
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('bandwidth-profile delete %s' % (nameOrId))
+            conn.run('bandwidth-profile delete %s' % (strNameOrId))
         
         assert self.not_exist_bandwidth_profile(nameOrId)
 
@@ -3614,7 +4265,7 @@ class OLTCLI_AN6K17:
         else:
             assert type(id) == int
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show bandwidth-profile %s' % id)
         
@@ -3658,18 +4309,13 @@ class OLTCLI_AN6K17:
             profileIdOrName (int或str): 带宽模板的ID或者名称
         """
 
-        assert type(profileIdOrName) == int or type(profileIdOrName) == str
+        strProfile = get_bandwidth_profile_str(profileIdOrName)
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-
-            if type(profileIdOrName) == int:
-                strProfile = 'profile-id %s' % profileIdOrName
-            else:
-                strProfile = 'profile-name %s' % profileIdOrName
-
-            conn.run('onu bandwidth-profile %s %s' % (self.get_onu_id(sn), strProfile))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run('onu bandwidth-profile %s %s' % (onuId, strProfile))
 
             if type(profileIdOrName) == str:
                 id = self.query_bandwidth_profile_id_by_name(profileIdOrName)
@@ -3710,10 +4356,11 @@ class OLTCLI_AN6K17:
             dict: 包含ONU所关联带宽模板的信息。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            result = conn.run('show onu bandwidth %s' % self.get_onu_id(sn))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            result = conn.run('show onu bandwidth %s' % onuId)
         
         ret = extract_onu_bandwidth(result)
         ret['prfId'] = ret['prfId'] + 1
@@ -3731,10 +4378,11 @@ class OLTCLI_AN6K17:
             dsPir (int): downstream peak information rate
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            conn.run('onu bandwidth %s upstream-pir %s downstream-pir %s upstream-cir %s upstream-fir %s' % (self.get_onu_id(sn), usPir, dsPir, usCir, usFir))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run(get_onu_bandwidth_cmd(onuId, usCir, usPir, usFir, dsPir))
         
 
         ret = self.get_onu_bandwidth_profile(sn)
@@ -3759,7 +4407,7 @@ class OLTCLI_AN6K17:
             dsPir (int): 下行Pir
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % (slot, port))
             if usPir != dsPir:
@@ -3782,7 +4430,7 @@ class OLTCLI_AN6K17:
             dict: 含带宽信息的字典。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % (slot, port))
             result =  conn.run('show bandwidth')
@@ -3802,10 +4450,11 @@ class OLTCLI_AN6K17:
             dsProfileId (int): 下行带宽模板
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            conn.run('onu port service-bandwith %s eth %s service %s upstream-profile %s downstream-profile %s' % (self.get_onu_id(sn), eth, serviceIndex, usProfileId, dsProfileId))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run('onu port service-bandwith %s eth %s service %s upstream-profile %s downstream-profile %s' % (onuId, eth, serviceIndex, usProfileId, dsProfileId))
 
     def set_onu_port_policy(self, sn, eth, usEnable, usCir, usCbs, usEbs, dsEnable, dsCir, dsPir):
         """设置ONU端口策略。等同于执行onu port policing命令。
@@ -3822,10 +4471,11 @@ class OLTCLI_AN6K17:
             dsPir (int): 下行PIR
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            conn.run('onu port policing %s eth %s upstream %s cir %s cbs %s ebs %s downstream %s cir %s pir %s' % (self.get_onu_id(sn), eth, usEnable, usCir, usCbs, usEbs, dsEnable, dsCir, dsPir))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run('onu port policing %s eth %s upstream %s cir %s cbs %s ebs %s downstream %s cir %s pir %s' % (onuId, eth, usEnable, usCir, usCbs, usEbs, dsEnable, dsCir, dsPir))
 
     def set_onu_layer3_rate_limit(self, sn, wanIndex, usProfileId, dsProfileId):
         """设置ONU三层限速。等同于执行onu layer3-ratelimit-profile命令。
@@ -3837,10 +4487,11 @@ class OLTCLI_AN6K17:
             dsProfileId (int): 下行限速模板ProfileId
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
-            conn.run('onu layer3-ratelimit-profile %s %s upstream-profile-id %s downstream-profile-id %s' % (self.get_onu_id(sn), wanIndex, usProfileId, dsProfileId))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
+            conn.run('onu layer3-ratelimit-profile %s %s upstream-profile-id %s downstream-profile-id %s' % (onuId, wanIndex, usProfileId, dsProfileId))
 
         found = False
         profiles = self.get_onu_layer3_rate_limit(sn)
@@ -3864,24 +4515,14 @@ class OLTCLI_AN6K17:
             list: 包含限速信息的列表
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        slot, pon, onuId = self._resolve_onu(sn)
+        with self._connect() as conn:
             conn.run('config')
-            conn.run('interface pon 1/%s/%s' % self.get_onu_position(sn))
+            conn.run('interface pon 1/%s/%s' % (slot, pon))
 
-            onuId = self.get_onu_id(sn)
-            if state == None:
-                
-
-                result1 = conn.run('show onu layer3-ratelimit-profile %s %s' % (onuId, 'offline'))
-                ret1 = extract_onu_layer3_rate_limit_profile(result1)
-
-                result2 = conn.run('show onu layer3-ratelimit-profile %s %s' % (onuId, 'online'))
-                ret2 = extract_onu_layer3_rate_limit_profile(result2)
-
-                ret = ret1 + ret2
-            else:
-                result = conn.run('show onu layer3-ratelimit-profile %s %s' % (onuId, state))
-                ret = extract_onu_layer3_rate_limit_profile(result)
+            ret = [ ]
+            for cmd in get_onu_layer3_rate_limit_cmds(onuId, state):
+                ret = ret + extract_onu_layer3_rate_limit_profile(conn.run(cmd))
         
         return ret
 
@@ -3907,7 +4548,7 @@ class OLTCLI_AN6K17:
         ValidTypesList = [ 'cnc', 'data', 'iptv', 'ngn', 'system', 'uplinksub', 'vod', 'voip']
         assert vlan_type in ValidTypesList, '无效的业务VLAN类型'
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('service-vlan %s %s type %s' % (name, vlan.replace('-', ' to '), vlan_type))
 
@@ -3920,7 +4561,7 @@ class OLTCLI_AN6K17:
             list: 包含业务VLAN信息字典的列表。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show service-vlan')
 
@@ -3936,7 +4577,7 @@ class OLTCLI_AN6K17:
         if not self.exist_service_vlan(name):
             return
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('no service-vlan %s' % name)
         
@@ -4023,7 +4664,7 @@ class OLTCLI_AN6K17:
             fieldValueOpStr = fieldValueOpStr + ' %s %s %s' % param
         fieldValueOpStr = fieldValueOpStr.strip()
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('onuqinq-classification-profile %s %s %s' % (op, name, fieldValueOpStr))
         
@@ -4039,14 +4680,9 @@ class OLTCLI_AN6K17:
             list: 包含Profile信息字典的列表
         """
 
-        if name:
-            cmdStr = 'name %s' % name
-        else:
-            cmdStr = 'all'
-
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
-            result = conn.run('show onuqinq-classification-profile %s' % cmdStr)
+            result = conn.run('show onuqinq-classification-profile %s' % get_onu_qinq_classification_profile_str(name))
         
         ret = extract_onu_qinq_classification_profile(result)
 
@@ -4062,7 +4698,7 @@ class OLTCLI_AN6K17:
         if not self.exist_onu_qinq_classification_profile(name):
             return
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('onuqinq-classification-profile delete %s' % name)
 
@@ -4094,7 +4730,7 @@ class OLTCLI_AN6K17:
             name (str): oltqinq-domain的名称。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('oltqinq-domain add %s' % name)
         
@@ -4110,14 +4746,9 @@ class OLTCLI_AN6K17:
         Returns:
             dict: 包含oltqinq-domain信息的字典。
         """
-        assert type(nameOrIndex) == str or type(nameOrIndex) == int, "nameOrIndex只接受str或int类型"
-
-        if type(nameOrIndex) == str and not nameOrIndex.isdigit():
-            strCmdArgs = nameOrIndex
-        else:
-            strCmdArgs = "index %s" % nameOrIndex
+        strCmdArgs = get_olt_qinq_domain_str(nameOrIndex)
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show oltqinq-domain %s' % strCmdArgs)
 
@@ -4134,7 +4765,7 @@ class OLTCLI_AN6K17:
         """
 
         profile = self.get_olt_qinq_domain(name)
-        if profile == None:
+        if profile == None or len(profile) == 0:
             return False
         
         return True
@@ -4148,7 +4779,7 @@ class OLTCLI_AN6K17:
         """
 
         
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('oltqinq-domain modify %s service-count %s' % (name, count))
         
@@ -4169,7 +4800,7 @@ class OLTCLI_AN6K17:
         assert profile != None, "oltqinq-domain不存在"
         assert serviceIndex <= profile['count'], "业务索引号(%s)超出范围, 仅有%s条业务。" % (serviceIndex, profile['count'])
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('oltqinq-domain modify %s service %s type %s' % (name, serviceIndex, type))
         
@@ -4191,7 +4822,7 @@ class OLTCLI_AN6K17:
         if not self.exist_olt_qinq_domain(name):
             return
         
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('oltqinq-domain delete %s' % name)
 
@@ -4212,7 +4843,7 @@ class OLTCLI_AN6K17:
         strRule = list_to_str(ruleList, 'field-id %s value %s condition %s')
 
         # 执行命令
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('oltqinq-domain %s service %s classification %s %s' % (name, serviceIndex, stream, strRule))
 
@@ -4243,7 +4874,7 @@ class OLTCLI_AN6K17:
         strVlanRule = list_to_str(vlanRuleList, 'vlan %s user-vlanid %s user-cos %s %s tpid %s cos %s vlanid %s')
 
         # run command
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('oltqinq-domain %s service %s %s' % (name, serviceIndex, strVlanRule))
 
@@ -4270,7 +4901,7 @@ class OLTCLI_AN6K17:
             name (str): 要绑定的QinQ域的名称
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % (slot, port))
             conn.run('oltqinq-domain %s' % name)
@@ -4287,7 +4918,7 @@ class OLTCLI_AN6K17:
         if not self.is_olt_qinq_domain_bound(slot, port, name):
             return
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % (slot, port))
             conn.run('no oltqinq-domain %s' % name)
@@ -4303,13 +4934,13 @@ class OLTCLI_AN6K17:
             bool: True, 绑定；Flase，未绑定。
         """
 
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             conn.run('interface pon 1/%s/%s' % (slot, port))
             try:
                 result = conn.run('show oltqinq-domain bound-info %s' % name)
                 ret = extract_olt_qinq_domain_bound_info(result)
-                return ret == (auto_convert(slot), auto_convert(port))
+                return ret == (int(slot), int(port))
             except AssertionError as ae:
                 return False
 
@@ -4330,7 +4961,7 @@ class OLTCLI_AN6K17:
     def get_current_alarm(self):
         """获取OLT上面当前产生的告警
         """
-        with OLTTelnet(self.ip, self.username, self.password) as conn:
+        with self._connect() as conn:
             conn.run('config')
             result = conn.run('show alarm current')
         
@@ -4342,5 +4973,7 @@ __all__ = [
 
     'OLTCLI_AN6K_17',
     'OLTModel',
-    'OLTCLI'
+    'OLTCLI',
+    'get_parser',
+    'parse_output'
 ]
\ No newline at end of file
@@ -0,0 +1,265 @@
+from collections.abc import Sized
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NoReturn, Optional
+
+from .entry import STATISTICS_FIELDS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# kind of each column, columns not listed are 'str'
+# int: numpy int64 array, missing values and placeholders such as 'null' or '-' are MISSING_INT
+# float: numpy float64 array, missing values and placeholders are nan
+# category: codes into a sorted list of distinct values, for enum-like columns
+# str: numpy unicode array
+AUTHORIZATION_KINDS = { 'Slot': 'int', 'Pon': 'int', 'Onu': 'int', 'Lic': 'int', 'OnuType': 'category', 'ST': 'category', 'OST': 'category' }
+DISCOVERY_KINDS = { 'No': 'int', 'Why': 'int', 'SLOT': 'int', 'PON': 'int', 'OnuType': 'category' }
+STATISTICS_KINDS = dict([ (title, 'int' if kind == int else 'float') for title, _, kind, _ in STATISTICS_FIELDS ])
+WHITELIST_KINDS = {
+    'Slot': 'int', 'Pon': 'int', 'Onu': 'int', 'Onu-Type': 'category', 'En': 'category', 'Used': 'category',
+    'SLOT': 'int', 'PON': 'int', 'ONU': 'int', 'TYPE': 'category', 'EN': 'category', 'USED': 'category'
+}
+
+# sentinel of missing value in int column
+MISSING_INT = -1
+
+# dtype of array for each kind, str values are kept as objects until all rows are read
+DTYPES = { 'int': 'int64', 'float': 'float64', 'category': 'int32', 'str': object }
+
+def require_numpy() -> NoReturn:
+    """raise if numpy is not installed
+    """
+    if numpy == None:
+        raise RuntimeError('numpy is required by columnar table, install it by pip install fiberhome-oltcli[columnar]')
+
+def to_number(value:Any, kind:type, missing:Any) -> Any:
+    """convert value of int or float column
+
+    Args:
+        value (Any): value of row, such as 12, '12', None, '' or 'null'
+        kind (type): int or float
+        missing (Any): value for None and placeholders which are not numbers
+
+    Returns:
+        Any: number, or missing
+    """
+    if value == None:
+        return missing
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return missing
+
+class ColumnarTable:
+    """Columnar Table
+
+    ColumnarTable keeps a table shown by OLT as one numpy array for each column, instead of one dict for each row,
+    so rows can be counted and filtered by vectorized operations without creating python objects for them.
+
+        table = ColumnarTable.from_rows(iter_authorization(output), AUTHORIZATION_KINDS)
+        offline = table.filter((table['Slot'] == 4) & table.equals('OST', 'dn'))
+    """
+
+    def __init__(self, columns:Dict[str, Any], kinds:Dict[str, str], categories:Dict[str, List[Any]]) -> NoReturn:
+        """init
+
+        Args:
+            columns (Dict[str, numpy.ndarray]): title to array, all of same length, in the order shown by OLT
+            kinds (Dict[str, str]): title to kind of column, 'int', 'float', 'category' or 'str'
+            categories (Dict[str, List[Any]]): title of category column to its distinct values, indexed by codes
+        """
+        require_numpy()
+
+        self._columns = columns
+        self._kinds = kinds
+        self._categories = categories
+        self._length = len(next(iter(columns.values()))) if len(columns) != 0 else 0
+
+    @classmethod
+    def from_rows(cls, rows:Iterable[Mapping], kinds:Optional[Dict[str, str]]=None, titles:Optional[Iterable[str]]=None) -> 'ColumnarTable':
+        """build table from rows, such as rows yielded by iter_authorization.
+        each row is dropped once its values are appended to columns, so rows can be streamed from OLT
+
+        Args:
+            rows (Iterable[Mapping]): rows, keys of first row are titles of table
+            kinds (Dict[str, str], optional): title to kind of column, default is None, all columns are 'str'
+            titles (Iterable[str], optional): titles of table when there is no row, default is None, titles named by kinds
+
+        Returns:
+            ColumnarTable: table
+        """
+        require_numpy()
+
+        kinds = kinds or { }
+        # values are written into preallocated arrays, which are doubled when full
+        capacity = max(len(rows), 1) if isinstance(rows, Sized) else 1024
+        length = 0
+        arrays:Dict[str, Any] = { }
+        # value of category column to its code in the order of first appearance
+        codes:Dict[str, Dict[str, int]] = { }
+
+        def allocate(titles:Iterable[str]):
+            for title in titles:
+                kind = kinds.get(title, 'str')
+                if kind not in DTYPES:
+                    raise RuntimeWarning('unknown kind %s of column %s' % (kind, title))
+                arrays[title] = numpy.empty(capacity, dtype=DTYPES[kind])
+                if kind == 'category':
+                    codes[title] = { }
+
+        for row in rows:
+            if len(arrays) == 0:
+                allocate(row.keys())
+
+            if length == capacity:
+                capacity = capacity * 2
+                for title, array in arrays.items():
+                    arrays[title] = numpy.empty(capacity, dtype=array.dtype)
+                    arrays[title][:length] = array
+
+            for title, array in arrays.items():
+                value = row.get(title)
+                kind = kinds.get(title, 'str')
+                if kind == 'int':
+                    array[length] = to_number(value, int, MISSING_INT)
+                elif kind == 'float':
+                    array[length] = to_number(value, float, numpy.nan)
+                elif kind == 'category':
+                    value = '' if value == None else str(value)
+                    array[length] = codes[title].setdefault(value, len(codes[title]))
+                else:
+                    array[length] = '' if value == None else str(value)
+            length = length + 1
+
+        if len(arrays) == 0:
+            # no row, columns are still created so that queries on them give empty results
+            allocate(titles if titles != None else kinds.keys())
+
+        columns, categories = { }, { }
+        for title, array in arrays.items():
+            array = array[:length]
+            if title in codes:
+                # renumber codes in the order of sorted values
+                distinct = sorted(codes[title])
+                order = numpy.empty(len(distinct), dtype=numpy.int32)
+                for code, value in enumerate(distinct):
+                    order[codes[title][value]] = code
+                categories[title] = distinct
+                columns[title] = order[array]
+            elif array.dtype == object:
+                columns[title] = array.astype(str)
+            else:
+                columns[title] = array
+
+        return cls(columns, { title: kinds.get(title, 'str') for title in columns }, categories)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, title:str) -> bool:
+        return title in self._columns
+
+    def __getitem__(self, title:str) -> Any:
+        """array of column, codes for category column
+
+        Args:
+            title (str): title of column
+
+        Returns:
+            numpy.ndarray: values of column
+        """
+        return self._columns[title]
+
+    @property
+    def titles(self) -> List[str]:
+        """titles of columns
+
+        Returns:
+            List[str]: titles, in the order shown by OLT
+        """
+        return list(self._columns.keys())
+
+    def kind(self, title:str) -> str:
+        """kind of column
+
+        Args:
+            title (str): title of column
+
+        Returns:
+            str: 'int', 'float', 'category' or 'str'
+        """
+        return self._kinds[title]
+
+    def categories(self, title:str) -> List[Any]:
+        """distinct values of category column, indexed by codes
+
+        Args:
+            title (str): title of category column
+
+        Returns:
+            List[Any]: distinct values, sorted
+        """
+        return list(self._categories[title])
+
+    def code(self, title:str, value:Any) -> int:
+        """code of value in category column
+
+        Args:
+            title (str): title of category column
+            value (Any): value
+
+        Returns:
+            int: code, -1 if no row has the value
+        """
+        categories = self._categories[title]
+        value = str(value)
+        return categories.index(value) if value in categories else -1
+
+    def equals(self, title:str, value:Any) -> Any:
+        """mask of rows whose value of column equals to value
+
+        Args:
+            title (str): title of column
+            value (Any): value to compare, compared by code for category column
+
+        Returns:
+            numpy.ndarray: bool array, one for each row
+        """
+        if self._kinds[title] == 'category':
+            return self._columns[title] == self.code(title, value)
+        return self._columns[title] == value
+
+    def decode(self, title:str) -> Any:
+        """values of column, values instead of codes for category column
+
+        Args:
+            title (str): title of column
+
+        Returns:
+            numpy.ndarray: values of column
+        """
+        if self._kinds[title] == 'category':
+            return numpy.array(self._categories[title])[self._columns[title]]
+        return self._columns[title]
+
+    def filter(self, mask:Any) -> 'ColumnarTable':
+        """rows selected by mask
+
+        Args:
+            mask (numpy.ndarray): bool array, one for each row, or array of row indexes
+
+        Returns:
+            ColumnarTable: table of selected rows, sharing categories with this table
+        """
+        return ColumnarTable({ title: column[mask] for title, column in self._columns.items() }, self._kinds, self._categories)
+
+    def rows(self) -> Iterator[dict]:
+        """rows as dicts, created one at a time
+
+        Yields:
+            dict: title to value, same as the row it is built from, except values of str column are str
+        """
+        columns = [ self.decode(title).tolist() for title in self._columns ]
+        for values in zip(*columns):
+            yield dict(zip(self._columns, values))
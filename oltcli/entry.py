@@ -0,0 +1,346 @@
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NoReturn, Optional, Tuple
+
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+class Entry(Mapping):
+    """Entry
+
+    Entry is a compact, read-mostly row of a table shown by OLT.
+    Values are kept in slots named by FIELDS, titles are kept in one tuple shared by all rows of a table,
+    so a row costs a few pointers instead of a dict with its own keys.
+
+    Entry is a Mapping keyed by the titles shown by OLT, so entry['PhyId'], entry.get('PhyId'), dict(entry) and
+    entry == {...} work as for the dict returned by extract_* functions, values are also attributes, such as entry.phy_id
+    """
+
+    __slots__ = ('_keys', '_extra')
+
+    # title shown by OLT to slot name, titles not listed are kept in _extra
+    FIELDS:Dict[str, str] = { }
+
+    # shared tuple of titles, so rows of same table do not keep own copies
+    _shared_keys:Dict[Tuple[str, ...], Tuple[str, ...]] = { }
+
+    def __init__(self, keys:Iterable[str], values:Iterable[Any]) -> NoReturn:
+        """init
+
+        Args:
+            keys (Iterable[str]): titles, pass the same tuple for every row of a table to share it
+            values (Iterable[Any]): values, in the order of keys
+        """
+        self._keys = keys if type(keys) is tuple else self._share(tuple(keys))
+        self._extra = None
+
+        fields = self.FIELDS
+        for key, value in zip(self._keys, values):
+            field = fields.get(key)
+            if field != None:
+                setattr(self, field, value)
+            else:
+                if self._extra == None:
+                    self._extra = { }
+                self._extra[key] = value
+
+    @classmethod
+    def from_dict(cls, value:Mapping) -> 'Entry':
+        """create entry from dict returned by extract_* functions
+
+        Args:
+            value (Mapping): row
+
+        Returns:
+            Entry: entry of same titles and values
+        """
+        return cls(tuple(value.keys()), value.values())
+
+    @classmethod
+    def _share(cls, keys:Tuple[str, ...]) -> Tuple[str, ...]:
+        return Entry._shared_keys.setdefault(keys, keys)
+
+    def __getattr__(self, name:str) -> Any:
+        # only called when slot is not set, i.e. the column is not shown in this table
+        if name in self.FIELDS.values():
+            return None
+        raise AttributeError('%s has no attribute %s' % (type(self).__name__, name))
+
+    def __getitem__(self, key:str) -> Any:
+        field = self.FIELDS.get(key)
+        if field != None and key in self._keys:
+            return getattr(self, field)
+        if self._extra != None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key:str, value:Any) -> NoReturn:
+        if key not in self._keys:
+            self._keys = self._share(self._keys + (key, ))
+
+        field = self.FIELDS.get(key)
+        if field != None:
+            setattr(self, field, value)
+        else:
+            if self._extra == None:
+                self._extra = { }
+            self._extra[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return '%s(%s)' % (type(self).__name__, ', '.join('%s=%r' % (key, self[key]) for key in self._keys))
+
+    def __getstate__(self) -> Tuple[Tuple[str, ...], Tuple[Any, ...]]:
+        return (self._keys, tuple(self.values()))
+
+    def __setstate__(self, state:Tuple[Tuple[str, ...], Tuple[Any, ...]]) -> NoReturn:
+        keys, values = state
+        self.__init__(self._share(keys), values)
+
+    def to_dict(self) -> dict:
+        """convert to dict, same as returned by extract_* functions
+
+        Returns:
+            dict: title to value
+        """
+        return dict(self.items())
+
+class AuthorizationEntry(Entry):
+    """row of show authorization
+
+    Attributes:
+        slot (int): Slot
+        pon (int): Pon
+        onu (int): Onu
+        onu_type (str): OnuType
+        status (str): ST, A for authorized, P for preauthorized, R for system reserved
+        lic (int): Lic
+        oper_status (str): OST, up or dn
+        phy_id (str): PhyId
+        phy_pwd (str): PhyPwd
+        logic_id (str): LogicId
+        logic_pwd (str): LogicPwd
+    """
+
+    __slots__ = ('slot', 'pon', 'onu', 'onu_type', 'status', 'lic', 'oper_status', 'phy_id', 'phy_pwd', 'logic_id', 'logic_pwd')
+
+    FIELDS = {
+        'Slot': 'slot', 'Pon': 'pon', 'Onu': 'onu', 'OnuType': 'onu_type', 'ST': 'status', 'Lic': 'lic', 'OST': 'oper_status',
+        'PhyId': 'phy_id', 'PhyPwd': 'phy_pwd', 'LogicId': 'logic_id', 'LogicPwd': 'logic_pwd'
+    }
+
+class DiscoveryEntry(Entry):
+    """row of show discovery or show onu discovered
+
+    Attributes:
+        no (int): No
+        onu_type (str): OnuType
+        phy_id (str): PhyId
+        phy_pwd (str): PhyPwd
+        logic_id (str): LogicId
+        logic_pwd (str): LogicPwd
+        why (int): Why
+        slot (int): SLOT, slot of the table
+        pon (int): PON, pon port of the table
+    """
+
+    __slots__ = ('no', 'onu_type', 'phy_id', 'phy_pwd', 'logic_id', 'logic_pwd', 'why', 'slot', 'pon')
+
+    FIELDS = {
+        'No': 'no', 'OnuType': 'onu_type', 'PhyId': 'phy_id', 'PhyPwd': 'phy_pwd', 'LogicId': 'logic_id', 'LogicPwd': 'logic_pwd',
+        'Why': 'why', 'SLOT': 'slot', 'PON': 'pon'
+    }
+
+class WhitelistEntry(Entry):
+    """row of show whitelist
+
+    titles differ between whitelist types and firmwares, such as Phy-ID and PHYID, both are kept in the same slot,
+    while entry['Phy-ID'] or entry['PHYID'] only works for the title shown by OLT
+
+    Attributes:
+        slot (int): Slot or SLOT
+        pon (int): Pon or PON
+        onu (int): Onu or ONU
+        onu_type (str): Onu-Type or TYPE
+        phy_id (str): Phy-ID or PHYID
+        phy_pwd (str): Phy-Pwd or PHYPWD
+        logic_id (str): Logic-Id or LOGICId
+        logic_pwd (str): Logic-Pwd or LOGICPWD
+        en (str): En or EN
+        used (str): Used or USED
+    """
+
+    __slots__ = ('slot', 'pon', 'onu', 'onu_type', 'phy_id', 'phy_pwd', 'logic_id', 'logic_pwd', 'en', 'used')
+
+    FIELDS = {
+        'Slot': 'slot', 'Pon': 'pon', 'Onu': 'onu', 'Onu-Type': 'onu_type', 'Phy-ID': 'phy_id', 'Phy-Pwd': 'phy_pwd',
+        'Logic-Id': 'logic_id', 'Logic-Pwd': 'logic_pwd', 'En': 'en', 'Used': 'used',
+        'SLOT': 'slot', 'PON': 'pon', 'ONU': 'onu', 'TYPE': 'onu_type', 'PHYID': 'phy_id', 'PHYPWD': 'phy_pwd',
+        'LOGICId': 'logic_id', 'LOGICPWD': 'logic_pwd', 'EN': 'en', 'USED': 'used'
+    }
+
+# counters and measurements of show onu statistics, in the order of vector
+# (title shown by OLT, slot name, type, unit the value is normalized to)
+STATISTICS_FIELDS = (
+    ('UPOctetsTransferred', 'up_octets', int, 'BYTEs'),
+    ('UP TotalFrame', 'up_frames', int, 'PKTs'),
+    ('UP UnicastFrames', 'up_unicast_frames', int, 'PKTs'),
+    ('UP BroadcastFrames', 'up_broadcast_frames', int, 'PKTs'),
+    ('UP MulticastFrames', 'up_multicast_frames', int, 'PKTs'),
+    ('UP CRC-32Errors', 'up_crc_errors', int, 'PKTs'),
+    ('UPUndersizeFrames', 'up_undersize_frames', int, 'PKTs'),
+    ('UPOversizeFrames', 'up_oversize_frames', int, 'PKTs'),
+    ('UPCollisions', 'up_collisions', int, 'PKTs'),
+    ('64OctetFrames', 'frames_64', int, 'PKTs'),
+    ('65-127OctetFrames', 'frames_65_127', int, 'PKTs'),
+    ('128-255OctetFrames', 'frames_128_255', int, 'PKTs'),
+    ('256-511OctetFrames', 'frames_256_511', int, 'PKTs'),
+    ('512-1023OctetFrames', 'frames_512_1023', int, 'PKTs'),
+    ('1024-1518OctetFrames', 'frames_1024_1518', int, 'PKTs'),
+    ('UPFramesDropped', 'up_frames_dropped', int, 'PKTs'),
+    ('DownOctetsTransferred', 'down_octets', int, 'BYTEs'),
+    ('DownTotalFrame', 'down_frames', int, 'PKTs'),
+    ('DownUnicastFrames', 'down_unicast_frames', int, 'PKTs'),
+    ('DownBroadcastFrames', 'down_broadcast_frames', int, 'PKTs'),
+    ('DownMulticastFrames', 'down_multicast_frames', int, 'PKTs'),
+    ('DownCRC-32Errors', 'down_crc_errors', int, 'PKTs'),
+    ('DownUndersizeFrames', 'down_undersize_frames', int, 'PKTs'),
+    ('DownOversizeFrames', 'down_oversize_frames', int, 'PKTs'),
+    ('DownCollisions', 'down_collisions', int, 'PKTs'),
+    ('DownFramesDropped', 'down_frames_dropped', int, 'PKTs'),
+    ('UPErrorBIP8', 'up_bip8_errors', int, 'PKTs'),
+    ('DownErrorBIP8', 'down_bip8_errors', int, 'PKTs'),
+    ('UPSpeed', 'up_speed', float, 'Mbps'),
+    ('DownSpeed', 'down_speed', float, 'Mbps'),
+    ('Optical module type', 'optical_reach', float, 'Km'),
+    ('Temperature', 'temperature', float, "'C"),
+    ('Power(Voltage)', 'voltage', float, 'V'),
+    ('Bias current', 'bias_current', float, 'mA'),
+    ('Tx_power', 'tx_power', float, 'dBm'),
+    ('Rx_power', 'rx_power', float, 'dBm'),
+    ('OLT_Rx_power', 'olt_rx_power', float, 'dBm'),
+)
+
+# unit shown by OLT, in lower case, to function converting value to the normalized unit
+UNIT_CONVERTERS:Dict[str, Dict[str, Callable[[float], float]]] = {
+    'BYTEs': { 'bytes': lambda v: v, 'byte': lambda v: v },
+    'PKTs': { 'pkts': lambda v: v, 'pkt': lambda v: v },
+    'Mbps': { 'bps': lambda v: v / 1e6, 'kbps': lambda v: v / 1e3, 'mbps': lambda v: v, 'gbps': lambda v: v * 1e3 },
+    'Km': { 'km': lambda v: v, 'm': lambda v: v / 1e3 },
+    "'C": { "'c": lambda v: v, 'c': lambda v: v, '℃': lambda v: v },
+    'V': { 'v': lambda v: v, 'mv': lambda v: v / 1e3 },
+    'mA': { 'ma': lambda v: v, 'ua': lambda v: v / 1e3, 'a': lambda v: v * 1e3 },
+    'dBm': { 'dbm': lambda v: v, 'mw': lambda v: 10 * math.log10(v) if v > 0 else -math.inf },
+}
+
+class ONUStatistics(Entry):
+    """typed result of show onu statistics
+
+    counters are int, measurements are float in normalized units: speed in Mbps, optical reach in Km, temperature in 'C,
+    voltage in V, bias current in mA and optical power in dBm. values not shown or not a number, such as of an offline ONU, are None.
+    keys are titles shown by OLT, such as entry['Rx_power'], plus 'From' and 'To', the period of counters.
+
+    to_vector() lays numbers out in the order of STATISTICS_FIELDS, so snapshots of many ONUs can be stored as rows of one numeric array
+    """
+
+    __slots__ = tuple(name for _, name, _, _ in STATISTICS_FIELDS) + ('since', 'until')
+
+    FIELDS = dict([ (title, name) for title, name, _, _ in STATISTICS_FIELDS ] + [ ('From', 'since'), ('To', 'until') ])
+
+    # slot names of to_vector, in order
+    VECTOR = tuple(name for _, name, _, _ in STATISTICS_FIELDS)
+
+    # title with spaces removed and in lower case, to field, so titles spaced differently by firmwares are still known
+    _SPECS = { title.replace(' ', '').lower(): (title, name, kind, unit) for title, name, kind, unit in STATISTICS_FIELDS }
+
+    @classmethod
+    def from_raw(cls, raw:Mapping, since:Optional[datetime]=None, until:Optional[datetime]=None) -> 'ONUStatistics':
+        """convert values and units shown by OLT
+
+        Args:
+            raw (Mapping): title to (value, unit) tuple of strings, returned by extract_onu_statistics
+            since (datetime, optional): start of counters, default is None
+            until (datetime, optional): end of counters, None if still counting, default is None
+
+        Returns:
+            ONUStatistics: statistics
+        """
+        keys, values = [ ], [ ]
+        for title, (value, unit) in raw.items():
+            spec = cls._SPECS.get(title.replace(' ', '').lower())
+            if spec == None:
+                keys.append(title)
+                values.append((value, unit))
+                continue
+
+            title, _, kind, target = spec
+            keys.append(title)
+            values.append(convert_unit(value, unit, kind, target))
+
+        keys.extend([ 'From', 'To' ])
+        values.extend([ since, until ])
+
+        return cls(cls._share(tuple(keys)), values)
+
+    @classmethod
+    def from_vector(cls, vector:Iterable[float], since:Optional[datetime]=None, until:Optional[datetime]=None) -> 'ONUStatistics':
+        """restore statistics from to_vector
+
+        Args:
+            vector (Iterable[float]): numbers in the order of VECTOR
+            since (datetime, optional): start of counters, default is None
+            until (datetime, optional): end of counters, default is None
+
+        Returns:
+            ONUStatistics: statistics
+        """
+        values = [ ]
+        for (_, _, kind, _), value in zip(STATISTICS_FIELDS, vector):
+            values.append(None if math.isnan(value) else kind(value))
+
+        return cls(cls._share(tuple(title for title, _, _, _ in STATISTICS_FIELDS) + ('From', 'To')), values + [ since, until ])
+
+    def to_vector(self) -> List[float]:
+        """numbers in the order of VECTOR, None as nan
+
+        Returns:
+            List[float]: one number for each of STATISTICS_FIELDS
+        """
+        values = [ ]
+        for name in self.VECTOR:
+            value = getattr(self, name)
+            values.append(math.nan if value == None else float(value))
+
+        return values
+
+def convert_unit(value:str, unit:str, kind:type, target:str) -> Any:
+    """convert value shown by OLT to kind in target unit
+
+    Args:
+        value (str): value, such as '-13.14'
+        unit (str): unit shown by OLT, such as 'dbm'
+        kind (type): int or float
+        target (str): key of UNIT_CONVERTERS
+
+    Returns:
+        Any: converted value, None if value is not a number or unit is unknown
+    """
+    try:
+        number = kind(value.strip())
+    except ValueError:
+        return None
+
+    converter = UNIT_CONVERTERS[target].get(unit.strip().lower())
+    if converter == None:
+        # one unknown unit should not fail the other fields of statistics
+        logger.warning('unknown unit %s of %s, value %s is ignored' % (unit, target, value))
+        return None
+
+    return kind(converter(number))
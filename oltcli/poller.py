@@ -0,0 +1,222 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NoReturn, Optional, Sequence, Tuple
+
+import logging
+import threading
+import time
+
+from .snapshot import AuthorizationSnapshot
+
+logger = logging.getLogger(__name__)
+
+class _Waiter:
+    """conditions waited on in turn, and future resolved by the last one
+    """
+
+    __slots__ = ('name', 'stages', 'deadline', 'future')
+
+    def __init__(self, name:Any, stages:List[Tuple[Callable[[AuthorizationSnapshot], Any], float]], future:Future) -> NoReturn:
+        self.name = name
+        # (condition, timeout) not satisfied yet, the first one is waited on
+        self.stages = stages
+        self.deadline = time.monotonic() + stages[0][1]
+        self.future = future
+
+class SnapshotPoller:
+    """Snapshot Poller
+
+    SnapshotPoller takes one authorization snapshot per tick and evaluates the condition of every pending wait against it,
+    so waiting for hundreds of ONUs costs one show authorization per tick instead of one for each ONU.
+
+    Ticks are taken by one background thread, which runs only while any wait is pending.
+    The interval between ticks grows by backoff while no wait is resolved, up to max_interval, and goes back to interval once any is.
+    """
+
+    def __init__(self, fetch:Callable[[], AuthorizationSnapshot], interval:float=1, max_interval:float=5, backoff:float=1.5) -> NoReturn:
+        """init
+
+        Args:
+            fetch (Callable[[], AuthorizationSnapshot]): take a fresh snapshot, called once per tick
+            interval (float, optional): seconds between ticks, default is 1
+            max_interval (float, optional): most seconds between ticks after backing off, default is 5
+            backoff (float, optional): factor the interval grows by after a tick resolving no wait, default is 1.5
+        """
+        assert interval > 0 and max_interval >= interval and backoff >= 1, "interval should be positive, max_interval not less than interval, backoff not less than 1"
+
+        self._fetch = fetch
+        self._interval = interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+
+        self._waiters:List[_Waiter] = [ ]
+        self._lock = threading.Lock()
+        # set to take next tick at once, such as when a wait is submitted
+        self._wakeup = threading.Event()
+        self._thread:Optional[threading.Thread] = None
+
+        # count of snapshots taken
+        self._ticks = 0
+
+    @property
+    def ticks(self) -> int:
+        """snapshots taken so far
+
+        Returns:
+            int: count of ticks
+        """
+        return self._ticks
+
+    @property
+    def pending(self) -> int:
+        """waits not resolved yet
+
+        Returns:
+            int: count of pending waits
+        """
+        with self._lock:
+            return len(self._waiters)
+
+    def submit(self, condition:Callable[[AuthorizationSnapshot], Any], timeout:float, name:Any=None) -> Future:
+        """wait for condition to hold on a snapshot taken from now on
+
+        Args:
+            condition (Callable[[AuthorizationSnapshot], Any]): called with each snapshot, the wait is resolved once it returns a true value
+            timeout (float): seconds to wait, the future fails with TimeoutError after it
+            name (Any, optional): name of the wait, such as ONU SN, shown in TimeoutError, default is None
+
+        Returns:
+            Future: resolved with the value returned by condition, fails with TimeoutError after timeout, or the exception raised by condition
+        """
+        return self.submit_sequence([ (condition, timeout) ], name)
+
+    def submit_sequence(self, stages:Sequence[Tuple[Callable[[AuthorizationSnapshot], Any], float]], name:Any=None) -> Future:
+        """wait for conditions to hold in turn, each on a snapshot taken after the previous one held, such as offline and then online again
+
+        Args:
+            stages (Sequence[Tuple[Callable[[AuthorizationSnapshot], Any], float]]): (condition, timeout) of each stage, timeout counts from the previous stage held
+            name (Any, optional): name of the wait, such as ONU SN, shown in TimeoutError, default is None
+
+        Returns:
+            Future: resolved with the value returned by the last condition, fails with TimeoutError when any stage times out, or the exception raised by condition
+        """
+        assert len(stages) > 0, "stages should not be empty"
+
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        with self._lock:
+            self._waiters.append(_Waiter(name, list(stages), future))
+            if self._thread == None:
+                self._thread = threading.Thread(target=self._run, name='SnapshotPoller', daemon=True)
+                self._thread.start()
+
+        self._wakeup.set()
+
+        return future
+
+    def _run(self) -> NoReturn:
+        """take ticks until no wait is pending
+        """
+        interval = self._interval
+        while True:
+            with self._lock:
+                if len(self._waiters) == 0:
+                    self._thread = None
+                    return
+                waiters = list(self._waiters)
+
+            self._wakeup.clear()
+
+            try:
+                snapshot = self._fetch()
+                self._ticks += 1
+            except Exception as e:
+                # OLT may be busy, try again at next tick until waits time out
+                logger.warning('failed to take snapshot: %s' % e)
+                snapshot = None
+
+            resolved = self._evaluate(waiters, snapshot)
+
+            interval = self._interval if resolved else min(interval * self._backoff, self._max_interval)
+
+            with self._lock:
+                if len(self._waiters) == 0:
+                    continue
+                nearest = min(waiter.deadline for waiter in self._waiters)
+
+            self._wakeup.wait(max(0, min(interval, nearest - time.monotonic())))
+
+    def _evaluate(self, waiters:List[_Waiter], snapshot:Optional[AuthorizationSnapshot]) -> bool:
+        """evaluate waiters against snapshot, resolve and remove those done
+
+        Args:
+            waiters (List[_Waiter]): waiters pending before the snapshot is taken
+            snapshot (AuthorizationSnapshot): snapshot, None if failed to take it
+
+        Returns:
+            bool: True if any waiter is resolved by its condition
+        """
+        resolved = False
+        now = time.monotonic()
+        for waiter in waiters:
+            if waiter.future.done():
+                continue
+
+            if snapshot != None:
+                condition, _ = waiter.stages[0]
+                try:
+                    value = condition(snapshot)
+                except Exception as e:
+                    waiter.future.set_exception(e)
+                    continue
+
+                if value and len(waiter.stages) > 1:
+                    # next stage is waited on from next snapshot
+                    waiter.stages.pop(0)
+                    waiter.deadline = now + waiter.stages[0][1]
+                    resolved = True
+                    continue
+
+                if value:
+                    waiter.future.set_result(value)
+                    resolved = True
+                    continue
+
+            if now >= waiter.deadline:
+                waiter.future.set_exception(TimeoutError('%s is not satisfied in time' % ('condition' if waiter.name == None else waiter.name)))
+
+        # every waiter done is resolved, cancelled or failed, rebuild list once instead of removing them one by one
+        with self._lock:
+            self._waiters = [ waiter for waiter in self._waiters if not waiter.future.done() ]
+
+        return resolved
+
+def wait_all(futures:Dict[Any, Future]) -> Dict[Any, Any]:
+    """wait for all futures, such as those returned by SnapshotPoller.submit
+
+    Args:
+        futures (Dict[Any, Future]): name, such as ONU SN, to future
+
+    Raises:
+        TimeoutError: any future times out, after all are done, with names of those timed out
+
+    Returns:
+        Dict[Any, Any]: name to result
+    """
+    results, timeouts = { }, [ ]
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except TimeoutError:
+            timeouts.append(name)
+
+    if len(timeouts) != 0:
+        raise TimeoutError('%d of %d not satisfied in time: %s' % (len(timeouts), len(futures), ', '.join(str(name) for name in timeouts)))
+
+    return results
+
+__all__ = [
+
+    'SnapshotPoller',
+    'wait_all'
+]
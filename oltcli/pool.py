@@ -0,0 +1,215 @@
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, NoReturn, Optional, Tuple
+
+import logging
+import threading
+import time
+
+from .session import OLTSession
+
+logger = logging.getLogger(__name__)
+
+class OLTSessionPool:
+    """OLT Session Pool
+
+    OLTSessionPool holds authenticated sessions with one OLT, and limits how many sessions are opened at the same time
+    """
+
+    def __init__(self, ip:str, username:str, password:str, max_size:int=4, idle_timeout:float=300, check_interval:float=30, **kwargs) -> NoReturn:
+        """init
+
+        Args:
+            ip (str): OLT ip address
+            username (str): username for connection
+            password (str): password for connection
+            max_size (int, optional): max sessions opened with OLT at the same time, default is 4
+            idle_timeout (float, optional): seconds after which an idle session is disconnected, default is 300
+            check_interval (float, optional): an idle session is checked before reuse when it has been idle more than these seconds, default is 30
+            kwargs: other arguments passed to OLTSession
+        """
+        assert max_size > 0, "max_size should be greater than 0"
+
+        self._ip = ip
+        self._username = username
+        self._password = password
+        self._kwargs = kwargs
+
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._check_interval = check_interval
+
+        # (session, time of checkin, owner checked it in) of idle sessions, the latest one at right
+        self._idle = deque()
+        # count of checked out sessions
+        self._in_use = 0
+
+        self._cond = threading.Condition()
+
+    @property
+    def max_size(self) -> int:
+        """max sessions opened with OLT at the same time
+
+        Returns:
+            int: max size
+        """
+        return self._max_size
+
+    @property
+    def size(self) -> int:
+        """sessions held by pool, both idle and checked out
+
+        Returns:
+            int: size
+        """
+        with self._cond:
+            return self._in_use + len(self._idle)
+
+    @property
+    def idle(self) -> int:
+        """idle sessions in pool
+
+        Returns:
+            int: count of idle sessions
+        """
+        with self._cond:
+            return len(self._idle)
+
+    def checkout(self, timeout:Optional[float]=None) -> OLTSession:
+        """take a session out of pool, wait when all sessions are in use
+
+        Args:
+            timeout (float, optional): seconds to wait, default is None, wait forever
+
+        Returns:
+            OLTSession: session, it connects OLT on first command if not connected
+        """
+        with self._cond:
+            self._evict_idle()
+
+            if not self._cond.wait_for(lambda: len(self._idle) != 0 or self._in_use < self._max_size, timeout):
+                raise RuntimeError('no free session with %s in %s seconds' % (self._ip, timeout))
+
+            self._in_use = self._in_use + 1
+            if len(self._idle) != 0:
+                session, since, _ = self._idle.pop()
+            else:
+                session, since = OLTSession(self._ip, self._username, self._password, **self._kwargs), None
+
+        # check the session which has been idle for a while outside of lock
+        if since != None and time.monotonic() - since > self._check_interval and not session.ping():
+            logger.info('idle session with %s is broken, reconnect on next command' % self._ip)
+            session.disconnect()
+
+        return session
+
+    def checkin(self, session:OLTSession, discard:bool=False, owner:Any=None) -> NoReturn:
+        """put a session back to pool
+
+        Args:
+            session (OLTSession): session taken by checkout
+            discard (bool, optional): disconnect the session instead of reusing it, default is False
+            owner (Any, optional): who puts the session back, its idle sessions can be released by release, default is None
+        """
+        with self._cond:
+            self._in_use = self._in_use - 1
+            if discard or not session.connected:
+                session.disconnect()
+            else:
+                self._idle.append((session, time.monotonic(), owner))
+
+            self._evict_idle()
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout:Optional[float]=None, owner:Any=None):
+        """take a session to use in with syntax, put it back when done
+
+        Args:
+            timeout (float, optional): seconds to wait for a free session, default is None, wait forever
+            owner (Any, optional): who uses the session, see checkin, default is None
+
+        Yields:
+            OLTSession: session
+        """
+        session = self.checkout(timeout)
+        try:
+            yield session
+        except (EOFError, OSError):
+            self.checkin(session, discard=True)
+            raise
+        except BaseException:
+            self.checkin(session, owner=owner)
+            raise
+        else:
+            self.checkin(session, owner=owner)
+
+    def evict_idle(self) -> NoReturn:
+        """disconnect sessions which have been idle longer than idle_timeout
+        """
+        with self._cond:
+            self._evict_idle()
+
+    def clear(self) -> NoReturn:
+        """disconnect all idle sessions, checked out sessions are not affected
+        """
+        with self._cond:
+            while len(self._idle) != 0:
+                session, _, _ = self._idle.popleft()
+                session.disconnect()
+
+    def release(self, owner:Any) -> NoReturn:
+        """disconnect idle sessions put back by owner, sessions of others are not affected
+
+        Args:
+            owner (Any): owner given to checkin or connection
+        """
+        with self._cond:
+            kept = deque()
+            while len(self._idle) != 0:
+                item = self._idle.popleft()
+                if item[2] is owner:
+                    item[0].disconnect()
+                else:
+                    kept.append(item)
+            self._idle = kept
+
+    def _evict_idle(self) -> NoReturn:
+        """disconnect expired idle sessions, must be called with lock held
+        """
+        now = time.monotonic()
+        while len(self._idle) != 0 and now - self._idle[0][1] > self._idle_timeout:
+            session, _, _ = self._idle.popleft()
+            logger.debug('disconnect idle session with %s' % self._ip)
+            session.disconnect()
+
+# pools shared in process, keyed by (ip, port, username, password)
+_pools:Dict[Tuple[str, int, str, str], OLTSessionPool] = { }
+_pools_lock = threading.Lock()
+
+def get_pool(ip:str, username:str, password:str, **kwargs) -> OLTSessionPool:
+    """get the pool shared in process for given OLT, port, username and password, create it when not exist
+
+    a changed password gets a new pool, sessions logged in with the old password are not reused
+
+    Args:
+        ip (str): OLT ip address
+        username (str): username for connection
+        password (str): password for connection
+        kwargs: arguments passed to OLTSessionPool when creating it
+
+    Returns:
+        OLTSessionPool: pool
+    """
+    with _pools_lock:
+        key = (ip, kwargs.get('port', 23), username, password)
+        if key not in _pools.keys():
+            _pools[key] = OLTSessionPool(ip, username, password, **kwargs)
+
+        return _pools[key]
+
+__all__ = [
+
+    'OLTSessionPool',
+    'get_pool'
+]
@@ -0,0 +1,361 @@
+from contextlib import contextmanager
+from typing import Iterator, List, NoReturn, Optional
+
+import logging
+
+from .telnet import Connection, OLTTelnet, CommandResult, find_error
+
+logger = logging.getLogger(__name__)
+
+def is_mode_command(cmd:str) -> bool:
+    """check whether command enters a sub mode of CLI
+
+    Args:
+        cmd (str): command to check
+
+    Returns:
+        bool: True, command enters a sub mode, such as config, interface pon 1/4/8 or igmp
+    """
+    cmd = cmd.strip()
+    return cmd in ('config', 'igmp') or cmd.startswith('interface ')
+
+def is_read_command(cmd:str) -> bool:
+    """check whether command changes nothing on OLT, so it can be sent again after connection is lost
+
+    Args:
+        cmd (str): command to check
+
+    Returns:
+        bool: True, command is empty, show, terminal, exit or a mode command
+    """
+    cmd = cmd.strip()
+    return cmd in ('', 'exit') or cmd.startswith('show ') or cmd.startswith('terminal ') or is_mode_command(cmd)
+
+def can_retry(error:Exception, sent:int, cmds:List[str]) -> bool:
+    """check whether commands can be sent again after connection is reconnected
+
+    Args:
+        error (Exception): error raised while running commands
+        sent (int): commands written to connection before error
+        cmds (List[str]): commands run
+
+    Returns:
+        bool: True, connection is lost and OLT has not received any command, or all of them can be sent again
+    """
+    # OLT may still be running the command when timed out
+    if isinstance(error, TimeoutError):
+        return False
+
+    return sent == 0 or all(is_read_command(cmd) for cmd in cmds)
+
+class OLTSession(Connection):
+    """OLT Session
+
+    OLTSession keeps one authenticated OLTTelnet alive, tracks the CLI mode entered by commands and confirmed by prompt,
+    and reconnects transparently when the connection is lost before OLT receives a command.
+    Commands OLT may have received are not sent again, except the ones changing nothing, the error is raised instead
+    """
+
+    def __init__(self, ip:str, username:str, password:str, **kwargs) -> NoReturn:
+        """init
+
+        Args:
+            ip (str): OLT ip address
+            username (str): username for connection
+            password (str): password for connection
+            kwargs: other arguments passed to OLTTelnet
+        """
+        # save information need for connection
+        self._ip = ip
+        self._username = username
+        self._password = password
+        self._kwargs = kwargs
+
+        # telnet connection
+        self._telnet = None
+
+        # mode commands entered from admin mode, such as ['config', 'interface pon 1/4/8']
+        self._modes = [ ]
+        # mode shown in prompt after each mode command, such as ['config', 'config-pon-1/4/8']
+        self._prompts = [ ]
+
+        # when not None, the session is replaying the mode commands of a new user from the position of cursor
+        self._cursor = None
+
+        # nested level of checkout
+        self._depth = 0
+
+    @property
+    def modes(self) -> List[str]:
+        """mode commands entered from admin mode
+
+        Returns:
+            List[str]: mode commands, empty list means admin mode
+        """
+        return list(self._modes)
+
+    @property
+    def connected(self) -> bool:
+        """whether telnet connection is opened
+
+        Returns:
+            bool: True, connected
+        """
+        return self._telnet != None
+
+    def connect(self) -> NoReturn:
+        """connect OLT with given information
+        """
+        self.disconnect()
+
+        self._telnet = OLTTelnet(self._ip, self._username, self._password, **self._kwargs)
+        self._telnet.connect()
+        self._modes = [ ]
+        self._prompts = [ ]
+
+    def disconnect(self) -> NoReturn:
+        """disconnect with OLT
+        """
+        if self._telnet != None:
+            self._telnet.disconnect()
+            self._telnet = None
+        self._modes = [ ]
+        self._prompts = [ ]
+
+    def ping(self) -> bool:
+        """check whether connection still works by running an empty command
+
+        Returns:
+            bool: True, connection works
+        """
+        if self._telnet == None:
+            return False
+
+        try:
+            self._telnet.run('')
+            return True
+        except (EOFError, OSError):
+            return False
+
+    @contextmanager
+    def checkout(self):
+        """use session for a group of commands which begins at admin mode
+
+        Mode commands of the group that match modes already entered are skipped,
+        so successive groups in same mode pay nothing for entering it again.
+        When used nested, the mode of outer group is restored on exit.
+        """
+        saved = (list(self._modes), self._cursor)
+        self._depth = self._depth + 1
+        self._cursor = 0
+        try:
+            yield self
+        finally:
+            self._depth = self._depth - 1
+            if self._depth == 0:
+                self._cursor = None
+            else:
+                # restore modes which outer group has entered
+                modes, cursor = saved
+                self._goto(modes if cursor == None else modes[:cursor])
+                self._cursor = cursor
+
+    def run(self, cmd:str, **kwargs) -> str:
+        """run command through session
+
+        Args:
+            cmd (str): command need to run
+            kwargs: other arguments passed to OLTTelnet.run
+
+        Returns:
+            str: result to return
+        """
+        if self._cursor != None:
+            # skip mode command which is already entered
+            if is_mode_command(cmd) and self._cursor < len(self._modes) and self._modes[self._cursor] == cmd.strip():
+                self._cursor = self._cursor + 1
+                return ''
+
+            self._goto(self._modes[:self._cursor])
+            self._cursor = None
+
+        return self._run(cmd, **kwargs)
+
+    def run_iter(self, cmd:str) -> Iterator[str]:
+        """run command through session, and yield lines of result as soon as they arrive
+
+        Mode commands are run by run, so the ones already entered are skipped.
+        Connection lost before the first line arrives is reconnected and retried once when it can be, same as run.
+
+        Args:
+            cmd (str): command need to run
+
+        Returns:
+            Iterator[str]: lines of result, see OLTTelnet.run_iter
+        """
+        if is_mode_command(cmd):
+            yield from self.run(cmd).split('\r\n')
+            return
+
+        if self._cursor != None:
+            self._goto(self._modes[:self._cursor])
+            self._cursor = None
+
+        if self._telnet == None:
+            self._reconnect()
+
+        before = self._telnet.mode
+        started = False
+        try:
+            for line in self._telnet.run_iter(cmd):
+                started = True
+                yield line
+        except (EOFError, OSError) as e:
+            if started or not can_retry(e, self._telnet.sent, [ cmd ]):
+                self._drop(e)
+                raise
+            logger.warning('connection to %s lost(%s), reconnect' % (self._ip, e))
+            self._reconnect()
+            before = self._telnet.mode
+            yield from self._telnet.run_iter(cmd)
+
+        self._track(cmd, before, self._telnet.mode, None)
+
+    def run_batch(self, cmds:List[str], **kwargs) -> List[CommandResult]:
+        """run commands through session in one batch
+
+        Leading mode commands already entered are skipped,
+        the others are sent without waiting for prompt of each.
+
+        Args:
+            cmds (List[str]): commands need to run
+            kwargs: other arguments passed to OLTTelnet.run_batch
+
+        Returns:
+            List[CommandResult]: results in order of commands
+        """
+        cmds = list(cmds)
+        results = [ ]
+        while len(cmds) != 0 and self._cursor != None and self._cursor < len(self._modes) and self._modes[self._cursor] == cmds[0].strip():
+            cmd = cmds.pop(0)
+            output = self.run(cmd)
+            results.append(CommandResult(cmd, output, find_error(output)))
+
+        if len(cmds) == 0:
+            return results
+
+        if self._cursor != None:
+            self._goto(self._modes[:self._cursor])
+            self._cursor = None
+
+        if self._telnet == None:
+            self._reconnect()
+
+        before = self._telnet.mode
+        try:
+            batch = self._telnet.run_batch(cmds, **kwargs)
+        except (EOFError, OSError) as e:
+            # resending a batch partly applied would apply its commands twice
+            if not can_retry(e, self._telnet.sent, cmds):
+                self._drop(e)
+                raise
+            logger.warning('connection to %s lost(%s), reconnect' % (self._ip, e))
+            self._reconnect()
+            before = self._telnet.mode
+            batch = self._telnet.run_batch(cmds, **kwargs)
+
+        for result in batch:
+            self._track(result.cmd, before, result.mode, result.error)
+            before = result.mode
+
+        return results + batch
+
+    def _goto(self, modes:List[str]) -> NoReturn:
+        """go to given modes from current modes
+
+        Args:
+            modes (List[str]): mode commands entered from admin mode
+        """
+        same = 0
+        while same < len(modes) and same < len(self._modes) and modes[same] == self._modes[same]:
+            same = same + 1
+
+        while len(self._modes) > same:
+            self._run('exit')
+
+        for mode in modes[same:]:
+            self._run(mode)
+
+    def _run(self, cmd:str, **kwargs) -> str:
+        """run command, reconnect and retry once if connection is lost and command can be sent again
+
+        Args:
+            cmd (str): command need to run
+
+        Returns:
+            str: result to return
+        """
+        if self._telnet == None:
+            self._reconnect()
+
+        before = self._telnet.mode
+        try:
+            ret = self._telnet.run(cmd, **kwargs)
+        except (EOFError, OSError) as e:
+            if not can_retry(e, self._telnet.sent, [ cmd ]):
+                self._drop(e)
+                raise
+            logger.warning('connection to %s lost(%s), reconnect' % (self._ip, e))
+            self._reconnect()
+            before = self._telnet.mode
+            ret = self._telnet.run(cmd, **kwargs)
+
+        self._track(cmd, before, self._telnet.mode, find_error(ret))
+        return ret
+
+    def _reconnect(self) -> NoReturn:
+        """reconnect OLT and enter modes entered before
+        """
+        modes = self._modes
+        self.connect()
+        for mode in modes:
+            before = self._telnet.mode
+            output = self._telnet.run(mode)
+            self._track(mode, before, self._telnet.mode, find_error(output))
+
+    def _drop(self, error:Exception) -> NoReturn:
+        """close connection in unknown state, modes are kept and entered again on next command
+
+        Args:
+            error (Exception): error raised by connection
+        """
+        logger.warning('connection to %s failed(%s) after command is sent, not retried' % (self._ip, error))
+        if self._telnet != None:
+            self._telnet.disconnect()
+            self._telnet = None
+
+    def _track(self, cmd:str, before:Optional[str], after:Optional[str], error:Optional[str]) -> NoReturn:
+        """track mode changed by command, confirmed by mode shown in prompt
+
+        Args:
+            cmd (str): command has run
+            before (str): mode shown in prompt before command, None in admin mode
+            after (str): mode shown in prompt after command, None in admin mode
+            error (str): error in result of command, None if accepted
+        """
+        cmd = cmd.strip()
+        if after == None:
+            self._modes, self._prompts = [ ], [ ]
+        elif is_mode_command(cmd) and error == None and after != before:
+            self._modes.append(cmd)
+            self._prompts.append(after)
+        else:
+            # rejected mode command changes nothing, exit and others go back to the mode shown in prompt
+            while len(self._prompts) != 0 and self._prompts[-1] != after:
+                self._modes.pop()
+                self._prompts.pop()
+
+__all__ = [
+
+    'OLTSession'
+]
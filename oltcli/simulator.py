@@ -0,0 +1,966 @@
+from typing import Callable, Dict, List, NoReturn, Optional, Pattern, Tuple
+
+import argparse
+import logging
+import re
+import socket
+import socketserver
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# (modes, compiled regex, handler) of commands emulated by OLTSimulator, registered by command decorator
+COMMANDS:List[Tuple[Tuple[str, ...], Pattern, Callable]] = [ ]
+
+# whitelist mode in command to the title shown by show whitelist
+WHITELIST_TITLES = { 'phy-id': 'Physical Address Whitelist', 'logic-id': 'Logic SN Whitelist', 'password': 'Physical Password Whitelist' }
+
+# vlan action in oltqinq-domain command to the code shown by show oltqinq-domain
+QINQ_ACTIONS = { 'add': 1, 'translation': 2, 'transparent': 3 }
+
+def command(pattern:str, *modes:str) -> Callable:
+    """register method of OLTSimulator as handler of commands matching pattern
+
+    Args:
+        pattern (str): regex matching the whole command, groups are passed to handler
+        modes (str): modes command is accepted in, 'admin', 'config' or 'pon'
+
+    Returns:
+        Callable: decorator returning the method unchanged
+    """
+    def register(func:Callable) -> Callable:
+        COMMANDS.append((modes, re.compile(pattern + '$'), func))
+        return func
+
+    return register
+
+def longest_prefix(table:Dict[str, float], cmd:str) -> Optional[float]:
+    """find value of the longest command prefix in table
+
+    Args:
+        table (dict): command prefix to value, such as { 'show authorization': 0.5 }
+        cmd (str): command, such as 'show authorization'
+
+    Returns:
+        float: value, None if no prefix matches
+    """
+    words = cmd.split()
+    for i in range(len(words), 0, -1):
+        value = table.get(' '.join(words[:i]))
+        if value != None:
+            return value
+
+    return None
+
+class SimulatedONU:
+    """Simulated ONU
+
+    SimulatedONU is an ONU connected to a PON port of OLTSimulator
+    """
+
+    def __init__(self, slot:int, pon:int, sn:str, onu_type:str='HG6243C', phy_pwd:str='', logic_id:str='', logic_pwd:str='') -> NoReturn:
+        """init
+
+        Args:
+            slot (int): slot number
+            pon (int): pon port number
+            sn (str): physical id, such as FHTT033178b0
+            onu_type (str, optional): ONU type, default is HG6243C
+            phy_pwd (str, optional): physical password, default is empty
+            logic_id (str, optional): logic id, default is empty
+            logic_pwd (str, optional): logic password, default is empty
+        """
+        self.slot = slot
+        self.pon = pon
+        self.sn = sn
+        self.onu_type = onu_type
+        self.phy_pwd = phy_pwd
+        self.logic_id = logic_id
+        self.logic_pwd = logic_pwd
+
+        # (whitelist mode, id, checkcode) authorizing the ONU, None if not authorized
+        self.whitelist = None
+        self.onu_id = None
+
+        # time when ONU comes back online after reset
+        self.online_at = 0
+
+        # id of bandwidth profile bound, 0 is none
+        self.bandwidth_profile = 0
+        self.bandwidth = { 'upMaxband': 1250000, 'downMaxband': 2500000, 'upAssureBand': 640, 'downAssureBand': 640, 'upFixband': 0 }
+
+    @property
+    def online(self) -> bool:
+        """whether ONU is online
+
+        Returns:
+            bool: True, online
+        """
+        return time.monotonic() >= self.online_at
+
+    def whitelist_id(self, mode:str) -> str:
+        """id used to find ONU in whitelist of given mode
+
+        Args:
+            mode (str): 'phy-id', 'logic-id' or 'password'
+
+        Returns:
+            str: physical id, logic id or physical password
+        """
+        return { 'phy-id': self.sn, 'logic-id': self.logic_id, 'password': self.phy_pwd }[mode]
+
+class OLTSimulator:
+    """OLT Simulator
+
+    OLTSimulator is a local telnet server emulating the CLI of AN6000-17. It supports the login flow, config and interface pon modes,
+    and keeps authorization, whitelist, bandwidth-profile and oltqinq-domain tables, so OLTTelnet and OLTCLI_AN6K17 work against it unchanged
+    """
+
+    def __init__(self, host:str='127.0.0.1', port:int=0, username:str='GPON', password:str='GPON', hostname:str='Admin',
+                 latency:float=0, latencies:Optional[Dict[str, float]]=None, padding:Optional[Dict[str, int]]=None, reboot_time:float=3) -> NoReturn:
+        """init
+
+        Args:
+            host (str, optional): address to listen on, default is 127.0.0.1
+            port (int, optional): port to listen on, default is 0, a free port is chosen when started
+            username (str, optional): username for login, default is GPON
+            password (str, optional): password for login and enable, default is GPON
+            hostname (str, optional): hostname shown in prompt, default is Admin
+            latency (float, optional): seconds to wait before answering each command, default is 0
+            latencies (dict, optional): seconds to wait for commands starting with key instead of latency, such as { 'show authorization': 0.5 }
+            padding (dict, optional): extra lines appended to output of commands starting with key, to emulate larger outputs
+            reboot_time (float, optional): seconds ONU stays offline after onu reset, default is 3
+        """
+        self._host = host
+        self._port = port
+        self._username = username
+        self._password = password
+        self._hostname = hostname
+
+        self._latency = latency
+        self._latencies = { ' '.join(k.split()): v for k, v in (latencies or { }).items() }
+        self._padding = { ' '.join(k.split()): v for k, v in (padding or { }).items() }
+        self.reboot_time = reboot_time
+
+        # ONUs connected, indexed by position and by sn
+        self._onus:Dict[Tuple[int, int], List[SimulatedONU]] = { }
+        self._by_sn:Dict[str, SimulatedONU] = { }
+
+        # name to [ id, name, upMin, upMax, downMin, downMax, upFix ]
+        self._bandwidth_profiles:Dict[str, list] = { }
+
+        # name to { 'index', 'services', 'bound' }
+        self._qinq_domains:Dict[str, dict] = { }
+
+        # passwords in password whitelist not bound to any ONU, shown with slot, pon and onu 65535
+        self._unbound_passwords:List[str] = [ ]
+
+        self._lock = threading.RLock()
+        self._server = None
+        self._thread = None
+
+        # counters of traffic, see stats
+        self._stats = { 'logins': 0, 'commands': 0, 'round_trips': 0, 'bytes': 0 }
+
+    def __enter__(self):
+        """start server, to support with syntax
+        """
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        """stop server, to support with syntax
+        """
+        self.stop()
+
+    @property
+    def host(self) -> str:
+        """address listened on
+
+        Returns:
+            str: address
+        """
+        return self._host
+
+    @property
+    def port(self) -> int:
+        """port listened on
+
+        Returns:
+            int: port, the chosen one after started when 0 is given
+        """
+        return self._port
+
+    @property
+    def onus(self) -> List[SimulatedONU]:
+        """all ONUs connected
+
+        Returns:
+            List[SimulatedONU]: ONUs ordered by slot and pon
+        """
+        with self._lock:
+            return [ onu for key in sorted(self._onus.keys()) for onu in self._onus[key] ]
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """traffic served since started or reset_stats
+
+        logins is the number of connections logged in, commands is the number of commands run after login,
+        round_trips is the number of times the server waited for client after answering, commands written ahead are not counted,
+        bytes is the number of bytes sent to client
+
+        Returns:
+            Dict[str, int]: copy of counters
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> NoReturn:
+        """set all traffic counters to 0
+        """
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def _count(self, key:str, value:int=1) -> NoReturn:
+        """increase traffic counter
+
+        Args:
+            key (str): name of counter
+            value (int, optional): value to add, default is 1
+        """
+        with self._lock:
+            self._stats[key] += value
+
+    def start(self) -> int:
+        """start serving in a background thread
+
+        Returns:
+            int: port listened on
+        """
+        assert self._server == None, "simulator is already started"
+
+        simulator = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                simulator._serve(self.request)
+
+        self._server = socketserver.ThreadingTCPServer((self._host, self._port), Handler, bind_and_activate=False)
+        self._server.allow_reuse_address = True
+        self._server.daemon_threads = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self._port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05, ), daemon=True)
+        self._thread.start()
+        logger.debug('simulator listens on %s:%s' % (self._host, self._port))
+
+        return self._port
+
+    def stop(self) -> NoReturn:
+        """stop serving
+        """
+        if self._server != None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+    def add_onu(self, slot:int, pon:int, sn:Optional[str]=None, onu_type:str='HG6243C', phy_pwd:str='', logic_id:str='', logic_pwd:str='', authorized:bool=True) -> SimulatedONU:
+        """connect an ONU to PON port
+
+        Args:
+            slot (int): slot number
+            pon (int): pon port number
+            sn (str, optional): physical id, default is None, generated from count of ONUs
+            onu_type (str, optional): ONU type, default is HG6243C
+            phy_pwd (str, optional): physical password, default is empty
+            logic_id (str, optional): logic id, default is empty
+            logic_pwd (str, optional): logic password, default is empty
+            authorized (bool, optional): whether add it to phy-id whitelist with the lowest free onu id, default is True
+
+        Returns:
+            SimulatedONU: ONU connected
+        """
+        with self._lock:
+            if sn == None:
+                sn = 'FHTT%08x' % len(self._by_sn)
+            assert sn not in self._by_sn.keys(), "sn %s already exists" % sn
+
+            onu = SimulatedONU(slot, pon, sn, onu_type, phy_pwd, logic_id, logic_pwd)
+            self._onus.setdefault((slot, pon), [ ]).append(onu)
+            self._by_sn[sn] = onu
+
+            if authorized:
+                self._authorize(onu, ('phy-id', sn, None), None)
+
+            return onu
+
+    def populate(self, slots:int, pons:int, onus:int, authorized:bool=True, onu_type:str='HG6243C') -> List[SimulatedONU]:
+        """connect ONUs to every PON port, such as 16 slots x 16 pons x 128 onus
+
+        Args:
+            slots (int): count of slots, numbered from 1
+            pons (int): count of pon ports in each slot, numbered from 1
+            onus (int): count of ONUs on each pon port
+            authorized (bool, optional): whether add them to phy-id whitelist, default is True
+            onu_type (str, optional): ONU type, default is HG6243C
+
+        Returns:
+            List[SimulatedONU]: ONUs connected
+        """
+        return [ self.add_onu(slot, pon, onu_type=onu_type, authorized=authorized)
+                 for slot in range(1, slots + 1) for pon in range(1, pons + 1) for _ in range(onus) ]
+
+    def _serve(self, sock:socket.socket) -> NoReturn:
+        """serve one telnet connection
+
+        Args:
+            sock (socket): socket of connection
+        """
+        # data received but not read yet, and whether client is waiting for answer written last
+        buffer = bytearray()
+        answered = False
+
+        def read() -> str:
+            nonlocal answered
+            while True:
+                end = buffer.find(b'\n')
+                if end != -1:
+                    line = bytes(buffer[:end + 1])
+                    del buffer[:end + 1]
+                    return line.decode('ascii').strip()
+
+                # nothing left to read, one more round-trip when client waits for the answer
+                if answered:
+                    self._count('round_trips')
+                    answered = False
+                chunk = sock.recv(65536)
+                if not chunk:
+                    raise EOFError
+                buffer.extend(chunk)
+
+        def write(text:str):
+            nonlocal answered
+            data = text.encode('ascii')
+            sock.sendall(data)
+            self._count('bytes', len(data))
+            answered = True
+
+        try:
+            # login
+            while True:
+                write('\r\nLogin: ')
+                username = read()
+                write('\r\nPassword: ')
+                if username == self._username and read() == self._password:
+                    break
+                write('\r\nLogin incorrect.\r\n')
+
+            # admin
+            while True:
+                write('\r\nUser> ')
+                if read() == 'enable':
+                    write('\r\nPassword: ')
+                    if read() == self._password:
+                        break
+            self._count('logins')
+
+            modes = [ ]
+            write('\r\n%s# ' % self._hostname)
+            while True:
+                cmd = ' '.join(read().split())
+                self._count('commands')
+                output = self._run(modes, cmd)
+                if output == None:
+                    return
+
+                prompt = self._hostname if len(modes) == 0 else '%s(%s)' % (self._hostname, modes[-1][0])
+                write('%s\r\n%s\r\n%s# ' % (cmd, output, prompt))
+        except (EOFError, ConnectionError):
+            pass
+
+    def _run(self, modes:list, cmd:str) -> Optional[str]:
+        """run command in given modes
+
+        Args:
+            modes (list): (mode shown in prompt, pon position) of modes entered, changed by mode commands
+            cmd (str): command with spaces normalized
+
+        Returns:
+            str: output, None when connection should be closed
+        """
+        delay = longest_prefix(self._latencies, cmd)
+        delay = self._latency if delay == None else delay
+        if delay > 0:
+            time.sleep(delay)
+
+        mode = 'admin' if len(modes) == 0 else ('config' if modes[-1][1] == None else 'pon')
+
+        # mode commands
+        if cmd in ('exit', 'quit'):
+            if len(modes) == 0:
+                return None
+            modes.pop()
+            return ''
+
+        if cmd == 'config' and mode == 'admin':
+            modes.append(('config', None))
+            return ''
+
+        match = re.match(r'interface pon 1/(\d+)/(\d+)$', cmd)
+        if match and mode != 'admin':
+            slot, pon = int(match.group(1)), int(match.group(2))
+            if mode == 'pon':
+                modes.pop()
+            modes.append(('config-pon-1/%s/%s' % (slot, pon), (slot, pon)))
+            return ''
+
+        if cmd == 'terminal length 0' or cmd == '':
+            return ''
+
+        for cmdModes, exp, handler in COMMANDS:
+            if mode not in cmdModes:
+                continue
+
+            match = exp.match(cmd)
+            if match:
+                with self._lock:
+                    output = handler(self, None if mode != 'pon' else modes[-1][1], *match.groups())
+                break
+        else:
+            output = '% Unknown command.'
+
+        lines = longest_prefix(self._padding, cmd)
+        if lines != None:
+            output = '\r\n'.join([ output ] + [ '' ] * lines)
+
+        return output
+
+    def _pon_onus(self, pon:Optional[Tuple[int, int]]) -> List[Tuple[Tuple[int, int], List[SimulatedONU]]]:
+        """ONUs grouped by pon port
+
+        Args:
+            pon (tuple): (slot, pon) to show only one pon port, None for all
+
+        Returns:
+            list: ((slot, pon), ONUs) ordered by slot and pon
+        """
+        keys = sorted(self._onus.keys()) if pon == None else [ pon ]
+        return [ (key, self._onus.get(key, [ ])) for key in keys ]
+
+    def _find_onu(self, pon:Tuple[int, int], onuId:str) -> Optional[SimulatedONU]:
+        """find authorized ONU by onu id
+
+        Args:
+            pon (tuple): (slot, pon)
+            onuId (str): onu id in command
+
+        Returns:
+            SimulatedONU: ONU, None if not found
+        """
+        for onu in self._onus.get(pon, [ ]):
+            if onu.onu_id == int(onuId):
+                return onu
+
+        return None
+
+    def _authorize(self, onu:SimulatedONU, whitelist:Tuple[str, str, Optional[str]], onuId:Optional[str]) -> Optional[str]:
+        """authorize ONU by whitelist entry
+
+        Args:
+            onu (SimulatedONU): ONU to authorize
+            whitelist (tuple): (mode, id, checkcode)
+            onuId (str): onu id in command, None to use the lowest free one
+
+        Returns:
+            str: error, None if authorized
+        """
+        used = set([ other.onu_id for other in self._onus[onu.slot, onu.pon] if other.onu_id != None ])
+        if onuId == None:
+            onuId = min(set(range(1, len(used) + 2)) - used)
+        elif int(onuId) in used:
+            return '%% Onu id %s is already used.' % onuId
+
+        onu.whitelist = whitelist
+        onu.onu_id = int(onuId)
+        return None
+
+    @command(r'show authorization', 'config', 'pon')
+    def _show_authorization(self, pon:Optional[Tuple[int, int]]) -> str:
+        """show authorization, all pon ports in config mode, or the pon port entered
+        """
+        lines = [ ]
+        for (slot, port), onus in self._pon_onus(pon):
+            onus = sorted([ onu for onu in onus if onu.onu_id != None ], key=lambda onu: onu.onu_id)
+            if len(onus) == 0:
+                continue
+
+            lines.append('')
+            lines.append('A: Authorized  P: Preauthorized  R: System Reserved')
+            lines.append('')
+            lines.append('-----  ONU Auth Table, SLOT = %s, PON = %s, ITEM = %s -----' % (slot, port, len(onus)))
+            lines.append('Slot Pon Onu OnuType        ST Lic OST PhyId        PhyPwd     LogicId                  LogicPwd')
+            lines.append('---- --- --- -------------- -- --- --- ------------ ---------- ------------------------ ------------')
+            for onu in onus:
+                lines.append('%-4s %-3s %-3s %-14s %-2s %-3s %-3s %-12s %-10s %-24s %-12s' % (slot, port, onu.onu_id, onu.onu_type, 'A', 0, 'up' if onu.online else 'dn',
+                             onu.sn, onu.phy_pwd, onu.logic_id, onu.logic_pwd))
+
+        return '\r\n'.join(lines)
+
+    def _show_discovery(self, pon:Optional[Tuple[int, int]]) -> str:
+        """table of ONUs found but not authorized
+        """
+        lines = [ ]
+        for (slot, port), onus in self._pon_onus(pon):
+            onus = [ onu for onu in onus if onu.onu_id == None ]
+            lines.append('----- ONU Unauth Table, SLOT = %s, PON = %s, ITEM = %s -----' % (slot, port, len(onus)))
+            if len(onus) == 0:
+                continue
+
+            lines.append('No  OnuType        PhyId        PhyPwd     LogicId                  LogicPwd     Why')
+            lines.append('--- -------------- ------------ ---------- ------------------------ ------------ ---')
+            for i, onu in enumerate(onus):
+                lines.append('%-3s %-14s %-12s %-10s %-24s %-12s %-3s' % (i + 1, onu.onu_type, onu.sn, onu.phy_pwd, onu.logic_id, onu.logic_pwd, 1))
+
+        return '\r\n'.join(lines)
+
+    @command(r'show discovery', 'config')
+    def _show_discovery_all(self, pon:None) -> str:
+        """show discovery
+        """
+        return self._show_discovery(None)
+
+    @command(r'show onu discovered', 'pon')
+    def _show_onu_discovered(self, pon:Tuple[int, int]) -> str:
+        """show onu discovered
+        """
+        return self._show_discovery(pon)
+
+    @command(r'show whitelist (phy-id|logic-id|password)', 'config', 'pon')
+    def _show_whitelist(self, pon:Optional[Tuple[int, int]], mode:str) -> str:
+        """show whitelist <phy-id|logic-id|password>, format differs between config mode and interface pon mode
+        """
+        lines = [ ]
+        if pon == None:
+            lines.append(' ----- %s -----' % WHITELIST_TITLES[mode])
+            lines.append({ 'phy-id': 'Slot  Pon   Onu   Onu-Type       Phy-ID       Phy-Pwd    Used',
+                           'logic-id': 'Slot  Pon   Onu   Onu-Type       Logic-Id                 Logic-Pwd    En Used',
+                           'password': 'Slot  Pon   Onu   Onu-Type       Phy-Pwd    En Used' }[mode])
+            lines.append({ 'phy-id': '----- ----- ----- -------------- ------------ ---------- ----',
+                           'logic-id': '----- ----- ----- -------------- ------------------------ ------------ -- ----',
+                           'password': '----- ----- ----- -------------- ---------- -- ----' }[mode])
+        else:
+            lines.append(' ----- %s-----' % WHITELIST_TITLES[mode])
+            lines.append({ 'phy-id': 'PHYID        PHYPWD     SLOT  PON   ONU   TYPE           EN  USED',
+                           'logic-id': 'LOGICId                  LOGICPWD     SLOT  PON   ONU   TYPE           EN  USED',
+                           'password': 'PHYPWD     SLOT  PON   ONU   TYPE           EN  USED' }[mode])
+            lines.append({ 'phy-id': '------------ ---------- ----- ----- ----- -------------- --- ----',
+                           'logic-id': '------------------------ ------------ ----- ----- ----- -------------- --- ----',
+                           'password': '---------- ----- ----- ----- -------------- --- ----' }[mode])
+
+        count = 0
+        for (slot, port), onus in self._pon_onus(pon):
+            for onu in sorted([ onu for onu in onus if onu.whitelist != None and onu.whitelist[0] == mode ], key=lambda onu: onu.onu_id):
+                _, id, checkcode = onu.whitelist
+                checkcode = '' if checkcode == None else checkcode
+                count = count + 1
+                if pon == None:
+                    if mode == 'phy-id':
+                        lines.append('%-5s %-5s %-5s %-14s %-12s %-10s %-4s' % (slot, port, onu.onu_id, onu.onu_type, id, checkcode, 'Y'))
+                    elif mode == 'logic-id':
+                        lines.append('%-5s %-5s %-5s %-14s %-24s %-12s %-2s %-4s' % (slot, port, onu.onu_id, onu.onu_type, id, checkcode, 'Y', 'Y'))
+                    else:
+                        lines.append('%-5s %-5s %-5s %-14s %-10s %-2s %-4s' % (slot, port, onu.onu_id, onu.onu_type, id, 'Y', 'Y'))
+                else:
+                    if mode == 'phy-id':
+                        lines.append('%-12s %-10s %-5s %-5s %-5s %-14s %-3s %-4s' % (id, checkcode, slot, port, onu.onu_id, onu.onu_type, 'EN', 'YES'))
+                    elif mode == 'logic-id':
+                        lines.append('%-24s %-12s %-5s %-5s %-5s %-14s %-3s %-4s' % (id, checkcode, slot, port, onu.onu_id, onu.onu_type, 'EN', 'YES'))
+                    else:
+                        lines.append('%-10s %-5s %-5s %-5s %-14s %-3s %-4s' % (id, slot, port, onu.onu_id, onu.onu_type, 'EN', 'YES'))
+
+        if pon == None and mode == 'password':
+            for password in self._unbound_passwords:
+                lines.append('%-5s %-5s %-5s %-14s %-10s %-2s %-4s' % (65535, 65535, 65535, 'null', password, 'Y', 'N'))
+
+        if pon != None:
+            lines.append('--------------------------------')
+            lines.append('SLOT: %s PON: %s ITEM: %s' % (pon[0], pon[1], count))
+
+        return '\r\n'.join(lines)
+
+    @command(r'whitelist add (phy-id|logic-id|password) (\S+)(?: checkcode (\S+))?(?: onuid (\d+))?', 'config', 'pon')
+    def _whitelist_add(self, pon:Optional[Tuple[int, int]], mode:str, id:str, checkcode:Optional[str], onuId:Optional[str]) -> str:
+        """whitelist add <phy-id|logic-id|password> <id> [checkcode <checkcode>] [onuid <onuid>], authorizes the ONU found
+        """
+        for _, onus in self._pon_onus(pon):
+            for onu in onus:
+                if onu.onu_id == None and onu.whitelist_id(mode) == id:
+                    if checkcode != None and checkcode != { 'phy-id': onu.phy_pwd, 'logic-id': onu.logic_pwd, 'password': None }[mode]:
+                        return '% Checkcode is not match.'
+
+                    error = self._authorize(onu, (mode, id, checkcode), onuId)
+                    return '' if error == None else error
+
+        if pon == None and mode == 'password' and onuId == None:
+            # password is kept until an ONU with it is found
+            if id not in self._unbound_passwords:
+                self._unbound_passwords.append(id)
+            return ''
+
+        return '% The onu is not exist.'
+
+    @command(r'no whitelist (phy-id|logic-id|password) (\d+) (\d+) (\S+)', 'config')
+    def _no_whitelist(self, pon:None, mode:str, slot:str, port:str, id:str) -> str:
+        """no whitelist <phy-id|logic-id|password> <slot> <pon> <id>, the ONU goes back to discovery
+        """
+        if mode == 'password' and int(slot) == 65535 and int(port) == 65535 and id in self._unbound_passwords:
+            self._unbound_passwords.remove(id)
+            return ''
+
+        for onu in self._onus.get((int(slot), int(port)), [ ]):
+            if onu.whitelist != None and onu.whitelist[0] == mode and onu.whitelist[1] == id:
+                onu.whitelist, onu.onu_id = None, None
+                return ''
+
+        return '% The whitelist is not exist.'
+
+    @command(r'no whitelist all', 'pon')
+    def _no_whitelist_all(self, pon:Tuple[int, int]) -> str:
+        """no whitelist all
+        """
+        for onu in self._onus.get(pon, [ ]):
+            onu.whitelist, onu.onu_id = None, None
+
+        return ''
+
+    @command(r'onu reset (\d+)', 'pon')
+    def _onu_reset(self, pon:Tuple[int, int], onuId:str) -> str:
+        """onu reset <onuid>, ONU is offline for reboot_time seconds
+        """
+        onu = self._find_onu(pon, onuId)
+        if onu == None:
+            return '% Onu %s is not exist.' % onuId
+
+        onu.online_at = time.monotonic() + self.reboot_time
+        return ''
+
+    def _add_bandwidth_profile(self, name:str, usPir:str, dsPir:str, usCir:str, dsCir:str, usFir:str) -> str:
+        """add bandwidth profile with the lowest free id
+        """
+        if name in self._bandwidth_profiles.keys():
+            return '% The profile name already exists.'
+
+        used = set([ profile[0] for profile in self._bandwidth_profiles.values() ])
+        id = min(set(range(1, len(used) + 2)) - used)
+        self._bandwidth_profiles[name] = [ id, name, int(usCir), int(usPir), int(dsCir), int(dsPir), int(usFir) ]
+        return ''
+
+    @command(r'bandwidth-profile add (\S+) upstream-pir (\d+) downstream-pir (\d+) upstream-cir (\d+) downstream-cir (\d+) upstream-fir (\d+)', 'config')
+    def _bandwidth_profile_add(self, pon:None, name:str, usPir:str, dsPir:str, usCir:str, dsCir:str, usFir:str) -> str:
+        """bandwidth-profile add <name> upstream-pir .. downstream-pir .. upstream-cir .. downstream-cir .. upstream-fir ..
+        """
+        return self._add_bandwidth_profile(name, usPir, dsPir, usCir, dsCir, usFir)
+
+    @command(r'bandwidth-profile add (\S+) upstream cir (\d+) pir (\d+) fir (\d+) downstream cir (\d+) pir (\d+)', 'config')
+    def _bandwidth_profile_add_rates(self, pon:None, name:str, usCir:str, usPir:str, usFir:str, dsCir:str, dsPir:str) -> str:
+        """bandwidth-profile add <name> upstream cir .. pir .. fir .. downstream cir .. pir ..
+        """
+        return self._add_bandwidth_profile(name, usPir, dsPir, usCir, dsCir, usFir)
+
+    def _find_bandwidth_profile(self, by:str, nameOrId:str) -> Optional[list]:
+        """find bandwidth profile by id or name
+        """
+        for profile in self._bandwidth_profiles.values():
+            if (by == 'id' and str(profile[0]) == nameOrId) or (by == 'name' and profile[1] == nameOrId):
+                return profile
+
+        return None
+
+    @command(r'bandwidth-profile modify (id|name) (\S+) upstream cir (\d+) pir (\d+) fir (\d+) downstream cir (\d+) pir (\d+)', 'config')
+    def _bandwidth_profile_modify(self, pon:None, by:str, nameOrId:str, usCir:str, usPir:str, usFir:str, dsCir:str, dsPir:str) -> str:
+        """bandwidth-profile modify <id|name> <nameOrId> upstream cir .. pir .. fir .. downstream cir .. pir ..
+        """
+        profile = self._find_bandwidth_profile(by, nameOrId)
+        if profile == None:
+            return '% The profile is not exist.'
+
+        profile[2:] = [ int(usCir), int(usPir), int(dsCir), int(dsPir), int(usFir) ]
+        return ''
+
+    @command(r'bandwidth-profile delete (id|name) (\S+)', 'config')
+    def _bandwidth_profile_delete(self, pon:None, by:str, nameOrId:str) -> str:
+        """bandwidth-profile delete <id|name> <nameOrId>, ONUs bound to it are unbound
+        """
+        profile = self._find_bandwidth_profile(by, nameOrId)
+        if profile == None:
+            return '% The profile is not exist.'
+
+        del self._bandwidth_profiles[profile[1]]
+        for onu in self._by_sn.values():
+            if onu.bandwidth_profile == profile[0]:
+                onu.bandwidth_profile = 0
+        return ''
+
+    @command(r'show bandwidth-profile (all|\d+)', 'config')
+    def _show_bandwidth_profile(self, pon:None, id:str) -> str:
+        """show bandwidth-profile <all|id>
+        """
+        profiles = sorted([ profile for profile in self._bandwidth_profiles.values() if id == 'all' or str(profile[0]) == id ])
+        lines = [ '-------- onubandwidth profile, num = %s --------' % len(profiles),
+                  'Id   Name                 upMin  upMax  downMin downMax upFix',
+                  '------------------------------------------------------------------' ]
+        for profile in profiles:
+            lines.append('%-4s %-20s %-6s %-6s %-6s %-6s %-6s' % tuple(profile))
+
+        return '\r\n'.join(lines)
+
+    @command(r'onu bandwidth-profile (\d+) (profile-id|profile-name) (\S+)', 'pon')
+    def _onu_bandwidth_profile(self, pon:Tuple[int, int], onuId:str, by:str, nameOrId:str) -> str:
+        """onu bandwidth-profile <onuid> <profile-id|profile-name> <nameOrId>, profile-id 0 unbinds
+        """
+        onu = self._find_onu(pon, onuId)
+        if onu == None:
+            return '% Onu %s is not exist.' % onuId
+
+        if by == 'profile-id' and nameOrId == '0':
+            onu.bandwidth_profile = 0
+            return ''
+
+        profile = self._find_bandwidth_profile('id' if by == 'profile-id' else 'name', nameOrId)
+        if profile == None:
+            return '% The profile is not exist.'
+
+        onu.bandwidth_profile = profile[0]
+        return ''
+
+    @command(r'onu bandwidth (\d+) upstream-pir (\d+) downstream-pir (\d+) upstream-cir (\d+) upstream-fir (\d+)', 'pon')
+    def _onu_bandwidth(self, pon:Tuple[int, int], onuId:str, usPir:str, dsPir:str, usCir:str, usFir:str) -> str:
+        """onu bandwidth <onuid> upstream-pir .. downstream-pir .. upstream-cir .. upstream-fir ..
+        """
+        onu = self._find_onu(pon, onuId)
+        if onu == None:
+            return '% Onu %s is not exist.' % onuId
+
+        onu.bandwidth.update({ 'upMaxband': int(usPir), 'downMaxband': int(dsPir), 'upAssureBand': int(usCir), 'upFixband': int(usFir) })
+        return ''
+
+    @command(r'show onu bandwidth (\d+)', 'pon')
+    def _show_onu_bandwidth(self, pon:Tuple[int, int], onuId:str) -> str:
+        """show onu bandwidth <onuid>
+        """
+        onu = self._find_onu(pon, onuId)
+        if onu == None:
+            return '% Onu %s is not exist.' % onuId
+
+        lines = [ 'onu: slot %s pon %s onu %s.' % (pon[0], pon[1], onuId) ]
+        for key in [ 'upMaxband', 'downMaxband', 'upAssureBand', 'downAssureBand', 'upFixband' ]:
+            lines.append('%s: %s.' % (key, onu.bandwidth[key]))
+        # prfId shown by OLT is one less than the profile id
+        lines.append('prfId: %s.' % (onu.bandwidth_profile - 1))
+
+        return '\r\n'.join(lines)
+
+    @staticmethod
+    def _qinq_service() -> dict:
+        """service of oltqinq-domain with default rules
+        """
+        return { 'type': 0, 'rule': { 'upstream': [ ], 'downstream': [ ] }, 'vlan': [ [ 65535, 255, 3, 0x8100, 255, 65535 ] for _ in range(4) ] }
+
+    @staticmethod
+    def _qinq_value(fieldId:int, value:str) -> str:
+        """encode value of classification rule as shown by show oltqinq-domain
+
+        Args:
+            fieldId (int): field id
+            value (str): value in command
+
+        Returns:
+            str: value shown, such as '00 64 00 00 00 00 00 00'
+        """
+        if fieldId in [ 12, 13, 14, 15, 22, 23 ]:
+            return value
+
+        if fieldId in [ 1, 2 ]:
+            digits = re.sub('[^0-9a-fA-F]', '', value).lower()
+            return ' '.join([ digits[i:i + 2] for i in range(0, len(digits), 2) ] + [ '00', '00' ])
+
+        digits = '%04x' % int(value, 0)
+        return ' '.join([ digits[i:i + 2] for i in range(0, len(digits), 2) ] + [ '00' ] * 6)
+
+    def _find_qinq_domain(self, nameOrIndex:str, byIndex:bool=False) -> Optional[dict]:
+        """find oltqinq-domain by name or index
+        """
+        for name, domain in self._qinq_domains.items():
+            if (byIndex and str(domain['index']) == nameOrIndex) or (not byIndex and name == nameOrIndex):
+                return domain
+
+        return None
+
+    @command(r'oltqinq-domain add (\S+)', 'config')
+    def _oltqinq_domain_add(self, pon:None, name:str) -> str:
+        """oltqinq-domain add <name>
+        """
+        if name in self._qinq_domains.keys():
+            return '% The domain already exists.'
+
+        used = set([ domain['index'] for domain in self._qinq_domains.values() ])
+        index = min(set(range(1, len(used) + 2)) - used)
+        self._qinq_domains[name] = { 'name': name, 'index': index, 'services': [ ], 'bound': set() }
+        return ''
+
+    @command(r'oltqinq-domain delete (\S+)', 'config')
+    def _oltqinq_domain_delete(self, pon:None, name:str) -> str:
+        """oltqinq-domain delete <name>
+        """
+        if self._qinq_domains.pop(name, None) == None:
+            return '% The domain is not exist.'
+
+        return ''
+
+    @command(r'oltqinq-domain modify (\S+) service-count (\d+)', 'config')
+    def _oltqinq_domain_service_count(self, pon:None, name:str, count:str) -> str:
+        """oltqinq-domain modify <name> service-count <count>
+        """
+        domain = self._find_qinq_domain(name)
+        if domain == None:
+            return '% The domain is not exist.'
+
+        services = domain['services'][:int(count)]
+        domain['services'] = services + [ self._qinq_service() for _ in range(int(count) - len(services)) ]
+        return ''
+
+    @command(r'oltqinq-domain modify (\S+) service (\d+) type (single|share)', 'config')
+    def _oltqinq_domain_service_type(self, pon:None, name:str, index:str, type:str) -> str:
+        """oltqinq-domain modify <name> service <index> type <single|share>
+        """
+        domain = self._find_qinq_domain(name)
+        if domain == None or not 0 < int(index) <= len(domain['services']):
+            return '% The domain or service is not exist.'
+
+        domain['services'][int(index) - 1]['type'] = 0 if type == 'single' else 1
+        return ''
+
+    @command(r'oltqinq-domain (\S+) service (\d+) classification (upstream|downstream)((?: field-id \d+ value \S+ condition \d+)+)', 'config')
+    def _oltqinq_domain_classification(self, pon:None, name:str, index:str, stream:str, rules:str) -> str:
+        """oltqinq-domain <name> service <index> classification <upstream|downstream> field-id .. value .. condition ..
+        """
+        domain = self._find_qinq_domain(name)
+        if domain == None or not 0 < int(index) <= len(domain['services']):
+            return '% The domain or service is not exist.'
+
+        domain['services'][int(index) - 1]['rule'][stream] = [ (int(fieldId), self._qinq_value(int(fieldId), value), int(condition))
+                                                              for fieldId, value, condition in re.findall(r'field-id (\d+) value (\S+) condition (\d+)', rules) ]
+        return ''
+
+    @command(r'oltqinq-domain (\S+) service (\d+)((?: vlan \d+ user-vlanid \S+ user-cos \S+ \S+ tpid \S+ cos \S+ vlanid \S+)+)', 'config')
+    def _oltqinq_domain_vlan(self, pon:None, name:str, index:str, rules:str) -> str:
+        """oltqinq-domain <name> service <index> vlan .. user-vlanid .. user-cos .. <action> tpid .. cos .. vlanid ..
+        """
+        domain = self._find_qinq_domain(name)
+        if domain == None or not 0 < int(index) <= len(domain['services']):
+            return '% The domain or service is not exist.'
+
+        def number(value:str, null:int) -> int:
+            return null if value == 'null' else int(value, 0)
+
+        vlan = domain['services'][int(index) - 1]['vlan']
+        for layer, oldVlan, oldCos, action, tpid, cos, newVlan in re.findall(r'vlan (\d+) user-vlanid (\S+) user-cos (\S+) (\S+) tpid (\S+) cos (\S+) vlanid (\S+)', rules):
+            if action not in QINQ_ACTIONS.keys() or not 0 < int(layer) <= len(vlan):
+                return '% Invalid vlan rule.'
+            vlan[int(layer) - 1] = [ number(oldVlan, 65535), number(oldCos, 255), QINQ_ACTIONS[action], number(tpid, 0x8100), number(cos, 255), number(newVlan, 65535) ]
+
+        return ''
+
+    @command(r'show oltqinq-domain bound-info (\S+)', 'config', 'pon')
+    def _show_oltqinq_domain_bound_info(self, pon:Optional[Tuple[int, int]], name:str) -> str:
+        """show oltqinq-domain bound-info <name>
+        """
+        domain = self._find_qinq_domain(name)
+        if domain == None:
+            return '% The domain is not exist.'
+
+        return '\r\n'.join([ 'Pon bound info: slot id: %s; pon id: %s.' % bound for bound in sorted(domain['bound']) if pon == None or bound == pon ])
+
+    @command(r'show oltqinq-domain (?:index (\d+)|(\S+))', 'config')
+    def _show_oltqinq_domain(self, pon:None, index:Optional[str], name:Optional[str]) -> str:
+        """show oltqinq-domain <name> / index <index>
+        """
+        domain = self._find_qinq_domain(index, True) if index != None else self._find_qinq_domain(name)
+        if domain == None:
+            return '% The domain is not exist.'
+
+        lines = [ '------------------QinQ domain [%s] information------------------' % domain['name'],
+                  'Domain index: %-9s Service num: %s' % (domain['index'], len(domain['services'])) ]
+        for no, service in enumerate(domain['services'], 1):
+            lines.append('')
+            lines.append('Service type: %-9s Service ID: %s' % (service['type'], no))
+            for stream in [ 'upstream', 'downstream' ]:
+                lines.append('Service[%s] %s rule:' % (no, stream))
+                for fieldId, value, condition in service['rule'][stream]:
+                    lines.append('Type[%02d]    val[%s]    opt[%s]' % (fieldId, value, condition))
+            lines.append('Service[%s] vlan information:' % no)
+            for layer, (oldVlan, oldCos, action, tpid, cos, newVlan) in enumerate(service['vlan'], 1):
+                lines.append('Layer %s: oldvlan[%s] oldcos[%s] action[%s] tpid[0x%x] cos[%s] newvlan[%s]' % (layer, oldVlan, oldCos, action, tpid, cos, newVlan))
+
+        return '\r\n'.join(lines)
+
+    @command(r'oltqinq-domain (\S+)', 'pon')
+    def _oltqinq_domain_bind(self, pon:Tuple[int, int], name:str) -> str:
+        """oltqinq-domain <name> in interface pon mode, binds domain to the pon port
+        """
+        domain = self._find_qinq_domain(name)
+        if domain == None:
+            return '% The domain is not exist.'
+
+        domain['bound'].add(pon)
+        return ''
+
+    @command(r'no oltqinq-domain (\S+)', 'pon')
+    def _oltqinq_domain_unbind(self, pon:Tuple[int, int], name:str) -> str:
+        """no oltqinq-domain <name> in interface pon mode
+        """
+        domain = self._find_qinq_domain(name)
+        if domain == None or pon not in domain['bound']:
+            return '% The domain is not bound.'
+
+        domain['bound'].discard(pon)
+        return ''
+
+def main():
+    """run simulator from command line, such as python -m oltcli.simulator --port 2323 --slots 16 --pons 16 --onus 128
+    """
+    argParser = argparse.ArgumentParser(description='AN6000-17 CLI simulator')
+    argParser.add_argument('--host', default='127.0.0.1')
+    argParser.add_argument('--port', type=int, default=2323)
+    argParser.add_argument('--username', default='GPON')
+    argParser.add_argument('--password', default='GPON')
+    argParser.add_argument('--slots', type=int, default=1)
+    argParser.add_argument('--pons', type=int, default=16)
+    argParser.add_argument('--onus', type=int, default=8, help='ONUs on each pon port')
+    argParser.add_argument('--latency', type=float, default=0, help='seconds to wait before answering each command')
+    argParser.add_argument('--reboot-time', type=float, default=3, help='seconds ONU stays offline after onu reset')
+    args = argParser.parse_args()
+
+    simulator = OLTSimulator(args.host, args.port, args.username, args.password, latency=args.latency, reboot_time=args.reboot_time)
+    simulator.populate(args.slots, args.pons, args.onus)
+    simulator.start()
+    print('AN6000-17 simulator with %s ONUs listens on %s:%s' % (len(simulator.onus), simulator.host, simulator.port))
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        simulator.stop()
+
+__all__ = [
+
+    'OLTSimulator',
+    'SimulatedONU'
+]
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+from typing import Dict, Iterator, List, NoReturn, Optional, Tuple
+
+import time
+
+class ONUIndex:
+    """ONU Index
+
+    ONUIndex indexes ONU entries of one table by PhyId, LogicId, (slot, pon, onu) and ONU type,
+    so each lookup takes constant time instead of scanning the table
+    """
+
+    def __init__(self, entries:List[dict], position_keys:Tuple[str, str, Optional[str]]=('Slot', 'Pon', 'Onu')) -> NoReturn:
+        """init
+
+        Args:
+            entries (List[dict]): entries returned by extract_authorization or extract_discovery
+            position_keys (tuple, optional): keys of slot, pon and onu id in entry, default is ('Slot', 'Pon', 'Onu'). onu id key is None for table without onu id, such as discovery
+        """
+        self._entries = entries
+        self._position_keys = position_keys
+
+        # first entry wins, same as scanning the table from top
+        self._by_phy_id:Dict[str, dict] = { }
+        self._by_logic_id:Dict[str, dict] = { }
+        self._by_position:Dict[Tuple[int, int, int], dict] = { }
+        self._by_type:Dict[str, List[dict]] = { }
+
+        slotKey, ponKey, onuKey = position_keys
+        for entry in entries:
+            if entry.get('PhyId') != None:
+                self._by_phy_id.setdefault(entry['PhyId'], entry)
+            if entry.get('LogicId') != None:
+                self._by_logic_id.setdefault(entry['LogicId'], entry)
+            if onuKey != None:
+                self._by_position.setdefault((entry[slotKey], entry[ponKey], entry[onuKey]), entry)
+            self._by_type.setdefault(entry.get('OnuType'), [ ]).append(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._entries)
+
+    def __contains__(self, sn:str) -> bool:
+        return sn in self._by_phy_id
+
+    @property
+    def entries(self) -> List[dict]:
+        """entries of table
+
+        Returns:
+            List[dict]: entries, in the order shown by OLT
+        """
+        return list(self._entries)
+
+    def get_by_phy_id(self, sn:str) -> Optional[dict]:
+        """find entry by PhyId
+
+        Args:
+            sn (str): ONU SN
+
+        Returns:
+            dict: entry, None if not found
+        """
+        return self._by_phy_id.get(sn)
+
+    def get_by_logic_id(self, logicId:str) -> Optional[dict]:
+        """find entry by LogicId
+
+        Args:
+            logicId (str): ONU logic id
+
+        Returns:
+            dict: entry, None if not found
+        """
+        return self._by_logic_id.get(logicId)
+
+    def get_by_position(self, slot:int, pon:int, onu:int) -> Optional[dict]:
+        """find entry by position
+
+        Args:
+            slot (int): slot number
+            pon (int): pon port number
+            onu (int): onu id
+
+        Returns:
+            dict: entry, None if not found
+        """
+        return self._by_position.get((slot, pon, onu))
+
+    def get_by_type(self, onuType:str) -> List[dict]:
+        """find entries by ONU type
+
+        Args:
+            onuType (str): ONU type, such as HG6243C
+
+        Returns:
+            List[dict]: entries, empty list if not found
+        """
+        return list(self._by_type.get(onuType, [ ]))
+
+    def locate(self, sn:str) -> Optional[Tuple[int, int, Optional[int]]]:
+        """find position of ONU by PhyId
+
+        Args:
+            sn (str): ONU SN
+
+        Returns:
+            tuple: (slot, pon, onu), onu is None for table without onu id. None if not found
+        """
+        entry = self._by_phy_id.get(sn)
+        if entry == None:
+            return None
+
+        slotKey, ponKey, onuKey = self._position_keys
+        return entry[slotKey], entry[ponKey], None if onuKey == None else entry[onuKey]
+
+class AuthorizationSnapshot(ONUIndex):
+    """Authorization Snapshot
+
+    AuthorizationSnapshot is the ONUIndex of authorization table parsed from one show authorization,
+    it remembers when it was taken
+    """
+
+    def __init__(self, entries:List[dict]) -> NoReturn:
+        """init
+
+        Args:
+            entries (List[dict]): entries returned by extract_authorization
+        """
+        super().__init__(entries)
+        self._created = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        """seconds since snapshot was taken
+
+        Returns:
+            float: age in seconds
+        """
+        return time.monotonic() - self._created
+
+__all__ = [
+
+    'ONUIndex',
+    'AuthorizationSnapshot'
+]
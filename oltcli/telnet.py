@@ -1,11 +1,70 @@
 from abc import ABC, abstractmethod
-from typing import NoReturn
+from typing import Iterator, List, NamedTuple, NoReturn, Optional, Pattern
 
 from telnetlib import Telnet
 import logging
+import re
+import selectors
 
 logger = logging.getLogger(__name__)
 
+# prompts during login
+LOGIN_PROMPT_EXP = re.compile(rb'Login: ?')
+PASSWORD_PROMPT_EXP = re.compile(rb'Password: ?')
+USER_PROMPT_EXP = re.compile(rb'User> ?')
+
+# prompt of admin mode before hostname is known, such as 'Admin# ' or 'Admin(config)# '
+ADMIN_PROMPT_EXP = re.compile(rb'(?:^|\r\n)(?P<hostname>[^\s#>()]+)(?:\((?P<mode>[^)\r\n]*)\))?# ')
+
+# longest prompt expected, used to search prompt only in the tail of rolling buffer
+MAX_PROMPT_LEN = 256
+
+# lines of result telling command is rejected, such as '% Unknown command.' or 'Error: onu is not exist'
+ERROR_EXP = re.compile(r'^\s*(?:%.*|error\b.*|.*\bcommand executes? fail.*|.*\bexecute failed.*)$', re.IGNORECASE | re.MULTILINE)
+
+# commands sent before their prompts come back in run_batch
+DEFAULT_BATCH_WINDOW = 32
+
+class CommandResult(NamedTuple):
+    """result of one command in batch
+    """
+    cmd:str
+    output:str
+    error:Optional[str]
+    mode:Optional[str] = None         # mode shown in prompt after command, None in admin mode or when unknown
+
+    @property
+    def ok(self) -> bool:
+        """whether command is accepted by OLT
+
+        Returns:
+            bool: True, no error found in output
+        """
+        return self.error == None
+
+def find_error(output:str) -> Optional[str]:
+    """find error in result of command
+
+    Args:
+        output (str): result of command
+
+    Returns:
+        str: first line telling error, None if command is accepted
+    """
+    match = ERROR_EXP.search(output)
+    return None if match == None else match.group(0).strip()
+
+def compile_prompt(hostname:str) -> Pattern:
+    """compile regex matching every prompt after command of given host
+
+    Args:
+        hostname (str): hostname shown in prompt, such as 'Admin'
+
+    Returns:
+        Pattern: compiled regex, group 'mode' is the mode shown in prompt, such as 'config'
+    """
+    return re.compile(rb'(?:^|\r\n)' + re.escape(hostname.encode('ascii')) + rb'(?:\((?P<mode>[^)\r\n]*)\))?# |User> |Login: |Password: ')
+
 class Connection(ABC):
     """Connection Class
     
@@ -46,6 +105,33 @@ class Connection(ABC):
         """
         pass
 
+    def run_iter(self, cmd:str, **kwargs) -> Iterator[str]:
+        """run command, and yield lines of result
+
+        Args:
+            cmd (str): command to run
+
+        Returns:
+            Iterator[str]: lines of result without line break
+        """
+        return iter(self.run(cmd, **kwargs).split('\r\n'))
+
+    def run_batch(self, cmds:List[str], **kwargs) -> List[CommandResult]:
+        """run commands in order, and check error of each
+
+        Args:
+            cmds (List[str]): commands to run
+
+        Returns:
+            List[CommandResult]: results in order of commands
+        """
+        results = [ ]
+        for cmd in cmds:
+            output = self.run(cmd, **kwargs)
+            results.append(CommandResult(cmd, output, find_error(output)))
+
+        return results
+
     def __del__(self):
         """disconnect when free
         """
@@ -57,25 +143,70 @@ class OLTTelnet(Connection):
     OLTTelnet represents a telnet connection with OLT
     """
 
-    def __init__(self, ip:str, username:str, password:str, read_interval:int=1) -> NoReturn:
+    def __init__(self, ip:str, username:str, password:str, read_interval:int=1, timeout:Optional[float]=30, port:int=23) -> NoReturn:
         """init
 
         Args:
             ip (str): OLT ip address
             username (str): username for connection
             password (str): password for connection
+            read_interval (int, optional): not used any more, reading ends as soon as prompt arrives, kept for compatibility
+            timeout (float, optional): seconds to wait for more data before giving up, default is 30, None is waiting forever
+            port (int, optional): telnet port of OLT, default is 23
         """
         # save information need for connection
         self._ip = ip
+        self._port = port
         self._username = username
         self._password = password
 
         # save read interval
         self._read_interval = read_interval
+        self._timeout = timeout
 
         # telnet client
         self._telnet = None
 
+        # data received but not consumed yet
+        self._buffer = bytearray()
+
+        # prompt regex, compiled with hostname after login
+        self._prompt_exp = None
+
+        # hostname and mode in last prompt
+        self._hostname = None
+        self._mode = None
+
+        # commands written by last run, run_iter or run_batch
+        self._sent = 0
+
+    @property
+    def hostname(self) -> Optional[str]:
+        """hostname shown in prompt
+
+        Returns:
+            str: hostname, None if not logged in
+        """
+        return self._hostname
+
+    @property
+    def mode(self) -> Optional[str]:
+        """mode shown in last prompt
+
+        Returns:
+            str: mode such as 'config' or 'config-pon-1/4/8', None in admin mode
+        """
+        return self._mode
+
+    @property
+    def sent(self) -> int:
+        """commands written to connection by last run, run_iter or run_batch, 0 means OLT has not received any of them
+
+        Returns:
+            int: count of commands written
+        """
+        return self._sent
+
     def connect(self):
         """connect OLT with given information
         """
@@ -85,7 +216,8 @@ class OLTTelnet(Connection):
             self._telnet = None
 
         # connect telnet server
-        self._telnet = Telnet(self._ip, 23)
+        self._telnet = Telnet(self._ip, self._port)
+        self._buffer = bytearray()
 
         self._login()
         self._admin()
@@ -99,26 +231,72 @@ class OLTTelnet(Connection):
         assert self._telnet != None
 
         # input en
-        self._telnet.read_until(b"User>", self._read_interval).decode("ascii")
+        self._read_until_prompt(USER_PROMPT_EXP)
         self._telnet.write("enable".encode('ascii') + b"\n")
 
         # input password
-        self._telnet.read_until(b"Password:", self._read_interval)
+        self._read_until_prompt(PASSWORD_PROMPT_EXP)
         self._telnet.write(self._password.encode('ascii') + b"\n")
 
+        # learn hostname from the first prompt of admin mode
+        _, match = self._read_until_prompt(ADMIN_PROMPT_EXP)
+        self._hostname = match.group('hostname').decode('ascii')
+        self._mode = None if match.group('mode') == None else match.group('mode').decode('ascii')
+        self._prompt_exp = compile_prompt(self._hostname)
+
     def _login(self):
         """login
         """
         assert self._telnet != None
 
         # input username
-        self._telnet.read_until(b"Login:", self._read_interval)
+        self._read_until_prompt(LOGIN_PROMPT_EXP)
         self._telnet.write(self._username.encode('ascii') + b"\n")
 
         # input password
-        self._telnet.read_until(b"Password:", self._read_interval)
+        self._read_until_prompt(PASSWORD_PROMPT_EXP)
         self._telnet.write(self._password.encode('ascii') + b"\n")
 
+    def _read_until_prompt(self, exp:Pattern):
+        """read until prompt matched, return as soon as it arrives
+
+        Args:
+            exp (Pattern): compiled regex of prompt
+
+        Returns:
+            tuple: (data, match), data is bytes read including prompt, match is the match object of prompt
+        """
+        start = 0
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._telnet, selectors.EVENT_READ)
+            while True:
+                # search prompt only in data not searched before
+                match = exp.search(self._buffer, start)
+                if match:
+                    # match again on a copy, buffer is changed below
+                    data = bytes(self._buffer[:match.end()])
+                    match = exp.match(data, match.start())
+                    del self._buffer[:match.end()]
+                    return data, match
+
+                start = max(0, len(self._buffer) - MAX_PROMPT_LEN)
+                self._receive(selector)
+
+    def _receive(self, selector:selectors.BaseSelector):
+        """append data already received to buffer, or wait until more data arrives
+
+        Args:
+            selector (BaseSelector): selector with telnet registered for reading
+        """
+        chunk = self._telnet.read_very_eager()
+        if chunk:
+            self._buffer += chunk
+            return
+
+        # wait for more data
+        if not selector.select(self._timeout):
+            raise TimeoutError('no prompt from %s in %s seconds, received: %s' % (self._ip, self._timeout, bytes(self._buffer[-MAX_PROMPT_LEN:])))
+
     def disconnect(self):
         """disconnect with OLT
         """
@@ -141,7 +319,8 @@ class OLTTelnet(Connection):
             raise RuntimeError("need connect OLT first")
 
         # before run command, should read out last result in buffer
-        self._telnet.read_until(b"# ", self._read_interval).decode("ascii")
+        self._sent = 0
+        self._drain()
 
         # run command
         if append_return:
@@ -149,23 +328,125 @@ class OLTTelnet(Connection):
         else:
             cmdBytes = cmd.encode('ascii')
         self._telnet.write(cmdBytes)
+        self._sent = 1
+
+        return self._read_result()
+
+    def run_iter(self, cmd:str) -> Iterator[str]:
+        """run command through telnet connection, and yield lines of result as soon as they arrive
+
+        Parsing can go on while the rest of a large result is still on the way, and the whole result is never held in memory.
+        When iteration stops early, the rest of result is read and dropped, so the connection is ready for next command.
+
+        Args:
+            cmd (str): command need to run
+
+        Returns:
+            Iterator[str]: lines of result without echo of command, prompt and line break, same as lines of run
+        """
+        if(self._telnet == None):
+            raise RuntimeError("need connect OLT first")
+
+        # before run command, should read out last result in buffer
+        self._sent = 0
+        self._drain()
+
+        self._telnet.write(cmd.encode('ascii') + b"\r\n")
+        self._sent = 1
+
+        # buffer always begins at the beginning of a line, first line is echo of command
+        echo = True
+        done = False
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(self._telnet, selectors.EVENT_READ)
+                while not done:
+                    match = self._prompt_exp.search(self._buffer)
+                    if match:
+                        # last line ends where prompt begins, none if prompt follows line break already consumed
+                        data = bytes(self._buffer[:match.start()])
+                        lines = data.split(b'\r\n') if self._buffer.startswith(b'\r\n', match.start()) else [ ]
+                        self._mode = None if match.group('mode') == None else match.group('mode').decode('ascii')
+                        del self._buffer[:match.end()]
+                        done = True
+                    else:
+                        end = self._buffer.rfind(b'\r\n')
+                        if end == -1:
+                            lines = [ ]
+                        else:
+                            lines = bytes(self._buffer[:end]).split(b'\r\n')
+                            del self._buffer[:end + 2]
+
+                    for line in lines:
+                        if echo:
+                            echo = False
+                            continue
+                        yield line.decode('ascii')
+
+                    if not done:
+                        self._receive(selector)
+        except GeneratorExit:
+            if not done and self._telnet != None:
+                # stopped early, drop the rest of result
+                _, match = self._read_until_prompt(self._prompt_exp)
+                self._mode = None if match.group('mode') == None else match.group('mode').decode('ascii')
+            raise
+
+    def run_batch(self, cmds:List[str], window:int=DEFAULT_BATCH_WINDOW) -> List[CommandResult]:
+        """run commands through telnet connection without waiting for prompt of each
+
+        Commands are written ahead of their results, at most window commands are waiting for prompt at the same time,
+        so the whole batch costs about one round-trip. Result of each command is cut from output by prompt.
+
+        Args:
+            cmds (List[str]): commands need to run
+            window (int, optional): max commands sent but not returned yet, default is 32, 1 is same as running one by one
+
+        Returns:
+            List[CommandResult]: results in order of commands, error is the line telling command is rejected
+        """
+        if(self._telnet == None):
+            raise RuntimeError("need connect OLT first")
+
+        assert window > 0, "window should be greater than 0"
+
+        # before run commands, should read out last result in buffer
+        self._sent = 0
+        self._drain()
+
+        results = [ ]
+        while len(results) < len(cmds):
+            # keep window full
+            pending = [ ]
+            while self._sent + len(pending) < len(cmds) and self._sent + len(pending) - len(results) < window:
+                pending.append(cmds[self._sent + len(pending)].encode('ascii') + b"\r\n")
+            if len(pending) != 0:
+                self._telnet.write(b''.join(pending))
+                self._sent = self._sent + len(pending)
+
+            output = self._read_result()
+            results.append(CommandResult(cmds[len(results)], output, find_error(output), self._mode))
+
+        return results
+
+    def _drain(self) -> NoReturn:
+        """read out and drop data left by last command, raise EOFError if OLT has closed the connection
+        """
+        self._buffer += self._telnet.read_very_eager()
+        if len(self._buffer) != 0:
+            logger.debug('discard unread data: %s' % bytes(self._buffer))
+            self._buffer = bytearray()
+
+    def _read_result(self) -> str:
+        """read result of one command until prompt, and remember the mode in prompt
+
+        Returns:
+            str: result without echo of command and prompt
+        """
+        data, match = self._read_until_prompt(self._prompt_exp)
+        self._mode = None if match.group('mode') == None else match.group('mode').decode('ascii')
 
-        # read result
-        output_data = [ ]
-        while(True):
-            
-            # read in every interval
-            data = self._telnet.read_until(b"# ", self._read_interval).decode("ascii")
-            output_data.append(data)
-            
-            # if read end symbols, break
-            if("# " in data \
-                or "User> " in data \
-                or "Login: " in data \
-                or "Password: " in data):
-                break
-
-        raw_output = "".join(output_data)
+        raw_output = data.decode("ascii")
         output = raw_output.split("\r\n")[1:-1]
         ret = "\r\n".join(output)
         logger.debug(ret)
@@ -175,6 +456,9 @@ class OLTTelnet(Connection):
 __all__ = [
 
     'Connection',
-    'OLTTelnet'
+    'OLTTelnet',
+    'CommandResult',
+    'compile_prompt',
+    'find_error'
 ]
 
@@ -0,0 +1,307 @@
+from typing import Callable, Dict, List, NoReturn, Optional, Tuple, Union
+
+import logging
+
+from .cli import OLTCLI_AN6K17, WhitelistMode, get_whitelist_query_str, get_whitelist_add_cmd, whitelist_contains, \
+    port_vlan_rule_to_str, bool_to_str, check_results, extract_authorization, extract_whitelist, extract_onu_port_vlan, \
+    extract_onu_bandwidth, extract_bandwidth_profile, get_onu_port_vlan_cmd, get_bandwidth_profile_str, get_onu_bandwidth_cmd
+from .snapshot import ONUIndex, AuthorizationSnapshot
+
+logger = logging.getLogger(__name__)
+
+class Transaction:
+    """配置事务
+
+    将多个ONU配置操作排队，退出with时按接口上下文排序，在一个会话中批量执行，最后统一回读验证一次。
+
+    使用示例:
+        with Transaction(oltcli) as tx:
+            tx.add_whitelist(WhitelistMode.phyid, 'FHTT000aae64')
+            tx.set_onu_port_vlan_service_count('FHTT000aae64', 1, 1)
+            tx.set_onu_port_vlan_service_vlan('FHTT000aae64', 1, 1, ('tag', 0, 33024, 1000))
+            tx.set_onu_bandwidth_profile('FHTT000aae64', 'bwp')
+    """
+
+    def __init__(self, cli:OLTCLI_AN6K17) -> NoReturn:
+        """构造函数
+
+        Args:
+            cli (OLTCLI_AN6K17): 执行事务的OLTCLI
+        """
+        self._cli = cli
+
+        # 要增加的白名单，(wlMode, sn, onuId)
+        self._whitelists:List[Tuple[WhitelistMode, str, Optional[int]]] = [ ]
+
+        # ONU的配置命令，(sn, 以ONU ID生成命令的函数)，提交时确定ONU ID后再生成命令
+        self._onu_cmds:List[Tuple[str, Callable[[int], str]]] = [ ]
+
+        # 每个ONU需要回读验证的内容
+        self._expects:Dict[str, dict] = { }
+
+        self._committed = False
+
+    def __enter__(self):
+        """支持with语法
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        """支持with语法，没有异常时提交事务
+        """
+        if exc_type == None:
+            self.commit()
+
+    def add_whitelist(self, wlMode:WhitelistMode, sn:str, onuId:Optional[int]=None) -> NoReturn:
+        """将指定的sn号的ONU增加到指定白名单中。增加白名单所需的信息在提交时统一查询自动发现的ONU。
+
+        Args:
+            wlMode (WhitelistMode): 要增加到哪个白名单
+            sn (str): ONU的SN
+            onuId (int, optional): 指定onuid，不指定自动分配。默认None，自动分配。
+        """
+        self._whitelists.append((wlMode, sn, onuId))
+
+    def set_onu_port_vlan_service_count(self, sn:str, eth:int, count:int) -> NoReturn:
+        """设置ONU Port VLAN业务个数
+
+        Args:
+            sn (str): ONU SN
+            eth (int): 要设置的ONU对应的网口
+            count (int): 要设置的业务个数
+        """
+        self._onu_cmds.append((sn, lambda onuId: get_onu_port_vlan_cmd(onuId, eth, 'count %s' % count)))
+        self._expect(sn).setdefault('count', { })[eth] = count
+
+    def set_onu_port_vlan_service_type(self, sn:str, eth:int, index:int, type:str) -> NoReturn:
+        """设置ONU Port VLAN业务类型
+
+        Args:
+            sn (str): ONU SN
+            eth (int): 网口的索引值，从1开始。
+            index (int): 业务的索引值，从1开始。
+            type (str): unicast，表示单播; multicast，表示多播。
+        """
+        self._onu_cmds.append((sn, lambda onuId: get_onu_port_vlan_cmd(onuId, eth, '%s type %s' % (index, type))))
+
+    def set_onu_port_vlan_service_vlan(self, sn:str, eth:int, index:int, rule:tuple) -> NoReturn:
+        """设置ONU Port Vlan业务
+
+        Args:
+            sn (str): ONU SN
+            eth (int): 网口的索引值，从1开始。
+            index (int): 业务的索引值，从1开始。
+            rule (tuple): LAN业务参数，参考OLTCLI_AN6K17.set_onu_port_vlan_service_vlan
+        """
+        ruleString = port_vlan_rule_to_str(rule)
+        self._onu_cmds.append((sn, lambda onuId: get_onu_port_vlan_cmd(onuId, eth, '%s %s' % (index, ruleString))))
+
+    def set_onu_port_vlan_tls(self, sn:str, eth:int, index:int, tls:bool) -> NoReturn:
+        """设置ONU Port Vlan TLS特性
+
+        Args:
+            sn (str): ONU SN
+            eth (int): ONU 端口号
+            index (int): ONU Service 索引号
+            tls (bool): 是否启用tls，True，启用，False，不启用
+        """
+        self._onu_cmds.append((sn, lambda onuId: get_onu_port_vlan_cmd(onuId, eth, '%s tls %s' % (index, bool_to_str(tls)))))
+
+    def del_onu_port_vlan_service(self, sn:str, eth:int, index:int) -> NoReturn:
+        """删除指定ONU下面指定网口的指定业务
+
+        Args:
+            sn (str): ONU SN
+            eth (int): 要删除的网口
+            index (int): 要删除的业务ID
+        """
+        self._onu_cmds.append((sn, lambda onuId: 'no ' + get_onu_port_vlan_cmd(onuId, eth, index)))
+
+    def set_onu_bandwidth_profile(self, sn:str, profileIdOrName:Union[int, str]) -> NoReturn:
+        """为ONU关联带宽模板
+
+        Args:
+            sn (str): ONU SN
+            profileIdOrName (int或str): 带宽模板的ID或者名称
+        """
+        strProfile = get_bandwidth_profile_str(profileIdOrName)
+        self._onu_cmds.append((sn, lambda onuId: 'onu bandwidth-profile %s %s' % (onuId, strProfile)))
+        self._expect(sn)['profile'] = profileIdOrName
+
+    def set_onu_bandwidth(self, sn:str, usCir:int, usPir:int, usFir:int, dsPir:int) -> NoReturn:
+        """设置ONU带宽
+
+        Args:
+            sn (str): ONU SN
+            usCir (int): upstream committed information rate
+            usPir (int): upstream peak information rate
+            usFir (int): upstream fix information rate
+            dsPir (int): downstream peak information rate
+        """
+        self._onu_cmds.append((sn, lambda onuId: get_onu_bandwidth_cmd(onuId, usCir, usPir, usFir, dsPir)))
+        self._expect(sn)['bandwidth'] = { 'upAssureBand': usCir, 'upMaxband': usPir, 'upFixband': usFir, 'downMaxband': dsPir }
+
+    def commit(self) -> NoReturn:
+        """提交事务。先增加白名单，再按PON口分组执行ONU配置，最后批量回读验证。
+
+        Raises:
+            RuntimeWarning: ONU查不到、命令执行失败或验证失败时，抛出异常
+        """
+        assert not self._committed, "事务已经提交过"
+        self._committed = True
+
+        if len(self._whitelists) == 0 and len(self._onu_cmds) == 0:
+            return
+
+        # 整个提交只登录一次
+        with self._cli.session() as conn:
+            # 增加白名单所需的ONU信息，只查一次自动发现
+            whitelistCmds = [ ]
+            whitelistIds = [ ]
+            if len(self._whitelists) != 0:
+                discovery = ONUIndex(self._cli.get_discovery(), position_keys=('SLOT', 'PON', None))
+                for wlMode, sn, onuId in self._whitelists:
+                    onuInfo = discovery.get_by_phy_id(sn)
+                    if onuInfo == None:
+                        raise RuntimeWarning('未查到该ONU(%s)信息，无法进行有效配置' % sn)
+
+                    cmd, id = get_whitelist_add_cmd(wlMode, onuInfo, onuId)
+                    whitelistCmds.append(cmd)
+                    whitelistIds.append((wlMode, id))
+
+            check_results(conn.run_batch([ 'config' ] + whitelistCmds))
+            if len(whitelistCmds) != 0:
+                self._cli.invalidate_authorization()
+
+            # 白名单生效后，读取一次授权表确定ONU位置
+            positions = { }
+            if len(self._onu_cmds) != 0:
+                snapshot = AuthorizationSnapshot(extract_authorization(conn.run('show authorization')))
+                for sn, _ in self._onu_cmds:
+                    if sn not in positions.keys():
+                        positions[sn] = snapshot.locate(sn)
+                        if positions[sn] == None:
+                            raise RuntimeWarning('查不到该ONU(%s)的授权信息，无法进行有效配置' % sn)
+
+                # 同一PON口下的命令放在一起，保持提交的先后顺序
+                groups = { }
+                for sn, build in self._onu_cmds:
+                    slot, pon, onuId = positions[sn]
+                    groups.setdefault((slot, pon), [ ]).append(build(onuId))
+
+                cmds = [ ]
+                for slotPon in sorted(groups.keys()):
+                    cmds.append('interface pon 1/%s/%s' % slotPon)
+                    cmds.extend(groups[slotPon])
+                    cmds.append('exit')
+                check_results(conn.run_batch(cmds))
+
+            # 回读验证需要的命令，一次批量执行
+            verifyCmds, keys = self._verify_cmds(whitelistIds, positions)
+            results = conn.run_batch(verifyCmds)
+
+        outputs = { key: result.output for key, result in zip(keys, results) if key != None }
+
+        failures = self._verify(whitelistIds, positions, outputs)
+        if len(failures) != 0:
+            logger.error(failures)
+            raise RuntimeWarning('事务验证失败：%s' % '，'.join(failures))
+
+    def _expect(self, sn:str) -> dict:
+        """获取ONU需要回读验证的内容
+
+        Args:
+            sn (str): ONU SN
+
+        Returns:
+            dict: 需要验证的内容
+        """
+        return self._expects.setdefault(sn, { })
+
+    def _verify_cmds(self, whitelistIds:List[tuple], positions:Dict[str, tuple]) -> Tuple[List[str], list]:
+        """生成回读验证需要执行的命令，从config模式开始
+
+        Args:
+            whitelistIds (List[tuple]): (wlMode, id)列表
+            positions (Dict[str, tuple]): ONU SN到(slot, pon, onuId)的映射
+
+        Returns:
+            tuple: (命令列表, 结果的键列表)。PON口下命令的键为(slot, pon, 命令)，进出模式的命令的键为None。
+        """
+        cmds = [ ]
+        for wlMode in dict.fromkeys([ wlMode for wlMode, _ in whitelistIds ]):
+            cmds.append('show whitelist %s' % get_whitelist_query_str(wlMode))
+
+        if any(type(expect.get('profile')) == str for expect in self._expects.values()):
+            cmds.append('show bandwidth-profile all')
+        keys = list(cmds)
+
+        groups = { }
+        for sn, expect in self._expects.items():
+            slot, pon, onuId = positions[sn]
+            if 'count' in expect.keys():
+                groups.setdefault((slot, pon), [ ]).append('show onu port vlan %s' % onuId)
+            if 'profile' in expect.keys() or 'bandwidth' in expect.keys():
+                groups.setdefault((slot, pon), [ ]).append('show onu bandwidth %s' % onuId)
+
+        for slotPon in sorted(groups.keys()):
+            cmds.append('interface pon 1/%s/%s' % slotPon)
+            keys.append(None)
+            for cmd in dict.fromkeys(groups[slotPon]):
+                cmds.append(cmd)
+                keys.append(slotPon + (cmd, ))
+            cmds.append('exit')
+            keys.append(None)
+
+        return cmds, keys
+
+    def _verify(self, whitelistIds:List[tuple], positions:Dict[str, tuple], outputs:Dict[str, str]) -> List[str]:
+        """根据回读的结果验证配置
+
+        Args:
+            whitelistIds (List[tuple]): (wlMode, id)列表
+            positions (Dict[str, tuple]): ONU SN到(slot, pon, onuId)的映射
+            outputs (dict): 键到结果的映射，键见_verify_cmds
+
+        Returns:
+            List[str]: 验证失败的描述，全部通过时为空列表
+        """
+        failures = [ ]
+
+        for wlMode, id in whitelistIds:
+            if not whitelist_contains(extract_whitelist(outputs['show whitelist %s' % get_whitelist_query_str(wlMode)]), wlMode, id):
+                failures.append('白名单(%s)中没有%s' % (get_whitelist_query_str(wlMode), id))
+
+        profileIds = { }
+        if 'show bandwidth-profile all' in outputs.keys():
+            profileIds = { profile['Name']: int(profile['Id']) for profile in extract_bandwidth_profile(outputs['show bandwidth-profile all']) }
+
+        for sn, expect in self._expects.items():
+            slot, pon, onuId = positions[sn]
+
+            if 'count' in expect.keys():
+                portVlans = extract_onu_port_vlan(outputs[slot, pon, 'show onu port vlan %s' % onuId])
+                for eth, count in expect['count'].items():
+                    if len([ item for item in portVlans if item['PORT'] == eth ]) != count:
+                        failures.append('ONU(%s)网口%s的业务个数不是%s' % (sn, eth, count))
+
+            if 'profile' in expect.keys() or 'bandwidth' in expect.keys():
+                bandwidth = extract_onu_bandwidth(outputs[slot, pon, 'show onu bandwidth %s' % onuId])
+
+                if 'profile' in expect.keys():
+                    profile = expect['profile']
+                    id = profile if type(profile) == int else profileIds.get(profile)
+                    if bandwidth.get('prfId', -2) + 1 != id:
+                        failures.append('ONU(%s)没有关联带宽模板%s' % (sn, profile))
+
+                if 'bandwidth' in expect.keys():
+                    for k, v in expect['bandwidth'].items():
+                        if bandwidth.get(k) != v:
+                            failures.append('ONU(%s)的%s不是%s' % (sn, k, v))
+
+        return failures
+
+__all__ = [
+
+    'Transaction'
+]
@@ -1,9 +1,28 @@
 import re
-from typing import Any, NoReturn, Optional, Type, List
+from typing import Any, Callable, Dict, Iterable, NoReturn, Optional, Type, List, Tuple, Union
+from operator import itemgetter
+from functools import lru_cache
+from datetime import datetime
 from types import FunctionType
 from dateutil.parser import parse
 import threadpool
 
+# auto_convert识别值类型的正则，导入时编译一次
+INT_EXP = re.compile(r'^-?(?:0[xX][\da-fA-F]+|\d+)$') # 匹配 10和16进制的±整数
+FLOAT_EXP = re.compile(r'^-?\d+\.\d+$') # 匹配 10进制的±浮点数
+DATETIME_EXP = re.compile(r'\d{4,4}-\d{1,2}-\d{1,2}\s\d{1,2}:\d{1,2}:\d{1,2}')
+# OLT输出时间的固定格式，如'2020-09-22 14:09:29'，可不经dateutil直接构造datetime
+FIXED_DATETIME_EXP = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})\s(\d{1,2}):(\d{1,2}):(\d{1,2})$')
+# OLT表示没有时间的值
+ZERO_DATETIME = '0000-00-00 00:00:00'
+
+# 点分格式的子网掩码
+MASK_EXP = re.compile(r'(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})')
+
+# 定宽表格标题下的下划线，如'---- --- ---'，至少两列
+UNDERLINE_EXP = re.compile(r'^ *-+(?: +-+)+ *$')
+DASHES_EXP = re.compile(r'-+')
+
 
 def run_by_thread_pool(func:FunctionType, argList:List, poolSize:int=5) -> NoReturn:
     """使用线程池的方法运行函数
@@ -13,7 +32,7 @@ def run_by_thread_pool(func:FunctionType, argList:List, poolSize:int=5) -> NoRet
         argList (list): 参数列表
         poolSize (int, optional): 线程池大小。默认5。
     """
-    pool = threadpool.ThreadPool(5)
+    pool = threadpool.ThreadPool(poolSize)
 
     requests = threadpool.makeRequests(func, argList)
     [pool.putRequest(req) for req in requests]
@@ -36,31 +55,211 @@ def auto_convert(value:str, max_value:Optional[int]=None) -> Any:
     # 去掉首尾空格
     value = value.strip()
     
-    intExp = re.compile('^-?(0x|0X)?\d+$') # 匹配 10和16进制的±整数
-    floatExp = re.compile('^-?\d+.\d+$') # 匹配 10进制的±浮点数
-    datetimeExp = re.compile("\d{4,4}-\d{1,2}-\d{1,2}\s\d{1,2}:\d{1,2}:\d{1,2}")
-
-    if intExp.match(value):
+    if INT_EXP.match(value):
         # 如果是整数类型
-        intValue = int(value, 10 if value.find('0x') == -1 and  value.find('0x') == -1 else 16)
+        intValue = int(value, 16 if value.lower().find('0x') != -1 else 10)
         if max_value != None and intValue == max_value:
             # 当设置了达到最大值的选项，且满足时，返回'null'
             return 'null'
         else:
             return intValue
-    elif floatExp.match(value):
+    elif FLOAT_EXP.match(value):
         # 如果是浮点类型
         return float(value)
-    elif datetimeExp.match(value):
+    elif DATETIME_EXP.match(value):
         # 如果是日期类型
-        if value != '0000-00-00 00:00:00':
-            return parse(value)
+        if value != ZERO_DATETIME:
+            return parse_datetime(value)
         else:
             return None
     else:
         # 不识别字符串的不处理
         return value
 
+def to_int(value:str, max_value:Optional[int]=None) -> Any:
+    """将已知为整数的列的值转换为int，结果与auto_convert相同，但不逐个尝试正则。
+
+    Args:
+        value (str or None): 要转换的字符串格式的值，为None时不转换，直接返回。
+        max_value (int, optional): 同auto_convert，值为max_value时返回'null'。默认为None，不进行判定和转换。
+
+    Returns:
+        any: 十进制整数返回int，其他值（如空值、'null'）交给auto_convert处理
+    """
+    if value == None:
+        return value
+
+    value = value.strip()
+    if value.isdigit():
+        intValue = int(value)
+        return 'null' if max_value != None and intValue == max_value else intValue
+
+    return auto_convert(value, max_value)
+
+@lru_cache(maxsize=4096)
+def parse_datetime(value:str) -> datetime:
+    """解析时间字符串。OLT输出的固定格式'YYYY-MM-DD HH:MM:SS'直接构造datetime，其他格式交给dateutil解析。
+
+    同一PON下大量ONU的时间常常相同，解析结果按字符串缓存，datetime不可变，可以共用。
+
+    Args:
+        value (str): 时间字符串，如'2020-09-22 14:09:29'
+
+    Returns:
+        datetime: 对应的时间
+    """
+    match = FIXED_DATETIME_EXP.match(value)
+    if match:
+        return datetime(*map(int, match.groups()))
+
+    return parse(value)
+
+def to_datetime(value:str, max_value:Optional[int]=None) -> Any:
+    """将已知为时间的列的值转换为datetime，'0000-00-00 00:00:00'转换为None。
+
+    Args:
+        value (str or None): 要转换的字符串格式的值，为None时不转换，直接返回。
+        max_value (int, optional): 不使用，与auto_convert参数一致，方便在列转换表中替换
+
+    Returns:
+        any: 时间返回datetime，没有时间返回None，其他值交给auto_convert处理
+    """
+    if value == None:
+        return value
+
+    value = value.strip()
+    if value == ZERO_DATETIME:
+        return None
+
+    if FIXED_DATETIME_EXP.match(value):
+        return parse_datetime(value)
+
+    return auto_convert(value, max_value)
+
+def to_str(value:str, max_value:Optional[int]=None) -> Optional[str]:
+    """将已知为文本的列的值去掉首尾空格，不做类型转换。
+
+    Args:
+        value (str or None): 要转换的字符串格式的值，为None时不转换，直接返回。
+        max_value (int, optional): 不使用，与auto_convert参数一致，方便在列转换表中替换
+
+    Returns:
+        str: 去掉首尾空格的值
+    """
+    return value if value == None else value.strip()
+
+def get_converters(titles:List[str], schema:Dict[str, Callable]) -> List[Callable]:
+    """按列标题查找每列的转换函数，表中未列出的列使用auto_convert。
+
+    每张表只需查找一次，之后每行按列调用对应的转换函数即可。
+
+    Args:
+        titles (list): 表的列标题
+        schema (dict): 列标题到转换函数的映射，转换函数的参数与auto_convert相同
+
+    Returns:
+        list: 与titles顺序相同的转换函数列表
+    """
+    return [ schema.get(title, auto_convert) for title in titles ]
+
+def iter_lines(value:Union[str, Iterable[str]]) -> Iterable[str]:
+    """按行迭代命令结果。
+
+    Args:
+        value (str or iterable): 命令结果字符串，或逐行产生结果的迭代器，如OLTTelnet.run_iter的返回值
+
+    Returns:
+        iterable: 字符串按行切分后的列表，迭代器原样返回
+    """
+    return value.splitlines() if isinstance(value, str) else value
+
+def get_column_spans(underline:str) -> List[Tuple[int, Optional[int]]]:
+    """根据表格标题下的下划线计算每列的起止位置。每列从其下划线开头起，到下一列下划线开头止，最后一列到行尾。
+
+    Args:
+        underline (str): 下划线，如'---- --- ---'
+
+    Returns:
+        list: (起始位置, 结束位置)列表，最后一列的结束位置为None
+    """
+    starts = [ match.start() for match in DASHES_EXP.finditer(underline) ]
+    return list(zip(starts, starts[1:] + [ None ]))
+
+class FixedWidthTable:
+    """定宽表格解析器
+
+    逐行输入命令结果。遇到标题下的下划线时，以上一行为标题，按下划线算出每列位置，之后的每行按位置切分后转换为字典，
+    直到遇到空行或以'-'、'='开头的行。列宽每张表重新计算，固件加宽某列时无需修改。
+    空白或被截掉的单元格值为None，如未设置LogicId的ONU的LogicId列。
+    """
+
+    def __init__(self, schema:Optional[Dict[str, Callable]]=None, max_value:Optional[int]=None, entry_type:Optional[Callable]=None) -> NoReturn:
+        """构造函数
+
+        Args:
+            schema (dict, optional): 列标题到转换函数的映射，未列出的列使用auto_convert。默认为None，全部使用auto_convert。
+            max_value (int, optional): 传给转换函数的max_value。默认为None。
+            entry_type (callable, optional): 以(标题元组, 值列表)构造一行的类型，如entry.AuthorizationEntry。默认为None，每行为字典。
+        """
+        self._schema = schema or { }
+        self._max_value = max_value
+        self._entry_type = entry_type
+
+        # 上一行，遇到下划线时作为标题
+        self._previous = None
+
+        # 当前表格的标题、各行共用的标题元组、转换函数和切分各列的函数，不在表格中时cut为None
+        self._titles = None
+        self._keys = None
+        self._converters = None
+        self._cut = None
+
+    @property
+    def titles(self) -> Optional[List[str]]:
+        """最近一张表格的列标题
+
+        Returns:
+            list: 列标题，还没遇到表格时为None
+        """
+        return self._titles
+
+    def feed(self, line:str) -> Optional[dict]:
+        """输入一行
+
+        Args:
+            line (str): 命令结果中的一行，不含换行符
+
+        Returns:
+            dict: 该行是表格中的数据行时，返回标题到转换后的值的字典，空白的单元格值为None，指定了entry_type时返回entry_type的实例；否则返回None
+        """
+        previous = self._previous
+        self._previous = line
+
+        if previous != None and UNDERLINE_EXP.match(line):
+            spans = get_column_spans(line)
+            self._cut = itemgetter(*[ slice(start, end) for start, end in spans ])
+            self._titles = [ auto_convert(title) for title in self._cut(previous) ]
+            self._keys = tuple(self._titles)
+            self._converters = get_converters(self._titles, self._schema)
+            return None
+
+        if self._cut == None:
+            return None
+
+        stripped = line.strip()
+        if stripped == '' or stripped[0] in '-=':
+            # 表格结束
+            self._cut = None
+            return None
+
+        # 空白的单元格转换为None，转换函数对None原样返回
+        values = [ value.strip() or None for value in self._cut(line) ]
+
+        if self._entry_type != None:
+            return self._entry_type(self._keys, [ convert(value, self._max_value) for convert, value in zip(self._converters, values) ])
+
+        return { title: convert(value, self._max_value) for title, convert, value in zip(self._titles, self._converters, values) }
+
 
 def len_of_mask(mask:str) -> int:
     """计算子网掩码对应的长度
@@ -71,8 +270,7 @@ def len_of_mask(mask:str) -> int:
     Return:
         int: 子网掩码对应的长度，如,255.255.255.0，对应的长度是24
     """
-    maskExpr = re.compile('(\d{1,3}).(\d{1,3}).(\d{1,3}).(\d{1,3})')
-    match = maskExpr.match(mask)
+    match = MASK_EXP.match(mask)
     a, b, c, d = match.groups()
     a, b, c, d = int(a), int(b), int(c), int(d)
     strBinary = bin(((a << 8 | b ) << 8 | c) << 8 | d)[2:]
@@ -0,0 +1,272 @@
+from enum import Enum
+from typing import Any, Callable, Iterable, List, NamedTuple, NoReturn, Optional, Tuple, Union
+
+import logging
+import queue
+import threading
+import time
+
+from .snapshot import AuthorizationSnapshot
+
+logger = logging.getLogger(__name__)
+
+class ONUEventType(Enum):
+    """type of ONU event
+    """
+    online = 'online'                 # OST changed to up
+    offline = 'offline'               # OST changed from up
+    new = 'new'                       # authorized since last snapshot
+    removed = 'removed'               # not authorized any more
+    type_changed = 'type_changed'     # OnuType changed, such as ONU replaced under same SN
+
+class ONUEvent(NamedTuple):
+    """change of one ONU between two successive snapshots
+    """
+    type:ONUEventType
+    sn:str                            # PhyId, or LogicId for ONU authorized by logic id
+    entry:dict                        # entry in current snapshot, entry in previous snapshot for removed
+    previous:Optional[dict]           # entry in previous snapshot, None for new
+    time:float                        # time.time() when current snapshot was taken
+
+def get_sn(entry:dict) -> str:
+    """identity of ONU in authorization table
+
+    Args:
+        entry (dict): entry of authorization table
+
+    Returns:
+        str: PhyId, or LogicId when PhyId is empty
+    """
+    return entry.get('PhyId') or entry.get('LogicId')
+
+def find(snapshot:AuthorizationSnapshot, entry:dict) -> Optional[dict]:
+    """find entry of the same ONU in snapshot by index
+
+    Args:
+        snapshot (AuthorizationSnapshot): snapshot to find in
+        entry (dict): entry of ONU from another snapshot
+
+    Returns:
+        dict: entry, None if not found
+    """
+    if entry.get('PhyId'):
+        return snapshot.get_by_phy_id(entry['PhyId'])
+    return snapshot.get_by_logic_id(entry.get('LogicId'))
+
+def diff_snapshots(previous:AuthorizationSnapshot, current:AuthorizationSnapshot, now:Optional[float]=None) -> List[ONUEvent]:
+    """changes of ONUs from previous snapshot to current one, each entry is looked up once by index
+
+    Args:
+        previous (AuthorizationSnapshot): earlier snapshot
+        current (AuthorizationSnapshot): later snapshot
+        now (float, optional): time of events, default is None, time.time()
+
+    Returns:
+        List[ONUEvent]: events, in the order of current snapshot, then removed ONUs in the order of previous snapshot
+    """
+    now = time.time() if now == None else now
+
+    events = [ ]
+    for entry in current:
+        sn = get_sn(entry)
+        before = find(previous, entry)
+        if before == None:
+            events.append(ONUEvent(ONUEventType.new, sn, entry, None, now))
+            continue
+
+        if before.get('OnuType') != entry.get('OnuType'):
+            events.append(ONUEvent(ONUEventType.type_changed, sn, entry, before, now))
+
+        if before.get('OST') != 'up' and entry.get('OST') == 'up':
+            events.append(ONUEvent(ONUEventType.online, sn, entry, before, now))
+        elif before.get('OST') == 'up' and entry.get('OST') != 'up':
+            events.append(ONUEvent(ONUEventType.offline, sn, entry, before, now))
+
+    for entry in previous:
+        if find(current, entry) == None:
+            events.append(ONUEvent(ONUEventType.removed, get_sn(entry), entry, entry, now))
+
+    return events
+
+def in_scope(entry:dict, scope:Optional[Iterable[Union[int, Tuple[int, int]]]]) -> bool:
+    """check if ONU is in scope
+
+    Args:
+        entry (dict): entry of authorization table
+        scope (Iterable[Union[int, Tuple[int, int]]]): slots, and (slot, pon) of pon ports, None for whole OLT
+
+    Returns:
+        bool: True if in scope
+    """
+    return scope == None or entry['Slot'] in scope or (entry['Slot'], entry['Pon']) in scope
+
+class _Subscriber(NamedTuple):
+    callback:Callable[[ONUEvent], Any]
+    scope:Optional[frozenset]
+    types:Optional[frozenset]
+
+class ONUWatcher:
+    """ONU Watcher
+
+    ONUWatcher takes an authorization snapshot every interval in a background thread, diffs it with the previous one,
+    and passes the changes as ONUEvent to every subscriber interested in them, so one poller serves all watchers of an OLT.
+    """
+
+    def __init__(self, fetch:Callable[[], AuthorizationSnapshot], interval:float=5) -> NoReturn:
+        """init
+
+        Args:
+            fetch (Callable[[], AuthorizationSnapshot]): take a fresh snapshot
+            interval (float, optional): seconds between snapshots, default is 5
+        """
+        assert interval > 0, "interval should be positive"
+
+        self._fetch = fetch
+        self._interval = interval
+
+        self._subscribers:List[_Subscriber] = [ ]
+        self._lock = threading.Lock()
+
+        self._previous:Optional[AuthorizationSnapshot] = None
+        self._thread:Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def interval(self) -> float:
+        """seconds between snapshots
+
+        Returns:
+            float: interval
+        """
+        return self._interval
+
+    @interval.setter
+    def interval(self, value:float) -> NoReturn:
+        assert value > 0, "interval should be positive"
+        self._interval = value
+
+    @property
+    def running(self) -> bool:
+        """whether background thread is running
+
+        Returns:
+            bool: True if running
+        """
+        return self._thread != None and self._thread.is_alive()
+
+    def subscribe(self, callback:Callable[[ONUEvent], Any], scope:Optional[Iterable[Union[int, Tuple[int, int]]]]=None,
+                  types:Optional[Iterable[ONUEventType]]=None, start:bool=True) -> Callable[[ONUEvent], Any]:
+        """pass events to callback, in the background thread
+
+        Args:
+            callback (Callable[[ONUEvent], Any]): called with each event, exceptions raised are logged and ignored
+            scope (Iterable[Union[int, Tuple[int, int]]], optional): slots, and (slot, pon) of pon ports, default is None, whole OLT
+            types (Iterable[ONUEventType], optional): types of event, default is None, all types
+            start (bool, optional): start background thread if not running, default is True
+
+        Returns:
+            Callable[[ONUEvent], Any]: callback, to unsubscribe
+        """
+        with self._lock:
+            self._subscribers.append(_Subscriber(callback, None if scope == None else frozenset(scope), None if types == None else frozenset(types)))
+
+        if start:
+            self.start()
+
+        return callback
+
+    def listen(self, scope:Optional[Iterable[Union[int, Tuple[int, int]]]]=None, types:Optional[Iterable[ONUEventType]]=None, start:bool=True) -> queue.Queue:
+        """put events to a new queue
+
+        Args:
+            scope (Iterable[Union[int, Tuple[int, int]]], optional): slots, and (slot, pon) of pon ports, default is None, whole OLT
+            types (Iterable[ONUEventType], optional): types of event, default is None, all types
+            start (bool, optional): start background thread if not running, default is True
+
+        Returns:
+            queue.Queue: queue of ONUEvent, unsubscribe it by unsubscribe(queue.put)
+        """
+        events = queue.Queue()
+        self.subscribe(events.put, scope, types, start)
+        return events
+
+    def unsubscribe(self, callback:Callable[[ONUEvent], Any]) -> NoReturn:
+        """stop passing events to callback
+
+        Args:
+            callback (Callable[[ONUEvent], Any]): callback subscribed
+        """
+        with self._lock:
+            self._subscribers = [ subscriber for subscriber in self._subscribers if subscriber.callback != callback ]
+
+    def poll(self) -> List[ONUEvent]:
+        """take one snapshot, and pass its changes to subscribers. first snapshot is the baseline, no event for it
+
+        Returns:
+            List[ONUEvent]: all changes since last snapshot, regardless of scope of subscribers
+        """
+        current = self._fetch()
+        previous, self._previous = self._previous, current
+        if previous == None:
+            return [ ]
+
+        events = diff_snapshots(previous, current)
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for event in events:
+            for subscriber in subscribers:
+                if subscriber.types != None and event.type not in subscriber.types:
+                    continue
+                if not in_scope(event.entry, subscriber.scope):
+                    continue
+                try:
+                    subscriber.callback(event)
+                except Exception as e:
+                    logger.warning('subscriber of %s failed: %s' % (event.type.value, e))
+
+        return events
+
+    def start(self) -> NoReturn:
+        """start polling in background thread if not running
+        """
+        with self._lock:
+            if self.running:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='ONUWatcher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout:Optional[float]=None) -> NoReturn:
+        """stop background thread, subscribers are kept, and the next start takes a new baseline
+
+        Args:
+            timeout (float, optional): seconds to wait for thread to exit, default is None, wait until it exits
+        """
+        self._stopped.set()
+
+        thread = self._thread
+        if thread != None and thread != threading.current_thread():
+            thread.join(timeout)
+
+        self._previous = None
+
+    def _run(self) -> NoReturn:
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            try:
+                self.poll()
+            except Exception as e:
+                # OLT may be busy, keep previous snapshot as baseline and try again
+                logger.warning('failed to take snapshot: %s' % e)
+
+            self._stopped.wait(max(0, self._interval - (time.monotonic() - started)))
+
+__all__ = [
+
+    'ONUEventType',
+    'ONUEvent',
+    'ONUWatcher',
+    'diff_snapshots'
+]
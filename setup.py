@@ -17,7 +17,8 @@ setuptools.setup(
     long_description=readme(),
     long_description_content_type='text/markdown',
     packages=['oltcli'],
-    install_requires=['wait-util', 'threadpool'],
+    install_requires=['threadpool', 'python-dateutil'],
+    extras_require={ 'columnar': ['numpy'] },
     tests_require= ['pytest', 'pytest-html'],
     license='MIT',
     classifiers=[
@@ -25,5 +26,5 @@ setuptools.setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6'
+    python_requires='>=3.7'
 )
\ No newline at end of file
@@ -0,0 +1,113 @@
+import asyncio
+import inspect
+
+import pytest
+
+from oltcli.aio import AsyncOLTTelnet, AsyncOLTCLI_AN6K17
+from oltcli.cli import OLTCLI_AN6K17, WhitelistMode
+from oltcli.simulator import OLTSimulator
+
+class FakeWriter:
+    """record data written back to OLT
+    """
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data):
+        self.data = self.data + data
+
+def test_process_telnet_commands():
+    conn = AsyncOLTTelnet('127.0.0.1', 'GPON', 'GPON')
+    conn._writer = FakeWriter()
+
+    # escaped 0xFF, DO ECHO split between chunks, NUL, and subnegotiation
+    data = b'ab\xff\xff\xff\xfd\x01c\x00d\xff\xfa\x18\x01\xff\xf0e'
+    assert conn._process(data[:5]) + conn._process(data[5:]) == b'ab\xffcde'
+    assert conn._writer.data == b'\xff\xfc\x01'
+
+    conn._writer = None
+
+def test_async_mirrors_sync():
+
+    # every coroutine is listed in docstring, and has the same parameters as OLTCLI_AN6K17
+    for name, method in vars(AsyncOLTCLI_AN6K17).items():
+        if name.startswith('_') or not inspect.iscoroutinefunction(method):
+            continue
+        if name == 'close':
+            continue
+        assert name in AsyncOLTCLI_AN6K17.__doc__, name
+        params = lambda func: [ (param.name, param.default) for param in inspect.signature(func).parameters.values() ]
+        assert params(method) == params(getattr(OLTCLI_AN6K17, name)), name
+
+@pytest.fixture
+def simulator():
+    with OLTSimulator(reboot_time=0.2) as simulator:
+        simulator.populate(1, 2, 2)
+        yield simulator
+
+@pytest.mark.parametrize('keep_alive', [ False, True ])
+def test_async_queries(simulator, keep_alive):
+
+    simulator.add_onu(1, 2, 'FHTTaaaaaaaa', phy_pwd='pwd', authorized=False)
+    oltcli = OLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', port=simulator.port)
+
+    async def main():
+        async with AsyncOLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', keep_alive=keep_alive, port=simulator.port) as aoltcli:
+            assert await aoltcli.get_authorization() == oltcli.get_authorization()
+            assert await aoltcli.get_authorization(compact=True) == oltcli.get_authorization(compact=True)
+            assert await aoltcli.get_discovery() == oltcli.get_discovery()
+            assert await aoltcli.get_pon_discovered(1, 2) == oltcli.get_pon_discovered(1, 2)
+            for wlMode in WhitelistMode:
+                assert await aoltcli.get_whitelist(wlMode) == oltcli.get_whitelist(wlMode)
+                assert await aoltcli.get_pon_whitelist(1, 2, wlMode) == oltcli.get_pon_whitelist(1, 2, wlMode)
+
+            assert await aoltcli.get_onu_position('FHTT00000001') == oltcli.get_onu_position('FHTT00000001') == (1, 1)
+            assert await aoltcli.get_onu_position('FHTTaaaaaaaa') == (1, 2)
+            assert await aoltcli.get_onu_id('FHTT00000001') == oltcli.get_onu_id('FHTT00000001')
+            assert await aoltcli.get_onu_sn(1, 1, 2) == 'FHTT00000001'
+            assert await aoltcli.is_onu_online('FHTT00000001')
+            assert await aoltcli.is_in_whitelist(WhitelistMode.phyid, 'FHTT00000001')
+            assert not await aoltcli.is_onu_in_whitelist('FHTTaaaaaaaa')
+            with pytest.raises(RuntimeWarning):
+                await aoltcli.get_onu_position('FHTTbbbbbbbb')
+
+            # position and id of ONU are resolved from one show authorization
+            simulator.reset_stats()
+            assert (await aoltcli.get_onu_bandwidth_profile('FHTT00000001'))['prfId'] == 0
+            assert simulator.stats['logins'] == (0 if keep_alive else 2)
+            assert await aoltcli.get_onu_bandwidth_profile('FHTT00000001') == oltcli.get_onu_bandwidth_profile('FHTT00000001')
+
+    asyncio.run(main())
+
+def test_async_settings(simulator):
+
+    simulator.add_onu(1, 2, 'FHTTaaaaaaaa', phy_pwd='pwd', authorized=False)
+    oltcli = OLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', port=simulator.port)
+    oltcli.add_bandwidth_profile('bwp', 0, 1000, 0, 0, 2000)
+    oltcli.add_olt_qinq_domain('domain')
+    oltcli.bound_olt_qinq_domain(1, 2, 'domain')
+
+    async def main():
+        async with AsyncOLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', keep_alive=True, port=simulator.port) as aoltcli:
+            await aoltcli.add_whitelist(WhitelistMode.phyid_psw, 'FHTTaaaaaaaa', onuId=9)
+            assert await aoltcli.get_onu_id('FHTTaaaaaaaa') == 9
+            assert len(await aoltcli.get_discovery()) == 0
+
+            await aoltcli.del_whitelist(WhitelistMode.phyid, 'FHTTaaaaaaaa')
+            assert not await aoltcli.is_in_whitelist(WhitelistMode.phyid, 'FHTTaaaaaaaa')
+            assert len(await aoltcli.get_discovery()) == 1
+
+            assert await aoltcli.query_bandwidth_profile_id_by_name('bwp') == 1
+            await aoltcli.set_onu_bandwidth_profile('FHTT00000001', 'bwp')
+            assert (await aoltcli.get_onu_bandwidth_profile('FHTT00000001'))['prfId'] == 1
+            await aoltcli.set_onu_bandwidth('FHTT00000001', 0, 2000, 0, 3000)
+
+            assert await aoltcli.get_olt_qinq_domain('domain') == oltcli.get_olt_qinq_domain('domain')
+            assert await aoltcli.is_olt_qinq_domain_bound(1, 2, 'domain')
+            assert not await aoltcli.is_olt_qinq_domain_bound(1, 1, 'domain')
+
+            await aoltcli.reset_onu('FHTT00000000')
+            assert await aoltcli.is_onu_online('FHTT00000000')
+            await aoltcli.reset_all_onu(wait=False)
+
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+import io
+
+from oltcli import cli
+from benchmark.bench_cli import SCENARIOS, load_budgets, run
+from benchmark.bench_parser import run as run_parsers
+from benchmark.corpus import generate
+
+def test_budgets():
+
+    results = run([ 64 ], out=io.StringIO())
+
+    assert len(results) == len(SCENARIOS)
+    for result in results:
+        assert result['budget'] != None, '%s has no budget' % result['name']
+        assert not result['over_budget'], '%s exceeds budget: %d round-trips, budget is %d' % (result['name'], result['round_trips'], result['budget'])
+        assert result['logins'] > 0 and result['commands'] > 0 and result['bytes'] > 0
+
+def test_load_budgets(tmp_path):
+
+    assert load_budgets(str(tmp_path / 'none.json')) == { }
+
+    path = tmp_path / 'budgets.json'
+    path.write_text('{ "get_authorization": { "64": 8 } }')
+    assert load_budgets(str(path)) == { 'get_authorization': { 64: 8 } }
+
+def test_corpus():
+
+    corpora = { corpus.name: corpus for corpus in generate(2, 3, 20) }
+    assert len(corpora) == 10
+
+    for name, corpus in corpora.items():
+        assert len(getattr(cli, corpus.parser)(corpus.output)) == corpus.rows, name
+
+    # rows with every column filled are not taken as titles
+    entries = cli.extract_authorization(corpora['authorization'].output)
+    assert all(list(entry.keys())[:3] == [ 'Slot', 'Pon', 'Onu' ] for entry in entries)
+    assert any(entry['LogicPwd'] != None and '-' not in entry['OnuType'] for entry in entries)
+
+    entries = cli.extract_discovery(corpora['discovery'].output)
+    assert [ (entry['SLOT'], entry['PON'], entry['No']) for entry in entries[:2] ] == [ (1, 1, 1), (1, 1, 2) ]
+    assert entries[-1]['SLOT'] == 2 and entries[-1]['PON'] == 3
+
+    assert [ corpus.output for corpus in generate(2, 3, 20) ] == [ corpus.output for corpus in corpora.values() ]
+
+def test_bench_parser():
+
+    results = run_parsers(1, 2, 8, repeat=1, names=[ 'whitelist_phy1', 'bandwidth_profile' ], out=io.StringIO())
+    assert [ result['name'] for result in results ] == [ 'bandwidth_profile', 'whitelist_phy1' ]
+    assert all(result['parsed'] == 16 and result['rows_per_sec'] > 0 and result['peak_bytes'] > 0 for result in results)
+
+    baselines = { result['name']: dict(result, parsed=15, rows_per_sec=result['rows_per_sec'] * 100) for result in results }
+    results = run_parsers(1, 2, 8, repeat=1, names=[ 'whitelist_phy1' ], baselines=baselines, out=io.StringIO())
+    assert results[0]['regression'] == 'parses 16 rows instead of 15'
@@ -0,0 +1,99 @@
+import pickle
+
+import math
+
+from oltcli.cli import extract_authorization, extract_discovery, extract_whitelist, extract_onu_statistics
+from oltcli.entry import AuthorizationEntry, DiscoveryEntry, WhitelistEntry, ONUStatistics, STATISTICS_FIELDS
+from oltcli.snapshot import AuthorizationSnapshot
+from test.test_snapshot import AUTHORIZATION
+from benchmark.corpus import generate
+from datetime import datetime
+
+STATISTICS = """buf:0x8cdcddc4,len448,prtcl:0, lv:4,obj:4/8/4 type:4, order:0.
+From 2020-11-10 14:46:04 To 0000-00-00 00:00:00
+UPOctetsTransferred             :               0 (BYTEs)
+UP TotalFrame                   :               0 (PKTs)
+DownOctetsTransferred           :     71016502636 (BYTEs)
+DownTotalFrame                  :       572736211 (PKTs)
+DownSpeed                       :             512 (Kbps)
+Temperature                     :           46.83 ('C)
+Bias current                    :           16.65 (mA)
+Tx_power                        :            2.00 (mW)
+Rx_power                        :          -13.14 (dbm)
+OLT_Rx_power                    :              -- (dbm)
+"""
+
+def test_authorization_entry():
+
+    entries = extract_authorization(AUTHORIZATION, compact=True)
+    assert entries == extract_authorization(AUTHORIZATION)
+
+    entry = entries[0]
+    assert isinstance(entry, AuthorizationEntry)
+    assert (entry.slot, entry.pon, entry.onu, entry.phy_id, entry.oper_status) == (4, 8, 1, 'FHTT033178b0', 'up')
+    assert entry['PhyId'] == entry.get('PhyId') == 'FHTT033178b0'
+    assert entry.get('Nothing') == None and 'Nothing' not in entry
+    assert list(entry.keys())[:3] == [ 'Slot', 'Pon', 'Onu' ]
+    assert dict(entry) == entry.to_dict() == extract_authorization(AUTHORIZATION)[0]
+
+    # rows of a table share their titles
+    assert entries[0]._keys is entries[1]._keys
+    assert not hasattr(entry, '__dict__')
+
+    assert pickle.loads(pickle.dumps(entries)) == entries
+    assert AuthorizationSnapshot(entries).get_by_phy_id('FHTT92f445c8') is entries[1]
+
+def test_discovery_whitelist_entry():
+
+    corpora = { corpus.name: corpus for corpus in generate(1, 2, 3) }
+
+    entries = extract_discovery(corpora['discovery'].output, compact=True)
+    assert isinstance(entries[0], DiscoveryEntry)
+    assert entries == extract_discovery(corpora['discovery'].output)
+    assert (entries[-1].slot, entries[-1].pon) == (entries[-1]['SLOT'], entries[-1]['PON']) == (1, 2)
+
+    for name in [ 'whitelist_phy1', 'whitelist_log2' ]:
+        entries = extract_whitelist(corpora[name].output, compact=True)
+        assert isinstance(entries[0], WhitelistEntry)
+        assert entries == extract_whitelist(corpora[name].output)
+        assert entries[0].slot == 1 and entries[0].onu_type != None
+
+    # columns not shown are None as attribute, but not keys
+    assert entries[0].phy_id == None and 'PHYID' not in entries[0]
+    assert entries[0].logic_id == entries[0]['LOGICId']
+
+    # titles unknown to entry are still kept
+    entry = WhitelistEntry(('Slot', 'Extra'), (1, 'x'))
+    assert entry == { 'Slot': 1, 'Extra': 'x' }
+
+def test_onu_statistics():
+
+    # raw values are kept by default
+    assert extract_onu_statistics(STATISTICS)['Rx_power'] == ('-13.14', 'dbm')
+
+    statistics = extract_onu_statistics(STATISTICS, typed=True)
+    assert isinstance(statistics, ONUStatistics)
+    assert statistics.down_octets == statistics['DownOctetsTransferred'] == 71016502636
+    assert type(statistics.up_frames) == int and statistics.up_frames == 0
+    assert (statistics.temperature, statistics.bias_current, statistics.rx_power) == (46.83, 16.65, -13.14)
+    assert statistics.since == datetime(2020, 11, 10, 14, 46, 4) and statistics.until == None
+
+    # units are normalized, values not shown or not numbers are None
+    assert statistics.down_speed == 0.512
+    assert round(statistics.tx_power, 2) == 3.01
+    assert statistics.olt_rx_power == None and statistics.up_speed == None
+
+    vector = statistics.to_vector()
+    assert len(vector) == len(STATISTICS_FIELDS)
+    assert vector[[ name for _, name, _, _ in STATISTICS_FIELDS ].index('down_octets')] == 71016502636
+    assert math.isnan(vector[[ name for _, name, _, _ in STATISTICS_FIELDS ].index('olt_rx_power')])
+
+    restored = ONUStatistics.from_vector(vector, statistics.since)
+    assert restored.down_octets == 71016502636 and restored.olt_rx_power == None
+
+def test_onu_statistics_unknown_unit():
+    statistics = extract_onu_statistics(STATISTICS.replace('-13.14 (dbm)', '-13.14 (uw)'), typed=True)
+
+    # unknown unit does not fail the other fields
+    assert statistics.rx_power == None
+    assert statistics.temperature == 46.83 and statistics.down_octets == 71016502636
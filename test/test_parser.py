@@ -0,0 +1,42 @@
+from oltcli.cli import get_parser, parse_output, extract_authorization, extract_bandwidth, extract_bandwidth_profile, extract_pon_auto_discover, iter_authorization
+from test.test_snapshot import AUTHORIZATION
+
+def test_get_parser():
+
+    assert get_parser('show authorization') == extract_authorization
+
+    # longest prefix wins, and arguments are ignored
+    assert get_parser('show bandwidth') == extract_bandwidth
+    assert get_parser('show  bandwidth-profile 1') == extract_bandwidth_profile
+
+    try:
+        get_parser('show nothing')
+        assert False
+    except RuntimeWarning:
+        pass
+
+    # same command in interface pon mode is not registered
+    assert get_parser('show onu auto-discover') != extract_pon_auto_discover
+
+def test_parse_output():
+
+    entries = parse_output('show authorization', AUTHORIZATION)
+    assert [ entry['PhyId'] for entry in entries ] == [ 'FHTT033178b0', 'FHTT92f445c8' ]
+
+    assert parse_output('show bandwidth', 'BANDWIDTH: UP 1000 DOWN 2000') == { 'UP': 1000, 'DOWN': 2000 }
+
+def test_schema():
+
+    entry = parse_output('show authorization', AUTHORIZATION)[0]
+    assert (entry['Slot'], entry['Pon'], entry['Onu'], entry['OnuType'], entry['Lic']) == (4, 8, 1, '5506-04-F1', 0)
+
+    # columns not in schema are still converted by auto_convert
+    assert entry['PhyPwd'] == None
+
+def test_iter_authorization():
+
+    entries = iter_authorization(AUTHORIZATION.splitlines())
+    assert next(entries)['PhyId'] == 'FHTT033178b0'
+    assert [ entry['PhyId'] for entry in entries ] == [ 'FHTT92f445c8' ]
+
+    assert list(iter_authorization(AUTHORIZATION)) == extract_authorization(AUTHORIZATION)
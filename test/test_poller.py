@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from oltcli.poller import SnapshotPoller, wait_all
+from oltcli.snapshot import AuthorizationSnapshot
+
+def make_snapshot(online):
+    return AuthorizationSnapshot([ { 'Slot': 1, 'Pon': 1, 'Onu': i + 1, 'PhyId': sn, 'OST': 'up' } for i, sn in enumerate(online) ])
+
+class FakeOLT:
+
+    def __init__(self):
+        self.online = set()
+        self.fetches = 0
+        self.lock = threading.Lock()
+
+    def fetch(self):
+        with self.lock:
+            self.fetches += 1
+            return make_snapshot(sorted(self.online))
+
+def test_poller():
+
+    olt = FakeOLT()
+    poller = SnapshotPoller(olt.fetch, interval=0.02, max_interval=0.1)
+
+    futures = { sn: poller.submit(lambda snapshot, sn=sn: snapshot.get_by_phy_id(sn), 2, sn) for sn in [ 'A', 'B', 'C' ] }
+    time.sleep(0.1)
+    olt.online.update([ 'A', 'B', 'C' ])
+
+    results = wait_all(futures)
+    assert results['B']['PhyId'] == 'B'
+
+    # all waits share one snapshot per tick
+    assert olt.fetches == poller.ticks < 15
+    assert poller.pending == 0
+
+def test_poller_timeout():
+
+    olt = FakeOLT()
+    poller = SnapshotPoller(olt.fetch, interval=0.02, max_interval=0.1)
+
+    # each wait has its own timeout
+    slow = poller.submit(lambda snapshot: snapshot.get_by_phy_id('A'), 0.1, 'A')
+    fast = poller.submit(lambda snapshot: True, 1, 'B')
+    assert fast.result() == True
+
+    with pytest.raises(TimeoutError) as e:
+        wait_all({ 'A': slow, 'B': fast })
+    assert 'A' in str(e.value) and 'B' not in str(e.value)
+
+def test_poller_backoff():
+
+    olt = FakeOLT()
+    poller = SnapshotPoller(olt.fetch, interval=0.01, max_interval=0.2, backoff=2)
+
+    with pytest.raises(TimeoutError):
+        poller.submit(lambda snapshot: False, 0.5).result()
+
+    # 0.01, 0.02, 0.04 ... 0.2, instead of 50 ticks
+    assert poller.ticks < 10
+
+def test_poller_error():
+
+    def fail(snapshot):
+        raise RuntimeWarning('failed')
+
+    poller = SnapshotPoller(FakeOLT().fetch, interval=0.01)
+    with pytest.raises(RuntimeWarning):
+        poller.submit(fail, 1).result()
+
+def test_poller_sequence():
+
+    olt = FakeOLT()
+    olt.online.add('A')
+    poller = SnapshotPoller(olt.fetch, interval=0.02, max_interval=0.05)
+
+    future = poller.submit_sequence([ (lambda snapshot: snapshot.get_by_phy_id('A') == None, 1),
+                                      (lambda snapshot: snapshot.get_by_phy_id('A'), 1) ], 'A')
+    time.sleep(0.1)
+    assert not future.done()
+
+    olt.online.discard('A')
+    time.sleep(0.1)
+    assert not future.done()
+
+    olt.online.add('A')
+    assert future.result(1)['PhyId'] == 'A'
+
+    # timeout of second stage counts from first stage held
+    future = poller.submit_sequence([ (lambda snapshot: True, 1), (lambda snapshot: False, 0.1) ], 'B')
+    with pytest.raises(TimeoutError):
+        future.result(1)
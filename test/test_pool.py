@@ -0,0 +1,68 @@
+import pytest
+import time
+
+import oltcli.session
+from oltcli.pool import OLTSessionPool, get_pool
+from oltcli.telnet import OLTTelnet
+from test.test_session import FakeTelnet
+
+def setup_function():
+    oltcli.session.OLTTelnet = FakeTelnet
+    FakeTelnet.commands = [ ]
+    FakeTelnet.logins = 0
+    FakeTelnet.drop_once = False
+
+def teardown_function():
+    oltcli.session.OLTTelnet = OLTTelnet
+
+def test_pool_reuse():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON', max_size=2)
+
+    for _ in range(3):
+        with pool.connection() as session:
+            session.run('show time')
+
+    assert FakeTelnet.logins == 1
+    assert pool.size == 1 and pool.idle == 1
+
+def test_pool_max_size():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON', max_size=1)
+
+    session = pool.checkout()
+    with pytest.raises(RuntimeError):
+        pool.checkout(timeout=0.1)
+
+    pool.checkin(session)
+    assert pool.checkout(timeout=0.1) != None
+
+def test_pool_idle_eviction():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON', idle_timeout=0.05)
+
+    with pool.connection() as session:
+        session.run('show time')
+    assert pool.idle == 1
+
+    time.sleep(0.1)
+    pool.evict_idle()
+    assert pool.idle == 0
+
+def test_get_pool():
+    assert get_pool('127.0.0.2', 'GPON', 'GPON') is get_pool('127.0.0.2', 'GPON', 'GPON')
+    assert get_pool('127.0.0.2', 'GPON', 'GPON') is not get_pool('127.0.0.2', 'admin', 'admin')
+    assert get_pool('127.0.0.2', 'GPON', 'GPON') is not get_pool('127.0.0.2', 'GPON', 'changed')
+
+def test_pool_release():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON')
+
+    owner, other = object(), object()
+    with pool.connection(owner=owner) as session:
+        with pool.connection(owner=other) as session2:
+            session.run('show time')
+            session2.run('show time')
+    assert pool.idle == 2
+
+    pool.release(owner)
+    assert pool.idle == 1
+
+    with pool.connection() as session:
+        assert session is session2
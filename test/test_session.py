@@ -0,0 +1,244 @@
+import pytest
+
+import oltcli.cli
+import oltcli.session
+from oltcli.cli import OLTCLI_AN6K17
+from oltcli.session import OLTSession, is_mode_command, is_read_command
+from oltcli.telnet import OLTTelnet, CommandResult
+from oltcli.simulator import OLTSimulator
+
+class FakeTelnet:
+    """record commands instead of sending them to OLT
+    """
+    commands = [ ]
+    logins = 0
+    # raise EOFError before or after command is written
+    drop_once = False
+    drop_after_sent = None
+    # commands rejected by OLT
+    rejects = [ ]
+
+    def __init__(self, ip, username, password, **kwargs):
+        self.modes = [ ]
+        self.sent = 0
+
+    @property
+    def mode(self):
+        return self.modes[-1] if len(self.modes) != 0 else None
+
+    def connect(self):
+        FakeTelnet.logins = FakeTelnet.logins + 1
+        self.modes = [ ]
+
+    def disconnect(self):
+        pass
+
+    def run(self, cmd, **kwargs):
+        self.sent = 0
+        if FakeTelnet.drop_once:
+            FakeTelnet.drop_once = False
+            raise EOFError('telnet connection closed')
+
+        self.sent = 1
+        FakeTelnet.commands.append(cmd)
+        if FakeTelnet.drop_after_sent == cmd:
+            FakeTelnet.drop_after_sent = None
+            raise EOFError('telnet connection closed')
+
+        if cmd in FakeTelnet.rejects:
+            return '% Unknown command.'
+        if cmd == 'config':
+            self.modes.append('config')
+        elif cmd.startswith('interface pon '):
+            self.modes.append('config-pon-%s' % cmd.split()[-1])
+        elif cmd == 'exit' and len(self.modes) != 0:
+            self.modes.pop()
+        return ''
+
+    def run_iter(self, cmd, **kwargs):
+        return iter(self.run(cmd, **kwargs).splitlines())
+
+    def run_batch(self, cmds, **kwargs):
+        results = [ ]
+        for cmd in cmds:
+            output = self.run(cmd)
+            results.append(CommandResult(cmd, output, output or None, self.mode))
+        return results
+
+def setup_function():
+    oltcli.session.OLTTelnet = FakeTelnet
+    FakeTelnet.commands = [ ]
+    FakeTelnet.logins = 0
+    FakeTelnet.drop_once = False
+    FakeTelnet.drop_after_sent = None
+    FakeTelnet.rejects = [ ]
+
+def teardown_function():
+    oltcli.session.OLTTelnet = OLTTelnet
+
+def test_is_mode_command():
+    assert is_mode_command('config')
+    assert is_mode_command('interface pon 1/4/8')
+    assert not is_mode_command('show authorization')
+    assert is_read_command('show authorization') and is_read_command('exit')
+    assert not is_read_command('onu reset 1')
+
+def test_session_reuse_modes():
+    session = OLTSession('127.0.0.1', 'GPON', 'GPON')
+
+    with session.checkout() as conn:
+        conn.run('config')
+        conn.run('interface pon 1/4/8')
+        conn.run('onu reset 1')
+
+    with session.checkout() as conn:
+        conn.run('config')
+        conn.run('interface pon 1/4/8')
+        conn.run('onu reset 2')
+
+    with session.checkout() as conn:
+        conn.run('config')
+        conn.run('show authorization')
+
+    assert FakeTelnet.logins == 1
+    assert FakeTelnet.commands == ['config', 'interface pon 1/4/8', 'onu reset 1', 'onu reset 2', 'exit', 'show authorization']
+    assert session.modes == ['config']
+
+def test_session_nested_restore():
+    session = OLTSession('127.0.0.1', 'GPON', 'GPON')
+
+    with session.checkout() as conn:
+        conn.run('config')
+        conn.run('interface pon 1/4/8')
+        with session.checkout() as inner:
+            inner.run('config')
+            inner.run('show authorization')
+        conn.run('onu reset 1')
+
+    assert FakeTelnet.commands == ['config', 'interface pon 1/4/8', 'exit', 'show authorization', 'interface pon 1/4/8', 'onu reset 1']
+
+def test_cli_session():
+    cli = OLTCLI_AN6K17('127.0.0.1', 'GPON', 'GPON')
+
+    # commands and methods in the with block share one login
+    with cli.session() as conn:
+        conn.run('config')
+        cli.get_authorization()
+        cli.get_discovery()
+    cli.get_authorization()
+
+    assert FakeTelnet.logins == 2
+    assert FakeTelnet.commands[:3] == ['config', 'show authorization', 'show discovery']
+
+def test_set_ip_address_port(monkeypatch):
+
+    class RefusedTelnet:
+        ports = [ ]
+
+        def __init__(self, ip, username, password, **kwargs):
+            RefusedTelnet.ports.append(kwargs.get('port', 23))
+
+        def __enter__(self):
+            raise ConnectionRefusedError()
+
+        def __exit__(self, exc_type, exc_value, exc_tb):
+            pass
+
+    # connection of its own is opened to the port of cli, not the default telnet port
+    monkeypatch.setattr(oltcli.cli, 'OLTTelnet', RefusedTelnet)
+    with pytest.raises(ConnectionRefusedError):
+        OLTCLI_AN6K17('127.0.0.1', 'GPON', 'GPON', port=2323).set_ip_address('192.168.1.2', '255.255.255.0')
+    assert RefusedTelnet.ports == [ 2323 ]
+
+def test_session_reconnect():
+    session = OLTSession('127.0.0.1', 'GPON', 'GPON')
+
+    with session.checkout() as conn:
+        conn.run('config')
+        conn.run('interface pon 1/4/8')
+        FakeTelnet.drop_once = True
+        conn.run('onu reset 1')
+
+    assert FakeTelnet.logins == 2
+    assert FakeTelnet.commands == ['config', 'interface pon 1/4/8', 'config', 'interface pon 1/4/8', 'onu reset 1']
+    assert session.modes == ['config', 'interface pon 1/4/8']
+
+def test_session_run_batch():
+    session = OLTSession('127.0.0.1', 'GPON', 'GPON')
+
+    with session.checkout() as conn:
+        conn.run('config')
+        conn.run('interface pon 1/4/8')
+
+    with session.checkout() as conn:
+        results = conn.run_batch([ 'config', 'interface pon 1/4/8', 'onu reset 1', 'onu reset 2', 'exit', 'show authorization' ])
+
+    assert [ result.cmd for result in results ] == [ 'config', 'interface pon 1/4/8', 'onu reset 1', 'onu reset 2', 'exit', 'show authorization' ]
+    assert FakeTelnet.commands == [ 'config', 'interface pon 1/4/8', 'onu reset 1', 'onu reset 2', 'exit', 'show authorization' ]
+    assert session.modes == [ 'config' ]
+
+def test_session_not_retried():
+    session = OLTSession('127.0.0.1', 'GPON', 'GPON')
+
+    with session.checkout() as conn:
+        conn.run('config')
+        conn.run('interface pon 1/4/8')
+
+        # OLT may have run the command
+        FakeTelnet.drop_after_sent = 'onu reset 1'
+        with pytest.raises(EOFError):
+            conn.run('onu reset 1')
+        assert not session.connected
+
+        # read command is sent again
+        FakeTelnet.drop_after_sent = 'show authorization'
+        conn.run('show authorization')
+
+    assert FakeTelnet.logins == 3
+    assert FakeTelnet.commands == [ 'config', 'interface pon 1/4/8', 'onu reset 1', 'config', 'interface pon 1/4/8', 'show authorization',
+                                    'config', 'interface pon 1/4/8', 'show authorization' ]
+    assert session.modes == [ 'config', 'interface pon 1/4/8' ]
+
+    with session.checkout() as conn:
+        FakeTelnet.drop_after_sent = 'onu reset 1'
+        with pytest.raises(EOFError):
+            conn.run_batch([ 'config', 'interface pon 1/4/8', 'onu reset 1', 'onu reset 2' ])
+    assert FakeTelnet.commands[-1] == 'onu reset 1'
+
+def test_session_rejected_mode():
+    session = OLTSession('127.0.0.1', 'GPON', 'GPON')
+    FakeTelnet.rejects = [ 'interface pon 1/40/8' ]
+
+    with session.checkout() as conn:
+        conn.run('config')
+        assert conn.run('interface pon 1/40/8') == '% Unknown command.'
+        conn.run('show authorization')
+    assert session.modes == [ 'config' ]
+
+    with session.checkout() as conn:
+        conn.run_batch([ 'config', 'interface pon 1/40/8', 'onu reset 1', 'exit' ])
+    assert session.modes == [ ]
+
+def test_session_timeout_not_retried():
+    oltcli.session.OLTTelnet = OLTTelnet
+
+    with OLTSimulator(latencies={ 'onu reset': 1.5 }) as simulator:
+        simulator.populate(1, 1, 1)
+        session = OLTSession(simulator.host, 'GPON', 'GPON', port=simulator.port, timeout=1)
+
+        with session.checkout() as conn:
+            conn.run('config')
+            conn.run('interface pon 1/1/1')
+            simulator.reset_stats()
+            with pytest.raises(TimeoutError):
+                conn.run('onu reset 1')
+
+        assert simulator.stats['commands'] == 1 and simulator.stats['logins'] == 0
+        assert not session.connected
+
+        with session.checkout() as conn:
+            conn.run('config')
+            conn.run('interface pon 1/1/1')
+            assert conn.run('show authorization') != ''
+        assert session.modes == [ 'config', 'interface pon 1/1/1' ]
+        session.disconnect()
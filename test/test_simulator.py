@@ -0,0 +1,186 @@
+import asyncio
+
+import pytest
+
+from oltcli.simulator import OLTSimulator
+from oltcli.cli import OLTCLI_AN6K17, WhitelistMode
+from oltcli.telnet import OLTTelnet
+from oltcli.session import OLTSession
+from oltcli.poller import wait_all
+
+@pytest.fixture
+def simulator():
+    with OLTSimulator(reboot_time=0.2) as simulator:
+        simulator.populate(1, 2, 2)
+        yield simulator
+
+def test_simulator_telnet(simulator):
+
+    with OLTTelnet(simulator.host, 'GPON', 'GPON', port=simulator.port) as telnet:
+        assert telnet.hostname == 'Admin'
+        assert telnet.run('config') == ''
+        assert telnet.mode == 'config'
+        telnet.run('interface pon 1/1/2')
+        assert telnet.mode == 'config-pon-1/1/2'
+        assert telnet.run('show nothing') == '% Unknown command.'
+
+        results = telnet.run_batch([ 'exit', 'exit', 'config' ])
+        assert [ result.ok for result in results ] == [ True, True, True ]
+        assert telnet.mode == 'config'
+
+def test_simulator_run_iter(simulator):
+
+    simulator.populate(2, 16, 32)
+    with OLTTelnet(simulator.host, 'GPON', 'GPON', port=simulator.port) as telnet:
+        telnet.run('config')
+        lines = list(telnet.run_iter('show authorization'))
+        assert lines == telnet.run('show authorization').split('\r\n')
+        assert len([ line for line in lines if line.startswith('FHTT') or line[:1].isdigit() ]) == 1028
+
+        assert list(telnet.run_iter('interface pon 1/1/2')) == [ '' ]
+        assert telnet.mode == 'config-pon-1/1/2'
+
+        # rest of result is dropped when stopped early
+        lines = telnet.run_iter('show authorization')
+        next(lines)
+        lines.close()
+        assert telnet.run('show nothing') == '% Unknown command.'
+
+    session = OLTSession(simulator.host, 'GPON', 'GPON', port=simulator.port)
+    with session.checkout() as conn:
+        conn.run('config')
+        assert len(list(conn.run_iter('show discovery'))) > 0
+    assert session.modes == [ 'config' ]
+    session.disconnect()
+
+def test_simulator_iter_authorization(simulator):
+
+    simulator.populate(2, 16, 32)
+    oltcli = OLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', port=simulator.port)
+
+    assert sum(1 for onu in oltcli.iter_authorization() if onu['Slot'] == 2) == 512
+    assert len(list(oltcli.iter_whitelist(WhitelistMode.phyid))) == len(oltcli.get_whitelist(WhitelistMode.phyid))
+    assert list(oltcli.iter_discovery()) == oltcli.get_discovery()
+    assert oltcli.get_authorization(compact=True) == oltcli.get_authorization()
+    assert next(oltcli.iter_authorization(compact=True)).phy_id != None
+
+    # connection is released when stopped early
+    onus = oltcli.iter_authorization()
+    next(onus)
+    onus.close()
+    assert len(oltcli.get_authorization()) == 1028
+
+def test_simulator_whitelist(simulator):
+
+    simulator.add_onu(1, 2, 'FHTTaaaaaaaa', phy_pwd='pwd', authorized=False)
+    oltcli = OLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', port=simulator.port)
+
+    assert len(oltcli.get_authorization()) == 4
+    assert [ onu['PhyId'] for onu in oltcli.get_discovery() ] == [ 'FHTTaaaaaaaa' ]
+
+    oltcli.add_whitelist(WhitelistMode.phyid_psw, 'FHTTaaaaaaaa', onuId=9)
+    assert oltcli.get_onu_position('FHTTaaaaaaaa') == (1, 2)
+    assert oltcli.get_onu_id('FHTTaaaaaaaa') == 9
+    assert len(oltcli.get_discovery()) == 0
+
+    oltcli.del_whitelist(WhitelistMode.phyid, 'FHTTaaaaaaaa')
+    assert len(oltcli.get_discovery()) == 1
+
+    oltcli.reset_onu('FHTT00000000')
+    assert oltcli.is_onu_online('FHTT00000000')
+
+def test_simulator_whitelist_bulk(simulator):
+
+    simulator.populate(1, 2, 128, authorized=False)
+    oltcli = OLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', port=simulator.port)
+
+    sns = [ onu['PhyId'] for onu in oltcli.get_discovery() ]
+    assert len(sns) == 256
+
+    oltcli.add_whitelist_bulk(WhitelistMode.phyid, sns[:-1] + [ (sns[-1], 200) ])
+    assert len(oltcli.get_discovery()) == 0
+    assert len(oltcli.get_whitelist(WhitelistMode.phyid)) == 260
+    assert oltcli.get_onu_id(sns[-1]) == 200
+
+    simulator.add_onu(1, 1, 'FHTTaaaaaaaa', authorized=False)
+    with pytest.raises(RuntimeWarning):
+        oltcli.add_whitelist_bulk(WhitelistMode.phyid, [ 'FHTTaaaaaaaa', 'FHTTbbbbbbbb' ])
+    assert len(oltcli.get_discovery()) == 1
+
+    # onu id already used is rejected by OLT
+    with pytest.raises(RuntimeWarning):
+        oltcli.add_whitelist_bulk(WhitelistMode.phyid, [ ('FHTTaaaaaaaa', 1) ])
+
+    oltcli.del_whitelist_bulk(sns[:128])
+    assert len(oltcli.get_discovery()) == 129
+    assert oltcli.get_onu_position(sns[-1]) == (1, 2)
+
+    oltcli.del_whitelist_bulk([ 'FHTTbbbbbbbb' ], [ WhitelistMode.logid ])
+
+    # password whitelist not bound to ONU shows slot and pon 65535, leading zeros are kept
+    with OLTTelnet(simulator.host, 'GPON', 'GPON', port=simulator.port) as telnet:
+        telnet.run('config')
+        assert telnet.run('whitelist add password 000123') == ''
+        assert telnet.run('whitelist add password 000456') == ''
+        assert telnet.run('whitelist add password 000789') == ''
+    assert [ onu['Slot'] for onu in oltcli.get_whitelist(WhitelistMode.password) ] == [ 65535, 65535, 65535 ]
+
+    oltcli.del_whitelist_bulk([ '000123' ], [ WhitelistMode.password ])
+    assert len(oltcli.get_whitelist(WhitelistMode.password)) == 2
+
+    oltcli.del_whitelist_bulk(None, [ WhitelistMode.password ])
+    assert len(oltcli.get_whitelist(WhitelistMode.password)) == 0
+    with OLTTelnet(simulator.host, 'GPON', 'GPON', port=simulator.port) as telnet:
+        telnet.run('config')
+        assert telnet.run('whitelist add password 000789') == ''
+
+    oltcli.clear_whitelist()
+    assert len(oltcli.get_authorization()) == 0
+    assert len(oltcli.get_whitelist(WhitelistMode.password)) == 0
+
+def test_simulator_bandwidth_profile(simulator):
+
+    oltcli = OLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', port=simulator.port)
+
+    oltcli.add_bandwidth_profile('bwp', 0, 1000, 0, 0, 2000)
+    oltcli.modify_bandwidth_profile('bwp', 0, 1000, 0, 0, 3000)
+    assert oltcli.query_bandwidth_profile_id_by_name('bwp') == 1
+
+    oltcli.set_onu_bandwidth_profile('FHTT00000001', 'bwp')
+    assert oltcli.get_onu_bandwidth_profile('FHTT00000001')['prfId'] == 1
+
+    oltcli.del_bandwidth_profile('bwp')
+    assert oltcli.get_bandwidth_profile() == [ ]
+
+def test_simulator_qinq_domain(simulator):
+
+    oltcli = OLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', port=simulator.port)
+
+    oltcli.add_olt_qinq_domain('domain')
+    oltcli.set_olt_qinq_domain_service_count('domain', 2)
+    oltcli.set_olt_qinq_domain_service_type('domain', 2, 'share')
+    oltcli.set_olt_qinq_domain_stream_rules('domain', 1, 'upstream', [ (7, 100, 5), (12, '192.168.1.1', 0) ])
+
+    oltcli.bound_olt_qinq_domain(1, 2, 'domain')
+    assert oltcli.is_olt_qinq_domain_bound(1, 2, 'domain')
+
+    oltcli.unbound_olt_qinq_domain(1, 2, 'domain')
+    oltcli.del_olt_qinq_domain('domain')
+    assert not oltcli.exist_olt_qinq_domain('domain')
+
+def test_simulator_reset_nowait(simulator):
+
+    simulator.populate(2, 4, 8)
+    oltcli = OLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', port=simulator.port)
+
+    futures = oltcli.reset_all_onu_nowait()
+    assert len(futures) == 68 and not any(future.done() for future in futures.values())
+
+    results = wait_all(futures)
+    assert all(entry['OST'] == 'up' for entry in results.values())
+
+    # awaitable in asyncio
+    async def reset(sn):
+        return await asyncio.wrap_future(oltcli.reset_onu_nowait(sn))
+
+    assert asyncio.run(reset('FHTT00000000'))['PhyId'] == 'FHTT00000000'
@@ -0,0 +1,89 @@
+import oltcli.session
+from oltcli.cli import OLTCLI_AN6K17, extract_authorization, extract_discovery
+from oltcli.snapshot import ONUIndex, AuthorizationSnapshot
+from oltcli.pool import OLTSessionPool
+from oltcli.telnet import OLTTelnet
+from test.test_session import FakeTelnet
+
+AUTHORIZATION = '''-----  ONU Auth Table, SLOT = 4, PON = 8, ITEM = 2 -----
+Slot Pon Onu OnuType        ST Lic OST PhyId        PhyPwd     LogicId                  LogicPwd
+---- --- --- -------------- -- --- --- ------------ ---------- ------------------------ ------------
+4    8   1   5506-04-F1     A  0   up  FHTT033178b0                                                 
+4    8   64  HG6243C        A  0   dn  FHTT92f445c8                                                 '''
+
+DISCOVERY = '''----- ONU Unauth Table, SLOT = 4, PON = 8, ITEM = 1 -----
+No  OnuType        PhyId        PhyPwd     LogicId                  LogicPwd     Why
+--- -------------- ------------ ---------- ------------------------ ------------ ---
+1   HG6243C        FHTT91fbc5e8 fiberhome  fiberhome                fiberhome    1   '''
+
+class AuthTelnet(FakeTelnet):
+    """return authorization table for show authorization, and discovery table for show discovery
+    """
+    def run(self, cmd, **kwargs):
+        super().run(cmd, **kwargs)
+        return { 'show authorization': AUTHORIZATION, 'show discovery': DISCOVERY }.get(cmd, '')
+
+def setup_function():
+    oltcli.session.OLTTelnet = AuthTelnet
+    FakeTelnet.commands = [ ]
+    FakeTelnet.logins = 0
+    FakeTelnet.drop_once = False
+
+def teardown_function():
+    oltcli.session.OLTTelnet = OLTTelnet
+
+def test_snapshot_index():
+    snapshot = AuthorizationSnapshot(extract_authorization(AUTHORIZATION))
+
+    assert len(snapshot) == 2
+    assert 'FHTT033178b0' in snapshot
+    assert snapshot.get_by_phy_id('FHTT92f445c8')['Onu'] == 64
+    assert snapshot.get_by_position(4, 8, 1)['PhyId'] == 'FHTT033178b0'
+    assert snapshot.get_by_position(4, 8, 2) == None
+
+def test_snapshot_ttl():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON')
+    cli = OLTCLI_AN6K17('127.0.0.1', 'GPON', 'GPON', pool=pool, auth_ttl=60)
+
+    assert cli.get_onu_position('FHTT033178b0') == (4, 8)
+    assert cli.get_onu_id('FHTT033178b0') == 1
+    assert cli.is_onu_online('FHTT033178b0')
+    assert not cli.is_onu_online('FHTT92f445c8')
+    assert cli.get_onu_sn(4, 8, 64) == 'FHTT92f445c8'
+    assert FakeTelnet.commands.count('show authorization') == 1
+
+    cli.invalidate_authorization()
+    cli.get_onu_id('FHTT033178b0')
+    assert FakeTelnet.commands.count('show authorization') == 2
+
+def test_snapshot_without_ttl():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON')
+    cli = OLTCLI_AN6K17('127.0.0.1', 'GPON', 'GPON', pool=pool)
+
+    cli.get_onu_id('FHTT033178b0')
+    cli.get_onu_id('FHTT033178b0')
+    assert FakeTelnet.commands.count('show authorization') == 2
+
+def test_onu_index():
+    index = ONUIndex(extract_authorization(AUTHORIZATION))
+
+    assert index.locate('FHTT92f445c8') == (4, 8, 64)
+    assert index.locate('FHTT00000000') == None
+    assert [ entry['PhyId'] for entry in index.get_by_type('HG6243C') ] == [ 'FHTT92f445c8' ]
+
+    # ONUs without LogicId are not indexed by logic id
+    assert index.get_by_logic_id('') == None
+    assert index.get_by_logic_id(None) == None
+
+    index = ONUIndex(extract_discovery(DISCOVERY), position_keys=('SLOT', 'PON', None))
+    assert index.locate('FHTT91fbc5e8') == (4, 8, None)
+    assert index.get_by_logic_id('fiberhome')['PhyId'] == 'FHTT91fbc5e8'
+
+def test_resolve_onu_once():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON')
+    cli = OLTCLI_AN6K17('127.0.0.1', 'GPON', 'GPON', pool=pool)
+
+    cli.set_onu_port_vlan_tls('FHTT92f445c8', 1, 1, True)
+    assert FakeTelnet.commands == [ 'config', 'show authorization', 'interface pon 1/4/8', 'onu port vlan 64 eth 1 service 1 tls enable' ]
+
+    assert cli.get_onu_position('FHTT91fbc5e8') == (4, 8)
@@ -1,11 +1,42 @@
-from oltcli.telnet import OLTTelnet
+import pytest
 
-def test_olttelnet():
-    telnet = OLTTelnet('10.182.33.210', 'GPON', 'GPON')
+from oltcli.simulator import OLTSimulator
+from oltcli.telnet import OLTTelnet, compile_prompt, find_error
+
+@pytest.fixture
+def simulator():
+    with OLTSimulator() as simulator:
+        simulator.populate(1, 1, 1)
+        yield simulator
+
+def test_olttelnet(simulator):
+    telnet = OLTTelnet(simulator.host, 'GPON', 'GPON', port=simulator.port)
     telnet.connect()
     assert telnet.run('config') == ''
     telnet.disconnect()
 
-def test_olttelnet_with():
-    with OLTTelnet('10.182.33.210', 'GPON', 'GPON') as telnet:
+def test_olttelnet_with(simulator):
+    with OLTTelnet(simulator.host, 'GPON', 'GPON', port=simulator.port) as telnet:
         assert telnet.run('config') == ''
+
+def test_olttelnet_run_batch(simulator):
+    with OLTTelnet(simulator.host, 'GPON', 'GPON', port=simulator.port) as telnet:
+        results = telnet.run_batch([ 'config', 'show authorization', 'exit' ])
+        assert [ result.cmd for result in results ] == [ 'config', 'show authorization', 'exit' ]
+        assert all(result.ok for result in results)
+        assert 'FHTT00000000' in results[1].output
+        assert telnet.mode == None
+
+def test_compile_prompt():
+    exp = compile_prompt('Admin')
+
+    assert exp.search(b'show time\r\nAdmin# ').group('mode') == None
+    assert exp.search(b'interface pon 1/4/8\r\nAdmin(config-pon-1/4/8)# ').group('mode') == b'config-pon-1/4/8'
+    assert exp.search(b'exit\r\nUser> ') != None
+    assert exp.search(b'line 1 Admin# \r\nOther# ') == None
+
+def test_find_error():
+    assert find_error('') == None
+    assert find_error('Command executes success.') == None
+    assert find_error('  ^\r\n% Unknown command.') == '% Unknown command.'
+    assert find_error('Error: onu 129 is not exist') == 'Error: onu 129 is not exist'
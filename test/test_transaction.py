@@ -0,0 +1,98 @@
+import pytest
+
+import oltcli.session
+from oltcli.cli import OLTCLI_AN6K17
+from oltcli.pool import OLTSessionPool
+from oltcli.telnet import OLTTelnet
+from oltcli.transaction import Transaction
+from test.test_session import FakeTelnet
+from test.test_snapshot import AuthTelnet
+
+BANDWIDTH = '''onu: slot 4 pon 8 onu 64.
+upMaxband: 2000.
+downMaxband: 3000.
+upAssureBand: 0.
+downAssureBand: 0.
+upFixband: 0.
+prfId: -1.'''
+
+class BandwidthTelnet(AuthTelnet):
+    """return bandwidth of onu for show onu bandwidth
+    """
+    def run(self, cmd, **kwargs):
+        if cmd.startswith('show onu bandwidth'):
+            super().run(cmd, **kwargs)
+            return BANDWIDTH
+        return super().run(cmd, **kwargs)
+
+class ProfileTelnet(BandwidthTelnet):
+    """return an empty bandwidth profile table for show bandwidth-profile all
+    """
+    def run(self, cmd, **kwargs):
+        if cmd == 'show bandwidth-profile all':
+            super().run(cmd, **kwargs)
+            return '-------- onubandwidth profile, num = 0 --------'
+        return super().run(cmd, **kwargs)
+
+def setup_function():
+    oltcli.session.OLTTelnet = BandwidthTelnet
+    FakeTelnet.commands = [ ]
+    FakeTelnet.logins = 0
+    FakeTelnet.drop_once = False
+
+def teardown_function():
+    oltcli.session.OLTTelnet = OLTTelnet
+
+def test_transaction():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON')
+    cli = OLTCLI_AN6K17('127.0.0.1', 'GPON', 'GPON', pool=pool)
+
+    with Transaction(cli) as tx:
+        tx.set_onu_port_vlan_service_type('FHTT92f445c8', 1, 1, 'unicast')
+        tx.set_onu_bandwidth('FHTT92f445c8', 0, 2000, 0, 3000)
+        tx.set_onu_port_vlan_tls('FHTT033178b0', 1, 1, True)
+
+    assert FakeTelnet.logins == 1
+    assert FakeTelnet.commands == [
+        'config',
+        'show authorization',
+        'interface pon 1/4/8',
+        'onu port vlan 64 eth 1 service 1 type unicast',
+        'onu bandwidth 64 upstream-pir 2000 downstream-pir 3000 upstream-cir 0 upstream-fir 0',
+        'onu port vlan 1 eth 1 service 1 tls enable',
+        'exit',
+        'interface pon 1/4/8',
+        'show onu bandwidth 64',
+        'exit'
+    ]
+
+def test_transaction_verify_failed():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON')
+    cli = OLTCLI_AN6K17('127.0.0.1', 'GPON', 'GPON', pool=pool)
+
+    with pytest.raises(RuntimeWarning):
+        with Transaction(cli) as tx:
+            tx.set_onu_bandwidth('FHTT92f445c8', 0, 1000, 0, 3000)
+
+def test_transaction_not_committed_on_error():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON')
+    cli = OLTCLI_AN6K17('127.0.0.1', 'GPON', 'GPON', pool=pool)
+
+    with pytest.raises(ValueError):
+        with Transaction(cli) as tx:
+            tx.set_onu_port_vlan_tls('FHTT033178b0', 1, 1, True)
+            tx.set_onu_port_vlan_service_vlan('FHTT033178b0', 1, 1, ('unknown', ))
+
+    assert FakeTelnet.commands == [ ]
+
+def test_transaction_percent_in_profile_name():
+    pool = OLTSessionPool('127.0.0.1', 'GPON', 'GPON')
+    cli = OLTCLI_AN6K17('127.0.0.1', 'GPON', 'GPON', pool=pool)
+
+    # profile is not in the profile table, so verification fails after the command is run
+    oltcli.session.OLTTelnet = ProfileTelnet
+    with pytest.raises(RuntimeWarning):
+        with Transaction(cli) as tx:
+            tx.set_onu_bandwidth_profile('FHTT92f445c8', '100%up')
+
+    assert 'onu bandwidth-profile 64 profile-name 100%up' in FakeTelnet.commands
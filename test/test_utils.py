@@ -17,6 +17,8 @@ def test_auto_convert():
 
     assert auto_convert('0x11') == 17
 
+    assert auto_convert('0XfF') == 255
+
 
 def test_validate_key():
 
@@ -33,3 +35,50 @@ def test_len_of_mask():
 
     assert len_of_mask('255.255.255.0') == 24
 
+
+def test_typed_converters():
+
+    assert to_int(' 8 ') == 8
+    assert to_int('65535', 65535) == 'null'
+    assert to_int('    ') == ''
+    assert to_int(None) == None
+
+    assert to_str(' 123456 ') == '123456'
+    assert to_str(None) == None
+
+    assert get_converters(['Slot', 'PhyPwd'], { 'Slot': to_int }) == [ to_int, auto_convert ]
+
+
+def test_parse_datetime():
+
+    from dateutil.parser import parse
+
+    for value in [ '2020-09-22 14:09:29', '2021-3-6 2:00:09', '2020-11-10T14:46:04' ]:
+        assert parse_datetime(value) == parse(value)
+
+    # repeated timestamps are parsed once
+    assert parse_datetime('2020-09-22 14:09:29') is parse_datetime('2020-09-22 14:09:29')
+
+    assert to_datetime(' 2020-09-22 14:09:29 ') == datetime(2020, 9, 22, 14, 9, 29)
+    assert to_datetime('0000-00-00 00:00:00') == None
+    assert to_datetime('') == ''
+
+
+def test_fixed_width_table():
+
+    assert get_column_spans('---- --- ---') == [ (0, 5), (5, 9), (9, None) ]
+
+    table = FixedWidthTable({ 'Slot': to_int }, max_value=65535)
+    lines = [ '-----  ONU Auth Table, SLOT = 4, PON = 8, ITEM = 2 -----',
+              'Slot Pon   PhyId        PhyPwd',
+              '---- ----- ------------ ------',
+              '4    65535 FHTT033178b0 123456',
+              '4    8     FHTT92f445c8',
+              '',
+              '4    8     FHTT00000000' ]
+    entries = [ entry for entry in map(table.feed, lines) if entry != None ]
+
+    # column widened by firmware and trailing empty column (None) are both fine, rows after blank line are not in table
+    assert entries == [ { 'Slot': 4, 'Pon': 'null', 'PhyId': 'FHTT033178b0', 'PhyPwd': 123456 },
+                        { 'Slot': 4, 'Pon': 8, 'PhyId': 'FHTT92f445c8', 'PhyPwd': None } ]
+    assert table.titles == [ 'Slot', 'Pon', 'PhyId', 'PhyPwd' ]
@@ -0,0 +1,71 @@
+import queue
+import time
+
+from oltcli.cli import OLTCLI_AN6K17
+from oltcli.simulator import OLTSimulator
+from oltcli.snapshot import AuthorizationSnapshot
+from oltcli.watcher import ONUWatcher, ONUEventType, diff_snapshots
+
+def entry(sn, slot=1, pon=1, onu=1, ost='up', onuType='HG6243C'):
+    return { 'Slot': slot, 'Pon': pon, 'Onu': onu, 'OnuType': onuType, 'OST': ost, 'PhyId': sn, 'LogicId': '' }
+
+def test_diff_snapshots():
+
+    previous = AuthorizationSnapshot([ entry('A'), entry('B', onu=2), entry('C', onu=3, ost='dn'), entry('D', onu=4) ])
+    current = AuthorizationSnapshot([ entry('A'), entry('B', onu=2, ost='dn'), entry('C', onu=3), entry('D', onu=4, onuType='5506-04-F1'), entry('E', onu=5) ])
+
+    events = diff_snapshots(previous, current)
+    assert [ (event.type, event.sn) for event in events ] == [
+        (ONUEventType.offline, 'B'), (ONUEventType.online, 'C'), (ONUEventType.type_changed, 'D'), (ONUEventType.new, 'E') ]
+    assert events[0].previous['OST'] == 'up' and events[0].entry['OST'] == 'dn'
+
+    events = diff_snapshots(current, AuthorizationSnapshot([ entry('A') ]))
+    assert [ (event.type, event.sn) for event in events ] == [ (ONUEventType.removed, sn) for sn in 'BCDE' ]
+
+    # ONU authorized by logic id is known by LogicId
+    logic = dict(entry(''), LogicId='logic1')
+    events = diff_snapshots(AuthorizationSnapshot([ logic ]), AuthorizationSnapshot([ dict(logic, OST='dn') ]))
+    assert [ (event.type, event.sn) for event in events ] == [ (ONUEventType.offline, 'logic1') ]
+
+def test_watcher_scope():
+
+    snapshots = [
+        AuthorizationSnapshot([ entry('A'), entry('B', slot=2) ]),
+        AuthorizationSnapshot([ entry('A', ost='dn'), entry('B', slot=2, ost='dn') ])
+    ]
+    watcher = ONUWatcher(lambda: snapshots.pop(0))
+
+    events = [ ]
+    watcher.subscribe(events.append, scope=[ 2 ], start=False)
+    offline = watcher.listen(scope=[ (1, 1) ], types=[ ONUEventType.online ], start=False)
+
+    assert watcher.poll() == [ ]
+    assert len(watcher.poll()) == 2
+    assert [ event.sn for event in events ] == [ 'B' ]
+    assert offline.empty()
+
+def test_watcher_simulator():
+
+    with OLTSimulator(reboot_time=0.3) as simulator:
+        simulator.populate(1, 2, 2)
+        oltcli = OLTCLI_AN6K17(simulator.host, 'GPON', 'GPON', port=simulator.port)
+
+        events = queue.Queue()
+        oltcli.watch(events.put, scope=[ (1, 2) ], interval=0.1)
+        watcher = oltcli.get_watcher()
+        assert watcher.running
+
+        # wait for baseline
+        time.sleep(0.3)
+        sn = [ onu['PhyId'] for onu in oltcli.get_authorization() if onu['Pon'] == 2 ][0]
+        oltcli.reset_onu(sn)
+
+        types = [ ]
+        while ONUEventType.online not in types:
+            event = events.get(timeout=5)
+            assert event.sn == sn
+            types.append(event.type)
+        assert types == [ ONUEventType.offline, ONUEventType.online ]
+
+        oltcli.close()
+        assert not watcher.running